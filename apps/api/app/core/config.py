@@ -1,9 +1,13 @@
 from dataclasses import dataclass
 import os
+import tempfile
 from typing import Literal
 
 
 Environment = Literal["development", "staging", "production"]
+PdfEngine = Literal["weasyprint", "native"]
+
+_DEFAULT_PDF_CACHE_DIR = os.path.join(tempfile.gettempdir(), "zollpilot-pdf-cache")
 
 
 @dataclass(frozen=True)
@@ -37,6 +41,29 @@ class Settings:
     rate_limit_validation: int
     rate_limit_fields: int
 
+    # PDF Rendering (Prozess-Pool, Engine siehe services/pdf_service.py)
+    pdf_engine: PdfEngine = "weasyprint"
+    pdf_render_workers: int = 2
+    pdf_render_queue_size: int = 8
+    pdf_render_timeout_seconds: int = 30
+
+    # PDF Cache (lokale Platte, siehe services/pdf_cache.py)
+    pdf_cache_dir: str = _DEFAULT_PDF_CACHE_DIR
+    pdf_cache_max_mb: int = 256
+    pdf_cache_hits_consume_credit: bool = True
+
+    # PDF Export-Jobs (Worker-Pool, siehe services/pdf_jobs.py)
+    pdf_job_poll_seconds: int = 5
+
+    # Prefill-Auswertung (Prozess-Pool, siehe services/prefill_extractor.py)
+    prefill_workers: int = 1
+    prefill_queue_size: int = 8
+    prefill_timeout_seconds: int = 10
+    prefill_max_pages: int = 5
+    # Ergebnis-Cache der Prefill-Auswertung (siehe services/prefill_cache.py)
+    prefill_cache_max_entries: int = 256
+    prefill_cache_ttl_seconds: int = 600
+
 
 class ConfigurationError(Exception):
     """Raised when configuration is invalid."""
@@ -114,6 +141,11 @@ def get_settings() -> Settings:
     if session_cookie_domain in {"localhost", "127.0.0.1"}:
         session_cookie_domain = None
 
+    pdf_engine_str = os.getenv("PDF_ENGINE", "weasyprint")
+    if pdf_engine_str not in ("weasyprint", "native"):
+        pdf_engine_str = "weasyprint"
+    pdf_engine: PdfEngine = pdf_engine_str  # type: ignore
+
     settings = Settings(
         environment=environment,
         debug_mode=_get_bool(os.getenv("DEBUG_MODE"), False),
@@ -132,6 +164,20 @@ def get_settings() -> Settings:
         rate_limit_pdf=_get_int("RATE_LIMIT_PDF", 10),
         rate_limit_validation=_get_int("RATE_LIMIT_VALIDATION", 30),
         rate_limit_fields=_get_int("RATE_LIMIT_FIELDS", 120),
+        pdf_engine=pdf_engine,
+        pdf_render_workers=_get_int("PDF_RENDER_WORKERS", 2),
+        pdf_render_queue_size=_get_int("PDF_RENDER_QUEUE_SIZE", 8),
+        pdf_render_timeout_seconds=_get_int("PDF_RENDER_TIMEOUT_SECONDS", 30),
+        pdf_cache_dir=os.getenv("PDF_CACHE_DIR") or _DEFAULT_PDF_CACHE_DIR,
+        pdf_cache_max_mb=_get_int("PDF_CACHE_MAX_MB", 256),
+        pdf_cache_hits_consume_credit=_get_bool(os.getenv("PDF_CACHE_HITS_CONSUME_CREDIT"), True),
+        pdf_job_poll_seconds=_get_int("PDF_JOB_POLL_SECONDS", 5),
+        prefill_workers=_get_int("PREFILL_WORKERS", 1),
+        prefill_queue_size=_get_int("PREFILL_QUEUE_SIZE", 8),
+        prefill_timeout_seconds=_get_int("PREFILL_TIMEOUT_SECONDS", 10),
+        prefill_max_pages=_get_int("PREFILL_MAX_PAGES", 5),
+        prefill_cache_max_entries=_get_int("PREFILL_CACHE_MAX_ENTRIES", 256),
+        prefill_cache_ttl_seconds=_get_int("PREFILL_CACHE_TTL_SECONDS", 600),
     )
     
     # Validate (will raise ConfigurationError if critical issues)
@@ -26,6 +26,7 @@ class ErrorCode(str, Enum):
     SNAPSHOT_NOT_FOUND = "SNAPSHOT_NOT_FOUND"
     PLAN_NOT_FOUND = "PLAN_NOT_FOUND"
     TENANT_NOT_FOUND = "TENANT_NOT_FOUND"
+    PDF_JOB_NOT_FOUND = "PDF_JOB_NOT_FOUND"
 
     # Validation / Bad Request (400)
     VALIDATION_ERROR = "VALIDATION_ERROR"
@@ -38,6 +39,7 @@ class ErrorCode(str, Enum):
     CASE_NOT_SUBMITTED = "CASE_NOT_SUBMITTED"
     CASE_ARCHIVED = "CASE_ARCHIVED"
     NO_SNAPSHOT = "NO_SNAPSHOT"
+    PDF_JOB_NOT_READY = "PDF_JOB_NOT_READY"
 
     # Payment Required (402)
     INSUFFICIENT_CREDITS = "INSUFFICIENT_CREDITS"
@@ -50,6 +52,14 @@ class ErrorCode(str, Enum):
 
     # Server Error (500)
     INTERNAL_SERVER_ERROR = "INTERNAL_SERVER_ERROR"
+    PDF_RENDER_FAILED = "PDF_RENDER_FAILED"
+    PREFILL_FAILED = "PREFILL_FAILED"
+
+    # Service Unavailable (503) / Timeout (504)
+    PDF_RENDERER_BUSY = "PDF_RENDERER_BUSY"
+    PDF_RENDER_TIMEOUT = "PDF_RENDER_TIMEOUT"
+    PREFILL_BUSY = "PREFILL_BUSY"
+    PREFILL_TIMEOUT = "PREFILL_TIMEOUT"
 
 
 # HTTP Status Code Mapping
@@ -72,12 +82,14 @@ ERROR_STATUS_MAP: dict[ErrorCode, int] = {
     ErrorCode.SNAPSHOT_NOT_FOUND: status.HTTP_404_NOT_FOUND,
     ErrorCode.PLAN_NOT_FOUND: status.HTTP_404_NOT_FOUND,
     ErrorCode.TENANT_NOT_FOUND: status.HTTP_404_NOT_FOUND,
+    ErrorCode.PDF_JOB_NOT_FOUND: status.HTTP_404_NOT_FOUND,
     # 409 Conflict
     ErrorCode.CASE_INVALID: status.HTTP_409_CONFLICT,
     ErrorCode.CASE_NOT_EDITABLE: status.HTTP_409_CONFLICT,
     ErrorCode.CASE_NOT_SUBMITTED: status.HTTP_409_CONFLICT,
     ErrorCode.CASE_ARCHIVED: status.HTTP_409_CONFLICT,
     ErrorCode.NO_SNAPSHOT: status.HTTP_409_CONFLICT,
+    ErrorCode.PDF_JOB_NOT_READY: status.HTTP_409_CONFLICT,
     ErrorCode.EMAIL_IN_USE: status.HTTP_409_CONFLICT,
     # 413 Payload Too Large (HTTP_413_REQUEST_ENTITY_TOO_LARGE is deprecated)
     ErrorCode.PAYLOAD_TOO_LARGE: 413,
@@ -85,6 +97,14 @@ ERROR_STATUS_MAP: dict[ErrorCode, int] = {
     ErrorCode.RATE_LIMITED: status.HTTP_429_TOO_MANY_REQUESTS,
     # 500 Internal Server Error
     ErrorCode.INTERNAL_SERVER_ERROR: status.HTTP_500_INTERNAL_SERVER_ERROR,
+    ErrorCode.PDF_RENDER_FAILED: status.HTTP_500_INTERNAL_SERVER_ERROR,
+    ErrorCode.PREFILL_FAILED: status.HTTP_500_INTERNAL_SERVER_ERROR,
+    # 503 Service Unavailable
+    ErrorCode.PDF_RENDERER_BUSY: status.HTTP_503_SERVICE_UNAVAILABLE,
+    ErrorCode.PREFILL_BUSY: status.HTTP_503_SERVICE_UNAVAILABLE,
+    # 504 Gateway Timeout
+    ErrorCode.PDF_RENDER_TIMEOUT: status.HTTP_504_GATEWAY_TIMEOUT,
+    ErrorCode.PREFILL_TIMEOUT: status.HTTP_504_GATEWAY_TIMEOUT,
 }
 
 
@@ -100,6 +120,7 @@ ERROR_MESSAGES: dict[ErrorCode, str] = {
     ErrorCode.SNAPSHOT_NOT_FOUND: "Snapshot nicht gefunden.",
     ErrorCode.PLAN_NOT_FOUND: "Plan nicht gefunden.",
     ErrorCode.TENANT_NOT_FOUND: "Mandant nicht gefunden.",
+    ErrorCode.PDF_JOB_NOT_FOUND: "PDF-Export-Job nicht gefunden.",
     ErrorCode.VALIDATION_ERROR: "Validierungsfehler.",
     ErrorCode.CONTRACT_VERSION_INVALID: "Contract version missing or invalid.",
     ErrorCode.NO_PROCEDURE_BOUND: "Kein Verfahren zugewiesen.",
@@ -108,10 +129,17 @@ ERROR_MESSAGES: dict[ErrorCode, str] = {
     ErrorCode.CASE_NOT_SUBMITTED: "Fall muss eingereicht sein.",
     ErrorCode.CASE_ARCHIVED: "Archivierte Fälle können nicht geändert werden.",
     ErrorCode.NO_SNAPSHOT: "Kein Snapshot vorhanden.",
+    ErrorCode.PDF_JOB_NOT_READY: "PDF ist noch nicht fertig.",
     ErrorCode.INSUFFICIENT_CREDITS: "Nicht genügend Credits.",
     ErrorCode.PAYLOAD_TOO_LARGE: "Anfrage zu groß.",
     ErrorCode.RATE_LIMITED: "Zu viele Anfragen. Bitte später erneut versuchen.",
     ErrorCode.INTERNAL_SERVER_ERROR: "Interner Serverfehler.",
+    ErrorCode.PDF_RENDER_FAILED: "PDF konnte nicht erstellt werden. Es wurde kein Credit verbraucht.",
+    ErrorCode.PDF_RENDERER_BUSY: "PDF-Erstellung ausgelastet. Bitte später erneut versuchen.",
+    ErrorCode.PDF_RENDER_TIMEOUT: "PDF-Erstellung hat zu lange gedauert. Es wurde kein Credit verbraucht.",
+    ErrorCode.PREFILL_FAILED: "Beleg konnte nicht ausgewertet werden.",
+    ErrorCode.PREFILL_BUSY: "Belegauswertung ausgelastet. Bitte später erneut versuchen.",
+    ErrorCode.PREFILL_TIMEOUT: "Belegauswertung hat zu lange gedauert. Bitte ein kleineres Dokument hochladen.",
 }
 
 
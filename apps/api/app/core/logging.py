@@ -7,6 +7,7 @@ Alle Log-Ausgaben sind JSON-formatiert und enthalten:
 - userId (falls vorhanden)
 - tenantId (falls vorhanden)
 - error.code (bei Fehlern)
+- stage_timings (optional, siehe StageTimer)
 """
 
 from __future__ import annotations
@@ -14,8 +15,10 @@ from __future__ import annotations
 import json
 import logging
 import sys
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Iterator
 
 from starlette.requests import Request
 
@@ -32,7 +35,7 @@ class StructuredLogFormatter(logging.Formatter):
         }
 
         # Füge extra Felder hinzu (requestId, userId, tenantId, etc.)
-        for key in ["request_id", "user_id", "tenant_id", "path", "method", "status_code", "error_code", "duration_ms"]:
+        for key in ["request_id", "user_id", "tenant_id", "path", "method", "status_code", "error_code", "duration_ms", "stage_timings"]:
             value = getattr(record, key, None)
             if value is not None:
                 log_data[key] = value
@@ -144,3 +147,30 @@ def log_request(request: Request) -> RequestLogger:
     """
     return RequestLogger(get_logger("api"), request)
 
+
+
+class StageTimer:
+    """
+    Misst die Dauer benannter Abschnitte eines Requests.
+
+    Die Zeiten (ms) werden in request.state.stage_timings abgelegt und von
+    der Logging-Middleware mit dem Request-Log ausgegeben.
+
+    Usage:
+        timer = StageTimer(request)
+        with timer.stage("load_case"):
+            case = await ...
+    """
+
+    def __init__(self, request: Request | None = None):
+        self.stages: dict[str, float] = {}
+        if request is not None:
+            request.state.stage_timings = self.stages
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round((time.perf_counter() - start) * 1000, 2)
@@ -0,0 +1,126 @@
+"""
+Bulk Case Export - Serialisierung von Fällen für JSONL und CSV.
+
+Formate:
+- JSONL: ein Objekt pro Fall inkl. aller Felder und des letzten Snapshots
+- CSV: feste Fall-Spalten, danach eine Spalte pro Feld-Key (sortiert).
+  Nicht-String-Werte werden als JSON geschrieben.
+
+WICHTIG:
+- Dieses Modul enthält KEINEN Datenbankzugriff (siehe routes/case_export.py)
+- Jede Funktion arbeitet auf einem einzelnen Fall, damit der Export
+  batchweise mit konstantem Speicherbedarf streamen kann
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Iterable
+
+
+# Feste CSV-Spalten vor den Feld-Spalten
+CSV_BASE_COLUMNS = (
+    "id",
+    "title",
+    "status",
+    "procedure_code",
+    "procedure_version",
+    "created_at",
+    "updated_at",
+    "snapshot_version",
+    "snapshot_created_at",
+)
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.JSONL: "application/x-ndjson",
+}
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def serialize_case(
+    case: Any,
+    latest_snapshot: Any | None,
+    snapshot_fields: dict[str, Any] | None = None,
+    snapshot_validation: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """
+    Wandelt einen Fall (mit `fields` und `procedure` geladen) in ein Export-Dict.
+
+    Die Payloads des Snapshots werden vom Aufrufer aufgelöst
+    (siehe services/snapshot_store.py).
+    """
+    procedure = getattr(case, "procedure", None)
+    snapshot = None
+    if latest_snapshot:
+        snapshot = {
+            "version": latest_snapshot.version,
+            "procedure_code": latest_snapshot.procedure_code,
+            "procedure_version": latest_snapshot.procedure_version,
+            "created_at": _iso(latest_snapshot.created_at),
+            "fields": snapshot_fields or {},
+            "validation": snapshot_validation or {},
+        }
+
+    return {
+        "id": case.id,
+        "title": case.title,
+        "status": case.status,
+        "procedure_code": procedure.code if procedure else None,
+        "procedure_version": case.procedure_version,
+        "created_at": _iso(case.created_at),
+        "updated_at": _iso(case.updated_at),
+        "fields": {field.key: field.value_json for field in (case.fields or [])},
+        "latest_snapshot": snapshot,
+    }
+
+
+def format_csv_value(value: Any) -> str:
+    """Strings unverändert, None leer, alles andere als JSON."""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def csv_header(field_keys: Iterable[str]) -> list[str]:
+    return [*CSV_BASE_COLUMNS, *field_keys]
+
+
+def csv_row(record: dict[str, Any], field_keys: Iterable[str]) -> list[str]:
+    """Baut eine CSV-Zeile aus einem serialisierten Fall."""
+    snapshot = record.get("latest_snapshot") or {}
+    base = {
+        **record,
+        "snapshot_version": snapshot.get("version"),
+        "snapshot_created_at": snapshot.get("created_at"),
+    }
+    fields = record.get("fields") or {}
+    return [
+        *(format_csv_value(base.get(column)) for column in CSV_BASE_COLUMNS),
+        *(format_csv_value(fields.get(key)) for key in field_keys),
+    ]
+
+
+def encode_csv_line(values: list[str]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(values)
+    return buffer.getvalue().encode("utf-8")
+
+
+def encode_jsonl_line(record: dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
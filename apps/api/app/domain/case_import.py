@@ -0,0 +1,285 @@
+"""
+Bulk Case Import - Parsing und Normalisierung von Import-Zeilen.
+
+Unterstützte Formate:
+- CSV: Kopfzeile mit Spaltennamen, reservierte Spalten `title` und
+  `procedure_code`, alle weiteren Spalten sind Feld-Keys
+- JSONL: ein Objekt pro Zeile, {"title": ..., "procedure_code": ..., "fields": {...}}
+
+WICHTIG:
+- Parsing ist inkrementell (Chunk für Chunk bzw. Zeile für Zeile), der
+  Speicherbedarf hängt nur von der längsten Zeile ab, nicht von der Dateigröße
+- CSV wird mit csv.reader zerlegt (Felder in Anführungszeichen dürfen
+  Zeilenumbrüche enthalten, ein `"` mitten im Feld ist ein normales Zeichen)
+- Dieses Modul enthält KEINEN Datenbankzugriff (siehe routes/case_import.py)
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, BinaryIO, Iterator
+
+from app.domain.procedures import ProcedureDefinition
+
+
+# Reservierte CSV-Spalten (alle anderen Spalten sind Feld-Keys)
+RESERVED_COLUMNS = frozenset({"title", "procedure_code"})
+
+# Maximale Länge einer logischen Zeile (Schutz gegen Zeilen ohne Umbruch)
+MAX_LINE_LENGTH = 256 * 1024
+
+_TRUE_VALUES = frozenset({"true", "1", "ja", "yes", "y", "x"})
+_FALSE_VALUES = frozenset({"false", "0", "nein", "no", "n", ""})
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+
+
+class ImportRowError(Exception):
+    """Fehler in einer einzelnen Import-Zeile (Zeile wird übersprungen)."""
+
+    def __init__(self, code: str, message: str):
+        self.code = code
+        self.message = message
+        super().__init__(message)
+
+
+class ImportAborted(ImportRowError):
+    """Fehler, nach dem die Datei nicht weiter gelesen werden kann."""
+
+
+def _line_too_long() -> ImportAborted:
+    return ImportAborted("LINE_TOO_LONG", "Zeile überschreitet die maximale Länge.")
+
+
+def _invalid_encoding() -> ImportAborted:
+    return ImportAborted("INVALID_ENCODING", "Datei ist nicht UTF-8-kodiert.")
+
+
+@dataclass
+class ImportRow:
+    """Eine geparste, noch nicht validierte Import-Zeile."""
+    row_number: int
+    title: str | None
+    procedure_code: str | None
+    fields: dict[str, Any] = field(default_factory=dict)
+    raw_fields: bool = False  # True bei CSV: Werte sind Strings und müssen typisiert werden
+
+
+class LineSplitter:
+    """Zerlegt einen Byte-Stream inkrementell in Textzeilen (JSONL)."""
+
+    def __init__(self, encoding: str = "utf-8-sig"):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="strict")
+        self._buffer = ""
+
+    def feed(self, chunk: bytes) -> Iterator[str]:
+        """Nimmt einen Chunk auf und liefert alle vollständigen Zeilen."""
+        try:
+            self._buffer += self._decoder.decode(chunk)
+        except UnicodeDecodeError as exc:
+            raise _invalid_encoding() from exc
+        yield from self._drain(final=False)
+
+    def close(self) -> Iterator[str]:
+        """Liefert die restlichen Zeilen nach Ende des Streams."""
+        try:
+            self._buffer += self._decoder.decode(b"", final=True)
+        except UnicodeDecodeError as exc:
+            raise _invalid_encoding() from exc
+        yield from self._drain(final=True)
+
+    def _drain(self, final: bool) -> Iterator[str]:
+        lines = self._buffer.split("\n")
+        self._buffer = "" if final else lines.pop()
+        if len(self._buffer) > MAX_LINE_LENGTH:
+            raise _line_too_long()
+
+        for line in lines:
+            yield line.rstrip("\r")
+
+
+class CsvRecordReader:
+    """
+    Liest CSV-Datensätze inkrementell aus einem Byte-Stream (csv.reader
+    über einem TextIOWrapper, Zeilen höchstens MAX_LINE_LENGTH Zeichen).
+
+    Iterieren liefert die Werte je Datensatz (leere Liste für Leerzeilen).
+
+    Raises (beim Iterieren):
+        ImportRowError: Datensatz nicht lesbar (z.B. offenes
+            Anführungszeichen); danach geht es mit der nächsten Zeile weiter
+        ImportAborted: Kodierungsfehler oder zu lange Zeile
+    """
+
+    def __init__(self, stream: BinaryIO, encoding: str = "utf-8-sig"):
+        self._text = io.TextIOWrapper(stream, encoding=encoding, errors="strict", newline="")
+        self._reader = csv.reader(self._lines(), strict=True)
+
+    def _lines(self) -> Iterator[str]:
+        while True:
+            try:
+                line = self._text.readline(MAX_LINE_LENGTH + 1)
+            except UnicodeDecodeError as exc:
+                raise _invalid_encoding() from exc
+            if not line:
+                return
+            if len(line) > MAX_LINE_LENGTH:
+                raise _line_too_long()
+            yield line
+
+    def __iter__(self) -> Iterator[list[str]]:
+        return self
+
+    def __next__(self) -> list[str]:
+        try:
+            return next(self._reader)
+        except csv.Error as exc:
+            raise ImportRowError("INVALID_ROW", f"Ungültiger CSV-Datensatz: {exc}.") from exc
+
+
+class RowParser:
+    """
+    Wandelt logische Zeilen in ImportRows um.
+
+    CSV: Die erste nicht-leere Zeile ist die Kopfzeile; Datensätze kommen
+    als Zeile oder bereits zerlegt (CsvRecordReader).
+    JSONL: Leere Zeilen werden ignoriert.
+    """
+
+    def __init__(self, fmt: ImportFormat):
+        self.format = fmt
+        self._header: list[str] | None = None
+        self._row_number = 0
+
+    def parse(self, record: str | list[str]) -> ImportRow | None:
+        """Parst einen Datensatz; None für Kopf- und Leerzeilen."""
+        if isinstance(record, list):
+            return self._parse_csv(record) if any(v.strip() for v in record) else None
+        if not record.strip():
+            return None
+        if self.format == ImportFormat.CSV:
+            try:
+                values = next(csv.reader([record], strict=True))
+            except csv.Error as exc:
+                self.skip_row()
+                raise ImportRowError("INVALID_ROW", f"Ungültiger CSV-Datensatz: {exc}.") from exc
+            return self._parse_csv(values)
+        return self._parse_jsonl(record)
+
+    def skip_row(self) -> int:
+        """
+        Zählt einen Datensatz, den CsvRecordReader nicht lesen konnte, und
+        liefert seine Zeilennummer.
+
+        Raises:
+            ImportAborted: die Kopfzeile selbst war nicht lesbar
+        """
+        if self._header is None:
+            raise ImportAborted("INVALID_ROW", "Kopfzeile ist kein gültiges CSV.")
+        self._row_number += 1
+        return self._row_number
+
+    def _parse_csv(self, values: list[str]) -> ImportRow | None:
+        if self._header is None:
+            self._header = [column.strip() for column in values]
+            return None
+
+        self._row_number += 1
+        if len(values) != len(self._header):
+            raise ImportRowError(
+                "INVALID_ROW",
+                f"Zeile hat {len(values)} Spalten, erwartet {len(self._header)}.",
+            )
+
+        record = dict(zip(self._header, values))
+        return ImportRow(
+            row_number=self._row_number,
+            title=record.get("title") or None,
+            procedure_code=record.get("procedure_code") or None,
+            fields={
+                key: value for key, value in record.items()
+                if key not in RESERVED_COLUMNS and value.strip() != ""
+            },
+            raw_fields=True,
+        )
+
+    def _parse_jsonl(self, line: str) -> ImportRow:
+        self._row_number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ImportRowError("INVALID_JSON", f"Ungültiges JSON: {exc.msg}.") from exc
+
+        if not isinstance(record, dict):
+            raise ImportRowError("INVALID_ROW", "Jede Zeile muss ein JSON-Objekt sein.")
+
+        fields = record.get("fields") or {}
+        if not isinstance(fields, dict):
+            raise ImportRowError("INVALID_ROW", "'fields' muss ein Objekt sein.")
+
+        title = record.get("title")
+        procedure_code = record.get("procedure_code")
+        if title is not None and not isinstance(title, str):
+            raise ImportRowError("INVALID_ROW", "'title' muss ein Text sein.")
+        if procedure_code is not None and not isinstance(procedure_code, str):
+            raise ImportRowError("INVALID_ROW", "'procedure_code' muss ein Text sein.")
+
+        return ImportRow(
+            row_number=self._row_number,
+            title=title or None,
+            procedure_code=procedure_code or None,
+            fields=fields,
+        )
+
+    @property
+    def rows_seen(self) -> int:
+        return self._row_number
+
+
+def build_field_types(procedure: ProcedureDefinition | None) -> dict[str, str]:
+    """Lookup field_key -> field_type für die Typisierung von CSV-Werten."""
+    if not procedure:
+        return {}
+    return {
+        field_def.field_key: field_def.field_type
+        for step in procedure.steps
+        for field_def in step.fields
+    }
+
+
+def coerce_csv_value(key: str, value: str, field_type: str | None) -> Any:
+    """
+    Typisiert einen CSV-Wert anhand des Feldtyps der Verfahrensdefinition.
+
+    Unbekannte Felder und Textfelder bleiben Strings (z.B. Postleitzahlen).
+    """
+    value = value.strip()
+
+    if field_type == "NUMBER":
+        normalized = value.replace(" ", "").replace(",", ".")
+        try:
+            number = float(normalized)
+        except ValueError:
+            raise ImportRowError("INVALID_VALUE", f"Feld '{key}' muss eine Zahl sein.")
+        return int(number) if number.is_integer() and "." not in normalized else number
+
+    if field_type == "BOOLEAN":
+        lowered = value.lower()
+        if lowered in _TRUE_VALUES:
+            return True
+        if lowered in _FALSE_VALUES:
+            return False
+        raise ImportRowError("INVALID_VALUE", f"Feld '{key}' muss true oder false sein.")
+
+    if field_type in ("COUNTRY", "CURRENCY"):
+        return value.upper()
+
+    return value
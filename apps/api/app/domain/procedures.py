@@ -8,6 +8,7 @@ This module provides:
 
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from typing import Any
 
@@ -60,6 +61,11 @@ class ValidationResult:
     errors: list[ValidationError]
 
 
+# Procedure definitions only change via migrations/seeds, so a short-lived
+# in-process cache is safe and saves the nested steps/fields include.
+PROCEDURE_CACHE_TTL_SECONDS = 300
+
+
 class ProcedureLoader:
     """
     Loads procedure definitions from the database.
@@ -67,6 +73,10 @@ class ProcedureLoader:
     Provides structured access to procedures, steps, and fields.
     """
 
+    def __init__(self, cache_ttl_seconds: float = PROCEDURE_CACHE_TTL_SECONDS):
+        self._cache_ttl_seconds = cache_ttl_seconds
+        self._cache: dict[tuple[str, str | None], tuple[float, ProcedureDefinition]] = {}
+
     async def list_active(self) -> list[dict[str, Any]]:
         """List all active procedures (summary only)."""
         procedures = await prisma.procedure.find_many(
@@ -136,6 +146,29 @@ class ProcedureLoader:
             steps=steps,
         )
 
+    async def get_cached(self, code: str, version: str | None = None) -> ProcedureDefinition | None:
+        """
+        Like get_by_code, but served from an in-process TTL cache.
+
+        Misses (unknown/inactive procedures) are not cached.
+        """
+        key = (code.upper(), version)
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry and now - entry[0] < self._cache_ttl_seconds:
+            return entry[1]
+
+        procedure = await self.get_by_code(key[0], version)
+        if procedure:
+            self._cache[key] = (now, procedure)
+        else:
+            self._cache.pop(key, None)
+        return procedure
+
+    def clear_cache(self) -> None:
+        """Drop all cached procedure definitions."""
+        self._cache.clear()
+
 
 class ValidationEngine:
     """
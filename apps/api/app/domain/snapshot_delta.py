@@ -0,0 +1,190 @@
+"""
+Snapshot Deltas - Versionsketten für CaseSnapshot-Felddaten.
+
+Snapshots speichern ihre Felddaten als Delta zum vorherigen Snapshot des
+Falls. Alle SNAPSHOT_KEYFRAME_INTERVAL Snapshots wird zusätzlich ein
+vollständiger Keyframe gespeichert, damit die Rekonstruktion einer
+Version höchstens SNAPSHOT_KEYFRAME_INTERVAL Schritte benötigt.
+
+Delta-Format (flach, Feld-Key -> Wert):
+    {"set": {key: neuer_wert, ...}, "unset": [key, ...]}
+"unset" ist sortiert, damit der Inhalt (und damit der Blob-Hash) mit der
+Berechnung in Migration 0018_snapshot_deltas übereinstimmt.
+
+WICHTIG:
+- Dieses Modul enthält KEINEN Datenbankzugriff (siehe services/snapshot_store.py)
+- Ketten werden als Liste von SnapshotLink in aufsteigender Version übergeben
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+
+# Nach so vielen Snapshots (inkl. Keyframe) beginnt ein neuer Keyframe
+SNAPSHOT_KEYFRAME_INTERVAL = 10
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class SnapshotLink:
+    """Ein Glied einer Snapshot-Kette."""
+
+    version: int
+    keyframe: dict[str, Any] | None  # Vollständige Felddaten (nur Keyframes)
+    delta: dict[str, Any] | None  # Delta zum vorherigen Snapshot
+
+
+def same_value(a: Any, b: Any) -> bool:
+    """
+    Typstrenge Gleichheit von JSON-Werten.
+
+    Python-Gleichheit behandelt True == 1 == 1.0; als JSON sind das drei
+    verschiedene Werte (true, 1, 1.0), die auch verschieden gespeichert
+    werden. Wie jsonb IS DISTINCT FROM in Migration 0018 sind Boolean und
+    Zahl verschieden; zusätzlich auch 1 und 1.0.
+    """
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same_value(a[key], b[key]) for key in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(map(same_value, a, b))
+    return a == b
+
+
+def compute_delta(previous: dict[str, Any], current: dict[str, Any]) -> dict[str, Any]:
+    """Delta, das previous in current überführt."""
+    return {
+        "set": {
+            key: value
+            for key, value in current.items()
+            if not same_value(previous.get(key, _MISSING), value)
+        },
+        "unset": sorted(key for key in previous if key not in current),
+    }
+
+
+def apply_delta(fields: dict[str, Any], delta: dict[str, Any]) -> None:
+    """Wendet ein Delta in-place an."""
+    fields.update(delta.get("set") or {})
+    for key in delta.get("unset") or ():
+        fields.pop(key, None)
+
+
+def is_keyframe_due(chain_length: int) -> bool:
+    """True, wenn der nächste Snapshot nach einer Kette dieser Länge ein Keyframe wird."""
+    return chain_length >= SNAPSHOT_KEYFRAME_INTERVAL
+
+
+def materialize(chain: list[SnapshotLink], keys: Iterable[str] | None = None) -> dict[str, Any]:
+    """
+    Rekonstruiert die Felddaten der letzten Version einer Kette.
+
+    Args:
+        chain: Kette ab (inkl.) Keyframe, aufsteigend nach Version
+        keys: Nur diese Keys auflösen (Default: alle)
+    """
+    if not chain or chain[0].keyframe is None:
+        raise ValueError("Snapshot chain must start with a keyframe")
+
+    if keys is None:
+        fields = dict(chain[0].keyframe)
+        for link in chain[1:]:
+            apply_delta(fields, link.delta or {})
+        return fields
+
+    wanted = set(keys)
+    fields = {key: value for key, value in chain[0].keyframe.items() if key in wanted}
+    for link in chain[1:]:
+        delta = link.delta or {}
+        for key, value in (delta.get("set") or {}).items():
+            if key in wanted:
+                fields[key] = value
+        for key in delta.get("unset") or ():
+            fields.pop(key, None)
+    return fields
+
+
+def compose_deltas(deltas: Iterable[dict[str, Any]]) -> dict[str, tuple[bool, Any]]:
+    """
+    Fasst aufeinanderfolgende Deltas zusammen.
+
+    Returns:
+        Key -> (vorhanden, Wert) nach Anwendung aller Deltas,
+        nur für berührte Keys
+    """
+    net: dict[str, tuple[bool, Any]] = {}
+    for delta in deltas:
+        for key, value in (delta.get("set") or {}).items():
+            net[key] = (True, value)
+        for key in delta.get("unset") or ():
+            net[key] = (False, None)
+    return net
+
+
+def _change(key: str, old: dict[str, Any], present: bool, value: Any) -> dict[str, Any] | None:
+    was_present = key in old
+    if present and not was_present:
+        return {"key": key, "op": "added", "from": None, "to": value}
+    if not present and was_present:
+        return {"key": key, "op": "removed", "from": old[key], "to": None}
+    if present and not same_value(old[key], value):
+        return {"key": key, "op": "changed", "from": old[key], "to": value}
+    return None
+
+
+def diff_fields(old: dict[str, Any], new: dict[str, Any]) -> list[dict[str, Any]]:
+    """Unterschiede zwischen zwei vollständigen Feldständen (Format wie diff_chain)."""
+    keys = sorted(old.keys() | new.keys())
+    changes = (_change(key, old, key in new, new.get(key)) for key in keys)
+    return [change for change in changes if change]
+
+
+def use_delta_diff(from_version: int, to_version: int) -> bool:
+    """
+    True, wenn ein Diff über die Delta-Kette günstiger ist.
+
+    Bei großem Abstand ist es billiger, beide Versionen ab ihren Keyframes
+    zu rekonstruieren, als alle Deltas dazwischen zu laden.
+    """
+    return abs(to_version - from_version) <= SNAPSHOT_KEYFRAME_INTERVAL
+
+
+def diff_chain(
+    base_chain: list[SnapshotLink],
+    forward: list[SnapshotLink],
+) -> list[dict[str, Any]]:
+    """
+    Unterschiede zwischen zwei Versionen über die Delta-Kette.
+
+    Keine der beiden Versionen wird vollständig rekonstruiert: Die Deltas
+    zwischen den Versionen werden zusammengefasst und nur für die dabei
+    berührten Keys wird der alte Wert aus base_chain aufgelöst.
+
+    Args:
+        base_chain: Kette ab Keyframe bis (inkl.) Ausgangsversion
+        forward: Snapshots nach der Ausgangsversion bis (inkl.) Zielversion
+
+    Returns:
+        Änderungen sortiert nach Key:
+        {"key", "op": "added"|"removed"|"changed", "from", "to"}
+    """
+    net = compose_deltas(link.delta or {} for link in forward)
+    if not net:
+        return []
+
+    old = materialize(base_chain, keys=net.keys())
+    changes = (_change(key, old, *net[key]) for key in sorted(net))
+    return [change for change in changes if change]
+
+
+def invert_changes(changes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Kehrt die Richtung eines Diffs um (für a > b)."""
+    inverse_op = {"added": "removed", "removed": "added", "changed": "changed"}
+    return [
+        {"key": c["key"], "op": inverse_op[c["op"]], "from": c["to"], "to": c["from"]}
+        for c in changes
+    ]
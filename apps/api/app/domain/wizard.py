@@ -241,11 +241,11 @@ def can_access_review(
         # Kein Review-Step definiert (sollte nicht passieren)
         return NavigationResult(allowed=True)
 
-    missing_steps = []
-    for i in range(review_idx):
-        step_key = steps_config.step_keys[i]
-        if step_key not in completed_steps:
-            missing_steps.append(step_key)
+    completed = set(completed_steps)
+    missing_steps = [
+        step_key for step_key in steps_config.step_keys[:review_idx]
+        if step_key not in completed
+    ]
 
     if missing_steps:
         return NavigationResult(
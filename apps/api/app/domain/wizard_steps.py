@@ -12,7 +12,8 @@ Die Wizard-Logik liegt in wizard.py.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import NamedTuple
 
 
@@ -26,56 +27,63 @@ class StepDefinition(NamedTuple):
 
 @dataclass(frozen=True)
 class ProcedureSteps:
-    """Step-Konfiguration für ein Verfahren."""
+    """
+    Step-Konfiguration für ein Verfahren.
+
+    Die Step-Liste wird beim Erzeugen einmalig kompiliert (Index-Map,
+    Nachfolger/Vorgänger-Arrays), alle Lookups sind danach O(1).
+    """
     procedure_code: str
     steps: list[StepDefinition]
+    _keys: tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _index: dict[str, int] = field(init=False, repr=False, compare=False)
+    _next: tuple[str | None, ...] = field(init=False, repr=False, compare=False)
+    _previous: tuple[str | None, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        keys = tuple(step.step_key for step in self.steps)
+        object.__setattr__(self, "_keys", keys)
+        object.__setattr__(self, "_index", {key: idx for idx, key in enumerate(keys)})
+        object.__setattr__(self, "_next", keys[1:] + (None,) if keys else ())
+        object.__setattr__(self, "_previous", (None,) + keys[:-1] if keys else ())
 
     @property
-    def step_keys(self) -> list[str]:
-        """Liste aller Step-Keys in Reihenfolge."""
-        return [step.step_key for step in self.steps]
+    def step_keys(self) -> tuple[str, ...]:
+        """Alle Step-Keys in Reihenfolge."""
+        return self._keys
 
     @property
     def first_step(self) -> str:
         """Erster Step-Key."""
-        return self.steps[0].step_key if self.steps else ""
+        return self._keys[0] if self._keys else ""
 
     @property
     def last_step(self) -> str:
         """Letzter Step-Key (üblicherweise 'review')."""
-        return self.steps[-1].step_key if self.steps else ""
+        return self._keys[-1] if self._keys else ""
 
     def get_step(self, step_key: str) -> StepDefinition | None:
         """Holt Step-Definition nach Key."""
-        for step in self.steps:
-            if step.step_key == step_key:
-                return step
-        return None
+        idx = self._index.get(step_key)
+        return self.steps[idx] if idx is not None else None
 
     def get_step_index(self, step_key: str) -> int:
         """Index eines Steps (-1 wenn nicht gefunden)."""
-        try:
-            return self.step_keys.index(step_key)
-        except ValueError:
-            return -1
+        return self._index.get(step_key, -1)
 
     def get_next_step(self, current_step: str) -> str | None:
         """Nächster Step nach current_step (oder None wenn letzter)."""
-        idx = self.get_step_index(current_step)
-        if idx < 0 or idx >= len(self.steps) - 1:
-            return None
-        return self.steps[idx + 1].step_key
+        idx = self._index.get(current_step)
+        return self._next[idx] if idx is not None else None
 
     def get_previous_step(self, current_step: str) -> str | None:
         """Vorheriger Step vor current_step (oder None wenn erster)."""
-        idx = self.get_step_index(current_step)
-        if idx <= 0:
-            return None
-        return self.steps[idx - 1].step_key
+        idx = self._index.get(current_step)
+        return self._previous[idx] if idx is not None else None
 
     def is_valid_step(self, step_key: str) -> bool:
         """Prüft ob step_key ein gültiger Step ist."""
-        return step_key in self.step_keys
+        return step_key in self._index
 
 
 # =============================================================================
@@ -223,6 +231,22 @@ def get_procedure_steps(procedure_code: str) -> ProcedureSteps | None:
     return PROCEDURE_STEPS_REGISTRY.get(procedure_code.upper())
 
 
+@lru_cache(maxsize=256)  # step_key kommt aus dem Request, Cache daher begrenzt
+def get_required_fields_for_step(step_key: str) -> frozenset[str]:
+    """
+    Pflichtfeld-Keys eines Step-Keys über alle Verfahren.
+
+    Wird genutzt um beim Step-Abschluss nur die relevanten CaseFields zu
+    laden, bevor das Verfahren des Cases bekannt ist.
+    """
+    return frozenset(
+        field_key
+        for steps_config in PROCEDURE_STEPS_REGISTRY.values()
+        if (step := steps_config.get_step(step_key))
+        for field_key in step.required_fields
+    )
+
+
 def get_all_procedure_codes() -> list[str]:
     """Liste aller verfügbaren Verfahrenscodes."""
     return list(PROCEDURE_STEPS_REGISTRY.keys())
@@ -21,6 +21,8 @@ from app.routes.admin import router as admin_router
 from app.routes.admin_content import router as admin_content_router
 from app.routes.auth import router as auth_router
 from app.routes.billing import router as billing_router
+from app.routes.case_export import router as case_export_router
+from app.routes.case_import import router as case_import_router
 from app.routes.cases import router as cases_router
 from app.routes.checkout import router as checkout_router
 from app.routes.content import router as content_router
@@ -34,6 +36,12 @@ from app.routes.pdf import router as pdf_router
 from app.routes.prefill import router as prefill_router
 from app.routes.profile import router as profile_router
 from app.routes.wizard import router as wizard_router
+from app.services.pdf_cache import pdf_cache
+from app.services.pdf_jobs import pdf_job_worker
+from app.services.pdf_renderer import pdf_renderer
+from app.services.pdf_service import pdf_service
+from app.services.prefill_cache import prefill_cache
+from app.services.prefill_extractor import prefill_extractor
 
 
 def create_app() -> FastAPI:
@@ -45,7 +53,39 @@ def create_app() -> FastAPI:
     @asynccontextmanager
     async def lifespan(_: FastAPI):
         await connect_prisma()
+        pdf_service.configure(engine=settings.pdf_engine)
+        pdf_renderer.configure(
+            workers=settings.pdf_render_workers,
+            queue_size=settings.pdf_render_queue_size,
+            timeout_seconds=settings.pdf_render_timeout_seconds,
+            initializer=pdf_service.worker_initializer,
+        )
+        pdf_renderer.start()
+        prefill_extractor.configure(
+            workers=settings.prefill_workers,
+            queue_size=settings.prefill_queue_size,
+            timeout_seconds=settings.prefill_timeout_seconds,
+            max_pages=settings.prefill_max_pages,
+        )
+        prefill_extractor.start()
+        prefill_cache.configure(
+            max_entries=settings.prefill_cache_max_entries,
+            ttl_seconds=settings.prefill_cache_ttl_seconds,
+        )
+        pdf_cache.configure(
+            directory=settings.pdf_cache_dir,
+            max_bytes=settings.pdf_cache_max_mb * 1024 * 1024,
+        )
+        # Export-Jobs: so viele parallel wie Render-Worker
+        pdf_job_worker.configure(
+            concurrency=settings.pdf_render_workers,
+            poll_seconds=settings.pdf_job_poll_seconds,
+        )
+        await pdf_job_worker.start()
         yield
+        await pdf_job_worker.stop()
+        pdf_renderer.shutdown()
+        prefill_extractor.shutdown()
         await disconnect_prisma()
 
     app = FastAPI(title="ZollPilot API", lifespan=lifespan)
@@ -100,6 +140,7 @@ def create_app() -> FastAPI:
             f"{request.method} {request.url.path}",
             status_code=response.status_code,
             duration_ms=round(duration_ms, 2),
+            stage_timings=getattr(request.state, "stage_timings", None),
         )
 
         return response
@@ -191,6 +232,8 @@ def create_app() -> FastAPI:
     app.include_router(auth_router)
     app.include_router(billing_router)
     app.include_router(checkout_router)
+    app.include_router(case_export_router)
+    app.include_router(case_import_router)
     app.include_router(cases_router)
     app.include_router(cases_procedure_router)
     app.include_router(content_router)
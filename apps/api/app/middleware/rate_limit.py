@@ -100,6 +100,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
     Wendet unterschiedliche Limits je nach Endpunkt an:
     - /cases/{id}/pdf: 10/min (teuer, Credit-relevant)
+    - /cases/{id}/pdf/jobs/{job_id}: Sonstige (Status-Polling, Download)
     - /cases/{id}/validate: 30/min
     - /cases/{id}/fields/*: 120/min (Autosave)
     - Sonstige: 60/min
@@ -107,6 +108,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
     # Pfad-Patterns für Kategorien
     RATE_LIMIT_PATTERNS = [
+        ("/pdf/jobs/", "default"),
         ("/pdf", "pdf"),
         ("/validate", "validation"),
         ("/fields/", "fields"),
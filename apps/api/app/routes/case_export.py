@@ -0,0 +1,212 @@
+"""
+Bulk Case Export API.
+
+Bietet:
+- GET /cases/export - Alle Fälle des Mandanten als JSONL oder CSV
+
+Ablauf:
+- Fälle werden per Keyset-Pagination (id > cursor) in Batches gelesen
+- Pro Batch: Felder per include, letzter Snapshot per latest_snapshots()
+  (DISTINCT ON in SQL)
+- CSV-Kopfzeile: Feld-Keys per SELECT DISTINCT in SQL
+- Jede Zeile wird sofort in die StreamingResponse geschrieben
+
+WICHTIG:
+- Im Gegensatz zu GET /cases wird die Liste nie vollständig geladen,
+  der Speicherbedarf ist unabhängig von der Anzahl der Fälle
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.db.prisma_client import prisma
+from app.dependencies.auth import AuthContext, get_current_user
+from app.domain.case_export import (
+    EXPORT_MEDIA_TYPES,
+    ExportFormat,
+    csv_header,
+    csv_row,
+    encode_csv_line,
+    encode_jsonl_line,
+    serialize_case,
+)
+from app.routes.cases import StatusFilter
+from app.services.snapshot_store import (
+    SNAPSHOT_PAYLOAD_INCLUDE,
+    latest_snapshots,
+    load_fields,
+    snapshot_validation,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/cases", tags=["case-export"])
+
+
+# Fälle pro Datenbank-Roundtrip
+EXPORT_BATCH_SIZE = 500
+
+ACTIVE_STATUSES = ["DRAFT", "IN_PROCESS", "PREPARED", "COMPLETED", "SUBMITTED"]
+
+# Feld-Keys der exportierten Fälle; Prismas distinct würde alle CaseFields
+# (inkl. value_json) laden und erst in der Query-Engine filtern
+_FIELD_KEYS_SQL = """
+SELECT DISTINCT f."key"
+FROM "CaseField" f
+JOIN "Case" c ON c."id" = f."case_id"
+WHERE c."tenant_id" = $1
+ORDER BY f."key"
+"""
+
+_FIELD_KEYS_BY_STATUS_SQL = """
+SELECT DISTINCT f."key"
+FROM "CaseField" f
+JOIN "Case" c ON c."id" = f."case_id"
+WHERE c."tenant_id" = $1
+  AND c."status"::text IN (SELECT jsonb_array_elements_text($2::jsonb))
+ORDER BY f."key"
+"""
+
+
+def _statuses(status_filter: StatusFilter) -> list[str] | None:
+    if status_filter == StatusFilter.ACTIVE:
+        return ACTIVE_STATUSES
+    if status_filter == StatusFilter.ARCHIVED:
+        return ["ARCHIVED"]
+    return None
+
+
+def _build_where(tenant_id: str, status_filter: StatusFilter) -> dict[str, Any]:
+    where: dict[str, Any] = {"tenant_id": tenant_id}
+    statuses = _statuses(status_filter)
+    if statuses:
+        where["status"] = {"in": statuses}
+    return where
+
+
+async def _get_field_keys(tenant_id: str, status_filter: StatusFilter) -> list[str]:
+    """Alle Feld-Keys der exportierten Fälle (für die CSV-Kopfzeile), in SQL dedupliziert."""
+    statuses = _statuses(status_filter)
+    if statuses:
+        rows = await prisma.query_raw(_FIELD_KEYS_BY_STATUS_SQL, tenant_id, json.dumps(statuses))
+    else:
+        rows = await prisma.query_raw(_FIELD_KEYS_SQL, tenant_id)
+    return [row["key"] for row in rows]
+
+
+async def iter_case_batches(
+    where: dict[str, Any],
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Liefert serialisierte Fälle batchweise per Keyset-Pagination über die id.
+
+    Stabil auch bei parallelen Inserts: jeder Fall erscheint höchstens einmal.
+    """
+    cursor: str | None = None
+    while True:
+        batch_where = {**where, "id": {"gt": cursor}} if cursor else where
+        cases = await prisma.case.find_many(
+            where=batch_where,
+            include={"fields": True, "procedure": True},
+            order={"id": "asc"},
+            take=batch_size,
+        )
+        if not cases:
+            return
+
+        snapshots = await latest_snapshots(
+            [case.id for case in cases], include=SNAPSHOT_PAYLOAD_INCLUDE
+        )
+        fields = await load_fields(list(snapshots.values()))
+        records = []
+        for case in cases:
+            snapshot = snapshots.get(case.id)
+            records.append(
+                serialize_case(
+                    case,
+                    snapshot,
+                    fields.get(snapshot.id) if snapshot else None,
+                    snapshot_validation(snapshot) if snapshot else None,
+                )
+            )
+        yield records
+
+        if len(cases) < batch_size:
+            return
+        cursor = cases[-1].id
+
+
+async def _export_stream(
+    where: dict[str, Any],
+    fmt: ExportFormat,
+    field_keys: list[str],
+) -> AsyncIterator[bytes]:
+    if fmt == ExportFormat.CSV:
+        yield encode_csv_line(csv_header(field_keys))
+
+    exported = 0
+    try:
+        async for records in iter_case_batches(where):
+            if fmt == ExportFormat.CSV:
+                yield b"".join(encode_csv_line(csv_row(record, field_keys)) for record in records)
+            else:
+                yield b"".join(encode_jsonl_line(record) for record in records)
+            exported += len(records)
+    except Exception as e:
+        # Status-Code ist bereits gesendet - abbrechen und loggen
+        logger.exception(f"Case export aborted after {exported} cases: {e}")
+        raise
+
+
+@router.get("/export")
+async def export_cases(
+    format: ExportFormat = Query(default=ExportFormat.JSONL),
+    status_filter: StatusFilter = Query(default=StatusFilter.ALL, alias="status"),
+    context: AuthContext = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Exportiert alle Fälle des Mandanten inkl. Felder und letztem Snapshot.
+
+    Query:
+    - format: jsonl (Default) oder csv
+    - status: all (Default), active oder archived
+
+    JSONL: ein Objekt pro Fall mit `fields` und `latest_snapshot`.
+    CSV: Fall-Spalten, snapshot_version/snapshot_created_at und eine Spalte
+    pro Feld-Key.
+    """
+    tenant_id = context.tenant.get("id") if context.tenant else None
+    if not tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "NO_TENANT", "message": "No tenant context available."},
+        )
+
+    where = _build_where(tenant_id, status_filter)
+
+    field_keys: list[str] = []
+    if format == ExportFormat.CSV:
+        try:
+            field_keys = await _get_field_keys(tenant_id, status_filter)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail={"code": "CASES_FETCH_ERROR", "message": f"Failed to fetch cases: {str(e)}"},
+            )
+
+    date_str = datetime.now(timezone.utc).strftime("%Y%m%d")
+    filename = f"ZollPilot_Faelle_{date_str}.{format.value}"
+
+    return StreamingResponse(
+        _export_stream(where, format, field_keys),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,392 @@
+"""
+Bulk Case Import API.
+
+Bietet:
+- POST /cases/import - Fälle aus CSV oder JSONL anlegen
+
+Ablauf:
+- Request-Body wird in eine SpooledTemporaryFile geschrieben (RAM-begrenzt)
+- Datensätze werden inkrementell geparst (CSV über csv.reader) und validiert
+- Fälle, Felder und Wizard-Fortschritt werden batchweise per create_many
+  in je einer Transaktion angelegt
+- Ergebnisse pro Zeile werden als NDJSON gestreamt
+
+WICHTIG:
+- Der Speicherbedarf ist unabhängig von der Dateigröße
+- Fehlerhafte Zeilen werden übersprungen, nicht der gesamte Import
+- Nicht lesbare Dateien und unerwartete Fehler beenden den Stream mit
+  einer Zusammenfassung (summary.aborted), bereits gespeicherte Batches
+  bleiben erhalten
+- Verfahren werden über den gecachten Procedure-Loader gebunden
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import tempfile
+import uuid
+from typing import Any, AsyncIterator, BinaryIO, Iterator
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.errors import ErrorCode, api_error
+from app.core.json import JsonSerializationError, normalize_to_json
+from app.db.prisma_client import prisma
+from app.dependencies.auth import AuthContext, get_current_user
+from app.domain.case_import import (
+    CsvRecordReader,
+    ImportAborted,
+    ImportFormat,
+    ImportRow,
+    ImportRowError,
+    LineSplitter,
+    RowParser,
+    build_field_types,
+    coerce_csv_value,
+)
+from app.domain.case_status import CaseStatus
+from app.domain.procedures import procedure_loader
+from app.domain.wizard_steps import get_procedure_steps
+from app.routes.cases import FIELD_KEY_PATTERN, FIELD_VALUE_MAX_SIZE
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/cases", tags=["case-import"])
+
+
+# Zeilen pro Transaktion
+IMPORT_BATCH_SIZE = 200
+
+# Maximale Upload-Größe: 50 MB
+IMPORT_MAX_BYTES = 50 * 1024 * 1024
+
+# Ab dieser Größe wird der Upload auf Platte ausgelagert
+IMPORT_SPOOL_MAX_MEMORY = 1024 * 1024
+
+# Lesegröße beim Parsen
+IMPORT_READ_CHUNK_SIZE = 64 * 1024
+
+DEFAULT_CASE_TITLE = "Neue Zollanmeldung"
+
+CONTENT_TYPE_FORMATS = {
+    "text/csv": ImportFormat.CSV,
+    "application/csv": ImportFormat.CSV,
+    "application/x-ndjson": ImportFormat.JSONL,
+    "application/jsonl": ImportFormat.JSONL,
+    "application/x-jsonlines": ImportFormat.JSONL,
+}
+
+
+def _resolve_format(fmt: ImportFormat | None, content_type: str | None) -> ImportFormat:
+    if fmt:
+        return fmt
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    resolved = CONTENT_TYPE_FORMATS.get(media_type)
+    if not resolved:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code": "INVALID_IMPORT_FORMAT",
+                "message": "Unbekanntes Importformat. Erlaubt: CSV (text/csv) oder JSONL (application/x-ndjson).",
+            },
+        )
+    return resolved
+
+
+def _ndjson(payload: dict[str, Any]) -> bytes:
+    return (json.dumps(payload, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def _row_error(row_number: int | None, code: str, message: str) -> dict[str, Any]:
+    return {"row": row_number, "status": "error", "error": {"code": code, "message": message}}
+
+
+class _PreparedRow:
+    """Validierte Zeile, bereit für create_many."""
+
+    __slots__ = ("row_number", "case", "fields", "progress", "procedure_code")
+
+    def __init__(
+        self,
+        row_number: int,
+        case: dict[str, Any],
+        fields: list[dict[str, Any]],
+        progress: dict[str, Any] | None,
+        procedure_code: str | None,
+    ):
+        self.row_number = row_number
+        self.case = case
+        self.fields = fields
+        self.progress = progress
+        self.procedure_code = procedure_code
+
+
+async def _prepare_row(
+    row: ImportRow,
+    tenant_id: str,
+    user_id: str,
+    default_procedure_code: str | None,
+) -> _PreparedRow:
+    """Validiert eine Zeile und baut die create_many-Payloads."""
+    procedure_code = (row.procedure_code or default_procedure_code or "").strip().upper() or None
+    procedure = None
+    if procedure_code:
+        procedure = await procedure_loader.get_cached(procedure_code)
+        if not procedure:
+            raise ImportRowError(
+                "PROCEDURE_NOT_FOUND",
+                f"Procedure '{procedure_code}' not found or inactive.",
+            )
+
+    field_types = build_field_types(procedure) if row.raw_fields else {}
+    case_id = str(uuid.uuid4())
+
+    fields: list[dict[str, Any]] = []
+    for key, value in row.fields.items():
+        if not isinstance(key, str) or not FIELD_KEY_PATTERN.match(key):
+            raise ImportRowError(
+                "VALIDATION_ERROR",
+                f"Invalid field key '{key}'. Must match pattern [a-z0-9_.-] and be max 64 chars.",
+            )
+        if row.raw_fields:
+            value = coerce_csv_value(key, value, field_types.get(key))
+        try:
+            normalized = normalize_to_json(value, raise_api_error=False)
+        except JsonSerializationError as exc:
+            raise ImportRowError("VALIDATION_ERROR", exc.message)
+        if len(json.dumps(normalized.data)) > FIELD_VALUE_MAX_SIZE:
+            raise ImportRowError("PAYLOAD_TOO_LARGE", f"Field '{key}' exceeds maximum size.")
+        fields.append({"case_id": case_id, "key": key, "value_json": normalized})
+
+    case: dict[str, Any] = {
+        "id": case_id,
+        "tenant_id": tenant_id,
+        "created_by_user_id": user_id,
+        "title": (row.title or DEFAULT_CASE_TITLE).strip()[:200],
+        "status": CaseStatus.DRAFT.value,
+    }
+
+    progress = None
+    if procedure:
+        case["status"] = CaseStatus.IN_PROCESS.value
+        case["procedure_id"] = procedure.id
+        case["procedure_version"] = procedure.version
+        steps_config = get_procedure_steps(procedure.code)
+        progress = {
+            "case_id": case_id,
+            "procedure_code": procedure.code,
+            "current_step": steps_config.first_step if steps_config else "",
+            "completed_steps": normalize_to_json([]),
+            "is_completed": False,
+        }
+
+    return _PreparedRow(
+        row_number=row.row_number,
+        case=case,
+        fields=fields,
+        progress=progress,
+        procedure_code=procedure.code if procedure else None,
+    )
+
+
+async def _flush_batch(batch: list[_PreparedRow]) -> list[dict[str, Any]]:
+    """Legt einen Batch in einer Transaktion an und liefert die Zeilenergebnisse."""
+    if not batch:
+        return []
+
+    cases = [item.case for item in batch]
+    fields = [f for item in batch for f in item.fields]
+    progresses = [item.progress for item in batch if item.progress]
+
+    try:
+        async with prisma.tx() as tx:
+            await tx.case.create_many(data=cases)
+            if fields:
+                await tx.casefield.create_many(data=fields)
+            if progresses:
+                await tx.wizardprogress.create_many(data=progresses)
+    except Exception as e:
+        logger.exception(f"Bulk import batch of {len(batch)} rows failed: {e}")
+        return [
+            _row_error(item.row_number, "BATCH_FAILED", "Batch konnte nicht gespeichert werden.")
+            for item in batch
+        ]
+
+    return [
+        {
+            "row": item.row_number,
+            "status": "created",
+            "case_id": item.case["id"],
+            "case_status": item.case["status"],
+            "procedure_code": item.procedure_code,
+            "fields": len(item.fields),
+        }
+        for item in batch
+    ]
+
+
+def _jsonl_lines(spool: BinaryIO) -> Iterator[str]:
+    splitter = LineSplitter()
+    while chunk := spool.read(IMPORT_READ_CHUNK_SIZE):
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+
+async def _import_stream(
+    spool: Any,
+    fmt: ImportFormat,
+    tenant_id: str,
+    user_id: str,
+    default_procedure_code: str | None,
+) -> AsyncIterator[bytes]:
+    """Parst den gespoolten Upload und streamt die Ergebnisse als NDJSON."""
+    parser = RowParser(fmt)
+    batch: list[_PreparedRow] = []
+    created = 0
+    failed = 0
+    aborted: dict[str, Any] | None = None
+
+    async def handle_record(
+        record: str | list[str] | ImportRowError,
+    ) -> AsyncIterator[dict[str, Any]]:
+        nonlocal created, failed
+        try:
+            if isinstance(record, ImportRowError):
+                # CSV-Datensatz schon beim Zerlegen nicht lesbar
+                parser.skip_row()
+                raise record
+            row = parser.parse(record)
+            if row is None:
+                return
+            batch.append(await _prepare_row(row, tenant_id, user_id, default_procedure_code))
+        except ImportAborted:
+            raise
+        except ImportRowError as e:
+            failed += 1
+            yield _row_error(parser.rows_seen, e.code, e.message)
+            return
+
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            for result in await _flush_batch(batch):
+                created += result["status"] == "created"
+                failed += result["status"] == "error"
+                yield result
+            batch.clear()
+
+    try:
+        spool.seek(0)
+        records: Iterator[str | list[str]] = (
+            CsvRecordReader(spool) if fmt == ImportFormat.CSV else _jsonl_lines(spool)
+        )
+        try:
+            while True:
+                try:
+                    record: str | list[str] | ImportRowError = next(records)
+                except StopIteration:
+                    break
+                except ImportAborted:
+                    raise
+                except ImportRowError as e:
+                    record = e
+                async for result in handle_record(record):
+                    yield _ndjson(result)
+        except ImportAborted as e:
+            aborted = {"code": e.code, "message": e.message}
+        except Exception:
+            logger.exception("Bulk import aborted after %d rows", parser.rows_seen)
+            aborted = {
+                "code": ErrorCode.INTERNAL_SERVER_ERROR.value,
+                "message": "Import wegen eines internen Fehlers abgebrochen.",
+            }
+
+        for result in await _flush_batch(batch):
+            created += result["status"] == "created"
+            failed += result["status"] == "error"
+            yield _ndjson(result)
+        batch.clear()
+
+        summary: dict[str, Any] = {
+            "total": parser.rows_seen,
+            "created": created,
+            "failed": failed,
+        }
+        if aborted:
+            summary["aborted"] = aborted
+        yield _ndjson({"summary": summary})
+    finally:
+        spool.close()
+
+
+@router.post("/import")
+async def import_cases(
+    request: Request,
+    format: ImportFormat | None = Query(default=None),
+    procedure_code: str | None = Query(default=None, max_length=16),
+    context: AuthContext = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Importiert Fälle aus CSV oder JSONL (Request-Body, nicht multipart).
+
+    Format:
+    - Über ?format=csv|jsonl oder Content-Type (text/csv, application/x-ndjson)
+    - CSV: Spalten `title`, `procedure_code`, restliche Spalten sind Feld-Keys.
+      Werte werden anhand der Verfahrensdefinition typisiert (NUMBER, BOOLEAN, ...)
+    - JSONL: {"title": ..., "procedure_code": ..., "fields": {...}} pro Zeile
+
+    Optional:
+    - ?procedure_code=IZA als Default für Zeilen ohne Verfahren
+
+    Response (application/x-ndjson), eine Zeile pro Datensatz:
+    - {"row": 1, "status": "created", "case_id": ..., ...}
+    - {"row": 2, "status": "error", "error": {"code": ..., "message": ...}}
+    - Abschließend {"summary": {"total": ..., "created": ..., "failed": ...}},
+      bei Abbruch zusätzlich "aborted": {"code": ..., "message": ...}
+
+    Fälle mit Verfahren starten direkt in IN_PROCESS (wie POST /cases).
+    """
+    tenant_id = context.tenant.get("id") if context.tenant else None
+    user_id = context.user.get("id") if context.user else None
+
+    if not tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "NO_TENANT", "message": "No tenant context available."},
+        )
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "NO_USER", "message": "No user context available."},
+        )
+
+    fmt = _resolve_format(format, request.headers.get("content-type"))
+
+    # Body vollständig empfangen, bevor die Antwort startet: StreamingResponse
+    # lauscht parallel auf receive() und würde sonst Body-Chunks verschlucken.
+    spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_MEMORY)
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > IMPORT_MAX_BYTES:
+                raise api_error(
+                    ErrorCode.PAYLOAD_TOO_LARGE,
+                    message="Importdatei zu groß. Maximum: 50 MB.",
+                )
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+
+    if received == 0:
+        spool.close()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "EMPTY_FILE", "message": "Die Importdatei ist leer."},
+        )
+
+    return StreamingResponse(
+        _import_stream(spool, fmt, tenant_id, user_id, procedure_code),
+        media_type="application/x-ndjson",
+    )
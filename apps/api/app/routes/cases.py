@@ -20,6 +20,7 @@ from app.domain.case_status import (
     CaseStatus,
     can_access_wizard,
 )
+from app.services.summary_cache import summary_cache
 
 router = APIRouter(prefix="/cases", tags=["cases"])
 
@@ -121,6 +122,33 @@ def _validate_field_key(key: str) -> None:
         )
 
 
+def case_to_detail(case) -> CaseDetail:
+    """Baut CaseDetail aus einem Case mit geladenen `fields` und `procedure`."""
+    fields = [
+        FieldResponse(key=f.key, value=f.value_json, updated_at=f.updated_at)
+        for f in (case.fields or [])
+    ]
+
+    procedure_info = None
+    if case.procedure:
+        procedure_info = ProcedureInfo(code=case.procedure.code, name=case.procedure.name)
+
+    return CaseDetail(
+        id=case.id,
+        title=case.title,
+        status=case.status,
+        version=case.version,
+        created_at=case.created_at,
+        updated_at=case.updated_at,
+        prepared_at=case.prepared_at,
+        completed_at=case.completed_at,
+        submitted_at=case.submitted_at,  # Legacy
+        archived_at=case.archived_at,
+        procedure=procedure_info,
+        fields=fields,
+    )
+
+
 async def _get_case_or_404(
     case_id: str, tenant_id: str, user_id: str | None = None
 ) -> dict:
@@ -314,31 +342,7 @@ async def get_case(
         user_id=context.user["id"],
     )
 
-    fields = [
-        FieldResponse(key=f.key, value=f.value_json, updated_at=f.updated_at)
-        for f in (case.fields or [])
-    ]
-
-    procedure_info = None
-    if case.procedure:
-        procedure_info = ProcedureInfo(code=case.procedure.code, name=case.procedure.name)
-
-    return CaseDetailResponse(
-        data=CaseDetail(
-            id=case.id,
-            title=case.title,
-            status=case.status,
-            version=case.version,
-            created_at=case.created_at,
-            updated_at=case.updated_at,
-            prepared_at=case.prepared_at,
-            completed_at=case.completed_at,
-            submitted_at=case.submitted_at,  # Legacy
-            archived_at=case.archived_at,
-            procedure=procedure_info,
-            fields=fields,
-        )
-    )
+    return CaseDetailResponse(data=case_to_detail(case))
 
 
 @router.patch("/{case_id}", response_model=CaseSummaryResponse)
@@ -440,6 +444,7 @@ async def upsert_field(
             "update": {"value_json": normalized_value},
         },
     )
+    summary_cache.invalidate(case_id)
 
     return FieldSingleResponse(
         data=FieldResponse(key=field.key, value=field.value_json, updated_at=field.updated_at)
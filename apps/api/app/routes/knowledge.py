@@ -70,6 +70,61 @@ class KnowledgeEntryDetail(BaseModel):
     updated_at: datetime
 
 
+# --- Helper Functions ---
+
+
+def _entry_to_item(entry) -> KnowledgeEntryItem:
+    return KnowledgeEntryItem(
+        id=entry.id,
+        title=entry.title,
+        summary=entry.summary,
+        applies_to=entry.applies_to,
+        related_fields=entry.related_fields,
+        version=entry.version,
+        topic_code=entry.topic.code if entry.topic else None,
+        topic_name=entry.topic.name if entry.topic else None,
+    )
+
+
+async def find_published_entries(
+    procedure: Optional[str] = None,
+    topic: Optional[str] = None,
+    field: Optional[str] = None,
+    field_level_only: bool = False,
+) -> list[KnowledgeEntryItem]:
+    """
+    Published knowledge entries with optional filters.
+
+    field_level_only: only entries linked to at least one form field
+    (used for wizard field hints).
+    """
+    where: dict = {"status": "PUBLISHED"}
+
+    if procedure:
+        # Include entries that apply to the specific procedure OR ALL
+        if procedure != "ALL":
+            where["applies_to"] = {"in": [procedure, "ALL"]}
+        else:
+            where["applies_to"] = "ALL"
+
+    if topic:
+        # Filter by topic code
+        where["topic"] = {"code": topic}
+
+    if field:
+        # Filter by related field (array contains)
+        where["related_fields"] = {"has": field}
+    elif field_level_only:
+        where["related_fields"] = {"isEmpty": False}
+
+    entries = await prisma.knowledgeentry.find_many(
+        where=where,
+        order={"title": "asc"},
+        include={"topic": True},
+    )
+    return [_entry_to_item(entry) for entry in entries]
+
+
 # --- Topic Endpoints ---
 
 
@@ -132,44 +187,7 @@ async def list_knowledge_entries(
     Returns only PUBLISHED entries.
     """
 
-    # Build where clause
-    where: dict = {"status": "PUBLISHED"}
-
-    if procedure:
-        # Include entries that apply to the specific procedure OR ALL
-        if procedure != "ALL":
-            where["applies_to"] = {"in": [procedure, "ALL"]}
-        else:
-            where["applies_to"] = "ALL"
-
-    if topic:
-        # Filter by topic code
-        where["topic"] = {"code": topic}
-
-    if field:
-        # Filter by related field (array contains)
-        where["related_fields"] = {"has": field}
-
-    entries = await prisma.knowledgeentry.find_many(
-        where=where,
-        order={"title": "asc"},
-        include={"topic": True},
-    )
-
-    items = [
-        KnowledgeEntryItem(
-            id=entry.id,
-            title=entry.title,
-            summary=entry.summary,
-            applies_to=entry.applies_to,
-            related_fields=entry.related_fields,
-            version=entry.version,
-            topic_code=entry.topic.code if entry.topic else None,
-            topic_name=entry.topic.name if entry.topic else None,
-        )
-        for entry in entries
-    ]
-
+    items = await find_published_entries(procedure=procedure, topic=topic, field=field)
     return success_response([item.model_dump() for item in items])
 
 
@@ -29,9 +29,10 @@ import logging
 from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import BaseModel, Field
 
+from app.core.logging import StageTimer
 from app.dependencies.auth import AuthContext, get_current_user
 from app.db.prisma_client import prisma
 from app.domain.procedures import procedure_loader, validate_case_fields
@@ -43,7 +44,14 @@ from app.domain.case_status import (
     CaseStatus,
     normalize_status,
 )
-from app.core.json import normalize_to_json
+from app.services.snapshot_store import (
+    SNAPSHOT_PAYLOAD_INCLUDE,
+    create_snapshot,
+    diff_snapshots,
+    load_snapshot_fields,
+    snapshot_validation,
+)
+from app.services.summary_cache import summary_cache
 
 logger = logging.getLogger(__name__)
 
@@ -131,6 +139,25 @@ class SnapshotDetailResponse(BaseModel):
     data: SnapshotDetail
 
 
+class SnapshotFieldChange(BaseModel):
+    key: str
+    op: str  # added | removed | changed
+    # "from" ist ein Python-Keyword
+    from_value: Any = Field(default=None, serialization_alias="from")
+    to: Any = None
+
+
+class SnapshotDiff(BaseModel):
+    case_id: str
+    from_version: int
+    to_version: int
+    changes: list[SnapshotFieldChange]
+
+
+class SnapshotDiffResponse(BaseModel):
+    data: SnapshotDiff
+
+
 class ProcedureInfo(BaseModel):
     code: str
     version: str
@@ -179,6 +206,7 @@ async def _get_case_with_fields(case_id: str, tenant_id: str):
 @router.post("/{case_id}/submit", response_model=SubmitResponse)
 async def submit_case(
     case_id: str,
+    request: Request,
     context: AuthContext = Depends(get_current_user),
 ) -> SubmitResponse:
     """
@@ -206,7 +234,13 @@ async def submit_case(
     - WIZARD_NOT_COMPLETED: Wizard nicht vollständig abgeschlossen
     - CASE_NOT_IN_PROCESS: Falscher Case-Status
     - CASE_INVALID: Validierungsfehler bei Pflichtfeldern
+
+    Persistenz (Status, Snapshot) läuft in einer Transaktion; die
+    Verfahrensdefinition kommt aus dem Procedure-Cache. Dauer je Abschnitt
+    erscheint als stage_timings im Request-Log.
     """
+    timer = StageTimer(request)
+
     # Defensive tenant_id extraction
     tenant_id = context.tenant.get("id") if context.tenant else None
     if not tenant_id:
@@ -215,7 +249,8 @@ async def submit_case(
             detail={"code": "NO_TENANT", "message": "No tenant found in session."},
         )
 
-    case = await _get_case_with_fields(case_id, tenant_id)
+    with timer.stage("load_case"):
+        case = await _get_case_with_fields(case_id, tenant_id)
 
     # Idempotent: if already submitted/prepared, return existing state
     if case.status in (CaseStatus.SUBMITTED.value, CaseStatus.PREPARED.value):
@@ -355,7 +390,8 @@ async def submit_case(
             },
         )
 
-    procedure = await procedure_loader.get_by_code(procedure_code, procedure_version)
+    with timer.stage("procedure"):
+        procedure = await procedure_loader.get_cached(procedure_code, procedure_version)
     if not procedure:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -371,7 +407,8 @@ async def submit_case(
         fields_dict[field.key] = field.value_json
 
     # Validate
-    validation_result = await validate_case_fields(procedure, fields_dict)
+    with timer.stage("validate"):
+        validation_result = await validate_case_fields(procedure, fields_dict)
 
     if not validation_result.valid:
         errors = [
@@ -391,95 +428,56 @@ async def submit_case(
     # Timestamp für Vorbereitung
     prepared_at = datetime.now(timezone.utc)
 
-    # Check if snapshot already exists (idempotency for retries)
-    existing_snapshot = await prisma.casesnapshot.find_first(
-        where={"case_id": case_id, "version": case.version}
-    )
-
-    if existing_snapshot:
-        # Snapshot exists, just update case status and return
-        await prisma.case.update(
-            where={"id": case_id},
-            data={
-                "status": "PREPARED",
-                "prepared_at": prepared_at,
-                "submitted_at": prepared_at,  # Legacy field
-            },
-        )
-        return SubmitResponse(
-            data=SubmitResultData(
-                case_id=case_id,
-                status="PREPARED",
-                procedure_code=procedure_code,
-                prepared_at=prepared_at,
-                submitted_at=prepared_at,  # Legacy alias
-                version=case.version,
-                snapshot_id=existing_snapshot.id,
-            )
-        )
-
-    # Create snapshot - use extracted values to avoid None issues
+    # Statuswechsel und Snapshot in einer Transaktion: kein PREPARED-Case ohne
+    # Snapshot und kein Snapshot für einen nicht abgegebenen Case.
+    # update_many mit Status-Check ist der Optimistic Lock; die Zeilensperre
+    # serialisiert parallele Abgaben. create_snapshot ist pro (case_id, version)
+    # idempotent (Retry nach Abbruch liefert den bestehenden Snapshot).
     try:
-        snapshot = await prisma.casesnapshot.create(
-            data={
-                "case_id": case_id,
-                "version": case.version,
-                "procedure_code": procedure_code,
-                "procedure_version": procedure_version or "v1",
-                "fields_json": normalize_to_json(fields_dict),
-                "validation_json": normalize_to_json({"valid": True, "errors": []}),
-            }
-        )
+        with timer.stage("persist"):
+            async with prisma.tx() as tx:
+                update_result = await tx.case.update_many(
+                    where={
+                        "id": case_id,
+                        "status": "IN_PROCESS",  # Only update if still in expected state
+                    },
+                    data={
+                        "status": "PREPARED",
+                        "prepared_at": prepared_at,
+                        "submitted_at": prepared_at,  # Legacy field
+                    },
+                )
+                if update_result.count == 0:
+                    # Race condition: status was changed by another request
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail={
+                            "code": "CONCURRENT_MODIFICATION",
+                            "message": "Case status was modified by another request. Please refresh and try again.",
+                        },
+                    )
+
+                snapshot = await create_snapshot(
+                    case_id=case_id,
+                    version=case.version,
+                    procedure_code=procedure_code,
+                    procedure_version=procedure_version or "v1",
+                    fields=fields_dict,
+                    validation={"valid": True, "errors": []},
+                    client=tx,
+                )
+    except HTTPException:
+        raise
     except Exception as e:
-        # Could be unique constraint violation from race condition
-        # Try to find existing snapshot
-        existing = await prisma.casesnapshot.find_first(
-            where={"case_id": case_id, "version": case.version}
-        )
-        if existing:
-            snapshot = existing
-        else:
-            import logging
-            logging.error(f"Failed to create snapshot for case {case_id}: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail={
-                    "code": "SNAPSHOT_CREATION_FAILED",
-                    "message": f"Failed to create snapshot: {str(e)}",
-                },
-            )
-
-    # Update case status atomically with optimistic locking
-    # Use update_many with status check to prevent race conditions
-    update_result = await prisma.case.update_many(
-        where={
-            "id": case_id,
-            "status": "IN_PROCESS",  # Only update if still in expected state
-        },
-        data={
-            "status": "PREPARED",
-            "prepared_at": prepared_at,
-            "submitted_at": prepared_at,  # Legacy field
-        },
-    )
-
-    if update_result.count == 0:
-        # Race condition: status was changed by another request
+        logger.error(f"Failed to submit case {case_id}: {e}")
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
-                "code": "CONCURRENT_MODIFICATION",
-                "message": "Case status was modified by another request. Please refresh and try again.",
+                "code": "SNAPSHOT_CREATION_FAILED",
+                "message": f"Failed to create snapshot: {str(e)}",
             },
         )
 
-    # Wizard als abgeschlossen markieren (falls noch nicht)
-    if wizard_progress and not wizard_progress.is_completed:
-        await prisma.wizardprogress.update(
-            where={"id": wizard_progress.id},
-            data={"is_completed": True},
-        )
-
     return SubmitResponse(
         data=SubmitResultData(
             case_id=case_id,
@@ -512,6 +510,7 @@ async def reopen_case(
     - Wizard ist wieder editierbar
     - Nutzer kann alle Felder ändern
     - Submit muss erneut erfolgen
+    - case.version ist erhöht; erneuter Submit erzeugt Snapshot version + 1
     """
     tenant_id = context.tenant.get("id") if context.tenant else None
     if not tenant_id:
@@ -542,6 +541,8 @@ async def reopen_case(
         },
         data={
             "status": "IN_PROCESS",
+            # Neue Version: erneute Abgabe erzeugt einen neuen Snapshot
+            "version": {"increment": 1},
         },
     )
 
@@ -562,6 +563,8 @@ async def reopen_case(
             data={"is_completed": False},
         )
 
+    summary_cache.invalidate(case_id)
+
     logger.info(f"Case {case_id} reopened: {previous_status} -> IN_PROCESS")
 
     return ReopenResponse(
@@ -723,7 +726,8 @@ async def get_snapshot(
         )
 
     snapshot = await prisma.casesnapshot.find_first(
-        where={"case_id": case_id, "version": version}
+        where={"case_id": case_id, "version": version},
+        include=SNAPSHOT_PAYLOAD_INCLUDE,
     )
     if not snapshot:
         raise HTTPException(
@@ -738,13 +742,68 @@ async def get_snapshot(
             version=snapshot.version,
             procedure_code=snapshot.procedure_code,
             procedure_version=snapshot.procedure_version,
-            fields_json=snapshot.fields_json,
-            validation_json=snapshot.validation_json,
+            fields_json=await load_snapshot_fields(snapshot),
+            validation_json=snapshot_validation(snapshot),
             created_at=snapshot.created_at,
         )
     )
 
 
+@router.get(
+    "/{case_id}/snapshots/{from_version}/diff/{to_version}",
+    response_model=SnapshotDiffResponse,
+)
+async def diff_snapshot_versions(
+    case_id: str,
+    from_version: int,
+    to_version: int,
+    context: AuthContext = Depends(get_current_user),
+) -> SnapshotDiffResponse:
+    """
+    Feldänderungen zwischen zwei Snapshot-Versionen.
+
+    Wird aus der Delta-Kette berechnet; from_version > to_version liefert
+    den umgekehrten Diff.
+    """
+    tenant_id = context.tenant.get("id") if context.tenant else None
+    if not tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"code": "NO_TENANT", "message": "No tenant found in session."},
+        )
+
+    # Verify case access
+    case = await prisma.case.find_first(
+        where={"id": case_id, "tenant_id": tenant_id}
+    )
+    if not case:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "CASE_NOT_FOUND", "message": "Case not found."},
+        )
+
+    changes = await diff_snapshots(case_id, from_version, to_version)
+    if changes is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "SNAPSHOT_NOT_FOUND", "message": "Snapshot not found."},
+        )
+
+    return SnapshotDiffResponse(
+        data=SnapshotDiff(
+            case_id=case_id,
+            from_version=from_version,
+            to_version=to_version,
+            changes=[
+                SnapshotFieldChange(
+                    key=c["key"], op=c["op"], from_value=c["from"], to=c["to"]
+                )
+                for c in changes
+            ],
+        )
+    )
+
+
 @router.get("/{case_id}/summary", response_model=CaseSummaryResponse)
 async def get_case_summary(
     case_id: str,
@@ -763,16 +822,29 @@ async def get_case_summary(
             detail={"code": "NO_TENANT", "message": "No tenant found in session."},
         )
 
+    # Bei vorhandenem Cache-Eintrag werden Felder nur bei Miss nachgeladen
+    include: dict[str, Any] = {"procedure": True}
+    # Vor dem Lesen der Felder: parallele Feld-Änderungen verwerfen das Ergebnis
+    generation = summary_cache.generation(case_id)
+    if not summary_cache.has_case(case_id):
+        include["fields"] = True
+
     try:
-        case = await _get_case_with_fields(case_id, tenant_id)
-    except HTTPException:
-        raise
+        case = await prisma.case.find_first(
+            where={"id": case_id, "tenant_id": tenant_id},
+            include=include,
+        )
     except Exception as e:
         logger.exception(f"Error fetching case {case_id} for summary: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={"code": "DATABASE_ERROR", "message": f"Failed to fetch case: {str(e)}"},
         )
+    if not case:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"code": "CASE_NOT_FOUND", "message": "Case not found."},
+        )
 
     # Check if procedure is bound
     if not case.procedure_id or not case.procedure:
@@ -784,19 +856,27 @@ async def get_case_summary(
             },
         )
 
-    # Build fields dict
-    fields_dict: dict[str, Any] = {}
-    for field in (case.fields or []):
-        fields_dict[field.key] = field.value_json
-
-    # Generate summary
+    # Generate summary (cached per case version, see services/summary_cache.py)
+    summary_key = (case_id, case.version, case.procedure.code, case.procedure.version)
     try:
-        summary = generate_case_summary(
-            procedure_code=case.procedure.code,
-            procedure_version=case.procedure.version,
-            procedure_name=case.procedure.name,
-            fields=fields_dict
-        )
+        summary = summary_cache.get(summary_key)
+        if summary is None:
+            fields = case.fields
+            if fields is None:
+                fields = await prisma.casefield.find_many(where={"case_id": case_id})
+
+            # Build fields dict
+            fields_dict: dict[str, Any] = {}
+            for field in fields:
+                fields_dict[field.key] = field.value_json
+
+            summary = generate_case_summary(
+                procedure_code=case.procedure.code,
+                procedure_version=case.procedure.version,
+                procedure_name=case.procedure.name,
+                fields=fields_dict
+            )
+            summary_cache.put(summary_key, summary, generation=generation)
     except Exception as e:
         logger.exception(f"Error generating summary for case {case_id}: {e}")
         raise HTTPException(
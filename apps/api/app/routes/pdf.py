@@ -6,18 +6,33 @@ Provides PDF generation for submitted cases with credit consumption.
 
 from __future__ import annotations
 
-from typing import Any
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import BinaryIO
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, model_validator
 
+from app.core.config import get_settings
+from app.core.errors import ErrorCode, api_error
 from app.dependencies.auth import AuthContext, get_current_user
 from app.db.prisma_client import prisma
+from app.services.pdf_batch import PDF_BATCH_MAX_CASES, PDFBatchExport, load_batch_items
+from app.services.pdf_export import (
+    debit_export_credit,
+    iter_pdf_file,
+    open_cached_snapshot_pdf,
+    pdf_size,
+    render_snapshot_pdf,
+)
+from app.services.pdf_jobs import PDF_JOB_INCLUDE, enqueue_job, pdf_job_worker
+from app.services.pdf_renderer import RenderFailed, RendererBusy, RenderTimeout
 from app.services.pdf_service import pdf_service
-from app.core.json import normalize_to_json
 
 
 router = APIRouter(prefix="/cases", tags=["pdf"])
+logger = logging.getLogger(__name__)
 
 
 async def _get_case_with_snapshot(case_id: str, tenant_id: str):
@@ -39,56 +54,117 @@ async def _get_latest_snapshot(case_id: str):
     snapshot = await prisma.casesnapshot.find_first(
         where={"case_id": case_id},
         order={"version": "desc"},
+        include={"fields_blob": True},
     )
     return snapshot
 
 
-async def _check_and_consume_credit(tenant_id: str, user_id: str, case_id: str, version: int) -> int:
+async def _get_exportable_snapshot(case):
+    """Latest snapshot of a submitted case or raise 409."""
+    if case.status != "SUBMITTED":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "code": "CASE_NOT_SUBMITTED",
+                "message": "Nur eingereichte Cases können als PDF exportiert werden.",
+                "details": {"current_status": case.status},
+            },
+        )
+
+    snapshot = await _get_latest_snapshot(case.id)
+    if not snapshot:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "code": "NO_SNAPSHOT",
+                "message": "Kein Snapshot vorhanden. Case muss zuerst eingereicht werden.",
+            },
+        )
+    return snapshot
+
+
+def _insufficient_credits(balance: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_402_PAYMENT_REQUIRED,
+        detail={
+            "code": "INSUFFICIENT_CREDITS",
+            "message": "Nicht genügend Credits. Bitte laden Sie Credits auf, um PDFs zu exportieren.",
+            "details": {"balance": balance, "required": 1},
+        },
+    )
+
+
+async def _check_credit(tenant_id: str) -> None:
     """
-    Check if tenant has credits and consume one.
-    
-    Returns the new balance.
+    Check that the tenant has at least one credit (without consuming it).
+
     Raises HTTPException if insufficient credits.
     """
-    # Get current balance
     balance_record = await prisma.tenantcreditbalance.find_unique(
         where={"tenant_id": tenant_id}
     )
-    
     current_balance = balance_record.balance if balance_record else 0
-    
     if current_balance < 1:
-        raise HTTPException(
-            status_code=status.HTTP_402_PAYMENT_REQUIRED,
-            detail={
-                "code": "INSUFFICIENT_CREDITS",
-                "message": "Nicht genügend Credits. Bitte laden Sie Credits auf, um PDFs zu exportieren.",
-                "details": {"balance": current_balance, "required": 1},
-            },
+        raise _insufficient_credits(current_balance)
+
+
+async def _consume_credit(
+    tenant_id: str, user_id: str, case_id: str, version: int, request_id: str
+) -> None:
+    """
+    Consume one credit after the PDF was rendered.
+
+    Decrement and ledger entry run in one transaction; the decrement is
+    guarded by balance >= 1, so concurrent exports cannot overdraw.
+    Raises HTTPException if the balance was used up in the meantime.
+    """
+    async with prisma.tx() as tx:
+        debited = await debit_export_credit(
+            tx,
+            tenant_id=tenant_id,
+            user_id=user_id,
+            case_id=case_id,
+            version=version,
+            request_id=request_id,
         )
-    
-    # Consume credit atomically
-    # Update balance (decrement by 1)
-    updated_balance = await prisma.tenantcreditbalance.update(
-        where={"tenant_id": tenant_id},
-        data={"balance": {"decrement": 1}},
-    )
-    
-    # Create ledger entry with normalized JSON metadata
-    await prisma.creditledgerentry.create(
-        data={
-            "tenant_id": tenant_id,
-            "delta": -1,
-            "reason": "PDF_EXPORT",
-            "metadata_json": normalize_to_json({
-                "case_id": case_id,
-                "version": version,
-            }),
-            "created_by_user_id": user_id,
-        }
+        if not debited:
+            raise _insufficient_credits(0)
+
+
+async def _render_snapshot(case, snapshot) -> BinaryIO:
+    """Render in the process pool; map renderer errors to API errors."""
+    try:
+        return await render_snapshot_pdf(case, snapshot)
+    except RendererBusy as exc:
+        raise api_error(
+            ErrorCode.PDF_RENDERER_BUSY,
+            details={"retry_after": exc.retry_after},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    except RenderTimeout:
+        raise api_error(ErrorCode.PDF_RENDER_TIMEOUT)
+    except RenderFailed:
+        logger.exception("PDF rendering failed")
+        raise api_error(ErrorCode.PDF_RENDER_FAILED)
+
+
+def _pdf_response(
+    pdf_file: BinaryIO, filename: str, headers: dict[str, str] | None = None
+) -> StreamingResponse:
+    """
+    Stream an open PDF file (closed after sending) with Content-Length.
+
+    The PDF is read in chunks, so no full copy is held in memory.
+    """
+    return StreamingResponse(
+        iter_pdf_file(pdf_file),
+        media_type="application/pdf",
+        headers={
+            "Content-Length": str(pdf_size(pdf_file)),
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            **(headers or {}),
+        },
     )
-    
-    return updated_balance.balance
 
 
 @router.post("/{case_id}/pdf")
@@ -106,15 +182,23 @@ async def export_case_pdf(
     - Tenant must have at least 1 credit
     
     On success:
-    - Generates PDF from latest snapshot
-    - Consumes 1 credit
+    - Serves the PDF of the latest snapshot from pdf_cache, or renders it
+      deterministically (in the pdf_renderer process pool, written straight
+      into the cache file)
+    - Consumes 1 credit (cache hits only if PDF_CACHE_HITS_CONSUME_CREDIT)
     - Creates ledger entry for audit
     - Returns PDF as stream download
+
+    The credit is consumed only after rendering succeeded; busy, timeout
+    and render errors cost nothing.
     
     Errors:
     - 404 CASE_NOT_FOUND: Case does not exist or not accessible
     - 409 CASE_NOT_SUBMITTED: Case is not in SUBMITTED status
     - 402 INSUFFICIENT_CREDITS: Tenant has no credits
+    - 503 PDF_RENDERER_BUSY: Render queue full (Retry-After header)
+    - 504 PDF_RENDER_TIMEOUT: Rendering exceeded the timeout
+    - 500 PDF_RENDER_FAILED: Rendering failed
     """
     tenant_id = context.tenant["id"]
     user_id = context.user["id"]
@@ -125,59 +209,278 @@ async def export_case_pdf(
     # 1. Get case
     case = await _get_case_with_snapshot(case_id, tenant_id)
     
-    # 2. Check status
-    if case.status != "SUBMITTED":
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={
-                "code": "CASE_NOT_SUBMITTED",
-                "message": "Nur eingereichte Cases können als PDF exportiert werden.",
-                "details": {"current_status": case.status},
-            },
-        )
-    
-    # 3. Get latest snapshot
-    snapshot = await _get_latest_snapshot(case_id)
-    if not snapshot:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={
-                "code": "NO_SNAPSHOT",
-                "message": "Kein Snapshot vorhanden. Case muss zuerst eingereicht werden.",
-            },
-        )
-    
-    # 4. Check and consume credit
-    await _check_and_consume_credit(tenant_id, user_id, case_id, snapshot.version)
-    
-    # 5. Get procedure name (from case.procedure or snapshot)
-    procedure_name = case.procedure.name if case.procedure else snapshot.procedure_code
+    # 2. Check status, 3. get latest snapshot
+    snapshot = await _get_exportable_snapshot(case)
     
-    # 6. Generate PDF
-    pdf_bytes = pdf_service.generate_pdf(
-        case_id=case_id,
-        version=snapshot.version,
-        procedure_code=snapshot.procedure_code,
-        procedure_version=snapshot.procedure_version,
-        procedure_name=procedure_name,
-        fields_json=snapshot.fields_json,
-        request_id=request_id,
-    )
+    # 4. Cached PDF (snapshots are immutable, rendering is deterministic)
+    pdf_file = open_cached_snapshot_pdf(snapshot)
+    cache_hit = pdf_file is not None
+    consume_credit = not cache_hit or get_settings().pdf_cache_hits_consume_credit
+
+    try:
+        # 5. Check credit (consumed after rendering)
+        if consume_credit:
+            await _check_credit(tenant_id)
+
+        # 6. Render on cache miss (layout off the event loop, written to the cache file)
+        if pdf_file is None:
+            pdf_file = await _render_snapshot(case, snapshot)
+
+        # 7. Consume credit
+        if consume_credit:
+            await _consume_credit(tenant_id, user_id, case_id, snapshot.version, request_id)
+    except BaseException:
+        if pdf_file is not None:
+            pdf_file.close()
+        raise
     
-    # 7. Generate filename
+    # 8. Generate filename
     filename = pdf_service.get_filename(
         procedure_code=snapshot.procedure_code,
         case_id=case_id,
         version=snapshot.version
     )
     
-    # 8. Return PDF as download
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "X-Credits-Consumed": "1",
+    # 9. Stream PDF from the file as download
+    return _pdf_response(
+        pdf_file,
+        filename,
+        {
+            "X-Credits-Consumed": "1" if consume_credit else "0",
+            "X-PDF-Cache": "hit" if cache_hit else "miss",
         },
     )
 
+
+# --- Asynchronous export jobs ---
+
+
+class PdfJobData(BaseModel):
+    id: str
+    case_id: str
+    snapshot_version: int
+    status: str
+    error_code: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+    download_url: str | None = None
+
+
+class PdfJobResponse(BaseModel):
+    data: PdfJobData
+
+
+def _job_response(job) -> PdfJobResponse:
+    download_url = None
+    if job.status == "SUCCEEDED":
+        download_url = f"/cases/{job.case_id}/pdf/jobs/{job.id}/download"
+    return PdfJobResponse(
+        data=PdfJobData(
+            id=job.id,
+            case_id=job.case_id,
+            snapshot_version=job.snapshot_version,
+            status=job.status,
+            error_code=job.error_code,
+            created_at=job.created_at,
+            finished_at=job.finished_at,
+            download_url=download_url,
+        )
+    )
+
+
+async def _get_job(case_id: str, job_id: str, tenant_id: str, include: dict | None = None):
+    """Get a job of the tenant's case or raise 404."""
+    job = await prisma.pdfexportjob.find_first(
+        where={"id": job_id, "case_id": case_id, "tenant_id": tenant_id},
+        include=include,
+    )
+    if not job:
+        raise api_error(ErrorCode.PDF_JOB_NOT_FOUND)
+    return job
+
+
+@router.post(
+    "/{case_id}/pdf/jobs",
+    response_model=PdfJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_pdf_job(
+    case_id: str,
+    request: Request,
+    context: AuthContext = Depends(get_current_user),
+) -> PdfJobResponse:
+    """
+    Enqueue a PDF export of the case's latest snapshot.
+
+    Idempotent per snapshot: if a job for the snapshot is queued, running or
+    succeeded, that job is returned. A failed job is queued again.
+
+    The credit is consumed by the job worker when the PDF is ready (see
+    services/pdf_jobs.py); enqueueing only checks the balance. Poll
+    GET /cases/{id}/pdf/jobs/{job_id} and download via download_url.
+
+    Errors:
+    - 404 CASE_NOT_FOUND: Case does not exist or not accessible
+    - 409 CASE_NOT_SUBMITTED / NO_SNAPSHOT: Nothing to export
+    - 402 INSUFFICIENT_CREDITS: Tenant has no credits
+    """
+    tenant_id = context.tenant["id"]
+    case = await _get_case_with_snapshot(case_id, tenant_id)
+    snapshot = await _get_exportable_snapshot(case)
+
+    job = await prisma.pdfexportjob.find_unique(where={"snapshot_id": snapshot.id})
+    if job is not None and job.status != "FAILED":
+        return _job_response(job)
+
+    await _check_credit(tenant_id)
+    job = await enqueue_job(
+        job,
+        tenant_id=tenant_id,
+        case_id=case_id,
+        snapshot=snapshot,
+        user_id=context.user["id"],
+        request_id=getattr(request.state, "request_id", None),
+        client=prisma,
+    )
+    pdf_job_worker.notify()
+    return _job_response(job)
+
+
+@router.get("/{case_id}/pdf/jobs/{job_id}", response_model=PdfJobResponse)
+async def get_pdf_job(
+    case_id: str,
+    job_id: str,
+    context: AuthContext = Depends(get_current_user),
+) -> PdfJobResponse:
+    """
+    Status of a PDF export job (QUEUED, RUNNING, SUCCEEDED, FAILED).
+
+    Errors:
+    - 404 PDF_JOB_NOT_FOUND: Job does not exist or not accessible
+    """
+    return _job_response(await _get_job(case_id, job_id, context.tenant["id"]))
+
+
+@router.get("/{case_id}/pdf/jobs/{job_id}/download")
+async def download_pdf_job(
+    case_id: str,
+    job_id: str,
+    context: AuthContext = Depends(get_current_user),
+) -> Response:
+    """
+    Download the PDF of a succeeded job.
+
+    The credit was consumed when the job succeeded; downloads are free.
+    If the PDF was evicted from pdf_cache it is rendered again (the output
+    is deterministic, so the document is identical).
+
+    Errors:
+    - 404 PDF_JOB_NOT_FOUND: Job does not exist or not accessible
+    - 409 PDF_JOB_NOT_READY: Job has not succeeded (yet)
+    - 503 / 504 / 500: Re-rendering failed (see POST /cases/{id}/pdf)
+    """
+    job = await _get_job(case_id, job_id, context.tenant["id"], include=PDF_JOB_INCLUDE)
+    if job.status != "SUCCEEDED":
+        raise api_error(ErrorCode.PDF_JOB_NOT_READY, details={"status": job.status})
+
+    pdf_file = open_cached_snapshot_pdf(job.snapshot)
+    if pdf_file is None:
+        pdf_file = await _render_snapshot(job.case, job.snapshot)
+
+    filename = pdf_service.get_filename(
+        procedure_code=job.snapshot.procedure_code,
+        case_id=case_id,
+        version=job.snapshot_version,
+    )
+    return _pdf_response(pdf_file, filename)
+
+
+# --- Batch export ---
+
+
+class PdfBatchRequest(BaseModel):
+    """Either case_ids or a range of prepared_at dates (inclusive, UTC)."""
+
+    case_ids: list[str] | None = None
+    prepared_from: date | None = None
+    prepared_to: date | None = None
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "PdfBatchRequest":
+        has_range = self.prepared_from is not None or self.prepared_to is not None
+        if (self.case_ids is None) == (not has_range):
+            raise ValueError("Provide either case_ids or prepared_from/prepared_to")
+        if self.case_ids is not None and not 1 <= len(self.case_ids) <= PDF_BATCH_MAX_CASES:
+            raise ValueError(f"case_ids must contain 1 to {PDF_BATCH_MAX_CASES} ids")
+        if self.prepared_from and self.prepared_to and self.prepared_from > self.prepared_to:
+            raise ValueError("prepared_from must not be after prepared_to")
+        return self
+
+
+def _prepared_range(body: PdfBatchRequest) -> dict:
+    prepared_at = {}
+    if body.prepared_from:
+        prepared_at["gte"] = datetime.combine(body.prepared_from, time.min, timezone.utc)
+    if body.prepared_to:
+        prepared_at["lt"] = datetime.combine(
+            body.prepared_to + timedelta(days=1), time.min, timezone.utc
+        )
+    return {"status": "SUBMITTED", "prepared_at": prepared_at}
+
+
+@router.post("/pdf/batch")
+async def export_pdf_batch(
+    body: PdfBatchRequest,
+    request: Request,
+    context: AuthContext = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Export the latest snapshots of several cases as one ZIP.
+
+    PDFs are rendered concurrently (PDF_RENDER_WORKERS at a time, through
+    pdf_renderer) and streamed into the ZIP as each one finishes. The last
+    entry, manifest.json, lists every requested case with its file,
+    credits consumed and error code. Credits follow the rules of
+    POST /cases/{id}/pdf, per case.
+
+    Errors (before streaming starts):
+    - 400 VALIDATION_ERROR: Neither or both of case_ids and date range
+    - 402 INSUFFICIENT_CREDITS: Tenant has no credits
+    - 413 PAYLOAD_TOO_LARGE: Date range matches more than PDF_BATCH_MAX_CASES cases
+
+    Per-case failures (CASE_NOT_FOUND, CASE_NOT_SUBMITTED, NO_SNAPSHOT,
+    PDF_RENDER_*, INSUFFICIENT_CREDITS) are reported in the manifest.
+    """
+    tenant_id = context.tenant["id"]
+    settings = get_settings()
+
+    if body.case_ids is not None:
+        case_ids = list(dict.fromkeys(body.case_ids))
+        items = await load_batch_items(tenant_id, case_ids=case_ids, client=prisma)
+    else:
+        items = await load_batch_items(tenant_id, where=_prepared_range(body), client=prisma)
+        if len(items) > PDF_BATCH_MAX_CASES:
+            raise api_error(
+                ErrorCode.PAYLOAD_TOO_LARGE,
+                message=f"Zeitraum enthält mehr als {PDF_BATCH_MAX_CASES} Fälle.",
+                details={"max_cases": PDF_BATCH_MAX_CASES},
+            )
+
+    if settings.pdf_cache_hits_consume_credit:
+        await _check_credit(tenant_id)
+
+    batch = PDFBatchExport(
+        items,
+        tenant_id=tenant_id,
+        user_id=context.user["id"],
+        request_id=getattr(request.state, "request_id", None),
+        concurrency=settings.pdf_render_workers,
+        cache_hits_consume_credit=settings.pdf_cache_hits_consume_credit,
+        client=prisma,
+    )
+    filename = f"ZollPilot_PDFs_{datetime.now(timezone.utc).strftime('%Y%m%d')}.zip"
+    return StreamingResponse(
+        batch.stream(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
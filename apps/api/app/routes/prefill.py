@@ -12,506 +12,380 @@ Key Principles:
 """
 from __future__ import annotations
 
+import asyncio
 import io
-import os
-import re
-import tempfile
-import uuid
-from datetime import datetime, timedelta
-from typing import Any
-
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+import logging
+from dataclasses import asdict
+from datetime import timedelta
+from typing import AsyncGenerator, Callable
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-
-from app.dependencies.auth import AuthContext, get_current_user
+from starlette.background import BackgroundTask
+from starlette.datastructures import FormData, UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from app.core.config import get_settings
+from app.core.errors import ErrorCode, api_error
+from app.core.logging import StageTimer
+from app.core.rbac import Role
+from app.dependencies.auth import AuthContext, get_current_user, require_role
+from app.services.prefill_extraction import (  # noqa: F401 – re-exported
+    ALLOWED_MIME_TYPES,
+    CURRENCY_SYMBOLS,
+    FILE_SIGNATURES,
+    MAX_FILE_SIZE,
+    PDF_HEADER_WINDOW,
+    SHIPPING_KEYWORDS,
+    FieldSuggestion,
+    ItemSuggestion,
+    PrefillSuggestions,
+    extract_amounts,
+    extract_items,
+    extract_merchant_name,
+    extract_shipping_cost,
+    extract_text_from_pdf,
+    extract_total_amount,
+    matches_signature,
+    process_document,
+)
+from app.services.prefill_batch import (
+    PREFILL_BATCH_MAX_BYTES,
+    PREFILL_BATCH_MAX_FILES,
+    PREFILL_BATCH_SPOOL_BYTES,
+    BatchTooLarge,
+    BatchUpload,
+    PrefillBatch,
+    collect_documents,
+)
+from app.services.prefill_cache import prefill_cache
+from app.services.prefill_extractor import (
+    ExtractionFailed,
+    ExtractionTimeout,
+    ExtractorBusy,
+    prefill_extractor,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/prefill", tags=["prefill"])
 
 
 # --- Constants ---
 
-# Maximum file size: 10 MB
-MAX_FILE_SIZE = 10 * 1024 * 1024
-
-# Allowed MIME types
-ALLOWED_MIME_TYPES = {
-    "application/pdf": "pdf",
-    "image/jpeg": "jpg",
-    "image/png": "png",
-    "image/jpg": "jpg",
-}
+# Maximum request body: file plus multipart overhead (boundaries, part headers)
+MAX_REQUEST_SIZE = MAX_FILE_SIZE + 64 * 1024
 
 # Temporary file TTL (5 minutes)
 TEMP_FILE_TTL = timedelta(minutes=5)
 
-# Currency patterns
-CURRENCY_SYMBOLS = {
-    "€": "EUR",
-    "$": "USD",
-    "£": "GBP",
-    "¥": "JPY",
-    "CHF": "CHF",
-    "EUR": "EUR",
-    "USD": "USD",
-    "GBP": "GBP",
-}
-
-# Common shipping keywords (German & English)
-SHIPPING_KEYWORDS = [
-    r"versand(?:kosten)?",
-    r"lieferung",
-    r"porto",
-    r"shipping",
-    r"delivery",
-    r"freight",
-    r"postage",
-    r"fracht",
-]
-
 
 # --- Models ---
 
 
-class FieldSuggestion(BaseModel):
-    """A single field suggestion with confidence."""
-    field_key: str
-    value: Any
-    confidence: float  # 0.0 - 1.0
-    source: str  # e.g., "regex_amount", "regex_merchant"
-    display_label: str  # German label for UI
-
-
-class ItemSuggestion(BaseModel):
-    """A suggested item from the invoice."""
-    name: str
-    price: float | None
-    currency: str | None
-    confidence: float
-
-
-class PrefillSuggestions(BaseModel):
-    """All suggestions extracted from the document."""
-    suggestions: list[FieldSuggestion]
-    items: list[ItemSuggestion]
-    raw_text_preview: str | None  # First 500 chars for debug (optional)
-    extraction_method: str
-    warnings: list[str]
-
-
 class PrefillUploadResponse(BaseModel):
     """Response wrapper for prefill upload."""
     data: PrefillSuggestions
 
 
-# --- Extraction Helpers ---
+# --- Upload Ingestion ---
 
 
-def extract_amounts(text: str) -> list[tuple[float, str, float]]:
+class _UploadParser(MultiPartParser):
     """
-    Extract monetary amounts from text.
-    Returns list of (amount, currency, confidence).
-    """
-    results: list[tuple[float, str, float]] = []
-
-    # Pattern: currency symbol followed by amount
-    # e.g., €150.00, $ 99.99, 150,00 €, 150.00 EUR
-    patterns = [
-        # €150.00 or € 150.00 or € 150,00
-        (r"€\s*(\d{1,6}(?:[.,]\d{2})?)", "EUR", 0.9),
-        # 150.00€ or 150,00 €
-        (r"(\d{1,6}(?:[.,]\d{2})?)\s*€", "EUR", 0.9),
-        # EUR 150.00 or 150.00 EUR
-        (r"EUR\s*(\d{1,6}(?:[.,]\d{2})?)", "EUR", 0.85),
-        (r"(\d{1,6}(?:[.,]\d{2})?)\s*EUR", "EUR", 0.85),
-        # $150.00 or $ 150.00
-        (r"\$\s*(\d{1,6}(?:[.,]\d{2})?)", "USD", 0.9),
-        (r"(\d{1,6}(?:[.,]\d{2})?)\s*\$", "USD", 0.9),
-        # USD 150.00 or 150.00 USD
-        (r"USD\s*(\d{1,6}(?:[.,]\d{2})?)", "USD", 0.85),
-        (r"(\d{1,6}(?:[.,]\d{2})?)\s*USD", "USD", 0.85),
-        # GBP / £
-        (r"£\s*(\d{1,6}(?:[.,]\d{2})?)", "GBP", 0.9),
-        (r"(\d{1,6}(?:[.,]\d{2})?)\s*£", "GBP", 0.9),
-        (r"GBP\s*(\d{1,6}(?:[.,]\d{2})?)", "GBP", 0.85),
-        # CHF
-        (r"CHF\s*(\d{1,6}(?:[.,]\d{2})?)", "CHF", 0.85),
-        (r"(\d{1,6}(?:[.,]\d{2})?)\s*CHF", "CHF", 0.85),
-    ]
+    Multipart parser that keeps uploads in memory up to spool_bytes (default:
+    the whole capped body, i.e. no spill to disk); larger files go to an
+    unnamed temporary file.
 
-    for pattern, currency, base_confidence in patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            amount_str = match.group(1)
-            # Normalize: replace comma with dot for parsing
-            amount_str = amount_str.replace(",", ".")
-            try:
-                amount = float(amount_str)
-                if amount > 0:
-                    results.append((amount, currency, base_confidence))
-            except ValueError:
-                continue
-
-    return results
-
-
-def extract_shipping_cost(text: str, amounts: list[tuple[float, str, float]]) -> tuple[float, str, float] | None:
+    With check_head, each file's first PDF_HEADER_WINDOW bytes (or the whole
+    file, if shorter) are checked as soon as they arrive, so mismatching
+    content is rejected before the rest of the body is received.
     """
-    Try to find shipping cost by looking for shipping keywords near amounts.
-    Returns (amount, currency, confidence) or None.
-    """
-    text_lower = text.lower()
-
-    for keyword_pattern in SHIPPING_KEYWORDS:
-        for match in re.finditer(keyword_pattern, text_lower, re.IGNORECASE):
-            # Look for amounts near the keyword (within 50 chars)
-            start = max(0, match.start() - 50)
-            end = min(len(text), match.end() + 50)
-            context = text[start:end]
-
-            context_amounts = extract_amounts(context)
-            if context_amounts:
-                # Return the first amount found near shipping keyword
-                amount, currency, conf = context_amounts[0]
-                # Boost confidence because we found it near shipping keyword
-                return (amount, currency, min(conf + 0.1, 0.95))
 
-    return None
+    def __init__(
+        self,
+        request: Request,
+        *,
+        max_bytes: int,
+        max_files: int,
+        too_large: Callable[[], Exception],
+        check_head: Callable[[UploadFile, bytes], None] | None = None,
+        spool_bytes: int | None = None,
+    ):
+        super().__init__(
+            request.headers,
+            _capped_body(request, max_bytes, too_large),
+            max_files=max_files,
+            max_fields=10,
+        )
+        # Spool threshold; the body is capped at max_bytes before parsing
+        self.max_file_size = spool_bytes or max_bytes
+        self._check_head = check_head
+        self._head: bytearray | None = None
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        if self._check_head is not None and self._current_part.file is not None:
+            self._head = bytearray()
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        super().on_part_data(data, start, end)
+        if self._head is not None:
+            self._head += data[start:end]
+            if len(self._head) >= PDF_HEADER_WINDOW:
+                self._run_check_head()
+
+    def on_part_end(self) -> None:
+        # Empty files are left to the endpoint (EMPTY_FILE)
+        if self._head:
+            self._run_check_head()
+        self._head = None
+        super().on_part_end()
+
+    def _run_check_head(self) -> None:
+        head, self._head = bytes(self._head), None
+        self._check_head(self._current_part.file, head)
+
+    async def parse(self) -> FormData:
+        try:
+            return await super().parse()
+        except HTTPException:
+            # too_large() / check_head(); the base class only closes the
+            # files on MultiPartException
+            for file in self._files_to_close_on_error:
+                file.close()
+            raise
+
+
+def _file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,  # HTTP_413_REQUEST_ENTITY_TOO_LARGE is deprecated
+        detail={
+            "code": "FILE_TOO_LARGE",
+            "message": "Datei zu groß. Maximum: 10 MB.",
+        },
+    )
 
 
-def extract_total_amount(text: str, amounts: list[tuple[float, str, float]]) -> tuple[float, str, float] | None:
-    """
-    Try to find the total/grand total amount.
-    Returns (amount, currency, confidence) or None.
-    """
-    total_keywords = [
-        r"gesamt",
-        r"total",
-        r"summe",
-        r"endbetrag",
-        r"zu zahlen",
-        r"grand total",
-        r"order total",
-        r"betrag",
-    ]
+def _invalid_file_type() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "code": "INVALID_FILE_TYPE",
+            "message": "Ungültiger Dateityp. Erlaubt: PDF, JPG, PNG.",
+        },
+    )
 
-    text_lower = text.lower()
 
-    for keyword in total_keywords:
-        for match in re.finditer(keyword, text_lower, re.IGNORECASE):
-            # Look for amounts near the keyword
-            start = max(0, match.start() - 30)
-            end = min(len(text), match.end() + 80)
-            context = text[start:end]
+def _content_mismatch() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={
+            "code": "INVALID_FILE_TYPE",
+            "message": "Dateiinhalt passt nicht zum Dateityp. Erlaubt: PDF, JPG, PNG.",
+        },
+    )
 
-            context_amounts = extract_amounts(context)
-            if context_amounts:
-                # Return the largest amount found near total keyword
-                context_amounts.sort(key=lambda x: x[0], reverse=True)
-                amount, currency, conf = context_amounts[0]
-                return (amount, currency, min(conf + 0.15, 0.95))
 
-    # Fallback: return the largest amount if no total keyword found
-    if amounts:
-        amounts_sorted = sorted(amounts, key=lambda x: x[0], reverse=True)
-        amount, currency, conf = amounts_sorted[0]
-        return (amount, currency, conf * 0.7)  # Lower confidence without keyword
+def _batch_too_large() -> HTTPException:
+    return api_error(
+        ErrorCode.PAYLOAD_TOO_LARGE,
+        message="Batch zu groß. Maximum: 50 MB.",
+        details={"max_bytes": PREFILL_BATCH_MAX_BYTES},
+    )
 
-    return None
 
+def _missing_file(field: str = "file") -> RequestValidationError:
+    """Same error as a missing File(...) parameter."""
+    return RequestValidationError(
+        [{"type": "missing", "loc": ("body", field), "msg": "Field required", "input": None}]
+    )
 
-def extract_merchant_name(text: str) -> tuple[str, float] | None:
-    """
-    Try to extract merchant/seller name from invoice.
-    Returns (name, confidence) or None.
-    """
-    # Look for common patterns
-    patterns = [
-        (r"(?:von|from|verkäufer|seller|händler|shop)[\s:]+([A-Za-zÄÖÜäöüß0-9\s&.-]{3,50})", 0.8),
-        (r"(?:rechnung|invoice)[\s]+(?:von|from)[\s:]+([A-Za-zÄÖÜäöüß0-9\s&.-]{3,50})", 0.85),
-        (r"(?:bestellung bei|order from)[\s:]+([A-Za-zÄÖÜäöüß0-9\s&.-]{3,50})", 0.85),
-    ]
 
-    for pattern, confidence in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            name = match.group(1).strip()
-            # Clean up the name
-            name = re.sub(r"\s+", " ", name)
-            if len(name) >= 3:
-                return (name, confidence)
-
-    # Try to find company-like names at the start of the document
-    lines = text.split("\n")[:10]  # First 10 lines
-    for line in lines:
-        line = line.strip()
-        # Skip short lines or lines that look like addresses
-        if len(line) < 5 or len(line) > 60:
-            continue
-        if re.match(r"^\d", line):  # Starts with number (likely address/date)
-            continue
-        if "@" in line or "www." in line.lower():  # Email or URL
-            continue
-        if re.match(r".*\d{5}.*", line):  # Postal code
-            continue
-        # Could be company name
-        return (line, 0.5)
-
-    return None
-
-
-def extract_items(text: str) -> list[ItemSuggestion]:
-    """
-    Try to extract line items from invoice.
-    Returns list of ItemSuggestion.
-    """
-    items: list[ItemSuggestion] = []
-
-    # Pattern: product name followed by price
-    # e.g., "iPhone 15 Pro          €1199.00"
-    # e.g., "2x Smartphone Case     $ 29.99"
-
-    # Look for lines with product + price pattern
-    lines = text.split("\n")
-
-    for line in lines:
-        line = line.strip()
-        if not line or len(line) < 10:
-            continue
-
-        # Try to find price at end of line
-        price_pattern = r"[€$£]\s*(\d{1,6}(?:[.,]\d{2})?)|(\d{1,6}(?:[.,]\d{2})?)\s*[€$£]|(\d{1,6}(?:[.,]\d{2})?)\s*(?:EUR|USD|GBP)"
-        price_match = re.search(price_pattern, line, re.IGNORECASE)
-
-        if price_match:
-            # Extract product name (everything before price)
-            price_start = price_match.start()
-            product_name = line[:price_start].strip()
-
-            # Clean up product name
-            product_name = re.sub(r"^\d+\s*x\s*", "", product_name)  # Remove "2x "
-            product_name = re.sub(r"\s+", " ", product_name)
-
-            if len(product_name) >= 3:
-                # Extract price value
-                price_str = price_match.group(1) or price_match.group(2) or price_match.group(3)
-                if price_str:
-                    try:
-                        price = float(price_str.replace(",", "."))
-
-                        # Determine currency
-                        currency = "EUR"  # Default
-                        if "$" in line:
-                            currency = "USD"
-                        elif "£" in line:
-                            currency = "GBP"
-                        elif "CHF" in line.upper():
-                            currency = "CHF"
-
-                        items.append(ItemSuggestion(
-                            name=product_name[:100],  # Limit length
-                            price=price,
-                            currency=currency,
-                            confidence=0.7
-                        ))
-                    except ValueError:
-                        pass
-
-    return items[:10]  # Limit to 10 items
-
-
-def extract_text_from_pdf(content: bytes) -> str:
+async def _capped_body(
+    request: Request,
+    max_bytes: int,
+    too_large: Callable[[], Exception],
+) -> AsyncGenerator[bytes, None]:
+    """Request body in chunks; too_large() as soon as it exceeds max_bytes."""
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise too_large()
+        yield chunk
+
+
+async def _receive_form(
+    request: Request,
+    field: str,
+    *,
+    max_bytes: int,
+    max_files: int,
+    too_large: Callable[[], Exception],
+    check_head: Callable[[UploadFile, bytes], None] | None = None,
+    spool_bytes: int | None = None,
+) -> list[UploadFile]:
     """
-    Extract text from PDF using pdfplumber or PyPDF2.
-    Returns extracted text.
+    Parse the multipart body while it streams in; returns the uploads of
+    `field`.
+
+    Oversized bodies are rejected from the Content-Length header or, without
+    one, once the stream passes max_bytes, instead of being received completely.
+    check_head(file, first_bytes) may reject a file as soon as its first
+    bytes are in; files above spool_bytes are kept on disk (see
+    _UploadParser).
     """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large()
+
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise _missing_file(field)
+
+    parser = _UploadParser(
+        request,
+        max_bytes=max_bytes,
+        max_files=max_files,
+        too_large=too_large,
+        check_head=check_head,
+        spool_bytes=spool_bytes,
+    )
     try:
-        # Try pdfplumber first (better extraction)
-        import pdfplumber
-
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
-            text_parts = []
-            for page in pdf.pages[:5]:  # Limit to first 5 pages
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
-            return "\n".join(text_parts)
-    except ImportError:
-        pass
-    except Exception:
-        pass
+        form = await parser.parse()
+    except MultiPartException as exc:
+        raise api_error(ErrorCode.VALIDATION_ERROR, message=exc.message)
 
-    try:
-        # Fallback to PyPDF2
-        from pypdf import PdfReader
+    uploads = [value for value in form.getlist(field) if isinstance(value, UploadFile)]
+    if not uploads:
+        await form.close()
+        raise _missing_file(field)
+    return uploads
 
-        reader = PdfReader(io.BytesIO(content))
-        text_parts = []
-        for page in reader.pages[:5]:  # Limit to first 5 pages
-            text_parts.append(page.extract_text() or "")
-        return "\n".join(text_parts)
-    except ImportError:
-        pass
-    except Exception:
-        pass
 
-    return ""
+def _check_upload_head(upload: UploadFile, head: bytes) -> None:
+    """
+    Runs while the upload streams in: 400 INVALID_FILE_TYPE for types other
+    than PDF, JPG, PNG or if the first bytes do not match the declared type.
+    """
+    file_type = ALLOWED_MIME_TYPES.get(upload.content_type or "")
+    if file_type is None:
+        raise _invalid_file_type()
+    if not matches_signature(head, file_type):
+        raise _content_mismatch()
 
 
-def process_document(content: bytes, file_type: str) -> PrefillSuggestions:
+def _upload_content(upload: UploadFile) -> bytes:
     """
-    Process uploaded document and extract suggestions.
+    Content of a received upload, handed to the extractor without a copy.
+
+    _UploadParser keeps the file in the SpooledTemporaryFile's BytesIO;
+    BytesIO.getvalue() returns a bytes object sharing that buffer (it stays
+    valid after the file is closed).
+
+    - 413 FILE_TOO_LARGE once MAX_FILE_SIZE is exceeded (upload.size is
+      counted while parsing)
     """
-    warnings: list[str] = []
-    suggestions: list[FieldSuggestion] = []
-    items: list[ItemSuggestion] = []
-    text = ""
-    extraction_method = "none"
-
-    if file_type == "pdf":
-        text = extract_text_from_pdf(content)
-        extraction_method = "pdf_text"
-
-        if not text or len(text) < 20:
-            warnings.append("PDF enthält wenig oder keinen extrahierbaren Text. Möglicherweise ist es ein Scan.")
-
-    elif file_type in ("jpg", "png"):
-        # For v1, we don't do OCR – just inform the user
-        warnings.append(
-            "Bildformate werden in dieser Version nur eingeschränkt unterstützt. "
-            "Für bessere Ergebnisse laden Sie bitte ein PDF hoch."
-        )
-        extraction_method = "image_unsupported"
-        # Return empty suggestions for images in v1
-        return PrefillSuggestions(
-            suggestions=[],
-            items=[],
-            raw_text_preview=None,
-            extraction_method=extraction_method,
-            warnings=warnings,
-        )
+    if upload.size is not None and upload.size > MAX_FILE_SIZE:
+        raise _file_too_large()
 
-    if not text:
-        return PrefillSuggestions(
-            suggestions=[],
-            items=[],
-            raw_text_preview=None,
-            extraction_method=extraction_method,
-            warnings=warnings if warnings else ["Kein Text im Dokument gefunden."],
-        )
+    # Like UploadFile._in_memory, look at the spooled file's storage
+    buffer = getattr(upload.file, "_file", upload.file)
+    if isinstance(buffer, io.BytesIO):
+        return buffer.getvalue()
+    upload.file.seek(0)
+    return upload.file.read()
 
-    # Extract amounts
-    amounts = extract_amounts(text)
-
-    # Extract total amount
-    total = extract_total_amount(text, amounts)
-    if total:
-        amount, currency, confidence = total
-        suggestions.append(FieldSuggestion(
-            field_key="value_amount",
-            value=amount,
-            confidence=confidence,
-            source="regex_total",
-            display_label="Warenwert",
-        ))
-        suggestions.append(FieldSuggestion(
-            field_key="value_currency",
-            value=currency,
-            confidence=confidence,
-            source="regex_currency",
-            display_label="Währung",
-        ))
-
-    # Extract shipping cost
-    shipping = extract_shipping_cost(text, amounts)
-    if shipping:
-        amount, currency, confidence = shipping
-        suggestions.append(FieldSuggestion(
-            field_key="shipping_cost",
-            value=amount,
-            confidence=confidence,
-            source="regex_shipping",
-            display_label="Versandkosten",
-        ))
-
-    # Extract merchant name
-    merchant = extract_merchant_name(text)
-    if merchant:
-        name, confidence = merchant
-        suggestions.append(FieldSuggestion(
-            field_key="sender_name",
-            value=name,
-            confidence=confidence,
-            source="regex_merchant",
-            display_label="Händlername / Absender",
-        ))
-
-    # Extract items
-    items = extract_items(text)
-
-    # Add confidence warning for low-confidence suggestions
-    low_conf = [s for s in suggestions if s.confidence < 0.6]
-    if low_conf:
-        warnings.append(
-            "Einige Vorschläge haben eine niedrige Konfidenz. Bitte besonders sorgfältig prüfen."
-        )
 
-    # Truncate text preview for debugging (optional, not shown to user in production)
-    raw_preview = text[:500] if len(text) > 0 else None
+async def _close_uploads(files: list[UploadFile]) -> None:
+    for file in files:
+        await file.close()
 
-    return PrefillSuggestions(
-        suggestions=suggestions,
-        items=items,
-        raw_text_preview=raw_preview,
-        extraction_method=extraction_method,
-        warnings=warnings,
-    )
+
+def _multipart_files_body(field: str, many: bool) -> dict:
+    """OpenAPI request body for uploads read via _receive_form."""
+    file_schema = {"type": "string", "format": "binary"}
+    schema = {"type": "array", "items": file_schema} if many else file_schema
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": [field],
+                        "properties": {field: schema},
+                    }
+                }
+            },
+        }
+    }
 
 
 # --- Endpoint ---
 
 
-@router.post("/upload", response_model=PrefillUploadResponse)
+@router.post(
+    "/upload",
+    response_model=PrefillUploadResponse,
+    openapi_extra=_multipart_files_body("file", many=False),
+)
 async def upload_and_extract(
-    file: UploadFile = File(...),
+    request: Request,
     context: AuthContext = Depends(get_current_user),
 ) -> PrefillUploadResponse:
     """
     Upload an invoice/receipt and extract field suggestions.
 
-    Accepts: PDF, JPG, PNG (max 10 MB)
+    Accepts: PDF, JPG, PNG (max 10 MB, multipart field `file`)
 
     Returns suggestions with confidence scores. User must confirm each field.
 
+    The upload is checked as it streams in: 413 FILE_TOO_LARGE as soon as
+    the limit is exceeded, 400 INVALID_FILE_TYPE once the first bytes are in
+    and do not match the declared type. The file is held in memory once and
+    passed to the extractor without a further copy.
+
     Privacy:
     - Files are processed in memory only
     - No permanent storage
     - No external services
     - No logging of file contents
+
+    Extraction runs in the prefill_extractor process pool (time and page
+    limits per document). Re-uploads of the same file are answered from
+    the result cache (keyed by content hash; the file itself is not kept):
+    - 503 PREFILL_BUSY: Extraction queue full (Retry-After header)
+    - 504 PREFILL_TIMEOUT: Extraction exceeded the timeout
+    - 500 PREFILL_FAILED: Extraction failed
     """
-    # Validate content type
+    timer = StageTimer(request)
+
+    with timer.stage("receive"):
+        (file,) = await _receive_form(
+            request,
+            "file",
+            max_bytes=MAX_REQUEST_SIZE,
+            max_files=1,
+            too_large=_file_too_large,
+            check_head=_check_upload_head,
+        )
+
+    # Validate content type (non-empty files were checked while receiving)
     content_type = file.content_type or ""
     if content_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "code": "INVALID_FILE_TYPE",
-                "message": f"Ungültiger Dateityp. Erlaubt: PDF, JPG, PNG.",
-            },
-        )
+        await file.close()
+        raise _invalid_file_type()
 
     file_type = ALLOWED_MIME_TYPES[content_type]
 
-    # Read file content
-    content = await file.read()
-
-    # Validate file size
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "code": "FILE_TOO_LARGE",
-                "message": f"Datei zu groß. Maximum: 10 MB.",
-            },
-        )
+    try:
+        with timer.stage("read"):
+            content = _upload_content(file)
+    finally:
+        await file.close()
 
     if len(content) == 0:
         raise HTTPException(
@@ -524,11 +398,119 @@ async def upload_and_extract(
 
     # Process document and extract suggestions
     # Note: We do NOT store the file - process in memory only
-    suggestions = process_document(content, file_type)
+    try:
+        with timer.stage("extract"):
+            suggestions = await prefill_extractor.extract(content, file_type)
+    except ExtractorBusy as exc:
+        raise api_error(
+            ErrorCode.PREFILL_BUSY,
+            details={"retry_after": exc.retry_after},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    except ExtractionTimeout:
+        raise api_error(ErrorCode.PREFILL_TIMEOUT)
+    except ExtractionFailed:
+        logger.exception("Prefill extraction failed")
+        raise api_error(ErrorCode.PREFILL_FAILED)
 
     return PrefillUploadResponse(data=suggestions)
 
 
+@router.post(
+    "/batch",
+    response_class=StreamingResponse,
+    openapi_extra=_multipart_files_body("files", many=True),
+)
+async def batch_extract(
+    request: Request,
+    context: AuthContext = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Extract suggestions from several invoices/receipts in one request.
+
+    Accepts: multipart field `files`, repeated; each a PDF, JPG, PNG (max
+    10 MB) or a ZIP of such files. At most PREFILL_BATCH_MAX_FILES documents
+    (ZIP entries count individually) and 50 MB per request.
+
+    Documents run through the prefill_extractor pool, PREFILL_WORKERS at a
+    time per request; each file is read only when its turn comes (files
+    above PREFILL_BATCH_SPOOL_BYTES wait on disk, all are closed after the
+    stream). Results stream back as NDJSON in completion order:
+    - {"index": 0, "file": "a.pdf", "status": "ok", "data": {...}}
+    - {"index": 1, "file": "b.zip/c.png", "status": "error", "error": {...}}
+    - Finally {"summary": {"total": ..., "succeeded": ..., "failed": ...}}
+
+    Errors (before streaming starts):
+    - 400 VALIDATION_ERROR: No files
+    - 413 PAYLOAD_TOO_LARGE: More than 50 MB or PREFILL_BATCH_MAX_FILES documents
+
+    Per-file failures (INVALID_FILE_TYPE, FILE_TOO_LARGE, EMPTY_FILE,
+    PREFILL_*) are reported in the file's line.
+    """
+    timer = StageTimer(request)
+
+    # Body fully received before the response starts: StreamingResponse
+    # listens on receive() in parallel and would swallow body chunks.
+    # Files above PREFILL_BATCH_SPOOL_BYTES are spooled to disk.
+    with timer.stage("receive"):
+        files = await _receive_form(
+            request,
+            "files",
+            max_bytes=PREFILL_BATCH_MAX_BYTES,
+            max_files=PREFILL_BATCH_MAX_FILES + 1,
+            too_large=_batch_too_large,
+            spool_bytes=PREFILL_BATCH_SPOOL_BYTES,
+        )
+
+    # Documents are read from the still-open files while streaming; the
+    # files are closed once the stream has finished
+    uploads = [
+        BatchUpload(
+            name=file.filename or f"file-{index + 1}",
+            content_type=file.content_type or "",
+            file=file.file,
+            size=file.size or 0,
+        )
+        for index, file in enumerate(files)
+    ]
+    try:
+        documents = await asyncio.to_thread(collect_documents, uploads)
+    except BatchTooLarge:
+        await _close_uploads(files)
+        raise api_error(
+            ErrorCode.PAYLOAD_TOO_LARGE,
+            message=f"Batch enthält mehr als {PREFILL_BATCH_MAX_FILES} Dokumente.",
+            details={"max_files": PREFILL_BATCH_MAX_FILES},
+        )
+    except BaseException:
+        await _close_uploads(files)
+        raise
+
+    batch = PrefillBatch(documents, concurrency=get_settings().prefill_workers)
+    return StreamingResponse(
+        batch.stream(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(_close_uploads, files),
+    )
+
+
+@router.get("/metrics")
+async def get_prefill_metrics(
+    context: AuthContext = Depends(require_role(Role.SYSTEM_ADMIN)),
+) -> dict:
+    """
+    Extraction pool metrics (SYSTEM_ADMIN only): queue depth, counters
+    (completed, failed, timeouts, rejected) and run/wait durations, plus
+    the result cache under `cache` (entries, hits, misses, hit_rate).
+    """
+    return {
+        "data": {
+            **asdict(prefill_extractor.stats()),
+            "cache": asdict(prefill_cache.stats()),
+        }
+    }
+
+
 @router.get("/info")
 async def get_prefill_info(
     context: AuthContext = Depends(get_current_user),
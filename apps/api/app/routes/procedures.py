@@ -111,7 +111,7 @@ class ValidateCaseResponse(BaseModel):
 # --- Helper Functions ---
 
 
-def _procedure_to_response(proc: ProcedureDefinition) -> ProcedureDefinitionResponse:
+def procedure_to_response(proc: ProcedureDefinition) -> ProcedureDefinitionResponse:
     """Convert domain ProcedureDefinition to API response."""
     steps = [
         StepDefinitionResponse(
@@ -183,7 +183,7 @@ async def get_procedure(
             detail={"code": "PROCEDURE_NOT_FOUND", "message": f"Procedure '{code}' not found."},
         )
 
-    return ProcedureSingleResponse(data=_procedure_to_response(procedure))
+    return ProcedureSingleResponse(data=procedure_to_response(procedure))
 
 
 # --- Case Binding Endpoints (mounted under /cases but defined here for organization) ---
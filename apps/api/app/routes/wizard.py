@@ -6,6 +6,7 @@ Bietet:
 - POST /cases/{id}/wizard/navigate - Zu einem Step navigieren
 - POST /cases/{id}/wizard/complete-step - Step als abgeschlossen markieren
 - GET /cases/{id}/wizard/steps - Step-Definitionen abrufen
+- GET /cases/{id}/wizard/bootstrap - Case, Wizard, Verfahren und Hinweise in einem Request
 
 WICHTIG:
 - Alle Endpoints prüfen Wizard-Zugangsrechte
@@ -16,10 +17,13 @@ WICHTIG:
 
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+from functools import lru_cache
+from itertools import product
+from typing import Any, Collection
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from app.dependencies.auth import AuthContext, get_current_user
 from app.db.prisma_client import prisma
@@ -32,8 +36,16 @@ from app.domain.wizard import (
     get_initial_wizard_state,
     WizardState,
 )
-from app.domain.wizard_steps import get_procedure_steps, StepDefinition
+from app.domain.wizard_steps import (
+    get_procedure_steps,
+    get_required_fields_for_step,
+    StepDefinition,
+)
 from app.domain.case_status import CaseStatus
+from app.domain.procedures import procedure_loader
+from app.routes.cases import CaseDetail, case_to_detail
+from app.routes.knowledge import KnowledgeEntryItem, find_published_entries
+from app.routes.procedures import ProcedureDefinitionResponse, procedure_to_response
 
 
 router = APIRouter(prefix="/cases", tags=["wizard"])
@@ -45,7 +57,9 @@ router = APIRouter(prefix="/cases", tags=["wizard"])
 
 
 class StepInfo(BaseModel):
-    """Step-Information für Frontend."""
+    """Step-Information für Frontend (immutable, wird als Template geteilt)."""
+    model_config = ConfigDict(frozen=True)
+
     step_key: str
     title: str
     description: str
@@ -75,6 +89,19 @@ class WizardResponse(BaseModel):
     data: WizardStateResponse
 
 
+class WizardBootstrapData(BaseModel):
+    """Case, Wizard-Zustand, Verfahren und Feld-Hinweise für den Wizard-Start."""
+    case: CaseDetail
+    wizard: WizardStateResponse
+    procedure: ProcedureDefinitionResponse | None
+    knowledge: list[KnowledgeEntryItem]
+
+
+class WizardBootstrapResponse(BaseModel):
+    """API-Response für Wizard-Bootstrap."""
+    data: WizardBootstrapData
+
+
 class NavigateRequest(BaseModel):
     """Request für Step-Navigation."""
     target_step: str
@@ -115,11 +142,35 @@ class CompleteStepResponse(BaseModel):
 # =============================================================================
 
 
-async def _get_case_with_procedure(case_id: str, tenant_id: str):
-    """Holt Case mit Procedure oder wirft 404."""
+def _case_include(
+    field_keys: Collection[str] | None = None,
+    all_fields: bool = False,
+) -> dict[str, Any]:
+    """
+    Include-Projektion für Wizard-Endpoints.
+
+    Status, Verfahren und Fortschritt reichen für die meisten Endpoints.
+    CaseFields werden nur geladen wenn field_keys angegeben sind, und dann
+    nur die angefragten Keys (all_fields=True lädt alle).
+    """
+    include: dict[str, Any] = {"procedure": True, "wizard_progress": True}
+    if all_fields:
+        include["fields"] = True
+    elif field_keys:
+        include["fields"] = {"where": {"key": {"in": sorted(field_keys)}}}
+    return include
+
+
+async def _get_case_with_procedure(
+    case_id: str,
+    tenant_id: str,
+    field_keys: Collection[str] | None = None,
+    all_fields: bool = False,
+):
+    """Holt Case mit Procedure und WizardProgress oder wirft 404."""
     case = await prisma.case.find_first(
         where={"id": case_id, "tenant_id": tenant_id},
-        include={"procedure": True, "fields": True, "wizard_progress": True},
+        include=_case_include(field_keys, all_fields),
     )
     if not case:
         raise HTTPException(
@@ -175,40 +226,139 @@ def _check_wizard_write_access(case) -> None:
         )
 
 
+def _check_wizard_read_access(case) -> None:
+    """Lesezugriff: IN_PROCESS normal, SUBMITTED/ARCHIVED nur mit vorhandenem Fortschritt."""
+    # Für SUBMITTED/ARCHIVED: Read-only Zugang erlauben
+    if case.status in (CaseStatus.SUBMITTED.value, CaseStatus.ARCHIVED.value):
+        # Wizard-Zustand nur lesen, nicht validieren
+        if not case.wizard_progress:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "code": "WIZARD_NOT_FOUND",
+                    "message": "No wizard progress found for this case.",
+                },
+            )
+    else:
+        # Für IN_PROCESS: Normale Wizard-Zugangsvalidierung
+        _check_wizard_access(case)
+
+
+async def _ensure_wizard_progress(case_id: str, procedure_code: str, progress):
+    """Liefert (progress, completed_steps), legt den Fortschritt bei Bedarf an."""
+    if progress:
+        completed_steps = progress.completed_steps if isinstance(progress.completed_steps, list) else []
+        return progress, completed_steps
+
+    # Neuen Wizard-Progress erstellen
+    steps_config = get_procedure_steps(procedure_code)
+    first_step = steps_config.first_step if steps_config else ""
+
+    progress = await prisma.wizardprogress.create(
+        data={
+            "case_id": case_id,
+            "procedure_code": procedure_code,
+            "current_step": first_step,
+            "completed_steps": [],
+            "is_completed": False,
+        }
+    )
+    return progress, []
+
+
+def _build_wizard_state_response(
+    case_id: str,
+    procedure_code: str,
+    progress,
+    completed_steps: list[str],
+) -> WizardStateResponse:
+    """Wizard-State + Steps-Info als Response-Modell."""
+    state = build_wizard_state(
+        case_id=case_id,
+        procedure_code=procedure_code,
+        current_step=progress.current_step,
+        completed_steps=completed_steps,
+        is_completed=progress.is_completed,
+    )
+
+    steps_info = _build_steps_info(
+        procedure_code=procedure_code,
+        current_step=progress.current_step,
+        completed_steps=completed_steps,
+    )
+
+    return WizardStateResponse(
+        case_id=state.case_id,
+        procedure_code=state.procedure_code,
+        current_step=state.current_step,
+        completed_steps=state.completed_steps,
+        is_completed=state.is_completed,
+        total_steps=state.total_steps,
+        current_step_index=state.current_step_index,
+        can_go_back=state.can_go_back,
+        can_go_forward=state.can_go_forward,
+        can_submit=state.can_submit,
+        steps=steps_info,
+    )
+
+
+# Key: (is_completed, is_current, is_accessible)
+_StepFlags = tuple[bool, bool, bool]
+
+
+@lru_cache(maxsize=None)
+def _step_info_templates(procedure_code: str) -> tuple[dict[_StepFlags, StepInfo], ...]:
+    """
+    Unveränderliche StepInfo-Instanzen je Step und Flag-Kombination.
+
+    Einmalig pro Verfahren erzeugt; pro Request werden nur noch die
+    passenden Instanzen ausgewählt statt neue Modelle zu validieren.
+    """
+    steps_config = get_procedure_steps(procedure_code)
+    if not steps_config:
+        return ()
+    return tuple(
+        {
+            flags: StepInfo(
+                step_key=step_def.step_key,
+                title=step_def.title,
+                description=step_def.description,
+                required_fields=list(step_def.required_fields),
+                is_completed=flags[0],
+                is_current=flags[1],
+                is_accessible=flags[2],
+            )
+            for flags in product((False, True), repeat=3)
+        }
+        for step_def in steps_config.steps
+    )
+
+
 def _build_steps_info(
     procedure_code: str,
     current_step: str,
     completed_steps: list[str],
 ) -> list[StepInfo]:
-    """Baut Step-Info-Liste für Response."""
-    steps_config = get_procedure_steps(procedure_code)
-    if not steps_config:
+    """Baut Step-Info-Liste für Response (Templates + Status-Flags)."""
+    templates = _step_info_templates(procedure_code)
+    if not templates:
         return []
 
-    result = []
+    steps_config = get_procedure_steps(procedure_code)
+    completed = set(completed_steps)
     current_idx = steps_config.get_step_index(current_step)
+    next_unlocked = current_step in completed
 
-    for idx, step_def in enumerate(steps_config.steps):
-        is_completed = step_def.step_key in completed_steps
-        is_current = step_def.step_key == current_step
-
+    result = []
+    for idx, step_key in enumerate(steps_config.step_keys):
+        is_completed = step_key in completed
         # Zugänglichkeit: Abgeschlossene Steps, aktueller Step, nächster Step wenn aktueller abgeschlossen
         is_accessible = (
             is_completed
-            or is_current
             or idx <= current_idx
-            or (idx == current_idx + 1 and current_step in completed_steps)
+            or (idx == current_idx + 1 and next_unlocked)
         )
-
-        result.append(StepInfo(
-            step_key=step_def.step_key,
-            title=step_def.title,
-            description=step_def.description,
-            required_fields=list(step_def.required_fields),
-            is_completed=is_completed,
-            is_current=is_current,
-            is_accessible=is_accessible,
-        ))
+        result.append(templates[idx][(is_completed, idx == current_idx, is_accessible)])
 
     return result
 
@@ -238,74 +388,15 @@ async def get_wizard_state(
     - Schreiboperationen (navigate, complete-step, reset) sind blockiert
     """
     case = await _get_case_with_procedure(case_id, context.tenant["id"])
-
-    # Für SUBMITTED/ARCHIVED: Read-only Zugang erlauben
-    if case.status in (CaseStatus.SUBMITTED.value, CaseStatus.ARCHIVED.value):
-        # Wizard-Zustand nur lesen, nicht validieren
-        if not case.wizard_progress:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail={
-                    "code": "WIZARD_NOT_FOUND",
-                    "message": "No wizard progress found for this case.",
-                },
-            )
-    else:
-        # Für IN_PROCESS: Normale Wizard-Zugangsvalidierung
-        _check_wizard_access(case)
+    _check_wizard_read_access(case)
 
     procedure_code = case.procedure.code
-
-    # Wizard-Progress laden oder erstellen
-    if case.wizard_progress:
-        progress = case.wizard_progress
-        completed_steps = progress.completed_steps if isinstance(progress.completed_steps, list) else []
-    else:
-        # Neuen Wizard-Progress erstellen
-        steps_config = get_procedure_steps(procedure_code)
-        first_step = steps_config.first_step if steps_config else ""
-
-        progress = await prisma.wizardprogress.create(
-            data={
-                "case_id": case_id,
-                "procedure_code": procedure_code,
-                "current_step": first_step,
-                "completed_steps": [],
-                "is_completed": False,
-            }
-        )
-        completed_steps = []
-
-    # Wizard-State bauen
-    state = build_wizard_state(
-        case_id=case_id,
-        procedure_code=procedure_code,
-        current_step=progress.current_step,
-        completed_steps=completed_steps,
-        is_completed=progress.is_completed,
-    )
-
-    # Steps-Info bauen
-    steps_info = _build_steps_info(
-        procedure_code=procedure_code,
-        current_step=progress.current_step,
-        completed_steps=completed_steps,
+    progress, completed_steps = await _ensure_wizard_progress(
+        case_id, procedure_code, case.wizard_progress
     )
 
     return WizardResponse(
-        data=WizardStateResponse(
-            case_id=state.case_id,
-            procedure_code=state.procedure_code,
-            current_step=state.current_step,
-            completed_steps=state.completed_steps,
-            is_completed=state.is_completed,
-            total_steps=state.total_steps,
-            current_step_index=state.current_step_index,
-            can_go_back=state.can_go_back,
-            can_go_forward=state.can_go_forward,
-            can_submit=state.can_submit,
-            steps=steps_info,
-        )
+        data=_build_wizard_state_response(case_id, procedure_code, progress, completed_steps)
     )
 
 
@@ -397,7 +488,12 @@ async def complete_wizard_step(
     Nicht erlaubt:
     - Step-Abschluss nach SUBMIT (Wizard ist read-only)
     """
-    case = await _get_case_with_procedure(case_id, context.tenant["id"])
+    # Nur die Pflichtfelder des Steps laden, nicht alle CaseFields
+    case = await _get_case_with_procedure(
+        case_id,
+        context.tenant["id"],
+        field_keys=get_required_fields_for_step(payload.step_key),
+    )
     _check_wizard_access(case)
     _check_wizard_write_access(case)  # Block after submit
 
@@ -463,6 +559,42 @@ async def get_wizard_steps(
     return await get_wizard_state(case_id, context)
 
 
+@router.get("/{case_id}/wizard/bootstrap", response_model=WizardBootstrapResponse)
+async def get_wizard_bootstrap(
+    case_id: str,
+    context: AuthContext = Depends(get_current_user),
+) -> WizardBootstrapResponse:
+    """
+    Alles für den Wizard-Start in einem Request.
+
+    Ersetzt die Aufrufe GET /cases/{id}, GET /cases/{id}/wizard,
+    GET /procedures/{code} und GET /knowledge/entries?procedure=.
+    Nach dem Laden des Cases (liefert Verfahren und Tenant-Prüfung) werden
+    Wizard-Fortschritt, Verfahrensdefinition (gecacht) und Feld-Hinweise
+    parallel geholt.
+
+    Zugang wie GET /wizard (SUBMITTED/ARCHIVED read-only).
+    """
+    case = await _get_case_with_procedure(case_id, context.tenant["id"], all_fields=True)
+    _check_wizard_read_access(case)
+
+    procedure_code = case.procedure.code
+    (progress, completed_steps), procedure, knowledge = await asyncio.gather(
+        _ensure_wizard_progress(case_id, procedure_code, case.wizard_progress),
+        procedure_loader.get_cached(procedure_code, case.procedure_version),
+        find_published_entries(procedure=procedure_code, field_level_only=True),
+    )
+
+    return WizardBootstrapResponse(
+        data=WizardBootstrapData(
+            case=case_to_detail(case),
+            wizard=_build_wizard_state_response(case_id, procedure_code, progress, completed_steps),
+            procedure=procedure_to_response(procedure) if procedure else None,
+            knowledge=knowledge,
+        )
+    )
+
+
 @router.post("/{case_id}/wizard/reset", response_model=WizardResponse)
 async def reset_wizard(
     case_id: str,
@@ -0,0 +1,341 @@
+"""
+PDF Batch - Mehrere Snapshot-PDFs als gestreamtes ZIP.
+
+POST /cases/pdf/batch rendert die letzten Snapshots mehrerer Fälle
+parallel (höchstens `concurrency` gleichzeitig, über pdf_renderer) und
+schreibt jedes PDF in das ZIP, sobald es fertig ist. Am Ende folgt
+manifest.json mit einem Eintrag pro Fall (Datei, Credit, Fehler).
+
+Speicher:
+- Das ZIP wird nie vollständig gehalten: ZipStream schreibt Einträge mit
+  Data Descriptor (kein Zurückspringen) und gibt die Bytes sofort ab
+- PDFs werden chunkweise aus der Cache-Datei in das ZIP kopiert
+- Fertige PDFs (geöffnete Dateien) warten in einer Queue der Größe
+  `concurrency`; liest der Client langsam, rendern die Worker nicht
+  weiter voraus
+
+Credits (wie POST /cases/{id}/pdf):
+- Pro Fall wird nach erfolgreichem Rendering ein Credit abgebucht
+  (Cache-Treffer nur mit PDF_CACHE_HITS_CONSUME_CREDIT)
+- Reicht das Guthaben nicht, fehlt das PDF und der Fall steht mit
+  INSUFFICIENT_CREDITS im Manifest; folgende Fälle werden nicht mehr
+  gerendert
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import logging
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, BinaryIO, Iterator
+
+from app.core.errors import ErrorCode
+from app.db.prisma_client import prisma
+from app.services.pdf_export import (
+    PDF_CHUNK_SIZE,
+    debit_export_credit,
+    open_cached_snapshot_pdf,
+    pdf_size,
+    render_snapshot_pdf,
+)
+from app.services.pdf_renderer import RenderFailed, RendererBusy, RenderTimeout
+from app.services.pdf_service import pdf_service
+from app.services.snapshot_store import latest_snapshots
+
+
+logger = logging.getLogger(__name__)
+
+PDF_BATCH_MAX_CASES = 200
+# Wiederholungen pro Fall, wenn die Render-Warteschlange voll ist
+PDF_BATCH_BUSY_RETRIES = 5
+
+MANIFEST_NAME = "manifest.json"
+
+
+class _Sink(io.RawIOBase):
+    """Nicht-seekbares Schreibziel; sammelt Bytes bis drain()."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStream:
+    """
+    ZIP-Encoder für Streaming-Responses.
+
+    add() liefert die Bytes eines vollständigen Eintrags, add_file() die
+    eines Eintrags aus einer Datei in Chunks, finish() das zentrale
+    Verzeichnis. zipfile erkennt das nicht-seekbare Ziel und
+    schreibt Größen und CRC in einen Data Descriptor hinter die Daten.
+    """
+
+    def __init__(self):
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, mode="w")
+
+    def add(self, name: str, data: bytes, *, compress: bool = False) -> bytes:
+        # PDFs sind bereits komprimiert; nur Text (Manifest) wird deflated
+        self._zip.writestr(
+            name, data, compress_type=zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        )
+        return self._sink.drain()
+
+    def add_file(self, name: str, source: BinaryIO, size: int) -> Iterator[bytes]:
+        """Kopiert source unkomprimiert in einen Eintrag, ohne es ganz zu lesen."""
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        info.external_attr = 0o600 << 16
+        info.file_size = size
+        with self._zip.open(info, mode="w") as entry:
+            while chunk := source.read(PDF_CHUNK_SIZE):
+                entry.write(chunk)
+                yield self._sink.drain()
+        yield self._sink.drain()
+
+    def finish(self) -> bytes:
+        self._zip.close()
+        return self._sink.drain()
+
+
+@dataclass
+class BatchItem:
+    """Ein angefragter Fall; case/snapshot fehlen, wenn er nicht exportierbar ist."""
+
+    case_id: str
+    case: Any | None = None
+    snapshot: Any | None = None
+    error_code: str | None = None
+
+
+@dataclass
+class BatchResult:
+    item: BatchItem
+    pdf: BinaryIO | None = None
+    cache_hit: bool = False
+    credits_consumed: int = 0
+    error_code: str | None = None
+    entry: dict[str, Any] = field(default_factory=dict)
+
+
+class PDFBatchExport:
+    """Ein Batch-Export; stream() liefert die ZIP-Bytes."""
+
+    def __init__(
+        self,
+        items: list[BatchItem],
+        *,
+        tenant_id: str,
+        user_id: str,
+        request_id: str | None,
+        concurrency: int,
+        cache_hits_consume_credit: bool,
+        client: Any = None,
+    ):
+        self._items = items
+        self._tenant_id = tenant_id
+        self._user_id = user_id
+        self._request_id = request_id
+        self._concurrency = max(1, concurrency)
+        self._cache_hits_consume_credit = cache_hits_consume_credit
+        self._db = client or prisma
+        self._credits_exhausted = False
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        archive = ZipStream()
+        exportable = [item for item in self._items if item.error_code is None]
+        results: asyncio.Queue[BatchResult] = asyncio.Queue(maxsize=self._concurrency)
+        pending = iter(exportable)
+
+        async def worker() -> None:
+            for item in pending:
+                await results.put(await self._export(item))
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(self._concurrency, len(exportable)))
+        ]
+        entries: dict[str, dict[str, Any]] = {}
+        names: set[str] = set()
+        try:
+            for _ in exportable:
+                result = await results.get()
+                if result.pdf is not None:
+                    name = self._file_name(result.item, names)
+                    result.entry["file"] = name
+                    with result.pdf:
+                        for chunk in archive.add_file(name, result.pdf, pdf_size(result.pdf)):
+                            yield chunk
+                entries[result.item.case_id] = result.entry
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            # Abbruch (z.B. Client getrennt): nicht mehr gelesene PDFs schließen
+            while not results.empty():
+                leftover = results.get_nowait()
+                if leftover.pdf is not None:
+                    leftover.pdf.close()
+
+        for item in self._items:
+            if item.error_code is not None:
+                entries[item.case_id] = self._entry(BatchResult(item, error_code=item.error_code))
+        manifest = self._manifest([entries[item.case_id] for item in self._items])
+        yield archive.add(MANIFEST_NAME, manifest, compress=True)
+        yield archive.finish()
+
+    async def _export(self, item: BatchItem) -> BatchResult:
+        result = BatchResult(item)
+        try:
+            result = await self._render(item)
+            if result.pdf is not None and self._consume_credit(result):
+                await self._debit(result)
+        except Exception:
+            logger.exception("PDF batch export of case %s failed", item.case_id)
+            if result.pdf is not None:
+                result.pdf.close()
+            result = BatchResult(item, error_code=ErrorCode.INTERNAL_SERVER_ERROR.value)
+        result.entry = self._entry(result)
+        return result
+
+    async def _render(self, item: BatchItem) -> BatchResult:
+        pdf = open_cached_snapshot_pdf(item.snapshot)
+        if pdf is not None:
+            return BatchResult(item, pdf=pdf, cache_hit=True)
+        if self._credits_exhausted:
+            return BatchResult(item, error_code=ErrorCode.INSUFFICIENT_CREDITS.value)
+
+        for _ in range(PDF_BATCH_BUSY_RETRIES):
+            try:
+                pdf = await render_snapshot_pdf(item.case, item.snapshot, client=self._db)
+                return BatchResult(item, pdf=pdf)
+            except RendererBusy as exc:
+                await asyncio.sleep(exc.retry_after)
+            except RenderTimeout:
+                return BatchResult(item, error_code=ErrorCode.PDF_RENDER_TIMEOUT.value)
+            except RenderFailed:
+                logger.exception("PDF rendering of case %s failed", item.case_id)
+                return BatchResult(item, error_code=ErrorCode.PDF_RENDER_FAILED.value)
+        return BatchResult(item, error_code=ErrorCode.PDF_RENDERER_BUSY.value)
+
+    def _consume_credit(self, result: BatchResult) -> bool:
+        return not result.cache_hit or self._cache_hits_consume_credit
+
+    async def _debit(self, result: BatchResult) -> None:
+        """Bucht den Credit ab; ohne Guthaben wird das PDF verworfen."""
+        snapshot = result.item.snapshot
+        async with self._db.tx() as tx:
+            debited = await debit_export_credit(
+                tx,
+                tenant_id=self._tenant_id,
+                user_id=self._user_id,
+                case_id=result.item.case_id,
+                version=snapshot.version,
+                request_id=self._request_id,
+            )
+        if debited:
+            result.credits_consumed = 1
+        else:
+            self._credits_exhausted = True
+            result.pdf.close()
+            result.pdf = None
+            result.error_code = ErrorCode.INSUFFICIENT_CREDITS.value
+
+    @staticmethod
+    def _entry(result: BatchResult) -> dict[str, Any]:
+        snapshot = result.item.snapshot
+        return {
+            "case_id": result.item.case_id,
+            "version": snapshot.version if snapshot else None,
+            "status": "exported" if result.pdf is not None else "failed",
+            "file": None,
+            "cache": ("hit" if result.cache_hit else "miss") if result.pdf is not None else None,
+            "credits_consumed": result.credits_consumed,
+            "error_code": result.error_code,
+        }
+
+    @staticmethod
+    def _file_name(item: BatchItem, names: set[str]) -> str:
+        name = pdf_service.get_filename(
+            procedure_code=item.snapshot.procedure_code,
+            case_id=item.case_id,
+            version=item.snapshot.version,
+        )
+        if name in names:
+            # Kurz-ID (8 Zeichen) kollidiert: volle Case-ID verwenden
+            name = f"ZollPilot_{item.snapshot.procedure_code}_{item.case_id}_v{item.snapshot.version}.pdf"
+        names.add(name)
+        return name
+
+    def _manifest(self, entries: list[dict[str, Any]]) -> bytes:
+        manifest = {
+            "request_id": self._request_id,
+            "requested": len(entries),
+            "exported": sum(1 for e in entries if e["status"] == "exported"),
+            "failed": sum(1 for e in entries if e["status"] == "failed"),
+            "credits_consumed": sum(e["credits_consumed"] for e in entries),
+            "cases": entries,
+        }
+        return json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+async def load_batch_items(
+    tenant_id: str,
+    *,
+    case_ids: list[str] | None = None,
+    where: dict[str, Any] | None = None,
+    client: Any = None,
+) -> list[BatchItem]:
+    """
+    Lädt Fälle und deren letzte Snapshots (letzter Snapshot je Fall per
+    latest_snapshots(), in SQL ausgewählt).
+
+    Entweder case_ids (Reihenfolge bleibt erhalten, unbekannte IDs werden
+    CASE_NOT_FOUND) oder ein zusätzlicher where-Filter (z.B. Zeitraum).
+    Nicht exportierbare Fälle erhalten den error_code des Einzel-Exports.
+    """
+    db = client or prisma
+    case_where: dict[str, Any] = {"tenant_id": tenant_id}
+    if case_ids is not None:
+        case_where["id"] = {"in": case_ids}
+    if where:
+        case_where.update(where)
+    cases = await db.case.find_many(
+        where=case_where,
+        include={"procedure": True},
+        order={"id": "asc"},
+        take=PDF_BATCH_MAX_CASES + 1,
+    )
+    by_id = {case.id: case for case in cases}
+
+    snapshots = await latest_snapshots(list(by_id), include={"fields_blob": True}, client=db)
+
+    items = []
+    for case_id in case_ids if case_ids is not None else list(by_id):
+        case = by_id.get(case_id)
+        snapshot = snapshots.get(case_id)
+        if case is None:
+            error_code = ErrorCode.CASE_NOT_FOUND.value
+        elif case.status != "SUBMITTED":
+            error_code = ErrorCode.CASE_NOT_SUBMITTED.value
+        elif snapshot is None:
+            error_code = ErrorCode.NO_SNAPSHOT.value
+        else:
+            error_code = None
+        items.append(BatchItem(case_id, case=case, snapshot=snapshot, error_code=error_code))
+    return items
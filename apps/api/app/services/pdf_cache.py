@@ -0,0 +1,157 @@
+"""
+PDF Cache - Gerenderte Snapshot-PDFs auf lokaler Platte.
+
+Snapshots sind unveränderlich und der Export rendert deterministisch
+(siehe pdf_service), daher ist ein PDF durch (snapshot_id, template_hash)
+vollständig bestimmt. Wiederholte Downloads lesen nur die Datei.
+
+Key: (snapshot_id, pdf_service.template_hash)
+- Template-, WeasyPrint- oder Engine-Änderungen (PDF_ENGINE) ergeben einen
+  neuen Hash; alte Einträge werden nicht mehr getroffen und per LRU verdrängt
+
+Verhalten:
+- Größenbegrenzt (max_bytes), Verdrängung nach LRU
+- Zugriffszeit = mtime der Datei, damit die LRU-Reihenfolge einen
+  Neustart übersteht (Index wird beim ersten Zugriff aus dem Verzeichnis
+  aufgebaut)
+- Schreiben über temporäre Datei + os.replace (keine halben Dateien);
+  der Renderer schreibt direkt in temp_path(), commit() übernimmt die Datei
+- open() liefert ein geöffnetes Dateiobjekt zum Streamen; eine spätere
+  Verdrängung löscht nur den Verzeichniseintrag, das offene Objekt bleibt
+  lesbar
+
+WICHTIG:
+- Prozesslokaler Index; die API läuft mit einem Worker
+- Verzeichnis ist ein reiner Cache und darf jederzeit gelöscht werden
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO
+
+
+PDF_CACHE_DIR = os.path.join(tempfile.gettempdir(), "zollpilot-pdf-cache")
+PDF_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+PDFKey = tuple[str, str]
+
+_tmp_counter = itertools.count()
+
+
+class PDFCache:
+    """Größenbegrenzter LRU-Cache für PDF-Bytes auf Platte."""
+
+    def __init__(self, directory: str | Path = PDF_CACHE_DIR, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self._directory = Path(directory)
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] | None = None
+        self._total = 0
+
+    def configure(self, *, directory: str | Path, max_bytes: int) -> None:
+        """Übernimmt die Settings (Lifespan); der Index wird neu aufgebaut."""
+        self._directory = Path(directory)
+        self._max_bytes = max_bytes
+        self._entries = None
+
+    @property
+    def size_bytes(self) -> int:
+        self._index()
+        return self._total
+
+    def open(self, key: PDFKey) -> BinaryIO | None:
+        """Öffnet den Eintrag zum Lesen (None bei Cache-Miss); Aufrufer schließt."""
+        entries = self._index()
+        name = self._name(key)
+        if name not in entries:
+            return None
+        path = self._directory / name
+        try:
+            pdf_file = path.open("rb")
+        except FileNotFoundError:
+            self._total -= entries.pop(name)
+            return None
+        os.utime(path)
+        entries.move_to_end(name)
+        return pdf_file
+
+    def get(self, key: PDFKey) -> bytes | None:
+        pdf_file = self.open(key)
+        if pdf_file is None:
+            return None
+        with pdf_file:
+            return pdf_file.read()
+
+    def temp_path(self, key: PDFKey) -> Path:
+        """Eindeutiger Pfad für einen neuen Eintrag (danach commit() oder löschen)."""
+        self._index()
+        name = self._name(key)
+        return self._directory / f"{name}.{os.getpid()}.{next(_tmp_counter)}.tmp"
+
+    def commit(self, key: PDFKey, tmp_path: Path) -> bool:
+        """
+        Übernimmt eine fertig geschriebene temporäre Datei als Eintrag.
+
+        Returns:
+            False, wenn die Datei größer als max_bytes ist (bleibt liegen)
+        """
+        size = tmp_path.stat().st_size
+        if size > self._max_bytes:
+            return False
+        entries = self._index()
+        name = self._name(key)
+        os.replace(tmp_path, self._directory / name)
+
+        self._total += size - entries.pop(name, 0)
+        entries[name] = size
+        self._evict()
+        return True
+
+    def put(self, key: PDFKey, data: bytes) -> None:
+        if len(data) > self._max_bytes:
+            return
+        tmp_path = self.temp_path(key)
+        tmp_path.write_bytes(data)
+        self.commit(key, tmp_path)
+
+    def clear(self) -> None:
+        for name in self._index():
+            (self._directory / name).unlink(missing_ok=True)
+        self._entries = OrderedDict()
+        self._total = 0
+
+    @staticmethod
+    def _name(key: PDFKey) -> str:
+        snapshot_id, template_hash = key
+        return f"{snapshot_id}-{template_hash}.pdf"
+
+    def _index(self) -> OrderedDict[str, int]:
+        """Baut den Index beim ersten Zugriff aus dem Verzeichnis auf (älteste zuerst)."""
+        if self._entries is None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            files = []
+            for path in self._directory.iterdir():
+                if path.suffix == ".tmp":
+                    path.unlink(missing_ok=True)
+                elif path.suffix == ".pdf":
+                    stat = path.stat()
+                    files.append((stat.st_mtime, path.name, stat.st_size))
+            files.sort()
+            self._entries = OrderedDict((name, size) for _, name, size in files)
+            self._total = sum(self._entries.values())
+            self._evict()
+        return self._entries
+
+    def _evict(self) -> None:
+        entries = self._entries
+        while entries and self._total > self._max_bytes:
+            name, size = entries.popitem(last=False)
+            (self._directory / name).unlink(missing_ok=True)
+            self._total -= size
+
+
+pdf_cache = PDFCache()
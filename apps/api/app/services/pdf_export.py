@@ -0,0 +1,163 @@
+"""
+PDF Export - Gemeinsame Schritte von synchronem Export und Export-Jobs.
+
+POST /cases/{id}/pdf und die Export-Jobs (services/pdf_jobs.py) erzeugen
+dasselbe PDF pro Snapshot und buchen denselben Credit:
+- build_snapshot_document(): deterministisches Dokument für die gewählte
+  Engine (Datum = Snapshot-Zeitpunkt, keine Request-ID im Dokument)
+- open_cached_snapshot_pdf() / render_snapshot_pdf(): pdf_cache bzw.
+  Rendering im pdf_renderer-Pool direkt in eine Cache-Datei; beide liefern
+  ein geöffnetes Dateiobjekt, das PDF liegt nie vollständig im API-Prozess
+- iter_pdf_file(): Chunks für StreamingResponse
+- debit_export_credit(): Abbuchung + Ledger-Eintrag, innerhalb einer
+  Transaktion des Aufrufers
+
+Fehler des Renderers (RendererBusy, RenderTimeout, RenderFailed) werden
+unverändert weitergereicht; Route und Job-Worker bilden sie selbst ab.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, BinaryIO, Iterator
+
+from app.core.json import normalize_to_json
+from app.domain.summary import generate_case_summary
+from app.services.pdf_cache import pdf_cache
+from app.services.pdf_renderer import pdf_renderer
+from app.services.pdf_service import PDFDocument, pdf_service
+from app.services.snapshot_store import load_snapshot_fields
+from app.services.summary_cache import summary_cache
+
+
+# Lesegröße beim Streamen eines PDFs
+PDF_CHUNK_SIZE = 64 * 1024
+
+
+async def build_snapshot_document(case: Any, snapshot: Any, client: Any = None) -> PDFDocument:
+    """
+    Dokument eines Snapshots im deterministischen Modus.
+
+    Das Dokumentdatum ist created_at des Snapshots, eine Request-ID wird
+    nicht eingebettet (sie steht im Ledger-Eintrag). Die Ausgabe hängt
+    damit nur vom Snapshot, der Engine und deren Template ab.
+    """
+    procedure_name = case.procedure.name if case.procedure else snapshot.procedure_code
+
+    # Summary (gemeinsamer Cache mit GET /cases/{id}/summary)
+    summary_key = (case.id, snapshot.version, snapshot.procedure_code, snapshot.procedure_version)
+    summary = summary_cache.get(summary_key)
+    fields_json: dict[str, Any] = {}
+    if summary is None:
+        fields_json = await load_snapshot_fields(snapshot, client=client)
+        summary = generate_case_summary(
+            procedure_code=snapshot.procedure_code,
+            procedure_version=snapshot.procedure_version,
+            procedure_name=procedure_name,
+            fields=fields_json,
+        )
+        summary_cache.put(summary_key, summary)
+
+    return pdf_service.build_document(
+        case_id=case.id,
+        version=snapshot.version,
+        procedure_code=snapshot.procedure_code,
+        procedure_version=snapshot.procedure_version,
+        procedure_name=procedure_name,
+        fields_json=fields_json,
+        request_id=None,
+        summary=summary,
+        generated_at=snapshot.created_at,
+    )
+
+
+def snapshot_cache_key(snapshot: Any) -> tuple[str, str]:
+    """Cache-Key eines Snapshot-PDFs; Engine-Wechsel rendern neu."""
+    return (snapshot.id, pdf_service.template_hash)
+
+
+def open_cached_snapshot_pdf(snapshot: Any) -> BinaryIO | None:
+    """Gecachtes PDF eines Snapshots, geöffnet (None bei Cache-Miss)."""
+    return pdf_cache.open(snapshot_cache_key(snapshot))
+
+
+async def render_snapshot_pdf(case: Any, snapshot: Any, client: Any = None) -> BinaryIO:
+    """
+    Rendert das PDF eines Snapshots im Prozess-Pool und legt es im Cache ab.
+
+    Der Worker schreibt direkt in eine temporäre Cache-Datei. Das
+    zurückgegebene Dateiobjekt bleibt auch gültig, wenn das PDF zu groß
+    für den Cache ist oder sofort verdrängt wird.
+
+    Raises:
+        RendererBusy, RenderTimeout, RenderFailed (siehe pdf_renderer)
+    """
+    document = await build_snapshot_document(case, snapshot, client=client)
+    key = snapshot_cache_key(snapshot)
+    tmp_path = pdf_cache.temp_path(key)
+    try:
+        await pdf_renderer.render_to_file(document, tmp_path)
+        pdf_file = tmp_path.open("rb")
+        pdf_cache.commit(key, tmp_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return pdf_file
+
+
+def pdf_size(pdf_file: BinaryIO) -> int:
+    """Größe eines geöffneten PDFs (für Content-Length)."""
+    return os.fstat(pdf_file.fileno()).st_size
+
+
+def iter_pdf_file(pdf_file: BinaryIO) -> Iterator[bytes]:
+    """Liest ein geöffnetes PDF in Chunks und schließt es danach."""
+    with pdf_file:
+        while chunk := pdf_file.read(PDF_CHUNK_SIZE):
+            yield chunk
+
+
+async def debit_export_credit(
+    tx: Any,
+    *,
+    tenant_id: str,
+    user_id: str,
+    case_id: str,
+    version: int,
+    request_id: str | None,
+    job_id: str | None = None,
+) -> bool:
+    """
+    Bucht einen Credit für einen PDF-Export ab.
+
+    Muss in einer Transaktion laufen (tx), damit Abbuchung und
+    Ledger-Eintrag gemeinsam geschrieben werden. Die Abbuchung ist durch
+    balance >= 1 abgesichert; parallele Exporte können nicht überziehen.
+
+    Returns:
+        False, wenn das Guthaben nicht reicht (nichts wurde geschrieben)
+    """
+    result = await tx.tenantcreditbalance.update_many(
+        where={"tenant_id": tenant_id, "balance": {"gte": 1}},
+        data={"balance": {"decrement": 1}},
+    )
+    if result.count == 0:
+        return False
+
+    metadata: dict[str, Any] = {
+        "case_id": case_id,
+        "version": version,
+        "request_id": request_id,
+    }
+    if job_id is not None:
+        metadata["job_id"] = job_id
+
+    await tx.creditledgerentry.create(
+        data={
+            "tenant_id": tenant_id,
+            "delta": -1,
+            "reason": "PDF_EXPORT",
+            "metadata_json": normalize_to_json(metadata),
+            "created_by_user_id": user_id,
+        }
+    )
+    return True
@@ -0,0 +1,279 @@
+"""
+PDF Jobs - Asynchrone PDF-Exporte über die Tabelle PdfExportJob.
+
+POST /cases/{id}/pdf/jobs reiht einen Job ein, ein lokaler Worker-Pool
+(PDFJobWorker) arbeitet die Tabelle ab, der Client fragt den Status ab und
+lädt das fertige PDF über /download (aus pdf_cache).
+
+Ablauf eines Jobs:
+- QUEUED -> RUNNING: claim_next_job() (FOR UPDATE SKIP LOCKED, ältester zuerst)
+- RUNNING -> SUCCEEDED: PDF gerendert bzw. im Cache, Credit abgebucht
+  (beides in einer Transaktion mit dem Statuswechsel)
+- RUNNING -> FAILED: Timeout, Renderfehler oder kein Guthaben (error_code)
+- RUNNING -> QUEUED: Renderer ausgelastet; der Worker wartet Retry-After ab
+
+Idempotenz:
+- Ein Job pro Snapshot (snapshot_id UNIQUE); erneutes Einreihen liefert den
+  bestehenden Job, nur FAILED-Jobs werden wieder auf QUEUED gesetzt
+
+Neustarts:
+- Jobs liegen in der Datenbank; beim Start setzt recover_jobs() Jobs, die
+  beim Beenden noch RUNNING waren, auf QUEUED zurück
+
+WICHTIG:
+- Die API läuft mit einem Worker; recover_jobs() geht davon aus, dass kein
+  anderer Prozess Jobs bearbeitet
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any
+
+from prisma.errors import UniqueViolationError
+
+from app.core.config import get_settings
+from app.core.errors import ErrorCode
+from app.db.prisma_client import prisma
+from app.services.pdf_export import (
+    debit_export_credit,
+    open_cached_snapshot_pdf,
+    render_snapshot_pdf,
+)
+from app.services.pdf_renderer import RenderFailed, RendererBusy, RenderTimeout
+
+
+logger = logging.getLogger(__name__)
+
+PDF_JOB_CONCURRENCY = 2
+PDF_JOB_POLL_SECONDS = 5.0
+
+# Include für die Bearbeitung eines Jobs (Fall, Verfahren, Snapshot-Payload)
+PDF_JOB_INCLUDE = {
+    "case": {"include": {"procedure": True}},
+    "snapshot": {"include": {"fields_blob": True}},
+}
+
+# Ältesten wartenden Job übernehmen; parallele Worker überspringen
+# gesperrte Zeilen statt aufeinander zu warten.
+_CLAIM_JOB_SQL = """
+UPDATE "PdfExportJob"
+SET "status" = 'RUNNING', "started_at" = NOW(), "attempts" = "attempts" + 1
+WHERE "id" = (
+    SELECT "id" FROM "PdfExportJob"
+    WHERE "status" = 'QUEUED'
+    ORDER BY "created_at"
+    FOR UPDATE SKIP LOCKED
+    LIMIT 1
+)
+RETURNING "id"
+"""
+
+
+async def enqueue_job(
+    existing: Any | None,
+    *,
+    tenant_id: str,
+    case_id: str,
+    snapshot: Any,
+    user_id: str,
+    request_id: str | None,
+    client: Any = None,
+) -> Any:
+    """
+    Reiht den Export eines Snapshots ein.
+
+    Args:
+        existing: Bestehender Job des Snapshots (None oder FAILED)
+
+    Returns:
+        Neuer bzw. zurückgesetzter Job; bei parallelem Einreihen der Job,
+        der zuerst angelegt wurde
+    """
+    db = client or prisma
+    if existing is not None:
+        await db.pdfexportjob.update_many(
+            where={"id": existing.id, "status": "FAILED"},
+            data={
+                "status": "QUEUED",
+                "error_code": None,
+                "started_at": None,
+                "finished_at": None,
+                "requested_by_user_id": user_id,
+                "request_id": request_id,
+            },
+        )
+        return await db.pdfexportjob.find_unique(where={"id": existing.id})
+
+    try:
+        return await db.pdfexportjob.create(
+            data={
+                "tenant_id": tenant_id,
+                "case_id": case_id,
+                "snapshot_id": snapshot.id,
+                "snapshot_version": snapshot.version,
+                "requested_by_user_id": user_id,
+                "request_id": request_id,
+            }
+        )
+    except UniqueViolationError:
+        return await db.pdfexportjob.find_unique(where={"snapshot_id": snapshot.id})
+
+
+async def claim_next_job(client: Any = None) -> str | None:
+    """Setzt den ältesten QUEUED-Job auf RUNNING und liefert dessen ID."""
+    db = client or prisma
+    rows = await db.query_raw(_CLAIM_JOB_SQL)
+    return rows[0]["id"] if rows else None
+
+
+async def recover_jobs(client: Any = None) -> int:
+    """Setzt beim Start verwaiste RUNNING-Jobs auf QUEUED zurück."""
+    db = client or prisma
+    result = await db.pdfexportjob.update_many(
+        where={"status": "RUNNING"},
+        data={"status": "QUEUED", "started_at": None},
+    )
+    return result.count
+
+
+async def _finish(db: Any, job_id: str, status: str, error_code: str | None = None) -> bool:
+    """Schließt einen RUNNING-Job ab; False, wenn er nicht mehr RUNNING ist."""
+    result = await db.pdfexportjob.update_many(
+        where={"id": job_id, "status": "RUNNING"},
+        data={
+            "status": status,
+            "error_code": error_code,
+            "finished_at": datetime.now(timezone.utc),
+        },
+    )
+    return result.count > 0
+
+
+async def process_job(job_id: str, client: Any = None) -> None:
+    """
+    Bearbeitet einen übernommenen (RUNNING) Job.
+
+    Raises:
+        RendererBusy: Job wurde wieder eingereiht; Aufrufer wartet
+            retry_after Sekunden
+    """
+    db = client or prisma
+    job = await db.pdfexportjob.find_unique(where={"id": job_id}, include=PDF_JOB_INCLUDE)
+    if job is None or job.status != "RUNNING":
+        return
+
+    try:
+        pdf_file = open_cached_snapshot_pdf(job.snapshot)
+        cache_hit = pdf_file is not None
+        if not cache_hit:
+            pdf_file = await render_snapshot_pdf(job.case, job.snapshot, client=db)
+        # Nur sicherstellen, dass das PDF im Cache liegt; /download liest es
+        pdf_file.close()
+    except RendererBusy:
+        await db.pdfexportjob.update_many(
+            where={"id": job_id, "status": "RUNNING"},
+            data={"status": "QUEUED", "started_at": None},
+        )
+        raise
+    except RenderTimeout:
+        await _finish(db, job_id, "FAILED", ErrorCode.PDF_RENDER_TIMEOUT.value)
+        return
+    except RenderFailed:
+        logger.exception("PDF export job %s failed", job_id)
+        await _finish(db, job_id, "FAILED", ErrorCode.PDF_RENDER_FAILED.value)
+        return
+
+    consume_credit = not cache_hit or get_settings().pdf_cache_hits_consume_credit
+    async with db.tx() as tx:
+        if not await _finish(tx, job_id, "SUCCEEDED"):
+            return
+        if consume_credit and not await debit_export_credit(
+            tx,
+            tenant_id=job.tenant_id,
+            user_id=job.requested_by_user_id,
+            case_id=job.case_id,
+            version=job.snapshot_version,
+            request_id=job.request_id,
+            job_id=job_id,
+        ):
+            await tx.pdfexportjob.update(
+                where={"id": job_id},
+                data={"status": "FAILED", "error_code": ErrorCode.INSUFFICIENT_CREDITS.value},
+            )
+
+
+class PDFJobWorker:
+    """Lokaler Worker-Pool: concurrency Schleifen, die Jobs übernehmen und bearbeiten."""
+
+    def __init__(
+        self,
+        concurrency: int = PDF_JOB_CONCURRENCY,
+        poll_seconds: float = PDF_JOB_POLL_SECONDS,
+        client: Any = None,
+    ):
+        self._concurrency = max(1, concurrency)
+        self._poll_seconds = poll_seconds
+        self._client = client
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+
+    def configure(self, *, concurrency: int, poll_seconds: float) -> None:
+        """Übernimmt die Settings (Lifespan, vor start())."""
+        self._concurrency = max(1, concurrency)
+        self._poll_seconds = poll_seconds
+
+    async def start(self) -> None:
+        """Setzt verwaiste Jobs zurück und startet die Worker-Schleifen."""
+        db = self._client or prisma
+        recovered = await recover_jobs(db)
+        if recovered:
+            logger.info("Requeued %d interrupted PDF export jobs", recovered)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run(db)) for _ in range(self._concurrency)]
+
+    def notify(self) -> None:
+        """Weckt die Worker nach dem Einreihen eines Jobs (sonst Polling)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Bricht die Schleifen ab; laufende Jobs werden beim nächsten Start fortgesetzt."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+
+    async def _run(self, db: Any) -> None:
+        wakeup = self._wakeup
+        while True:
+            wakeup.clear()
+            try:
+                job_id = await claim_next_job(db)
+            except Exception:
+                logger.exception("Claiming PDF export job failed")
+                job_id = None
+            if job_id is None:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self._poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await process_job(job_id, db)
+            except RendererBusy as exc:
+                await asyncio.sleep(exc.retry_after)
+            except Exception:
+                logger.exception("PDF export job %s failed", job_id)
+                try:
+                    await _finish(db, job_id, "FAILED", ErrorCode.INTERNAL_SERVER_ERROR.value)
+                except Exception:
+                    # Bleibt RUNNING und wird beim nächsten Start zurückgesetzt
+                    logger.exception("Marking PDF export job %s as failed failed", job_id)
+
+
+pdf_job_worker = PDFJobWorker()
@@ -0,0 +1,594 @@
+"""
+Native PDF engine.
+
+Draws the case summary directly with a small built-in PDF writer instead
+of laying out HTML with WeasyPrint. The layout follows PDF_STYLESHEET and
+PDF_TEMPLATE (A4, same margins, colours, header, case info box,
+instructions, field tables, footer and "Seite X von Y"), so both engines
+produce visually equivalent documents. There is no HTML/CSS layout and
+no font discovery, which makes rendering much faster and lighter on
+memory (see benchmarks/bench_pdf_engines.py).
+
+Fonts are the standard Type 1 fonts Helvetica and Helvetica-Bold with
+WinAnsiEncoding. They are not embedded (every PDF viewer provides them)
+and cover German and most Western European text, but nothing outside
+Windows-1252 (e.g. Chinese sender names, "Ł"). PDFService.build_document
+checks can_render_native and hands such documents to WeasyPrint instead;
+_encode only replaces characters with "?" as a last resort. Text widths
+come from the Adobe font metrics below, which is what line wrapping and
+right alignment are based on.
+
+The output is deterministic: it depends only on the document and this
+module. NATIVE_TEMPLATE_HASH is part of the PDF cache key, like
+PDF_TEMPLATE_HASH for WeasyPrint.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import unicodedata
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from app.services.pdf_service import PDFDocument
+
+
+# Identifies this layout (module source); part of the PDF cache key
+NATIVE_TEMPLATE_HASH = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+# Geometry in points (CSS: 1cm = 72 / 2.54 pt, 1px = 0.75pt)
+_CM = 72 / 2.54
+_PX = 0.75
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+MARGIN_X = 1.5 * _CM
+MARGIN_Y = 2 * _CM
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN_X
+CONTENT_HEIGHT = PAGE_HEIGHT - 2 * MARGIN_Y
+LINE_HEIGHT = 1.5
+
+LABEL_WIDTH = 0.4 * CONTENT_WIDTH
+VALUE_WIDTH = CONTENT_WIDTH - LABEL_WIDTH - 0.25 * _CM
+ROW_PADDING = 0.25 * _CM
+
+# Colours (PDF_STYLESHEET)
+TEXT = "#333333"
+MUTED = "#666666"
+ACCENT = "#6366f1"
+RULE = "#e0e0e0"
+ROW_RULE = "#eeeeee"
+INFO_BACKGROUND = "#f5f5f5"
+NOTE_BACKGROUND = "#f9fafb"
+NOTE_BORDER = "#e5e7eb"
+FOOTER_TEXT = "#888888"
+
+# Fixed texts (PDF_TEMPLATE)
+DOCUMENT_TITLE = "Ausfüllhilfe zur Zollanmeldung (keine offizielle Anmeldung)"
+DOCUMENT_SUBTITLE = "Vorbereitung für Internetbestellungen"
+INSTRUCTIONS_TITLE = "So verwenden Sie dieses Dokument"
+INSTRUCTIONS = (
+    ("Schritt 1:", "Öffnen Sie das offizielle Zollformular (z.B. Internetzollanmeldung IZA)."),
+    ("Schritt 2:", "Übertragen Sie die untenstehenden Werte in die entsprechenden Felder."),
+    ("Schritt 3:", "Prüfen Sie Ihre Angaben und senden Sie das Formular im offiziellen Portal ab."),
+)
+DISCLAIMER = (
+    "Diese Übersicht unterstützt Sie beim Ausfüllen des Zollformulars. "
+    "Sie ersetzt keine offizielle Zollanmeldung. ZollPilot übermittelt keine Daten an "
+    "Zollbehörden. Der Nutzer ist für die Richtigkeit der Angaben verantwortlich."
+)
+
+REGULAR = "F1"
+BOLD = "F2"
+_BASE_FONTS = {REGULAR: "Helvetica", BOLD: "Helvetica-Bold"}
+
+# Glyph widths (1/1000 em) for " " through "~" from the Adobe AFM files
+_ASCII_WIDTHS = {
+    REGULAR: (
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+    ),
+    BOLD: (
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+        975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+        333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+        611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+    ),
+}
+
+# Windows-1252 characters whose width is not that of their base letter
+# (regular, bold)
+_SPECIAL_WIDTHS = {
+    "€": (556, 556), "‚": (222, 278), "„": (333, 500), "…": (1000, 1000),
+    "–": (556, 556), "—": (1000, 1000), "‘": (222, 278), "’": (222, 278),
+    "“": (333, 500), "”": (333, 500), "•": (350, 350), "™": (1000, 1000),
+    "\xa0": (278, 278), "¦": (260, 280), "§": (556, 556), "©": (737, 737),
+    "®": (737, 737), "°": (400, 400), "±": (584, 584), "µ": (556, 611),
+    "¶": (537, 556), "·": (278, 278), "ª": (370, 370), "º": (365, 365),
+    "«": (556, 556), "»": (556, 556), "¼": (834, 834), "½": (834, 834),
+    "¾": (834, 834), "¿": (611, 611), "×": (584, 584), "÷": (584, 584),
+    "ß": (611, 611), "Æ": (1000, 1000), "æ": (889, 889), "Ø": (778, 778),
+    "ø": (611, 611), "Ð": (722, 722), "ð": (556, 611), "Þ": (667, 667),
+    "þ": (556, 611),
+}
+
+_DEFAULT_WIDTH = 556
+
+
+def _width_table(font: str) -> tuple[int, ...]:
+    """Width per Windows-1252 byte; accented letters use their base letter."""
+    ascii_widths = dict(zip(range(32, 127), _ASCII_WIDTHS[font]))
+    bold = font == BOLD
+    table = []
+    for code in range(256):
+        if code in ascii_widths:
+            table.append(ascii_widths[code])
+            continue
+        char = bytes([code]).decode("cp1252", errors="ignore")
+        if char in _SPECIAL_WIDTHS:
+            table.append(_SPECIAL_WIDTHS[char][bold])
+            continue
+        base = unicodedata.normalize("NFD", char)[:1]
+        table.append(ascii_widths.get(ord(base), _DEFAULT_WIDTH) if base else _DEFAULT_WIDTH)
+    return tuple(table)
+
+
+_WIDTHS = {font: _width_table(font) for font in _BASE_FONTS}
+
+# A line is a list of runs: (Windows-1252 text, font)
+Run = tuple[bytes, str]
+Line = list[Run]
+
+
+def _encode(text: str) -> bytes:
+    return text.encode("cp1252", errors="replace")
+
+
+def can_render_native(document: PDFDocument) -> bool:
+    """True if every text drawn for the document is in Windows-1252."""
+    texts = [
+        document.case_id,
+        document.procedure_code,
+        document.procedure_version,
+        document.generated_at,
+        document.request_id or "",
+    ]
+    for section in document.sections:
+        texts.append(section.title)
+        for item in section.items:
+            texts += (item.label, item.value)
+    try:
+        for text in texts:
+            text.encode("cp1252")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _text_width(data: bytes, font: str, size: float) -> float:
+    widths = _WIDTHS[font]
+    return sum(widths[byte] for byte in data) * size / 1000
+
+
+def _line_width(line: Line, size: float) -> float:
+    width = sum(_text_width(data, font, size) for data, font in line)
+    spaces = sum(_text_width(b" ", font, size) for _, font in line[1:])
+    return width + spaces
+
+
+def _split_word(word: bytes, font: str, size: float, width: float) -> list[bytes]:
+    """Break a word that is wider than the line at character boundaries."""
+    parts: list[bytes] = []
+    start = 0
+    for end in range(1, len(word) + 1):
+        if end - start > 1 and _text_width(word[start:end], font, size) > width:
+            parts.append(word[start:end - 1])
+            start = end - 1
+    parts.append(word[start:])
+    return parts
+
+
+def _wrap(runs: list[tuple[str, str]], size: float, width: float) -> list[Line]:
+    """
+    Greedy line breaking of styled text.
+
+    Whitespace is collapsed as in HTML; runs are separated by a space.
+    Returns at least one (possibly empty) line.
+    """
+    words: list[Run] = []
+    for text, font in runs:
+        for word in text.split():
+            data = _encode(word)
+            if _text_width(data, font, size) > width:
+                words.extend((part, font) for part in _split_word(data, font, size, width))
+            else:
+                words.append((data, font))
+
+    lines: list[Line] = [[]]
+    current = 0.0
+    for data, font in words:
+        word_width = _text_width(data, font, size)
+        line = lines[-1]
+        space = _text_width(b" ", font, size) if line else 0.0
+        if line and current + space + word_width > width:
+            lines.append([(data, font)])
+            current = word_width
+            continue
+        if line and line[-1][1] == font:
+            line[-1] = (line[-1][0] + b" " + data, font)
+        else:
+            line.append((data, font))
+        current += space + word_width
+    return lines
+
+
+def _number(value: float) -> str:
+    text = f"{value:.2f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def _rgb(color: str) -> str:
+    return " ".join(_number(int(color[i:i + 2], 16) / 255) for i in (1, 3, 5))
+
+
+def _escape(data: bytes) -> str:
+    escaped = data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    # Latin-1 maps each byte to one character; the stream is encoded back with it
+    return escaped.decode("latin-1")
+
+
+class _Canvas:
+    """
+    Pages as lists of content-stream operators.
+
+    Positions run top-down from the page edge (like CSS); vertical margins
+    between blocks collapse and are dropped at the top of a page.
+    """
+
+    def __init__(self):
+        self.pages: list[list[str]] = []
+        self.y = 0.0
+        self._margin = 0.0
+        self.new_page()
+
+    def new_page(self) -> None:
+        self.pages.append([])
+        self.y = MARGIN_Y
+        self._margin = 0.0
+
+    @property
+    def fresh(self) -> bool:
+        return self.y == MARGIN_Y
+
+    def space(self, margin: float) -> None:
+        self._margin = max(self._margin, margin)
+
+    def fits(self, height: float) -> bool:
+        margin = 0.0 if self.fresh else self._margin
+        return self.y + margin + height <= PAGE_HEIGHT - MARGIN_Y
+
+    def keep_together(self, height: float) -> None:
+        """Start a new page unless the next height points fit (or cannot fit anywhere)."""
+        if not self.fits(height) and not self.fresh and height <= CONTENT_HEIGHT:
+            self.new_page()
+
+    def block(self, height: float) -> float:
+        """Reserve height points, on a new page if necessary; returns the block's top."""
+        if not self.fits(height) and not self.fresh:
+            self.new_page()
+        top = self.y if self.fresh else self.y + self._margin
+        self.y = top + height
+        self._margin = 0.0
+        return top
+
+    def text(
+        self,
+        x: float,
+        top: float,
+        line: Line,
+        size: float,
+        color: str,
+        *,
+        width: float | None = None,
+        align: str = "left",
+        page: int = -1,
+    ) -> None:
+        """Draw one line whose line box starts at top; align within width."""
+        if not line:
+            return
+        if align == "right":
+            x += width - _line_width(line, size)
+        elif align == "center":
+            x += (width - _line_width(line, size)) / 2
+        # Centre Helvetica's ascender/descender (718/207) in the line box
+        baseline = top + (size * LINE_HEIGHT - 0.925 * size) / 2 + 0.718 * size
+        ops = self.pages[page]
+        ops.append(f"{_rgb(color)} rg")
+        for index, (data, font) in enumerate(line):
+            if index:
+                x += _text_width(b" ", font, size)
+            ops.append(
+                f"BT /{font} {_number(size)} Tf {_number(x)} {_number(PAGE_HEIGHT - baseline)} Td "
+                f"({_escape(data)}) Tj ET"
+            )
+            x += _text_width(data, font, size)
+
+    def lines(
+        self,
+        x: float,
+        top: float,
+        lines: list[Line],
+        size: float,
+        color: str,
+        **kwargs: Any,
+    ) -> None:
+        for index, line in enumerate(lines):
+            self.text(x, top + index * size * LINE_HEIGHT, line, size, color, **kwargs)
+
+    def rect(
+        self,
+        x: float,
+        top: float,
+        width: float,
+        height: float,
+        *,
+        fill: str,
+        border: str | None = None,
+    ) -> None:
+        box = f"{_number(x)} {_number(PAGE_HEIGHT - top - height)} {_number(width)} {_number(height)} re"
+        ops = self.pages[-1]
+        ops.append(f"{_rgb(fill)} rg {box} f")
+        if border:
+            ops.append(f"{_number(_PX)} w {_rgb(border)} RG {box} S")
+
+    def rule(self, top: float, thickness: float, color: str) -> None:
+        """Horizontal line across the content width; top is its upper edge."""
+        y = _number(PAGE_HEIGHT - top - thickness / 2)
+        self.pages[-1].append(
+            f"{_number(thickness)} w {_rgb(color)} RG "
+            f"{_number(MARGIN_X)} {y} m {_number(MARGIN_X + CONTENT_WIDTH)} {y} l S"
+        )
+
+
+def _height(lines: list[Line], size: float) -> float:
+    return len(lines) * size * LINE_HEIGHT
+
+
+def _draw_header(canvas: _Canvas, document: PDFDocument) -> None:
+    meta = [f"Erstellt am: {document.generated_at}"]
+    if document.request_id:
+        meta.append(f"Request-ID: {document.request_id}")
+    top = canvas.block(max(18 * LINE_HEIGHT, len(meta) * 9 * LINE_HEIGHT))
+    canvas.text(MARGIN_X, top, [(b"ZollPilot", BOLD)], 18, ACCENT)
+    canvas.lines(
+        MARGIN_X,
+        top,
+        [[(_encode(text), REGULAR)] for text in meta],
+        9,
+        MUTED,
+        width=CONTENT_WIDTH,
+        align="right",
+    )
+    canvas.space(0.5 * _CM)
+
+    title = _wrap([(DOCUMENT_TITLE, BOLD)], 16, CONTENT_WIDTH)
+    canvas.lines(MARGIN_X, canvas.block(_height(title, 16)), title, 16, TEXT)
+    canvas.space(0.25 * _CM)
+    subtitle = _wrap([(DOCUMENT_SUBTITLE, REGULAR)], 11, CONTENT_WIDTH)
+    canvas.lines(MARGIN_X, canvas.block(_height(subtitle, 11)), subtitle, 11, MUTED)
+
+    top = canvas.block(1 * _CM + 2 * _PX)
+    canvas.rule(top + 1 * _CM, 2 * _PX, TEXT)
+    canvas.space(0.75 * _CM)
+
+
+def _draw_case_info(canvas: _Canvas, document: PDFDocument) -> None:
+    padding = gap = 0.5 * _CM
+    column = (CONTENT_WIDTH - 2 * padding - 2 * gap) / 3
+    cells = [
+        ("Case-ID", document.case_id[:8] + "..."),
+        ("Version", str(document.version)),
+        ("Verfahren", f"{document.procedure_code} {document.procedure_version}"),
+    ]
+    wrapped = [
+        (_wrap([(label, REGULAR)], 9, column), _wrap([(value, REGULAR)], 9, column))
+        for label, value in cells
+    ]
+    inner = max(_height(label, 9) + _height(value, 9) for label, value in wrapped)
+
+    top = canvas.block(inner + 2 * padding)
+    canvas.rect(MARGIN_X, top, CONTENT_WIDTH, inner + 2 * padding, fill=INFO_BACKGROUND)
+    for index, (label, value) in enumerate(wrapped):
+        x = MARGIN_X + padding + index * (column + gap)
+        canvas.lines(x, top + padding, label, 9, MUTED)
+        canvas.lines(x, top + padding + _height(label, 9), value, 9, TEXT)
+    canvas.space(0.75 * _CM)
+
+
+def _section_title_height(title: list[Line]) -> float:
+    return _height(title, 12) + 0.2 * _CM + _PX + 0.4 * _CM
+
+
+def _draw_section_title(canvas: _Canvas, title: list[Line]) -> None:
+    top = canvas.block(_section_title_height(title))
+    canvas.lines(MARGIN_X, top, title, 12, ACCENT)
+    canvas.rule(top + _height(title, 12) + 0.2 * _CM, _PX, RULE)
+
+
+def _draw_instructions(canvas: _Canvas) -> None:
+    title = _wrap([(INSTRUCTIONS_TITLE, BOLD)], 12, CONTENT_WIDTH)
+    padding = 10 * _PX + _PX
+    paragraph_gap = 5 * _PX
+    paragraphs = [
+        _wrap([(step, BOLD), (text, REGULAR)], 9, CONTENT_WIDTH - 2 * padding)
+        for step, text in INSTRUCTIONS
+    ]
+    inner = sum(_height(lines, 9) for lines in paragraphs) + paragraph_gap * (len(paragraphs) - 1)
+
+    canvas.keep_together(_section_title_height(title) + inner + 2 * padding)
+    _draw_section_title(canvas, title)
+    top = canvas.block(inner + 2 * padding)
+    canvas.rect(
+        MARGIN_X, top, CONTENT_WIDTH, inner + 2 * padding, fill=NOTE_BACKGROUND, border=NOTE_BORDER
+    )
+    y = top + padding
+    for lines in paragraphs:
+        canvas.lines(MARGIN_X + padding, y, lines, 9, TEXT)
+        y += _height(lines, 9) + paragraph_gap
+    canvas.space(0.75 * _CM)
+
+
+def _draw_section(canvas: _Canvas, section: Any) -> None:
+    title = _wrap([(section.title, BOLD)], 12, CONTENT_WIDTH)
+    rows = [
+        (_wrap([(item.label, REGULAR)], 10, LABEL_WIDTH), _wrap([(item.value, REGULAR)], 10, VALUE_WIDTH))
+        for item in section.items
+    ]
+    heights = [
+        2 * ROW_PADDING + max(_height(label, 10), _height(value, 10)) for label, value in rows
+    ]
+
+    # page-break-inside: avoid; sections longer than a page break between rows
+    total = _section_title_height(title) + sum(heights)
+    canvas.keep_together(
+        total if total <= CONTENT_HEIGHT else _section_title_height(title) + sum(heights[:1])
+    )
+    _draw_section_title(canvas, title)
+    for index, ((label, value), height) in enumerate(zip(rows, heights)):
+        top = canvas.block(height)
+        canvas.lines(MARGIN_X, top + ROW_PADDING, label, 10, MUTED)
+        canvas.lines(
+            MARGIN_X + CONTENT_WIDTH - VALUE_WIDTH,
+            top + ROW_PADDING,
+            value,
+            10,
+            TEXT,
+            width=VALUE_WIDTH,
+            align="right",
+        )
+        if index < len(rows) - 1:
+            canvas.rule(top + height - _PX, _PX, ROW_RULE)
+    canvas.space(0.75 * _CM)
+
+
+def _draw_footer(canvas: _Canvas, document: PDFDocument) -> None:
+    disclaimer = _wrap([("Hinweis:", BOLD), (DISCLAIMER, REGULAR)], 8, CONTENT_WIDTH)
+    padding = 0.5 * _CM
+    height = _PX + padding + _height(disclaimer, 8) + 0.25 * _CM + 8 * LINE_HEIGHT
+
+    canvas.space(1 * _CM)
+    top = canvas.block(height)
+    canvas.rule(top, _PX, RULE)
+    y = top + _PX + padding
+    canvas.lines(MARGIN_X, y, disclaimer, 8, FOOTER_TEXT)
+    y += _height(disclaimer, 8) + 0.25 * _CM
+    canvas.text(MARGIN_X, y, [(_encode(f"© ZollPilot {document.year}"), REGULAR)], 8, FOOTER_TEXT)
+    canvas.text(
+        MARGIN_X,
+        y,
+        [(_encode(f"Snapshot Version: {document.version}"), REGULAR)],
+        8,
+        FOOTER_TEXT,
+        width=CONTENT_WIDTH,
+        align="right",
+    )
+
+
+def _draw_page_numbers(canvas: _Canvas) -> None:
+    """@bottom-center: "Seite X von Y", centred in the bottom margin."""
+    top = PAGE_HEIGHT - MARGIN_Y + (MARGIN_Y - 9 * LINE_HEIGHT) / 2
+    total = len(canvas.pages)
+    for number in range(1, total + 1):
+        canvas.text(
+            MARGIN_X,
+            top,
+            [(_encode(f"Seite {number} von {total}"), REGULAR)],
+            9,
+            MUTED,
+            width=CONTENT_WIDTH,
+            align="center",
+            page=number - 1,
+        )
+
+
+def _text_string(text: str) -> bytes:
+    """PDF text string (UTF-16BE with BOM) for the document information."""
+    return b"<" + ("\ufeff" + text).encode("utf-16-be").hex().upper().encode("ascii") + b">"
+
+
+def _write_pdf(pages: list[list[str]], *, title: str, created_iso: str) -> bytes:
+    """Serialize pages into a PDF 1.4 file with a classic xref table."""
+    created = datetime.fromisoformat(created_iso).strftime("D:%Y%m%d%H%M%SZ")
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(b"%d 0 R" % (6 + 2 * index) for index in range(len(pages)))
+        + b"] /Count %d >>" % len(pages),
+    ]
+    for font in (REGULAR, BOLD):
+        objects.append(
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>"
+            % _BASE_FONTS[font].encode("ascii")
+        )
+    objects.append(
+        b"<< /Title " + _text_string(title)
+        + b" /Producer (ZollPilot) /CreationDate (" + created.encode("ascii") + b") >>"
+    )
+    for index, ops in enumerate(pages):
+        content = zlib.compress("\n".join(ops).encode("latin-1"))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %s %s] "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+            % (_number(PAGE_WIDTH).encode(), _number(PAGE_HEIGHT).encode(), 7 + 2 * index)
+        )
+        objects.append(
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content)
+            + content
+            + b"\nendstream"
+        )
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
+
+
+def render_native_pdf(document: PDFDocument) -> bytes:
+    """Draw a document (CPU-light, picklable for the process pool)."""
+    canvas = _Canvas()
+    _draw_header(canvas, document)
+    _draw_case_info(canvas, document)
+    _draw_instructions(canvas)
+    for section in document.sections:
+        _draw_section(canvas, section)
+    _draw_footer(canvas, document)
+    _draw_page_numbers(canvas)
+    return _write_pdf(
+        canvas.pages,
+        title=f"{document.procedure_name} - {document.case_id}",
+        created_iso=document.created_iso,
+    )
+
+
+def render_native_to_file(document: PDFDocument, path: str) -> int:
+    """Draw a document and write it to path; returns the file size."""
+    data = render_native_pdf(document)
+    with open(path, "wb") as target:
+        return target.write(data)
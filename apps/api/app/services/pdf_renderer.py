@@ -0,0 +1,130 @@
+"""
+PDF Renderer - WeasyPrint-Layout in einem Prozess-Pool.
+
+Das Layout eines PDFs kostet mehrere hundert Millisekunden CPU. Im
+Event Loop ausgeführt blockiert es alle anderen Requests des Workers,
+daher rendert export_case_pdf über diesen Pool.
+
+Der Pool selbst ist services/process_pool.BoundedProcessPool.
+
+Verhalten:
+- Höchstens `workers` Renderings laufen parallel, weitere `queue_size`
+  warten; darüber hinaus wirft render() sofort RendererBusy
+  (API: 503 PDF_RENDERER_BUSY mit Retry-After)
+- Jedes Rendering hat ein Timeout; danach werden die Worker-Prozesse
+  beendet und der Pool neu erstellt (ein laufender Prozess lässt sich
+  nicht anders abbrechen). Renderings, die dabei mit abbrechen, werden
+  einmal auf dem neuen Pool wiederholt
+- Retry-After schätzt die Wartezeit aus der mittleren Renderdauer
+- stats(): Warteschlangentiefe, Zähler und Renderdauern
+- render_to_file() rendert ein PDFDocument mit dessen Engine und schreibt
+  das PDF im Worker direkt in eine Datei (pdf_cache.temp_path), statt die
+  Bytes zurück zu übertragen
+- Jeder Worker führt beim Start initializer aus (WeasyPrint:
+  pdf_service.warm_up, Stylesheet parsen, Fonts laden; native Engine:
+  keiner); start() startet alle Worker vorab
+
+WICHTIG:
+- Prozesslokal; die API läuft mit einem Worker
+- Worker werden per "spawn" gestartet: fork aus einem Prozess mit
+  laufendem Event Loop und Prisma-Engine-Threads ist nicht sicher
+- render_fn / file_render_fn müssen picklebar sein (Modul-Funktionen)
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+from app.services.pdf_service import (
+    PDFDocument,
+    render_document_to_file,
+    render_html_to_pdf,
+    warm_up,
+)
+from app.services.process_pool import (
+    BoundedProcessPool,
+    PoolBusy,
+    PoolTaskFailed,
+    PoolTimeout,
+)
+
+
+PDF_RENDER_WORKERS = 2
+PDF_RENDER_QUEUE_SIZE = 8
+PDF_RENDER_TIMEOUT_SECONDS = 30.0
+
+
+class RendererBusy(PoolBusy):
+    """Warteschlange voll; retry_after in Sekunden."""
+
+
+class RenderTimeout(PoolTimeout):
+    """Rendering hat das Timeout überschritten."""
+
+
+class RenderFailed(PoolTaskFailed):
+    """Rendering ist im Worker-Prozess fehlgeschlagen."""
+
+
+class PDFRenderer(BoundedProcessPool):
+    """Begrenzter Prozess-Pool für PDF-Renderings."""
+
+    busy_error = RendererBusy
+    timeout_error = RenderTimeout
+    failed_error = RenderFailed
+
+    def __init__(
+        self,
+        workers: int = PDF_RENDER_WORKERS,
+        queue_size: int = PDF_RENDER_QUEUE_SIZE,
+        timeout_seconds: float = PDF_RENDER_TIMEOUT_SECONDS,
+        render_fn: Callable[[str], bytes] = render_html_to_pdf,
+        initializer: Callable[[], None] | None = None,
+        file_render_fn: Callable[[PDFDocument, str], int] = render_document_to_file,
+    ):
+        super().__init__(workers, queue_size, timeout_seconds, initializer)
+        self._render_fn = render_fn
+        self._file_render_fn = file_render_fn
+
+    def configure(
+        self,
+        *,
+        workers: int,
+        queue_size: int,
+        timeout_seconds: float,
+        initializer: Callable[[], None] | None = warm_up,
+    ) -> None:
+        """Übernimmt die Settings (Lifespan); ein bestehender Pool wird beendet."""
+        super().configure(
+            workers=workers,
+            queue_size=queue_size,
+            timeout_seconds=timeout_seconds,
+            initializer=initializer,
+        )
+
+    async def render(self, html: str) -> bytes:
+        """
+        Rendert HTML zu PDF im Pool.
+
+        Raises:
+            RendererBusy: Warteschlange voll
+            RenderTimeout: Timeout überschritten
+            RenderFailed: Fehler im Worker
+        """
+        return await self._run(self._render_fn, html)
+
+    async def render_to_file(self, document: PDFDocument, path: str | Path) -> int:
+        """
+        Rendert ein Dokument im Pool und schreibt das PDF nach path.
+
+        Returns:
+            Dateigröße in Bytes
+
+        Raises:
+            wie render(); path kann dann unvollständig sein
+        """
+        return await self._run(self._file_render_fn, document, str(path))
+
+
+pdf_renderer = PDFRenderer(initializer=warm_up)
@@ -1,171 +1,213 @@
 """
 PDF Generation Service.
 
-Generates PDF documents from CaseSnapshots using WeasyPrint.
+Generates PDF documents from CaseSnapshots, with one of two engines
+(PDF_ENGINE setting):
+- "weasyprint" (default): HTML template + stylesheet laid out by WeasyPrint
+- "native": the same layout drawn directly by a small PDF writer
+  (see pdf_native), without HTML/CSS layout. Documents with text outside
+  Windows-1252 (which the native fonts cannot show) are rendered with
+  WeasyPrint instead; build_document records the engine per document
+
+Preparing the document (cheap) and rendering (CPU-bound) are separate
+steps: build_document runs in the API process and returns a picklable
+PDFDocument, render_document_to_file is a module-level function so it can
+run in the pdf_renderer process pool. For WeasyPrint the stylesheet is
+parsed once and the FontConfiguration is shared by all renders of a
+process; warm_up() prepares both ahead of the first export. WeasyPrint
+is imported on first use, so native render workers only load it (and
+Pango) for such fallback documents.
+
+Deterministic mode (used by the export endpoint): pass the snapshot's
+created_at as generated_at and no request_id. The output then depends
+only on the snapshot and the engine's template hash
+(PDFService.template_hash), which makes it cacheable (see pdf_cache).
 """
 
 from __future__ import annotations
 
+import hashlib
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
+from importlib.metadata import version as package_version
 from io import BytesIO
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Literal
 
 from jinja2 import Environment, BaseLoader
-from weasyprint import HTML, CSS
 
-from app.domain.summary import generate_case_summary, CaseSummary
+from app.domain.summary import generate_case_summary, CaseSummary, SummarySection
+from app.services.pdf_native import (
+    NATIVE_TEMPLATE_HASH,
+    can_render_native,
+    render_native_pdf,
+    render_native_to_file,
+)
+
+
+if TYPE_CHECKING:
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+
+WEASYPRINT_VERSION = package_version("weasyprint")
+
+PdfEngine = Literal["weasyprint", "native"]
+PDF_ENGINES: tuple[PdfEngine, ...] = ("weasyprint", "native")
+
+
+# Stylesheet for PDF generation (parsed once, see _render_resources)
+PDF_STYLESHEET = """
+@page {
+    size: A4;
+    margin: 2cm 1.5cm;
+    @bottom-center {
+        content: "Seite " counter(page) " von " counter(pages);
+        font-size: 9pt;
+        color: #666;
+    }
+}
+
+* {
+    box-sizing: border-box;
+    margin: 0;
+    padding: 0;
+}
+
+body {
+    font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;
+    font-size: 10pt;
+    line-height: 1.5;
+    color: #333;
+}
+
+.header {
+    border-bottom: 2px solid #333;
+    padding-bottom: 1cm;
+    margin-bottom: 0.75cm;
+}
+
+.header-top {
+    display: flex;
+    justify-content: space-between;
+    align-items: flex-start;
+    margin-bottom: 0.5cm;
+}
+
+.logo {
+    font-size: 18pt;
+    font-weight: bold;
+    color: #6366f1;
+}
+
+.document-meta {
+    text-align: right;
+    font-size: 9pt;
+    color: #666;
+}
+
+.document-title {
+    font-size: 16pt;
+    font-weight: bold;
+    margin: 0.5cm 0 0.25cm 0;
+}
+
+.document-subtitle {
+    font-size: 11pt;
+    color: #666;
+}
+
+.case-info {
+    background: #f5f5f5;
+    padding: 0.5cm;
+    border-radius: 4px;
+    margin-bottom: 0.75cm;
+}
+
+.case-info-grid {
+    display: grid;
+    grid-template-columns: 1fr 1fr 1fr;
+    gap: 0.5cm;
+}
+
+.case-info-item {
+    font-size: 9pt;
+}
+
+.case-info-label {
+    color: #666;
+    display: block;
+}
+
+.case-info-value {
+    font-weight: 500;
+}
+
+.section {
+    margin-bottom: 0.75cm;
+    page-break-inside: avoid;
+}
+
+.section-title {
+    font-size: 12pt;
+    font-weight: bold;
+    color: #6366f1;
+    border-bottom: 1px solid #e0e0e0;
+    padding-bottom: 0.2cm;
+    margin-bottom: 0.4cm;
+}
+
+.field-table {
+    width: 100%;
+    border-collapse: collapse;
+}
+
+.field-row {
+    border-bottom: 1px solid #eee;
+}
 
+.field-row:last-child {
+    border-bottom: none;
+}
 
-# HTML Template for PDF generation
+.field-label {
+    padding: 0.25cm 0;
+    color: #666;
+    width: 40%;
+    vertical-align: top;
+}
+
+.field-value {
+    padding: 0.25cm 0;
+    font-weight: 500;
+    text-align: right;
+}
+
+.footer {
+    margin-top: 1cm;
+    padding-top: 0.5cm;
+    border-top: 1px solid #e0e0e0;
+    font-size: 8pt;
+    color: #888;
+}
+
+.footer-disclaimer {
+    margin-bottom: 0.25cm;
+}
+
+.footer-meta {
+    display: flex;
+    justify-content: space-between;
+}
+"""
+
+# HTML Template for PDF generation (styled by PDF_STYLESHEET)
 PDF_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="de">
 <head>
     <meta charset="UTF-8">
+    <meta name="dcterms.created" content="{{ created_iso }}">
     <title>{{ procedure_name }} - {{ case_id }}</title>
-    <style>
-        @page {
-            size: A4;
-            margin: 2cm 1.5cm;
-            @bottom-center {
-                content: "Seite " counter(page) " von " counter(pages);
-                font-size: 9pt;
-                color: #666;
-            }
-        }
-        
-        * {
-            box-sizing: border-box;
-            margin: 0;
-            padding: 0;
-        }
-        
-        body {
-            font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif;
-            font-size: 10pt;
-            line-height: 1.5;
-            color: #333;
-        }
-        
-        .header {
-            border-bottom: 2px solid #333;
-            padding-bottom: 1cm;
-            margin-bottom: 0.75cm;
-        }
-        
-        .header-top {
-            display: flex;
-            justify-content: space-between;
-            align-items: flex-start;
-            margin-bottom: 0.5cm;
-        }
-        
-        .logo {
-            font-size: 18pt;
-            font-weight: bold;
-            color: #6366f1;
-        }
-        
-        .document-meta {
-            text-align: right;
-            font-size: 9pt;
-            color: #666;
-        }
-        
-        .document-title {
-            font-size: 16pt;
-            font-weight: bold;
-            margin: 0.5cm 0 0.25cm 0;
-        }
-        
-        .document-subtitle {
-            font-size: 11pt;
-            color: #666;
-        }
-        
-        .case-info {
-            background: #f5f5f5;
-            padding: 0.5cm;
-            border-radius: 4px;
-            margin-bottom: 0.75cm;
-        }
-        
-        .case-info-grid {
-            display: grid;
-            grid-template-columns: 1fr 1fr 1fr;
-            gap: 0.5cm;
-        }
-        
-        .case-info-item {
-            font-size: 9pt;
-        }
-        
-        .case-info-label {
-            color: #666;
-            display: block;
-        }
-        
-        .case-info-value {
-            font-weight: 500;
-        }
-        
-        .section {
-            margin-bottom: 0.75cm;
-            page-break-inside: avoid;
-        }
-        
-        .section-title {
-            font-size: 12pt;
-            font-weight: bold;
-            color: #6366f1;
-            border-bottom: 1px solid #e0e0e0;
-            padding-bottom: 0.2cm;
-            margin-bottom: 0.4cm;
-        }
-        
-        .field-table {
-            width: 100%;
-            border-collapse: collapse;
-        }
-        
-        .field-row {
-            border-bottom: 1px solid #eee;
-        }
-        
-        .field-row:last-child {
-            border-bottom: none;
-        }
-        
-        .field-label {
-            padding: 0.25cm 0;
-            color: #666;
-            width: 40%;
-            vertical-align: top;
-        }
-        
-        .field-value {
-            padding: 0.25cm 0;
-            font-weight: 500;
-            text-align: right;
-        }
-        
-        .footer {
-            margin-top: 1cm;
-            padding-top: 0.5cm;
-            border-top: 1px solid #e0e0e0;
-            font-size: 8pt;
-            color: #888;
-        }
-        
-        .footer-disclaimer {
-            margin-bottom: 0.25cm;
-        }
-        
-        .footer-meta {
-            display: flex;
-            justify-content: space-between;
-        }
-    </style>
 </head>
 <body>
     <div class="header">
@@ -173,7 +215,7 @@ PDF_TEMPLATE = """
             <div class="logo">ZollPilot</div>
             <div class="document-meta">
                 <div>Erstellt am: {{ generated_at }}</div>
-                <div>Request-ID: {{ request_id }}</div>
+                {% if request_id %}<div>Request-ID: {{ request_id }}</div>{% endif %}
             </div>
         </div>
         <h1 class="document-title">Ausfüllhilfe zur Zollanmeldung (keine offizielle Anmeldung)</h1>
@@ -210,7 +252,7 @@ PDF_TEMPLATE = """
     <div class="section">
         <h2 class="section-title">{{ section.title }}</h2>
         <table class="field-table">
-            {% for item in section.items %}
+            {% for item in section['items'] %}
             <tr class="field-row">
                 <td class="field-label">{{ item.label }}</td>
                 <td class="field-value">{{ item.value }}</td>
@@ -235,15 +277,62 @@ PDF_TEMPLATE = """
 </html>
 """
 
+# Identifies template, stylesheet and renderer; part of the PDF cache key
+PDF_TEMPLATE_HASH = hashlib.sha256(
+    f"{WEASYPRINT_VERSION}\n{PDF_STYLESHEET}\n{PDF_TEMPLATE}".encode("utf-8")
+).hexdigest()[:16]
+
+_TEMPLATE_HASHES: dict[str, str] = {
+    "weasyprint": PDF_TEMPLATE_HASH,
+    # Native documents may fall back to WeasyPrint, so both templates count
+    "native": hashlib.sha256(
+        f"{NATIVE_TEMPLATE_HASH}\n{PDF_TEMPLATE_HASH}".encode("utf-8")
+    ).hexdigest()[:16],
+}
+
+_template = Environment(loader=BaseLoader()).from_string(PDF_TEMPLATE)
+
+
+@dataclass(frozen=True)
+class PDFDocument:
+    """Everything needed to render one PDF; sent to the process pool."""
+
+    engine: PdfEngine
+    case_id: str
+    version: int
+    procedure_code: str
+    procedure_version: str
+    procedure_name: str
+    sections: tuple[SummarySection, ...]
+    generated_at: str
+    created_iso: str
+    year: int
+    request_id: str | None = None
+
 
 class PDFService:
     """Service for generating PDF documents from case data."""
 
-    def __init__(self):
-        self._env = Environment(loader=BaseLoader())
-        self._template = self._env.from_string(PDF_TEMPLATE)
+    def __init__(self, engine: PdfEngine = "weasyprint"):
+        self.engine = engine
 
-    def generate_pdf(
+    def configure(self, *, engine: PdfEngine) -> None:
+        """Select the render engine (lifespan)."""
+        if engine not in PDF_ENGINES:
+            raise ValueError(f"Unknown PDF engine: {engine}")
+        self.engine = engine
+
+    @property
+    def template_hash(self) -> str:
+        """Template hash of the selected engine; part of the PDF cache key."""
+        return _TEMPLATE_HASHES[self.engine]
+
+    @property
+    def worker_initializer(self) -> Callable[[], None] | None:
+        """Pool-worker initializer for the selected engine (native needs none)."""
+        return warm_up if self.engine == "weasyprint" else None
+
+    def build_document(
         self,
         case_id: str,
         version: int,
@@ -251,10 +340,12 @@ class PDFService:
         procedure_version: str,
         procedure_name: str,
         fields_json: dict[str, Any],
-        request_id: str,
-    ) -> bytes:
+        request_id: str | None,
+        summary: CaseSummary | None = None,
+        generated_at: datetime | None = None,
+    ) -> PDFDocument:
         """
-        Generate a PDF document from case snapshot data.
+        Prepare a document for render_document_to_file.
 
         Args:
             case_id: The case ID
@@ -263,51 +354,111 @@ class PDFService:
             procedure_version: Procedure version (e.g., "v1")
             procedure_name: Human-readable procedure name
             fields_json: Case field data
-            request_id: Request ID for audit trail
+            request_id: Request ID for audit trail; omitted from the
+                document if None
+            summary: Precomputed summary (e.g. from summary_cache); generated
+                from fields_json if omitted
+            generated_at: Document date (snapshot created_at in deterministic
+                mode); defaults to now
 
         Returns:
-            PDF file as bytes
+            PDFDocument for the selected engine; "weasyprint" if the native
+            engine cannot show all of its text
         """
         # Generate structured summary
-        summary = generate_case_summary(
+        if summary is None:
+            summary = generate_case_summary(
+                procedure_code=procedure_code,
+                procedure_version=procedure_version,
+                procedure_name=procedure_name,
+                fields=fields_json
+            )
+
+        now = (generated_at or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        document = PDFDocument(
+            engine=self.engine,
+            case_id=case_id,
+            version=version,
             procedure_code=procedure_code,
             procedure_version=procedure_version,
             procedure_name=procedure_name,
-            fields=fields_json
+            sections=tuple(summary.sections),
+            generated_at=now.strftime("%d.%m.%Y %H:%M UTC"),
+            created_iso=now.isoformat(timespec="seconds"),
+            year=now.year,
+            request_id=request_id,
         )
+        if document.engine == "native" and not can_render_native(document):
+            return replace(document, engine="weasyprint")
+        return document
 
-        # Prepare template context
-        now = datetime.now(timezone.utc)
-        context = {
-            "procedure_name": procedure_name,
-            "procedure_code": procedure_code,
-            "procedure_version": procedure_version,
-            "case_id": case_id,
-            "case_id_short": case_id[:8] + "...",
-            "version": version,
-            "sections": [
-                {
-                    "title": section.title,
-                    "items": [
-                        {"label": item.label, "value": item.value}
-                        for item in section.items
-                    ]
-                }
-                for section in summary.sections
-            ],
-            "generated_at": now.strftime("%d.%m.%Y %H:%M UTC"),
-            "year": now.year,
-            "request_id": request_id,
-        }
-
-        # Render HTML
-        html_content = self._template.render(**context)
-
-        # Generate PDF
-        pdf_buffer = BytesIO()
-        HTML(string=html_content).write_pdf(pdf_buffer)
-
-        return pdf_buffer.getvalue()
+    def build_html(
+        self,
+        case_id: str,
+        version: int,
+        procedure_code: str,
+        procedure_version: str,
+        procedure_name: str,
+        fields_json: dict[str, Any],
+        request_id: str | None,
+        summary: CaseSummary | None = None,
+        generated_at: datetime | None = None,
+    ) -> str:
+        """
+        Render the PDF template to HTML (WeasyPrint engine).
+
+        Arguments as in build_document.
+
+        Returns:
+            HTML document for render_html_to_pdf
+        """
+        return document_html(
+            self.build_document(
+                case_id=case_id,
+                version=version,
+                procedure_code=procedure_code,
+                procedure_version=procedure_version,
+                procedure_name=procedure_name,
+                fields_json=fields_json,
+                request_id=request_id,
+                summary=summary,
+                generated_at=generated_at,
+            )
+        )
+
+    def generate_pdf(
+        self,
+        case_id: str,
+        version: int,
+        procedure_code: str,
+        procedure_version: str,
+        procedure_name: str,
+        fields_json: dict[str, Any],
+        request_id: str,
+        summary: CaseSummary | None = None,
+    ) -> bytes:
+        """
+        Generate a PDF document from case snapshot data (in-process).
+
+        The API uses build_document + pdf_renderer instead, so layout does
+        not block the event loop. Arguments as in build_document.
+
+        Returns:
+            PDF file as bytes
+        """
+        document = self.build_document(
+            case_id=case_id,
+            version=version,
+            procedure_code=procedure_code,
+            procedure_version=procedure_version,
+            procedure_name=procedure_name,
+            fields_json=fields_json,
+            request_id=request_id,
+            summary=summary,
+        )
+        if document.engine == "native":
+            return render_native_pdf(document)
+        return render_html_to_pdf(document_html(document))
 
     def get_filename(self, procedure_code: str, case_id: str, version: int) -> str:
         """
@@ -319,6 +470,94 @@ class PDFService:
         return f"ZollPilot_{procedure_code}_{case_id_short}_v{version}.pdf"
 
 
+_resources: tuple[CSS, FontConfiguration] | None = None
+
+
+def _render_resources() -> tuple[CSS, FontConfiguration]:
+    """Parsed stylesheet and font configuration, created once per process."""
+    global _resources
+    if _resources is None:
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        font_config = FontConfiguration()
+        _resources = (CSS(string=PDF_STYLESHEET, font_config=font_config), font_config)
+    return _resources
+
+
+def render_html_to_pdf(html_content: str) -> bytes:
+    """Lay out HTML with WeasyPrint (CPU-bound, picklable for the process pool)."""
+    from weasyprint import HTML
+
+    stylesheet, font_config = _render_resources()
+    pdf_buffer = BytesIO()
+    HTML(string=html_content).write_pdf(
+        pdf_buffer, stylesheets=[stylesheet], font_config=font_config
+    )
+    return pdf_buffer.getvalue()
+
+
+def render_html_to_file(html_content: str, path: str) -> int:
+    """
+    Lay out HTML and write the PDF directly to path.
+
+    Used by the process pool: the document is neither copied out of a
+    buffer nor pickled back to the API process. Returns the file size.
+    """
+    from weasyprint import HTML
+
+    stylesheet, font_config = _render_resources()
+    with open(path, "wb") as target:
+        HTML(string=html_content).write_pdf(
+            target, stylesheets=[stylesheet], font_config=font_config
+        )
+        return target.tell()
+
+
+def document_html(document: PDFDocument) -> str:
+    """Render the HTML template for a document."""
+    return _template.render(
+        procedure_name=document.procedure_name,
+        procedure_code=document.procedure_code,
+        procedure_version=document.procedure_version,
+        case_id=document.case_id,
+        case_id_short=document.case_id[:8] + "...",
+        version=document.version,
+        sections=[
+            {
+                "title": section.title,
+                "items": [{"label": item.label, "value": item.value} for item in section.items],
+            }
+            for section in document.sections
+        ],
+        generated_at=document.generated_at,
+        created_iso=document.created_iso,
+        year=document.year,
+        request_id=document.request_id,
+    )
+
+
+def render_document_to_file(document: PDFDocument, path: str) -> int:
+    """
+    Render a document with its engine and write the PDF to path.
+
+    Default file_render_fn of the process pool. Returns the file size.
+    """
+    if document.engine == "native":
+        return render_native_to_file(document, path)
+    return render_html_to_file(document_html(document), path)
+
+
+def warm_up() -> None:
+    """
+    Parse the stylesheet and load fonts by rendering a minimal document.
+
+    Used as pool-worker initializer, so the first export does not pay
+    for font discovery.
+    """
+    render_html_to_pdf("<!DOCTYPE html><html lang=\"de\"><body><p>ZollPilot</p></body></html>")
+
+
 # Singleton instance
 pdf_service = PDFService()
 
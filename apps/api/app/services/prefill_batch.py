@@ -0,0 +1,288 @@
+"""
+Prefill Batch - Mehrere Belege (oder ein ZIP) in einem Request auswerten.
+
+POST /prefill/batch nimmt mehrere Dateien entgegen (PDF, JPG, PNG oder
+ZIP mit solchen Dateien) und wertet sie parallel über prefill_extractor
+aus, höchstens `concurrency` gleichzeitig pro Request. Jedes Ergebnis wird
+als NDJSON-Zeile geschrieben, sobald es fertig ist; die ersten Vorschläge
+kommen so an, bevor der langsamste Beleg ausgewertet ist. Am Ende folgt
+eine Zusammenfassung.
+
+Zeilen (Reihenfolge = Fertigstellung, `index` = Position im Upload):
+- {"index": 0, "file": "a.pdf", "status": "ok", "data": {...}}
+- {"index": 1, "file": "b.zip/c.png", "status": "error", "error": {...}}
+- {"summary": {"total": 2, "succeeded": 1, "failed": 1}}
+
+Speicher:
+- Hochgeladene Dateien über PREFILL_BATCH_SPOOL_BYTES lagert der Parser in
+  eine unbenannte temporäre Datei aus; sie bleiben bis zum Ende des Streams
+  offen und werden dann geschlossen (und damit gelöscht)
+- Dateien und ZIP-Einträge werden erst bei der Auswertung gelesen bzw.
+  entpackt (in einem Thread, höchstens MAX_FILE_SIZE Bytes), nie alle
+  gleichzeitig
+- Fertige Ergebnisse warten in einer Queue der Größe `concurrency`; liest
+  der Client langsam, werten die Worker nicht weiter voraus
+
+WICHTIG:
+- Fehler einzelner Dateien brechen den Batch nicht ab
+- Ist die Auswertungs-Warteschlange voll, wird pro Datei bis zu
+  PREFILL_BATCH_BUSY_RETRIES-mal nach Retry-After erneut versucht
+- Wie beim Einzel-Upload: keine Speicherung, keine Protokollierung von
+  Dateiinhalten
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import posixpath
+import zipfile
+import zlib
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, BinaryIO, Callable
+
+from app.core.errors import ERROR_MESSAGES, ErrorCode
+from app.services.prefill_extraction import (
+    ALLOWED_MIME_TYPES,
+    MAX_FILE_SIZE,
+    matches_signature,
+)
+from app.services.prefill_extractor import (
+    ExtractionFailed,
+    ExtractionTimeout,
+    ExtractorBusy,
+    PrefillExtractor,
+    prefill_extractor,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Dokumente pro Batch (ZIP-Einträge einzeln gezählt)
+PREFILL_BATCH_MAX_FILES = 50
+# Maximale Request-Größe: 50 MB
+PREFILL_BATCH_MAX_BYTES = 50 * 1024 * 1024
+# Größere Dateien hält der Multipart-Parser auf der Platte statt im Speicher
+PREFILL_BATCH_SPOOL_BYTES = 1024 * 1024
+# Wiederholungen pro Datei, wenn die Auswertungs-Warteschlange voll ist
+PREFILL_BATCH_BUSY_RETRIES = 5
+
+ZIP_MIME_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+# Dateityp von ZIP-Einträgen (kein Content-Type vorhanden)
+EXTENSION_TYPES = {
+    ".pdf": "pdf",
+    ".jpg": "jpg",
+    ".jpeg": "jpg",
+    ".png": "png",
+}
+
+
+class BatchTooLarge(Exception):
+    """Mehr als PREFILL_BATCH_MAX_FILES Dokumente."""
+
+
+class BatchFileError(Exception):
+    """Fehler einer einzelnen Datei; landet als Zeile im Ergebnis."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _invalid_type() -> BatchFileError:
+    return BatchFileError("INVALID_FILE_TYPE", "Ungültiger Dateityp. Erlaubt: PDF, JPG, PNG.")
+
+
+def _too_large() -> BatchFileError:
+    return BatchFileError("FILE_TOO_LARGE", "Datei zu groß. Maximum: 10 MB.")
+
+
+@dataclass
+class BatchDocument:
+    """Ein auszuwertender Beleg; read() liefert den Inhalt (blockierend)."""
+
+    index: int
+    name: str
+    file_type: str | None = None
+    read: Callable[[], bytes] | None = None
+    error: BatchFileError | None = None
+
+
+@dataclass(frozen=True)
+class BatchUpload:
+    """
+    Eine hochgeladene Datei des Requests; file muss offen bleiben, bis
+    stream() fertig ist (der Aufrufer schließt sie).
+    """
+
+    name: str
+    content_type: str
+    file: BinaryIO
+    size: int
+
+
+def _read_upload(file: BinaryIO) -> bytes:
+    file.seek(0)
+    return file.read()
+
+
+def _read_zip_entry(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """Entpackt einen Eintrag; die Größenangabe im ZIP wird nicht geglaubt."""
+    try:
+        with archive.open(info) as entry:
+            content = entry.read(MAX_FILE_SIZE + 1)
+    except (zipfile.BadZipFile, NotImplementedError, EOFError, zlib.error):
+        raise BatchFileError("INVALID_FILE_TYPE", "ZIP-Eintrag ist beschädigt.") from None
+    if len(content) > MAX_FILE_SIZE:
+        raise _too_large()
+    return content
+
+
+def _zip_documents(upload: BatchUpload, first_index: int) -> list[BatchDocument]:
+    try:
+        archive = zipfile.ZipFile(upload.file)
+        infos = archive.infolist()
+    except (zipfile.BadZipFile, ValueError):
+        return [BatchDocument(
+            first_index, upload.name,
+            error=BatchFileError("INVALID_FILE_TYPE", "ZIP-Archiv ist beschädigt."),
+        )]
+
+    documents = []
+    for info in infos:
+        base = posixpath.basename(info.filename)
+        # Verzeichnisse und Metadaten von macOS/Finder überspringen
+        if info.is_dir() or info.filename.startswith("__MACOSX/") or base.startswith("."):
+            continue
+        document = BatchDocument(first_index + len(documents), f"{upload.name}/{info.filename}")
+        document.file_type = EXTENSION_TYPES.get(posixpath.splitext(base)[1].lower())
+        if document.file_type is None:
+            document.error = _invalid_type()
+        elif info.flag_bits & 0x1:
+            document.error = BatchFileError(
+                "INVALID_FILE_TYPE", "Verschlüsselte ZIP-Einträge werden nicht unterstützt."
+            )
+        elif info.file_size > MAX_FILE_SIZE:
+            document.error = _too_large()
+        else:
+            document.read = lambda archive=archive, info=info: _read_zip_entry(archive, info)
+        documents.append(document)
+    return documents
+
+
+def collect_documents(uploads: list[BatchUpload]) -> list[BatchDocument]:
+    """
+    Zerlegt die Uploads in Belege (ZIP-Einträge einzeln). Blockierend: liest
+    die Inhaltsverzeichnisse der ZIP-Archive.
+
+    Raises:
+        BatchTooLarge: mehr als PREFILL_BATCH_MAX_FILES Belege
+    """
+    documents: list[BatchDocument] = []
+    for upload in uploads:
+        if upload.content_type in ZIP_MIME_TYPES or upload.name.lower().endswith(".zip"):
+            documents.extend(_zip_documents(upload, len(documents)))
+        else:
+            document = BatchDocument(len(documents), upload.name)
+            document.file_type = ALLOWED_MIME_TYPES.get(upload.content_type)
+            if document.file_type is None:
+                document.error = _invalid_type()
+            elif upload.size > MAX_FILE_SIZE:
+                document.error = _too_large()
+            else:
+                document.read = lambda file=upload.file: _read_upload(file)
+            documents.append(document)
+        if len(documents) > PREFILL_BATCH_MAX_FILES:
+            raise BatchTooLarge()
+    return documents
+
+
+def _ndjson(payload: dict[str, Any]) -> bytes:
+    return (json.dumps(payload, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+class PrefillBatch:
+    """Ein Batch; stream() liefert die NDJSON-Zeilen."""
+
+    def __init__(
+        self,
+        documents: list[BatchDocument],
+        *,
+        concurrency: int,
+        extractor: PrefillExtractor = prefill_extractor,
+    ):
+        self._documents = documents
+        self._concurrency = max(1, concurrency)
+        self._extractor = extractor
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        results: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=self._concurrency)
+        pending = iter(self._documents)
+
+        async def worker() -> None:
+            for document in pending:
+                await results.put(await self._process(document))
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(self._concurrency, len(self._documents)))
+        ]
+        succeeded = 0
+        try:
+            for _ in self._documents:
+                result = await results.get()
+                succeeded += result["status"] == "ok"
+                yield _ndjson(result)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        yield _ndjson({"summary": {
+            "total": len(self._documents),
+            "succeeded": succeeded,
+            "failed": len(self._documents) - succeeded,
+        }})
+
+    async def _process(self, document: BatchDocument) -> dict[str, Any]:
+        result: dict[str, Any] = {"index": document.index, "file": document.name}
+        try:
+            suggestions = await self._extract(document)
+        except BatchFileError as exc:
+            return {**result, "status": "error", "error": {"code": exc.code, "message": exc.message}}
+        except Exception:
+            logger.exception("Prefill batch document %d failed", document.index)
+            code = ErrorCode.PREFILL_FAILED
+            return {**result, "status": "error", "error": {"code": code.value, "message": ERROR_MESSAGES[code]}}
+        return {**result, "status": "ok", "data": suggestions.model_dump()}
+
+    async def _extract(self, document: BatchDocument) -> Any:
+        if document.error is not None:
+            raise document.error
+
+        content = await asyncio.to_thread(document.read)
+        if not content:
+            raise BatchFileError("EMPTY_FILE", "Die hochgeladene Datei ist leer.")
+        if not matches_signature(content, document.file_type):
+            raise BatchFileError(
+                "INVALID_FILE_TYPE",
+                "Dateiinhalt passt nicht zum Dateityp. Erlaubt: PDF, JPG, PNG.",
+            )
+
+        for _ in range(PREFILL_BATCH_BUSY_RETRIES):
+            try:
+                return await self._extractor.extract(content, document.file_type)
+            except ExtractorBusy as exc:
+                await asyncio.sleep(exc.retry_after)
+            except ExtractionTimeout:
+                code = ErrorCode.PREFILL_TIMEOUT
+                raise BatchFileError(code.value, ERROR_MESSAGES[code])
+            except ExtractionFailed:
+                logger.exception("Prefill extraction of batch document %d failed", document.index)
+                code = ErrorCode.PREFILL_FAILED
+                raise BatchFileError(code.value, ERROR_MESSAGES[code])
+        code = ErrorCode.PREFILL_BUSY
+        raise BatchFileError(code.value, ERROR_MESSAGES[code])
@@ -0,0 +1,125 @@
+"""
+Prefill Cache - In-Process-Cache für Ergebnisse der Belegauswertung.
+
+Nutzer laden dieselbe Rechnung oft mehrfach hoch (weitere Fälle, erneuter
+Versuch). Statt sie jedes Mal im Prozess-Pool neu auszuwerten, liefert
+prefill_extractor ein kurz zurückliegendes Ergebnis aus diesem Cache.
+
+Key: (SHA-256 des Uploads, EXTRACTOR_VERSION, max_pages)
+- EXTRACTOR_VERSION wird bei jeder Änderung der Heuristiken erhöht, damit
+  keine veralteten Vorschläge ausgeliefert werden
+- max_pages beeinflusst das Ergebnis (ausgewertete Seiten, Warnung)
+
+WICHTIG:
+- Gespeichert werden nur die abgeleiteten Vorschläge (PrefillSuggestions),
+  niemals die Datei selbst; der Hash ist nicht umkehrbar
+- raw_text_preview (Dokumenttext) wird vor dem Speichern entfernt;
+  Treffer aus dem Cache liefern daher keine Textvorschau
+- Einträge verfallen nach PREFILL_CACHE_TTL_SECONDS und sind auf
+  PREFILL_CACHE_MAX_ENTRIES begrenzt (LRU)
+- Prozesslokal (wie summary_cache); die API läuft mit einem Worker
+- stats(): Einträge, Treffer, Fehlschläge und Trefferquote
+  (GET /prefill/metrics)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from app.services.prefill_extraction import EXTRACTOR_VERSION, PrefillSuggestions
+
+
+PREFILL_CACHE_MAX_ENTRIES = 256
+PREFILL_CACHE_TTL_SECONDS = 600.0
+
+PrefillKey = tuple[str, str, int]
+
+
+@dataclass(frozen=True)
+class PrefillCacheStats:
+    """Momentaufnahme des Caches (Metriken)."""
+
+    entries: int
+    max_entries: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    # Treffer / (Treffer + Fehlschläge), 0.0 ohne Anfragen
+    hit_rate: float
+
+
+def cache_key(content: bytes, max_pages: int) -> PrefillKey:
+    """Key eines Uploads; nur der Hash, nicht der Inhalt, bleibt im Cache."""
+    return (hashlib.sha256(content).hexdigest(), EXTRACTOR_VERSION, max_pages)
+
+
+class PrefillCache:
+    """LRU-Cache mit TTL für PrefillSuggestions."""
+
+    def __init__(
+        self,
+        max_entries: int = PREFILL_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = PREFILL_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._max_entries = max(0, max_entries)
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[PrefillKey, tuple[float, PrefillSuggestions]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def configure(self, *, max_entries: int, ttl_seconds: float) -> None:
+        """Übernimmt die Settings (Lifespan); bestehende Einträge werden verworfen."""
+        self._max_entries = max(0, max_entries)
+        self._ttl_seconds = ttl_seconds
+        self.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0 and self._ttl_seconds > 0
+
+    def get(self, key: PrefillKey) -> PrefillSuggestions | None:
+        """Kopie des Eintrags oder None (fehlend bzw. abgelaufen)."""
+        entry = self._entries.get(key)
+        if entry is not None and self._clock() - entry[0] >= self._ttl_seconds:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._entries.move_to_end(key)
+        # Kopie: Aufrufer dürfen das Ergebnis verändern
+        return entry[1].model_copy(deep=True)
+
+    def put(self, key: PrefillKey, suggestions: PrefillSuggestions) -> None:
+        """Speichert eine Kopie ohne Dokumenttext (raw_text_preview)."""
+        if not self.enabled:
+            return
+        stored = suggestions.model_copy(update={"raw_text_preview": None}, deep=True)
+        self._entries[key] = (self._clock(), stored)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> PrefillCacheStats:
+        lookups = self._hits + self._misses
+        return PrefillCacheStats(
+            entries=len(self._entries),
+            max_entries=self._max_entries,
+            ttl_seconds=self._ttl_seconds,
+            hits=self._hits,
+            misses=self._misses,
+            hit_rate=round(self._hits / lookups, 3) if lookups else 0.0,
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+prefill_cache = PrefillCache()
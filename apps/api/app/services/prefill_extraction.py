@@ -0,0 +1,736 @@
+"""
+Prefill Extraction – heuristic field suggestions from invoices/receipts.
+
+Used by routes/prefill.py. Runs inside the prefill_extractor worker
+processes, so this module must stay free of FastAPI, auth and database
+imports (cheap to import in a spawned worker).
+
+Key Principles:
+- NEVER auto-fill fields – only suggest
+- Heuristic extraction v1 (regex-based, no AI)
+- Bounded work per document: at most max_pages PDF pages are read,
+  first and last page first; reading stops once the suggestions are
+  confident enough
+"""
+from __future__ import annotations
+
+import io
+import re
+from bisect import bisect_left
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+
+# --- Constants ---
+
+# Version of the heuristics below; bump on any change that alters results
+# (invalidates the prefill_cache entries)
+EXTRACTOR_VERSION = "2"
+
+# Pages read per PDF (first, last, then front to back); others are ignored
+# (with a warning)
+PREFILL_MAX_PAGES = 5
+
+# Stop reading pages once total and merchant reach this confidence
+PAGE_STOP_CONFIDENCE = 0.8
+
+# pypdf text shorter than this (per page) is retried with pdfplumber
+MIN_PAGE_TEXT = 20
+
+# Maximum size of one uploaded document: 10 MB
+MAX_FILE_SIZE = 10 * 1024 * 1024
+
+# Allowed MIME types of uploaded documents
+ALLOWED_MIME_TYPES = {
+    "application/pdf": "pdf",
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/jpg": "jpg",
+}
+
+# Magic bytes per file type (checked on the first bytes of an upload)
+FILE_SIGNATURES = {
+    "pdf": b"%PDF-",
+    "jpg": b"\xff\xd8\xff",
+    "png": b"\x89PNG\r\n\x1a\n",
+}
+
+# PDF readers accept the header anywhere in the first 1024 bytes
+PDF_HEADER_WINDOW = 1024
+
+# Currency patterns
+CURRENCY_SYMBOLS = {
+    "€": "EUR",
+    "$": "USD",
+    "£": "GBP",
+    "¥": "JPY",
+    "CHF": "CHF",
+    "EUR": "EUR",
+    "USD": "USD",
+    "GBP": "GBP",
+}
+
+# Common shipping keywords (German & English)
+SHIPPING_KEYWORDS = [
+    r"versand(?:kosten)?",
+    r"lieferung",
+    r"porto",
+    r"shipping",
+    r"delivery",
+    r"freight",
+    r"postage",
+    r"fracht",
+]
+
+
+# --- Models ---
+
+
+class FieldSuggestion(BaseModel):
+    """A single field suggestion with confidence."""
+    field_key: str
+    value: Any
+    confidence: float  # 0.0 - 1.0
+    source: str  # e.g., "regex_amount", "regex_merchant"
+    display_label: str  # German label for UI
+
+
+class ItemSuggestion(BaseModel):
+    """A suggested item from the invoice."""
+    name: str
+    price: float | None
+    currency: str | None
+    confidence: float
+
+
+class PrefillSuggestions(BaseModel):
+    """All suggestions extracted from the document."""
+    suggestions: list[FieldSuggestion]
+    items: list[ItemSuggestion]
+    raw_text_preview: str | None  # First 500 chars for debug (optional)
+    extraction_method: str
+    warnings: list[str]
+
+
+# --- Amount Tokenizer ---
+
+Amount = tuple[float, str, float]
+
+# Amount pattern shared by all currencies: up to 6 digits, optional 2 decimals
+_AMOUNT = r"(\d{1,6}(?:[.,]\d{2})?)"
+
+# Currency before the amount (€150.00, EUR 150.00, $ 99.99, GBP 20, CHF 30)
+# and after it (150,00 €, 150.00 EUR, 99.99 $, 20 £, 30 CHF).
+# Value: (rank, currency, confidence). The rank keeps the order of the former
+# 13 single patterns (€ before/after, EUR before/after, $ ..., CHF after), so
+# results, ties and "first amount" picks stay the same.
+_PREFIX_CURRENCIES: dict[str, tuple[int, str, float]] = {
+    "€": (0, "EUR", 0.9),
+    "eur": (2, "EUR", 0.85),
+    "$": (4, "USD", 0.9),
+    "usd": (6, "USD", 0.85),
+    "£": (8, "GBP", 0.9),
+    "gbp": (10, "GBP", 0.85),
+    "chf": (11, "CHF", 0.85),
+}
+_SUFFIX_CURRENCIES: dict[str, tuple[int, str, float]] = {
+    "€": (1, "EUR", 0.9),
+    "eur": (3, "EUR", 0.85),
+    "$": (5, "USD", 0.9),
+    "usd": (7, "USD", 0.85),
+    "£": (9, "GBP", 0.9),
+    "chf": (12, "CHF", 0.85),
+}
+
+# One combined pattern per side. The currency literals start with different
+# characters and a match contains no other currency start, so these find
+# exactly the union of the former single-pattern scans.
+_PREFIX_PATTERN = re.compile(r"(€|EUR|\$|USD|£|GBP|CHF)\s*" + _AMOUNT, re.IGNORECASE)
+_SUFFIX_PATTERN = re.compile(_AMOUNT + r"\s*(€|EUR|\$|USD|£|CHF)", re.IGNORECASE)
+
+# Every amount touches a currency literal: the tokenizer scans for these once
+# (the lookahead lets the regex engine skip other characters quickly)
+_CURRENCY_PATTERN = re.compile(r"(?=[€$£EeUuGgCc])(?:[€$£]|EUR|USD|GBP|CHF)", re.IGNORECASE)
+_SUFFIX_CURRENCY_KEYS = frozenset(_SUFFIX_CURRENCIES)
+# Characters an amount before a currency can consist of (see _AMOUNT, \s*)
+_RUN_PATTERN = re.compile(r"[\d.,\s]*")
+
+_SHIPPING_PATTERNS = [re.compile(keyword, re.IGNORECASE) for keyword in SHIPPING_KEYWORDS]
+
+_TOTAL_PATTERNS = [
+    re.compile(keyword, re.IGNORECASE)
+    for keyword in [
+        r"gesamt",
+        r"total",
+        r"summe",
+        r"endbetrag",
+        r"zu zahlen",
+        r"grand total",
+        r"order total",
+        r"betrag",
+    ]
+]
+
+
+class _AmountSpans:
+    """Matches of one combined pattern, sorted by offset."""
+
+    def __init__(
+        self,
+        text: str,
+        pattern: re.Pattern[str],
+        currencies: dict[str, tuple[int, str, float]],
+        amount_group: int,
+        currency_group: int,
+        matches: list[re.Match[str]],
+    ):
+        self._text = text
+        self._pattern = pattern
+        self._currencies = currencies
+        self._amount_group = amount_group
+        self._currency_group = currency_group
+        self.starts = [match.start() for match in matches]
+        self.ends = [match.end() for match in matches]
+        self.tokens = [self._token(match) for match in matches]
+
+    def _token(self, match: re.Match[str]) -> tuple[int, int, str, str, float]:
+        """(rank, offset, amount text, currency, confidence)"""
+        # casefold: IGNORECASE also matches e.g. "ſ" for "s"
+        rank, currency, confidence = self._currencies[
+            match.group(self._currency_group).casefold()
+        ]
+        return (rank, match.start(), match.group(self._amount_group), currency, confidence)
+
+    def _rescan(self, start: int, end: int) -> list[re.Match[str]]:
+        return list(self._pattern.finditer(self._text, start, end))
+
+    def window(self, start: int, end: int) -> list[tuple[int, int, str, str, float]]:
+        """
+        Matches within text[start:end], exactly as a scan of that slice.
+
+        Matches fully inside the window come from the index. Only a match
+        cut by a window border is scanned again, limited to the cut part
+        (a cut amount like "€1199.00" -> "€119" is what the slice scan sees).
+        """
+        if start >= end:
+            return []
+
+        first = bisect_left(self.starts, start)
+        tokens: list[tuple[int, int, str, str, float]] = []
+
+        if first > 0 and self.ends[first - 1] > start:
+            # Match cut by the left border: the slice scan starts inside it
+            border = self.ends[first - 1]
+            inside: list[re.Match[str]] = []
+            for match in self._pattern.finditer(self._text, start, end):
+                if match.start() >= border:
+                    break
+                inside.append(match)
+            if inside and inside[-1].end() > border:
+                # Not in step with the full scan any more
+                return [self._token(match) for match in self._rescan(start, end)]
+            tokens.extend(self._token(match) for match in inside)
+            if border >= end:
+                return tokens
+
+        index = first
+        while index < len(self.starts) and self.starts[index] < end:
+            if self.ends[index] > end:
+                # Match cut by the right border
+                tokens.extend(
+                    self._token(match) for match in self._rescan(self.starts[index], end)
+                )
+                break
+            tokens.append(self.tokens[index])
+            index += 1
+        return tokens
+
+
+class AmountIndex:
+    """
+    All monetary amounts of a text, tokenized in one pass.
+
+    One scan finds the currency literals; amounts before (€150.00) and after
+    (150,00 €) each literal are matched right there with precompiled
+    patterns. Keyword proximity queries (shipping, total) then look up the
+    amounts of a context window by offset (bisect) instead of running all
+    patterns on every context slice again.
+    """
+
+    def __init__(self, text: str):
+        prefix_matches: list[re.Match[str]] = []
+        suffix_matches: list[re.Match[str]] = []
+        reversed_text = text[::-1]
+        for currency in _CURRENCY_PATTERN.finditer(text):
+            literal_start, literal_end = currency.span()
+            match = _PREFIX_PATTERN.match(text, literal_start)
+            if match:
+                prefix_matches.append(match)
+            if currency.group().casefold() not in _SUFFIX_CURRENCY_KEYS:
+                continue
+            # Amount before the literal: only digits, separators and spaces
+            # can belong to it (found by matching the reversed text).
+            # Scanning from the start of that run matches exactly like a
+            # scan of the whole text.
+            run_start = literal_start - len(
+                _RUN_PATTERN.match(reversed_text, len(text) - literal_start).group()
+            )
+            if run_start < literal_start:
+                suffix_matches.extend(_SUFFIX_PATTERN.finditer(text, run_start, literal_end))
+        self._sides = [
+            _AmountSpans(text, _PREFIX_PATTERN, _PREFIX_CURRENCIES, 2, 1, prefix_matches),
+            _AmountSpans(text, _SUFFIX_PATTERN, _SUFFIX_CURRENCIES, 1, 2, suffix_matches),
+        ]
+
+    @staticmethod
+    def _amounts(tokens: list[tuple[int, int, str, str, float]]) -> list[Amount]:
+        results: list[Amount] = []
+        for _, _, amount_str, currency, confidence in sorted(tokens):
+            # Normalize: replace comma with dot for parsing
+            try:
+                amount = float(amount_str.replace(",", "."))
+            except ValueError:
+                continue
+            if amount > 0:
+                results.append((amount, currency, confidence))
+        return results
+
+    def amounts(self) -> list[Amount]:
+        """All amounts as (amount, currency, confidence)."""
+        return self._amounts([token for side in self._sides for token in side.tokens])
+
+    def window(self, start: int, end: int) -> list[Amount]:
+        """Amounts in text[start:end]; same result as extract_amounts(text[start:end])."""
+        return self._amounts([token for side in self._sides for token in side.window(start, end)])
+
+
+# --- Extraction Helpers ---
+
+
+def extract_amounts(text: str) -> list[Amount]:
+    """
+    Extract monetary amounts from text.
+    Returns list of (amount, currency, confidence).
+
+    e.g., €150.00, $ 99.99, 150,00 €, 150.00 EUR
+    """
+    return AmountIndex(text).amounts()
+
+
+def extract_shipping_cost(
+    text: str,
+    amounts: list[Amount],
+    index: AmountIndex | None = None,
+) -> Amount | None:
+    """
+    Try to find shipping cost by looking for shipping keywords near amounts.
+    Returns (amount, currency, confidence) or None.
+
+    Pass the document's AmountIndex to avoid tokenizing the text again.
+    """
+    index = index or AmountIndex(text)
+    text_lower = text.lower()
+
+    for keyword_pattern in _SHIPPING_PATTERNS:
+        for match in keyword_pattern.finditer(text_lower):
+            # Look for amounts near the keyword (within 50 chars)
+            start = max(0, match.start() - 50)
+            end = min(len(text), match.end() + 50)
+
+            context_amounts = index.window(start, end)
+            if context_amounts:
+                # Return the first amount found near shipping keyword
+                amount, currency, conf = context_amounts[0]
+                # Boost confidence because we found it near shipping keyword
+                return (amount, currency, min(conf + 0.1, 0.95))
+
+    return None
+
+
+def extract_total_amount(
+    text: str,
+    amounts: list[Amount],
+    index: AmountIndex | None = None,
+) -> Amount | None:
+    """
+    Try to find the total/grand total amount.
+    Returns (amount, currency, confidence) or None.
+
+    Pass the document's AmountIndex to avoid tokenizing the text again.
+    """
+    index = index or AmountIndex(text)
+    text_lower = text.lower()
+
+    for keyword_pattern in _TOTAL_PATTERNS:
+        for match in keyword_pattern.finditer(text_lower):
+            # Look for amounts near the keyword
+            start = max(0, match.start() - 30)
+            end = min(len(text), match.end() + 80)
+
+            context_amounts = index.window(start, end)
+            if context_amounts:
+                # Return the largest amount found near total keyword
+                context_amounts.sort(key=lambda x: x[0], reverse=True)
+                amount, currency, conf = context_amounts[0]
+                return (amount, currency, min(conf + 0.15, 0.95))
+
+    # Fallback: return the largest amount if no total keyword found
+    if amounts:
+        amounts_sorted = sorted(amounts, key=lambda x: x[0], reverse=True)
+        amount, currency, conf = amounts_sorted[0]
+        return (amount, currency, conf * 0.7)  # Lower confidence without keyword
+
+    return None
+
+
+def extract_merchant_name(text: str) -> tuple[str, float] | None:
+    """
+    Try to extract merchant/seller name from invoice.
+    Returns (name, confidence) or None.
+    """
+    # Look for common patterns
+    patterns = [
+        (r"(?:von|from|verkäufer|seller|händler|shop)[\s:]+([A-Za-zÄÖÜäöüß0-9\s&.-]{3,50})", 0.8),
+        (r"(?:rechnung|invoice)[\s]+(?:von|from)[\s:]+([A-Za-zÄÖÜäöüß0-9\s&.-]{3,50})", 0.85),
+        (r"(?:bestellung bei|order from)[\s:]+([A-Za-zÄÖÜäöüß0-9\s&.-]{3,50})", 0.85),
+    ]
+
+    for pattern, confidence in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            name = match.group(1).strip()
+            # Clean up the name
+            name = re.sub(r"\s+", " ", name)
+            if len(name) >= 3:
+                return (name, confidence)
+
+    # Try to find company-like names at the start of the document
+    lines = text.split("\n")[:10]  # First 10 lines
+    for line in lines:
+        line = line.strip()
+        # Skip short lines or lines that look like addresses
+        if len(line) < 5 or len(line) > 60:
+            continue
+        if re.match(r"^\d", line):  # Starts with number (likely address/date)
+            continue
+        if "@" in line or "www." in line.lower():  # Email or URL
+            continue
+        if re.match(r".*\d{5}.*", line):  # Postal code
+            continue
+        # Could be company name
+        return (line, 0.5)
+
+    return None
+
+
+def extract_items(text: str) -> list[ItemSuggestion]:
+    """
+    Try to extract line items from invoice.
+    Returns list of ItemSuggestion.
+    """
+    items: list[ItemSuggestion] = []
+
+    # Pattern: product name followed by price
+    # e.g., "iPhone 15 Pro          €1199.00"
+    # e.g., "2x Smartphone Case     $ 29.99"
+
+    # Look for lines with product + price pattern
+    lines = text.split("\n")
+
+    for line in lines:
+        line = line.strip()
+        if not line or len(line) < 10:
+            continue
+
+        # Try to find price at end of line
+        price_pattern = r"[€$£]\s*(\d{1,6}(?:[.,]\d{2})?)|(\d{1,6}(?:[.,]\d{2})?)\s*[€$£]|(\d{1,6}(?:[.,]\d{2})?)\s*(?:EUR|USD|GBP)"
+        price_match = re.search(price_pattern, line, re.IGNORECASE)
+
+        if price_match:
+            # Extract product name (everything before price)
+            price_start = price_match.start()
+            product_name = line[:price_start].strip()
+
+            # Clean up product name
+            product_name = re.sub(r"^\d+\s*x\s*", "", product_name)  # Remove "2x "
+            product_name = re.sub(r"\s+", " ", product_name)
+
+            if len(product_name) >= 3:
+                # Extract price value
+                price_str = price_match.group(1) or price_match.group(2) or price_match.group(3)
+                if price_str:
+                    try:
+                        price = float(price_str.replace(",", "."))
+
+                        # Determine currency
+                        currency = "EUR"  # Default
+                        if "$" in line:
+                            currency = "USD"
+                        elif "£" in line:
+                            currency = "GBP"
+                        elif "CHF" in line.upper():
+                            currency = "CHF"
+
+                        items.append(ItemSuggestion(
+                            name=product_name[:100],  # Limit length
+                            price=price,
+                            currency=currency,
+                            confidence=0.7
+                        ))
+                    except ValueError:
+                        pass
+
+    return items[:10]  # Limit to 10 items
+
+
+def matches_signature(head: bytes, file_type: str) -> bool:
+    """True if the first bytes of a file match the magic bytes of file_type."""
+    signature = FILE_SIGNATURES[file_type]
+    if file_type == "pdf":
+        return signature in head[:PDF_HEADER_WINDOW]
+    return head.startswith(signature)
+
+
+class _PdfPages:
+    """
+    Per-page text of a PDF, read on demand.
+
+    pypdf is the fast first pass; pdfplumber (if installed) is only used for
+    pages where pypdf finds (almost) no text, or if pypdf cannot open the file.
+    """
+
+    def __init__(self, content: bytes):
+        self._content = content
+        self._reader: Any = None
+        self._plumber: Any = None
+        self.count = 0
+        try:
+            from pypdf import PdfReader
+
+            self._reader = PdfReader(io.BytesIO(content))
+            self.count = len(self._reader.pages)
+        except Exception:  # not installed or unreadable
+            self._reader = None
+        if self._reader is None and self._open_plumber() is not None:
+            self.count = len(self._plumber.pages)
+
+    def _open_plumber(self) -> Any:
+        if self._plumber is None:
+            try:
+                import pdfplumber
+
+                self._plumber = pdfplumber.open(io.BytesIO(self._content))
+            except Exception:  # not installed or unreadable
+                self._plumber = False
+        return self._plumber or None
+
+    def text(self, index: int) -> str:
+        text = ""
+        if self._reader is not None:
+            try:
+                text = self._reader.pages[index].extract_text() or ""
+            except Exception:
+                text = ""
+        if len(text.strip()) < MIN_PAGE_TEXT and self._open_plumber() is not None:
+            try:
+                text = self._plumber.pages[index].extract_text() or text
+            except Exception:
+                pass
+        return text
+
+    def close(self) -> None:
+        if self._plumber:
+            self._plumber.close()
+
+
+def page_order(page_count: int, max_pages: int) -> list[int]:
+    """
+    Page indexes in reading order: first and last page (merchant, totals),
+    then the pages in between front to back; at most max_pages.
+    """
+    order = [0] if page_count else []
+    if page_count > 1:
+        order.append(page_count - 1)
+    order.extend(range(1, page_count - 1))
+    return order[:max(1, max_pages)]
+
+
+def extract_text_from_pdf(
+    content: bytes,
+    max_pages: int = PREFILL_MAX_PAGES,
+    enough: Callable[[str], bool] | None = None,
+) -> tuple[str, int, int]:
+    """
+    Extract text from at most max_pages pages in page_order().
+
+    Once first and last page are read, enough(text so far) is checked after
+    each page; True stops reading.
+    Returns (text of the read pages in document order, total page count,
+    pages read).
+    """
+    pages = _PdfPages(content)
+    try:
+        texts: dict[int, str] = {}
+        for index in page_order(pages.count, max_pages):
+            texts[index] = pages.text(index)
+            if enough is not None and len(texts) >= min(2, pages.count):
+                text = "\n".join(texts[i] for i in sorted(texts) if texts[i])
+                if enough(text):
+                    break
+        text = "\n".join(texts[i] for i in sorted(texts) if texts[i])
+        return text, pages.count, len(texts)
+    finally:
+        pages.close()
+
+
+def suggestions_confident(text: str) -> bool:
+    """
+    True if total amount and merchant name are found with at least
+    PAGE_STOP_CONFIDENCE; later pages would not change them.
+    Shipping is optional (many invoices have none) and not required.
+    """
+    merchant = extract_merchant_name(text)
+    if merchant is None or merchant[1] < PAGE_STOP_CONFIDENCE:
+        return False
+    index = AmountIndex(text)
+    total = extract_total_amount(text, index.amounts(), index)
+    return total is not None and total[2] >= PAGE_STOP_CONFIDENCE
+
+
+def warm_up() -> None:
+    """
+    Worker initializer: import the PDF libraries once per worker process,
+    so the first document does not pay for the import.
+    """
+    for module in ("pdfplumber", "pypdf"):
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+
+
+def process_document(
+    content: bytes,
+    file_type: str,
+    max_pages: int = PREFILL_MAX_PAGES,
+) -> PrefillSuggestions:
+    """
+    Process uploaded document and extract suggestions.
+
+    CPU-bound (PDF parsing, regexes): the API calls it through
+    prefill_extractor, never directly in the event loop.
+    """
+    warnings: list[str] = []
+    suggestions: list[FieldSuggestion] = []
+    items: list[ItemSuggestion] = []
+    text = ""
+    extraction_method = "none"
+
+    if file_type == "pdf":
+        text, page_count, pages_read = extract_text_from_pdf(
+            content, max_pages, enough=suggestions_confident
+        )
+        extraction_method = "pdf_text"
+
+        if pages_read < page_count:
+            warnings.append(
+                f"Nur {pages_read} von {page_count} Seiten wurden ausgewertet "
+                "(erste und letzte Seite zuerst)."
+            )
+
+        if not text or len(text) < 20:
+            warnings.append("PDF enthält wenig oder keinen extrahierbaren Text. Möglicherweise ist es ein Scan.")
+
+    elif file_type in ("jpg", "png"):
+        # For v1, we don't do OCR – just inform the user
+        warnings.append(
+            "Bildformate werden in dieser Version nur eingeschränkt unterstützt. "
+            "Für bessere Ergebnisse laden Sie bitte ein PDF hoch."
+        )
+        extraction_method = "image_unsupported"
+        # Return empty suggestions for images in v1
+        return PrefillSuggestions(
+            suggestions=[],
+            items=[],
+            raw_text_preview=None,
+            extraction_method=extraction_method,
+            warnings=warnings,
+        )
+
+    if not text:
+        return PrefillSuggestions(
+            suggestions=[],
+            items=[],
+            raw_text_preview=None,
+            extraction_method=extraction_method,
+            warnings=warnings if warnings else ["Kein Text im Dokument gefunden."],
+        )
+
+    # Extract amounts (tokenized once, shared by the keyword lookups)
+    index = AmountIndex(text)
+    amounts = index.amounts()
+
+    # Extract total amount
+    total = extract_total_amount(text, amounts, index)
+    if total:
+        amount, currency, confidence = total
+        suggestions.append(FieldSuggestion(
+            field_key="value_amount",
+            value=amount,
+            confidence=confidence,
+            source="regex_total",
+            display_label="Warenwert",
+        ))
+        suggestions.append(FieldSuggestion(
+            field_key="value_currency",
+            value=currency,
+            confidence=confidence,
+            source="regex_currency",
+            display_label="Währung",
+        ))
+
+    # Extract shipping cost
+    shipping = extract_shipping_cost(text, amounts, index)
+    if shipping:
+        amount, currency, confidence = shipping
+        suggestions.append(FieldSuggestion(
+            field_key="shipping_cost",
+            value=amount,
+            confidence=confidence,
+            source="regex_shipping",
+            display_label="Versandkosten",
+        ))
+
+    # Extract merchant name
+    merchant = extract_merchant_name(text)
+    if merchant:
+        name, confidence = merchant
+        suggestions.append(FieldSuggestion(
+            field_key="sender_name",
+            value=name,
+            confidence=confidence,
+            source="regex_merchant",
+            display_label="Händlername / Absender",
+        ))
+
+    # Extract items
+    items = extract_items(text)
+
+    # Add confidence warning for low-confidence suggestions
+    low_conf = [s for s in suggestions if s.confidence < 0.6]
+    if low_conf:
+        warnings.append(
+            "Einige Vorschläge haben eine niedrige Konfidenz. Bitte besonders sorgfältig prüfen."
+        )
+
+    # Truncate text preview for debugging (optional, not shown to user in production)
+    raw_preview = text[:500] if len(text) > 0 else None
+
+    return PrefillSuggestions(
+        suggestions=suggestions,
+        items=items,
+        raw_text_preview=raw_preview,
+        extraction_method=extraction_method,
+        warnings=warnings,
+    )
@@ -0,0 +1,130 @@
+"""
+Prefill Extractor - Belegauswertung (Prefill) in einem Prozess-Pool.
+
+PDF-Parsing und Regex-Heuristiken kosten bei großen oder ungünstig
+aufgebauten Belegen Sekunden CPU. Im Event Loop ausgeführt blockiert das
+alle anderen Requests des Workers, daher wertet POST /prefill/upload über
+diesen Pool aus.
+
+Der Pool selbst ist services/process_pool.BoundedProcessPool.
+
+Verhalten:
+- Höchstens `workers` Auswertungen laufen parallel, weitere `queue_size`
+  warten; darüber hinaus wirft extract() sofort ExtractorBusy
+  (API: 503 PREFILL_BUSY mit Retry-After)
+- Jede Auswertung hat ein Timeout (API: 504 PREFILL_TIMEOUT); der Worker
+  wird dabei beendet
+- Pro PDF werden höchstens max_pages Seiten gelesen
+- Bilder (JPG/PNG) werden in v1 nicht ausgewertet; sie laufen ohne Pool
+- stats(): Warteschlangentiefe, Zähler und Auswertungsdauern
+  (GET /prefill/metrics)
+- Jeder Worker importiert beim Start die PDF-Bibliotheken
+  (prefill_extraction.warm_up)
+- Ergebnisse werden per Inhalts-Hash zwischengespeichert
+  (services/prefill_cache.py); ein erneut hochgeladener Beleg belegt
+  keinen Worker
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+from app.services.prefill_cache import PrefillCache, cache_key, prefill_cache
+from app.services.prefill_extraction import (
+    PREFILL_MAX_PAGES,
+    PrefillSuggestions,
+    process_document,
+    warm_up,
+)
+from app.services.process_pool import (
+    BoundedProcessPool,
+    PoolBusy,
+    PoolTaskFailed,
+    PoolTimeout,
+)
+
+
+PREFILL_WORKERS = 1
+PREFILL_QUEUE_SIZE = 8
+PREFILL_TIMEOUT_SECONDS = 10.0
+
+
+class ExtractorBusy(PoolBusy):
+    """Warteschlange voll; retry_after in Sekunden."""
+
+
+class ExtractionTimeout(PoolTimeout):
+    """Auswertung hat das Timeout überschritten."""
+
+
+class ExtractionFailed(PoolTaskFailed):
+    """Auswertung ist im Worker-Prozess fehlgeschlagen."""
+
+
+class PrefillExtractor(BoundedProcessPool):
+    """Begrenzter Prozess-Pool für Prefill-Auswertungen."""
+
+    busy_error = ExtractorBusy
+    timeout_error = ExtractionTimeout
+    failed_error = ExtractionFailed
+
+    def __init__(
+        self,
+        workers: int = PREFILL_WORKERS,
+        queue_size: int = PREFILL_QUEUE_SIZE,
+        timeout_seconds: float = PREFILL_TIMEOUT_SECONDS,
+        max_pages: int = PREFILL_MAX_PAGES,
+        extract_fn: Callable[[bytes, str, int], PrefillSuggestions] = process_document,
+        initializer: Callable[[], None] | None = None,
+        cache: PrefillCache | None = None,
+    ):
+        super().__init__(workers, queue_size, timeout_seconds, initializer)
+        self._max_pages = max_pages
+        self._extract_fn = extract_fn
+        self._cache = cache
+
+    def configure(
+        self,
+        *,
+        workers: int,
+        queue_size: int,
+        timeout_seconds: float,
+        max_pages: int = PREFILL_MAX_PAGES,
+        initializer: Callable[[], None] | None = warm_up,
+    ) -> None:
+        """Übernimmt die Settings (Lifespan); ein bestehender Pool wird beendet."""
+        super().configure(
+            workers=workers,
+            queue_size=queue_size,
+            timeout_seconds=timeout_seconds,
+            initializer=initializer,
+        )
+        self._max_pages = max(1, max_pages)
+
+    async def extract(self, content: bytes, file_type: str) -> PrefillSuggestions:
+        """
+        Wertet einen Beleg im Pool aus; bereits ausgewertete Belege kommen
+        aus dem Cache.
+
+        Raises:
+            ExtractorBusy: Warteschlange voll
+            ExtractionTimeout: Timeout überschritten
+            ExtractionFailed: Fehler im Worker
+        """
+        if file_type != "pdf":
+            # Keine Auswertung (nur Hinweis), kein Worker nötig
+            return process_document(content, file_type, self._max_pages)
+
+        cache = self._cache if self._cache is not None and self._cache.enabled else None
+        if cache is None:
+            return await self._run(self._extract_fn, content, file_type, self._max_pages)
+
+        key = cache_key(content, self._max_pages)
+        suggestions = cache.get(key)
+        if suggestions is None:
+            suggestions = await self._run(self._extract_fn, content, file_type, self._max_pages)
+            cache.put(key, suggestions)
+        return suggestions
+
+
+prefill_extractor = PrefillExtractor(initializer=warm_up, cache=prefill_cache)
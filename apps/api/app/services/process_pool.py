@@ -0,0 +1,253 @@
+"""
+Process Pool - Begrenzter Prozess-Pool für CPU-lastige Arbeit.
+
+Gemeinsame Grundlage von pdf_renderer (PDF-Layout) und prefill_extractor
+(Textextraktion aus Belegen). CPU-Arbeit im Event Loop blockiert alle
+anderen Requests des (einzigen) API-Workers, daher laufen solche Aufgaben
+in Worker-Prozessen.
+
+Verhalten:
+- Höchstens `workers` Aufgaben laufen parallel, weitere `queue_size`
+  warten; darüber hinaus wird sofort busy_error geworfen
+  (API: 503 mit Retry-After)
+- Wartende Aufgaben warten vor dem Executor (Semaphore mit `workers`
+  Plätzen), nicht in dessen Queue
+- Jede Aufgabe hat ein Timeout ab dem Start im Worker, die Wartezeit
+  zählt nicht mit; danach werden die Worker-Prozesse
+  beendet und der Pool neu erstellt (ein laufender Prozess lässt sich
+  nicht anders abbrechen). Aufgaben, die dabei mit abbrechen, werden
+  einmal auf dem neuen Pool wiederholt
+- Retry-After schätzt die Wartezeit aus der mittleren Laufzeit
+- stats() liefert Warteschlangentiefe, Zähler und Laufzeiten (Metriken)
+- Jeder Worker führt beim Start initializer aus; start() startet alle
+  Worker vorab
+
+WICHTIG:
+- Prozesslokal; die API läuft mit einem Worker
+- Worker werden per "spawn" gestartet: fork aus einem Prozess mit
+  laufendem Event Loop und Prisma-Engine-Threads ist nicht sicher
+- Aufgaben-Funktionen müssen picklebar sein (Modul-Funktionen)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+# Startwert für Retry-After, solange keine Laufzeit gemessen wurde
+_INITIAL_TASK_SECONDS = 1.0
+# Gewicht einer neuen Messung im gleitenden Mittel
+_DURATION_SMOOTHING = 0.2
+
+
+class PoolBusy(Exception):
+    """Warteschlange voll; retry_after in Sekunden."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Process pool busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PoolTimeout(Exception):
+    """Aufgabe hat das Timeout überschritten."""
+
+
+class PoolTaskFailed(Exception):
+    """Aufgabe ist im Worker-Prozess fehlgeschlagen."""
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Momentaufnahme eines Pools (Metriken)."""
+
+    workers: int
+    queue_size: int
+    # Laufende plus wartende Aufgaben
+    pending: int
+    completed: int
+    failed: int
+    timeouts: int
+    rejected: int
+    # Gleitende Mittel: Laufzeit im Worker bzw. Wartezeit davor
+    avg_run_ms: float
+    avg_wait_ms: float
+    max_run_ms: float
+
+
+def _noop() -> None:
+    """Startet einen Worker (inkl. initializer), ohne etwas zu tun."""
+
+
+def _timed_call(task_fn: Callable[..., Any], *args: Any) -> tuple[Any, float]:
+    """Läuft im Worker: führt die Aufgabe aus und misst die reine Laufzeit."""
+    started = time.perf_counter()
+    result = task_fn(*args)
+    return result, time.perf_counter() - started
+
+
+class BoundedProcessPool:
+    """Begrenzter Prozess-Pool; Unterklassen legen die Fehlerklassen fest."""
+
+    busy_error: type[PoolBusy] = PoolBusy
+    timeout_error: type[PoolTimeout] = PoolTimeout
+    failed_error: type[PoolTaskFailed] = PoolTaskFailed
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        timeout_seconds: float,
+        initializer: Callable[[], None] | None = None,
+    ):
+        self._workers = max(1, workers)
+        self._queue_size = max(0, queue_size)
+        self._timeout = timeout_seconds
+        self._initializer = initializer
+        self._pool: ProcessPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._slots_loop: asyncio.AbstractEventLoop | None = None
+        self._pending = 0
+        self._avg_seconds = _INITIAL_TASK_SECONDS
+        self._avg_wait_seconds = 0.0
+        self._max_seconds = 0.0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._rejected = 0
+
+    def configure(
+        self,
+        *,
+        workers: int,
+        queue_size: int,
+        timeout_seconds: float,
+        initializer: Callable[[], None] | None = None,
+    ) -> None:
+        """Übernimmt die Settings (Lifespan); ein bestehender Pool wird beendet."""
+        self.shutdown()
+        self._slots = None
+        self._workers = max(1, workers)
+        self._queue_size = max(0, queue_size)
+        self._timeout = timeout_seconds
+        self._initializer = initializer
+
+    def start(self) -> None:
+        """Startet alle Worker im Hintergrund (Lifespan), damit die erste Aufgabe warm ist."""
+        pool = self._ensure_pool()
+        for _ in range(self._workers):
+            pool.submit(_noop)
+
+    @property
+    def capacity(self) -> int:
+        """Laufende plus wartende Aufgaben."""
+        return self._workers + self._queue_size
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def retry_after(self) -> int:
+        """Geschätzte Sekunden, bis wieder ein Platz frei ist."""
+        waves = self._pending // self._workers + 1
+        return max(1, math.ceil(waves * self._avg_seconds))
+
+    def stats(self) -> PoolStats:
+        return PoolStats(
+            workers=self._workers,
+            queue_size=self._queue_size,
+            pending=self._pending,
+            completed=self._completed,
+            failed=self._failed,
+            timeouts=self._timeouts,
+            rejected=self._rejected,
+            avg_run_ms=round(self._avg_seconds * 1000, 1),
+            avg_wait_ms=round(self._avg_wait_seconds * 1000, 1),
+            max_run_ms=round(self._max_seconds * 1000, 1),
+        )
+
+    async def _run(self, task_fn: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.capacity:
+            self._rejected += 1
+            raise self.busy_error(self.retry_after())
+
+        self._pending += 1
+        queued = time.perf_counter()
+        try:
+            # Nur so viele Aufgaben im Executor, wie Worker frei sind; das
+            # Timeout läuft erst ab hier
+            async with self._worker_slots():
+                try:
+                    return await self._submit(task_fn, args, queued)
+                except BrokenProcessPool:
+                    # Pool wurde wegen eines anderen Timeouts neu erstellt
+                    return await self._submit(task_fn, args, queued)
+        except BrokenProcessPool as exc:
+            self._failed += 1
+            raise self.failed_error("Worker process died") from exc
+        finally:
+            self._pending -= 1
+
+    def _worker_slots(self) -> asyncio.Semaphore:
+        """Semaphore mit `workers` Plätzen (je Event Loop, Tests nutzen eigene Loops)."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self._workers)
+            self._slots_loop = loop
+        return self._slots
+
+    async def _submit(self, task_fn: Callable[..., Any], args: tuple, queued: float) -> Any:
+        pool = self._ensure_pool()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(pool, _timed_call, task_fn, *args)
+        try:
+            result, seconds = await asyncio.wait_for(future, self._timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            self._reset_pool(pool)
+            raise self.timeout_error(f"Task exceeded {self._timeout}s") from None
+        except BrokenProcessPool:
+            self._reset_pool(pool)
+            raise
+        except Exception as exc:
+            self._failed += 1
+            raise self.failed_error(str(exc)) from exc
+
+        waited = max(0.0, time.perf_counter() - queued - seconds)
+        if self._completed == 0:
+            # Erste Messung ersetzt den Startwert
+            self._avg_seconds, self._avg_wait_seconds = seconds, waited
+        self._completed += 1
+        self._avg_seconds += _DURATION_SMOOTHING * (seconds - self._avg_seconds)
+        self._avg_wait_seconds += _DURATION_SMOOTHING * (waited - self._avg_wait_seconds)
+        self._max_seconds = max(self._max_seconds, seconds)
+        return result
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self._initializer,
+            )
+        return self._pool
+
+    def _reset_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Beendet die Prozesse eines Pools; der nächste Aufruf erstellt einen neuen."""
+        if self._pool is pool:
+            self._pool = None
+        # ProcessPoolExecutor bietet keinen Abbruch laufender Aufgaben
+        for process in list((pool._processes or {}).values()):
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
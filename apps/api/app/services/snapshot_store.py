@@ -0,0 +1,299 @@
+"""
+Snapshot Store - Content-addressed Speicherung von Snapshot-Payloads.
+
+CaseSnapshots speichern fields_json und validation_json nicht inline,
+sondern referenzieren SnapshotBlobs über deren Hash. Identische Payloads
+(Reopen/Resubmit ohne Änderung, gleiche Validierungsergebnisse, Vorlagen)
+werden nur einmal gespeichert.
+
+Felddaten als Delta-Kette (siehe domain/snapshot_delta.py):
+- delta_hash: Delta zum vorherigen Snapshot (fehlt nur beim ersten)
+- fields_hash: vollständige Felddaten, nur bei Keyframes
+- keyframe_version: Version des Keyframes, ab dem rekonstruiert wird
+
+Hash:
+- SHA-256 über die kanonische JSONB-Textform (Postgres sortiert Keys und
+  normalisiert Whitespace)
+- Wird in der Datenbank berechnet, damit API und Migrationen
+  (0017_snapshot_blobs, 0018_snapshot_deltas) dieselben Hashes erzeugen
+
+Lesen:
+- Snapshots mit SNAPSHOT_PAYLOAD_INCLUDE laden; den letzten Snapshot
+  mehrerer Fälle über latest_snapshots()
+- Felddaten über load_snapshot_fields() / load_fields() (Keyframes ohne
+  weitere Query), Validierung über snapshot_validation()
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from app.core.json import normalize_to_json
+from app.db.prisma_client import prisma
+from app.domain.snapshot_delta import (
+    SnapshotLink,
+    compute_delta,
+    diff_chain,
+    diff_fields,
+    invert_changes,
+    is_keyframe_due,
+    materialize,
+    use_delta_diff,
+)
+
+
+# Include für Snapshot-Queries, die Payloads benötigen
+SNAPSHOT_PAYLOAD_INCLUDE = {"fields_blob": True, "validation_blob": True}
+
+# Include für Ketten-Queries (Keyframe + Deltas)
+SNAPSHOT_CHAIN_INCLUDE = {"fields_blob": True, "delta_blob": True}
+
+# Speichert alle Payloads eines JSON-Arrays in einem Roundtrip und liefert
+# die Hashes in Eingabereihenfolge. Bereits vorhandene Blobs bleiben unverändert.
+_PUT_BLOBS_SQL = """
+WITH payload AS (
+    SELECT value AS content, ordinality AS position
+    FROM jsonb_array_elements($1::jsonb) WITH ORDINALITY
+), hashed AS (
+    SELECT encode(sha256(convert_to(content::text, 'UTF8')), 'hex') AS hash, content, position
+    FROM payload
+), inserted AS (
+    INSERT INTO "SnapshotBlob" ("hash", "content", "size_bytes")
+    SELECT DISTINCT ON (hash) hash, content, octet_length(content::text)
+    FROM hashed
+    ON CONFLICT ("hash") DO NOTHING
+)
+SELECT hash FROM hashed ORDER BY position
+"""
+
+
+# Letzter Snapshot je Fall (Index case_id, version); Fall-IDs als JSON-Array.
+# Prismas distinct=["case_id"] filtert erst in der Query-Engine und lädt dafür
+# alle Snapshots der Fälle samt Payloads.
+_LATEST_SNAPSHOT_IDS_SQL = """
+SELECT DISTINCT ON ("case_id") "id"
+FROM "CaseSnapshot"
+WHERE "case_id" IN (SELECT jsonb_array_elements_text($1::jsonb))
+ORDER BY "case_id", "version" DESC
+"""
+
+
+async def latest_snapshots(
+    case_ids: list[str],
+    include: dict[str, Any] | None = None,
+    client: Any = None,
+) -> dict[str, Any]:
+    """
+    Letzter Snapshot je Fall (Fall-ID -> Snapshot), zwei Queries: die IDs
+    per DISTINCT ON, dann nur diese Snapshots mit include.
+    """
+    if not case_ids:
+        return {}
+    db = client or prisma
+    rows = await db.query_raw(_LATEST_SNAPSHOT_IDS_SQL, json.dumps(case_ids))
+    if not rows:
+        return {}
+    snapshots = await db.casesnapshot.find_many(
+        where={"id": {"in": [row["id"] for row in rows]}},
+        include=include,
+    )
+    return {snapshot.case_id: snapshot for snapshot in snapshots}
+
+
+async def put_blobs(values: list[Any], client: Any = None) -> list[str]:
+    """
+    Speichert Payloads content-addressed und liefert deren Hashes.
+
+    Args:
+        values: JSON-serialisierbare Payloads
+        client: Prisma-Client oder Transaktion (Default: globaler Client)
+    """
+    if not values:
+        return []
+    db = client or prisma
+    payload = json.dumps(normalize_to_json(values).data)
+    rows = await db.query_raw(_PUT_BLOBS_SQL, payload)
+    return [row["hash"] for row in rows]
+
+
+def _link(row: Any) -> SnapshotLink:
+    fields_blob = getattr(row, "fields_blob", None)
+    delta_blob = getattr(row, "delta_blob", None)
+    return SnapshotLink(
+        version=row.version,
+        keyframe=fields_blob.content if fields_blob else None,
+        delta=delta_blob.content if delta_blob else None,
+    )
+
+
+async def _load_chains(snapshots: list[Any], db: Any) -> dict[str, list[SnapshotLink]]:
+    """
+    Lädt die Ketten (Keyframe bis Snapshot) mehrerer Snapshots in einer Query.
+
+    Returns:
+        Snapshot-ID -> Kette aufsteigend nach Version
+    """
+    if not snapshots:
+        return {}
+    rows = await db.casesnapshot.find_many(
+        where={
+            "OR": [
+                {"case_id": s.case_id, "version": {"gte": s.keyframe_version, "lte": s.version}}
+                for s in snapshots
+            ]
+        },
+        order=[{"case_id": "asc"}, {"version": "asc"}],
+        include=SNAPSHOT_CHAIN_INCLUDE,
+    )
+    by_case: dict[str, list[Any]] = {}
+    for row in rows:
+        by_case.setdefault(row.case_id, []).append(row)
+    return {
+        s.id: [
+            _link(row)
+            for row in by_case.get(s.case_id, [])
+            if s.keyframe_version <= row.version <= s.version
+        ]
+        for s in snapshots
+    }
+
+
+async def load_fields(snapshots: list[Any], client: Any = None) -> dict[str, dict[str, Any]]:
+    """
+    Felddaten mehrerer Snapshots (Snapshot-ID -> Felder).
+
+    Keyframes, die mit SNAPSHOT_PAYLOAD_INCLUDE geladen wurden, benötigen
+    keine Query; alle übrigen werden gemeinsam über ihre Ketten aufgelöst.
+    """
+    result: dict[str, dict[str, Any]] = {}
+    pending = []
+    for snapshot in snapshots:
+        fields_blob = getattr(snapshot, "fields_blob", None)
+        if fields_blob is not None:
+            result[snapshot.id] = fields_blob.content
+        else:
+            pending.append(snapshot)
+
+    chains = await _load_chains(pending, client or prisma)
+    for snapshot in pending:
+        result[snapshot.id] = materialize(chains[snapshot.id])
+    return result
+
+
+async def load_snapshot_fields(snapshot: Any, client: Any = None) -> dict[str, Any]:
+    """Felddaten eines einzelnen Snapshots."""
+    return (await load_fields([snapshot], client=client))[snapshot.id]
+
+
+async def create_snapshot(
+    *,
+    case_id: str,
+    version: int,
+    procedure_code: str,
+    procedure_version: str,
+    fields: dict[str, Any],
+    validation: dict[str, Any],
+    client: Any = None,
+):
+    """
+    Legt einen CaseSnapshot an.
+
+    Felddaten werden als Delta zum vorherigen Snapshot gespeichert; nach
+    SNAPSHOT_KEYFRAME_INTERVAL Snapshots zusätzlich als Keyframe.
+    Idempotent: existiert der Snapshot der Version bereits, wird er
+    unverändert zurückgegeben.
+    """
+    db = client or prisma
+    fields = normalize_to_json(fields).data
+    previous = await db.casesnapshot.find_first(
+        where={"case_id": case_id, "version": {"lte": version}},
+        order={"version": "desc"},
+        include=SNAPSHOT_CHAIN_INCLUDE,
+    )
+    if previous and previous.version == version:
+        return previous
+
+    delta = None
+    keyframe_version = version
+    if previous:
+        if previous.fields_blob is not None:
+            chain = [_link(previous)]
+        else:
+            chain = (await _load_chains([previous], db))[previous.id]
+        delta = compute_delta(materialize(chain), fields)
+        if not is_keyframe_due(len(chain)):
+            keyframe_version = previous.keyframe_version
+    is_keyframe = keyframe_version == version
+
+    payloads = [validation]
+    if is_keyframe:
+        payloads.append(fields)
+    if delta is not None:
+        payloads.append(delta)
+    hashes = iter(await put_blobs(payloads, client=db))
+
+    validation_hash = next(hashes)
+    return await db.casesnapshot.create(
+        data={
+            "case_id": case_id,
+            "version": version,
+            "procedure_code": procedure_code,
+            "procedure_version": procedure_version,
+            "keyframe_version": keyframe_version,
+            "fields_hash": next(hashes) if is_keyframe else None,
+            "delta_hash": next(hashes) if delta is not None else None,
+            "validation_hash": validation_hash,
+        }
+    )
+
+
+async def diff_snapshots(
+    case_id: str,
+    from_version: int,
+    to_version: int,
+    client: Any = None,
+) -> list[dict[str, Any]] | None:
+    """
+    Änderungen der Felddaten von from_version nach to_version.
+
+    Nahe Versionen (siehe use_delta_diff) werden über die Delta-Kette
+    verglichen, ohne beide Versionen vollständig zu rekonstruieren. Bei
+    großem Abstand werden beide Versionen ab ihren Keyframes aufgebaut.
+    Jeweils zwei Queries.
+
+    Returns:
+        Änderungen (siehe diff_chain) oder None, wenn eine Version fehlt
+    """
+    db = client or prisma
+    low, high = sorted((from_version, to_version))
+    endpoints = await db.casesnapshot.find_many(
+        where={"case_id": case_id, "version": {"in": [low, high]}},
+        order={"version": "asc"},
+    )
+    if not endpoints or endpoints[0].version != low or endpoints[-1].version != high:
+        return None
+    base, target = endpoints[0], endpoints[-1]
+
+    if use_delta_diff(low, high):
+        rows = await db.casesnapshot.find_many(
+            where={"case_id": case_id, "version": {"gte": base.keyframe_version, "lte": high}},
+            order={"version": "asc"},
+            include=SNAPSHOT_CHAIN_INCLUDE,
+        )
+        links = [_link(row) for row in rows]
+        changes = diff_chain(
+            [link for link in links if link.version <= low],
+            [link for link in links if link.version > low],
+        )
+    else:
+        chains = await _load_chains([base, target], db)
+        changes = diff_fields(materialize(chains[base.id]), materialize(chains[target.id]))
+
+    return invert_changes(changes) if from_version > to_version else changes
+
+
+def snapshot_validation(snapshot: Any) -> dict[str, Any]:
+    """Validierungsergebnis eines mit SNAPSHOT_PAYLOAD_INCLUDE geladenen Snapshots."""
+    blob = getattr(snapshot, "validation_blob", None)
+    return blob.content if blob else {}
@@ -0,0 +1,104 @@
+"""
+Summary Cache - In-Process-Cache für Case-Summaries.
+
+Gemeinsam genutzt von GET /cases/{id}/summary und der PDF-Erstellung.
+
+Key: (case_id, version, procedure_code, procedure_version)
+- version ändert sich bei Reopen, daher entspricht ein Eintrag für eine
+  abgegebene Version immer dem Snapshot dieser Version
+- Einträge für bearbeitbare Fälle werden bei Feld-Änderungen und Reopen
+  über invalidate(case_id) verworfen
+- Feld-Änderungen erhöhen case.version nicht: Wer eine Summary aus der
+  Datenbank erzeugt, holt vor dem Lesen generation(case_id) und übergibt
+  sie an put(). Wurde der Fall inzwischen invalidiert, wird die (evtl.
+  aus alten Feldern erzeugte) Summary nicht gespeichert
+
+WICHTIG:
+- Prozesslokal (wie der Procedure-Cache); die API läuft mit einem Worker
+- Begrenzt auf SUMMARY_CACHE_MAX_ENTRIES (LRU)
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from app.domain.summary import CaseSummary
+
+
+SUMMARY_CACHE_MAX_ENTRIES = 1024
+
+SummaryKey = tuple[str, int, str, str]
+# (Epoche, Zähler des Falls), siehe SummaryCache.generation
+Generation = tuple[int, int]
+
+
+class SummaryCache:
+    """LRU-Cache für CaseSummary-Objekte."""
+
+    def __init__(self, max_entries: int = SUMMARY_CACHE_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[SummaryKey, CaseSummary] = OrderedDict()
+        self._by_case: dict[str, set[SummaryKey]] = {}
+        # Invalidierungen pro Fall, begrenzt auf max_entries Fälle (LRU)
+        self._generations: OrderedDict[str, int] = OrderedDict()
+        self._epoch = 0
+
+    def has_case(self, case_id: str) -> bool:
+        """True, wenn für den Fall mindestens ein Eintrag existiert."""
+        return case_id in self._by_case
+
+    def get(self, key: SummaryKey) -> CaseSummary | None:
+        summary = self._entries.get(key)
+        if summary is not None:
+            self._entries.move_to_end(key)
+        return summary
+
+    def generation(self, case_id: str) -> Generation:
+        """Stand der Invalidierungen eines Falls; vor dem Lesen der Felder holen."""
+        return (self._epoch, self._generations.get(case_id, 0))
+
+    def put(
+        self,
+        key: SummaryKey,
+        summary: CaseSummary,
+        generation: Generation | None = None,
+    ) -> None:
+        """
+        Speichert eine Summary.
+
+        Mit generation wird sie verworfen, wenn der Fall seitdem
+        invalidiert wurde (Felder während der Erzeugung geändert).
+        """
+        if generation is not None and generation != self.generation(key[0]):
+            return
+        self._entries[key] = summary
+        self._entries.move_to_end(key)
+        self._by_case.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self._max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._discard_index(evicted)
+
+    def invalidate(self, case_id: str) -> None:
+        """Verwirft alle Einträge eines Falls (Feld-Änderung, Reopen)."""
+        for key in self._by_case.pop(case_id, ()):
+            self._entries.pop(key, None)
+        self._generations[case_id] = self._generations.get(case_id, 0) + 1
+        self._generations.move_to_end(case_id)
+        if len(self._generations) > self._max_entries:
+            self._generations.popitem(last=False)
+            # Zähler vergessen: laufende Erzeugungen aller Fälle verwerfen
+            self._epoch += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_case.clear()
+
+    def _discard_index(self, key: SummaryKey) -> None:
+        keys = self._by_case.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_case[key[0]]
+
+
+summary_cache = SummaryCache()
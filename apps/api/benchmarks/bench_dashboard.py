@@ -0,0 +1,188 @@
+"""
+Benchmark: GET /dashboard-Aggregation bei 10k und 100k Fällen pro Mandant.
+
+Vergleicht pro Dashboard-Aufruf
+- einzeln: frühere Implementierung, 19 Abfragen (4 Status-count, find_first
+  für die letzte Aktivität, 7 Tage × 2 count)
+- aggregiert: _get_case_stats (GROUP BY status) und _get_daily_activity
+  (generate_series + date_trunc), zwei Abfragen parallel
+
+und prüft, dass beide identische Kennzahlen liefern (sonst Exit-Code 1).
+
+Benötigt eine migrierte PostgreSQL-Datenbank (DATABASE_URL) und den
+generierten Prisma-Client. Pro Größe wird ein temporärer Mandant mit
+Fällen über die letzten 90 Tage angelegt und danach wieder gelöscht.
+
+Ausführen (aus apps/api):
+    python -m benchmarks.bench_dashboard [--cases 10000 100000] [--iterations 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.prisma_client import prisma  # noqa: E402
+from app.routes.dashboard import (  # noqa: E402
+    CaseStatusCounts,
+    DailyActivity,
+    _get_case_stats,
+    _get_daily_activity,
+)
+
+
+# Fälle über die letzten 90 Tage; jeder dritte eingereicht
+_SEED_CASES_SQL = """
+INSERT INTO "Case" (
+    "id", "tenant_id", "created_by_user_id", "title", "status",
+    "created_at", "updated_at", "submitted_at"
+)
+SELECT gen_random_uuid()::text, $1, $2, 'Benchmark ' || n,
+       (ARRAY['DRAFT', 'IN_PROCESS', 'PREPARED', 'ARCHIVED'])[n % 4 + 1]::"CaseStatus",
+       created_at,
+       created_at + INTERVAL '2 hours',
+       CASE WHEN n % 3 = 0 THEN created_at + INTERVAL '1 day' END
+FROM (
+    SELECT n, NOW() AT TIME ZONE 'UTC' - (n % 90) * INTERVAL '1 day'
+              - (n % 1440) * INTERVAL '1 minute' AS created_at
+    FROM generate_series(1, $3::int) AS n
+) AS seed
+"""
+
+
+async def _legacy_metrics(tenant_id: str) -> tuple[CaseStatusCounts, Any, list[DailyActivity]]:
+    """Frühere Implementierung: eine Abfrage pro Status und pro Tag."""
+    counts = []
+    for status in ("DRAFT", "IN_PROCESS", "SUBMITTED", "ARCHIVED"):
+        # SUBMITTED ist veraltet; der Enum-Wert existiert ggf. nicht mehr
+        try:
+            counts.append(await prisma.case.count(where={"tenant_id": tenant_id, "status": status}))
+        except Exception:
+            counts.append(0)
+    latest = await prisma.case.find_first(
+        where={"tenant_id": tenant_id}, order={"updated_at": "desc"}
+    )
+
+    today = datetime.utcnow().date()
+    days = []
+    for i in range(6, -1, -1):
+        day = today - timedelta(days=i)
+        day_start = datetime(day.year, day.month, day.day)
+        day_end = datetime(day.year, day.month, day.day, 23, 59, 59, 999999)
+        created = await prisma.case.count(
+            where={"tenant_id": tenant_id, "created_at": {"gte": day_start, "lte": day_end}}
+        )
+        submitted = await prisma.case.count(
+            where={"tenant_id": tenant_id, "submitted_at": {"gte": day_start, "lte": day_end}}
+        )
+        days.append(
+            DailyActivity(date=day.isoformat(), cases_created=created, cases_submitted=submitted)
+        )
+
+    drafts, in_process, submitted_count, archived = counts
+    case_counts = CaseStatusCounts(
+        drafts=drafts,
+        in_process=in_process,
+        submitted=submitted_count,
+        archived=archived,
+        total=sum(counts),
+    )
+    return case_counts, latest.updated_at if latest else None, days
+
+
+async def _aggregated_metrics(tenant_id: str) -> tuple[CaseStatusCounts, Any, list[DailyActivity]]:
+    (case_counts, last_activity), days = await asyncio.gather(
+        _get_case_stats(tenant_id),
+        _get_daily_activity(tenant_id, days=7),
+    )
+    return case_counts, last_activity, days
+
+
+async def _measure(
+    variant: Callable[[str], Awaitable[Any]], tenant_id: str, iterations: int
+) -> tuple[list[float], Any]:
+    result = await variant(tenant_id)  # Warmlauf (Plan-Cache, Buffer)
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = await variant(tenant_id)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, result
+
+
+async def _seed(cases: int) -> tuple[str, str]:
+    tenant = await prisma.tenant.create(data={"name": f"Benchmark {cases}"})
+    user = await prisma.user.create(
+        data={"email": f"bench-{uuid.uuid4()}@example.invalid", "password_hash": "-"}
+    )
+    await prisma.execute_raw(_SEED_CASES_SQL, tenant.id, user.id, cases)
+    await prisma.execute_raw('ANALYZE "Case"')
+    return tenant.id, user.id
+
+
+async def _cleanup(tenant_id: str, user_id: str) -> None:
+    await prisma.case.delete_many(where={"tenant_id": tenant_id})
+    await prisma.user.delete(where={"id": user_id})
+    await prisma.tenant.delete(where={"id": tenant_id})
+
+
+async def main_async(sizes: list[int], iterations: int) -> bool:
+    await prisma.connect()
+    identical = True
+    try:
+        print(f"{'Fälle':>8}  {'Variante':<11}{'Abfragen':>9}{'p50 ms':>9}{'p95 ms':>9}")
+        for cases in sizes:
+            tenant_id, user_id = await _seed(cases)
+            try:
+                legacy, legacy_result = await _measure(_legacy_metrics, tenant_id, iterations)
+                aggregated, aggregated_result = await _measure(
+                    _aggregated_metrics, tenant_id, iterations
+                )
+            finally:
+                await _cleanup(tenant_id, user_id)
+
+            for name, queries, timings in (
+                ("einzeln", 19, legacy),
+                ("aggregiert", 2, aggregated),
+            ):
+                timings = sorted(timings)
+                p95 = timings[min(len(timings) - 1, int(0.95 * len(timings)))]
+                print(
+                    f"{cases:>8}  {name:<11}{queries:>9}"
+                    f"{statistics.median(timings):>9.2f}{p95:>9.2f}"
+                )
+            speedup = statistics.median(legacy) / statistics.median(aggregated)
+            print(f"{'':>8}  Faktor {speedup:.1f}x")
+
+            if legacy_result != aggregated_result:
+                identical = False
+                print(f"  ABWEICHUNG bei {cases} Fällen:")
+                print(f"    einzeln:    {legacy_result}")
+                print(f"    aggregiert: {aggregated_result}")
+    finally:
+        await prisma.disconnect()
+    return identical
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cases", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    if not asyncio.run(main_async(args.cases, args.iterations)):
+        sys.exit(1)
+    print("\nIdentische Kennzahlen in beiden Varianten")
+
+
+if __name__ == "__main__":
+    main()
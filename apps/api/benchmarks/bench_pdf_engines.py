@@ -0,0 +1,116 @@
+"""
+Benchmark: PDF-Engines im Vergleich (WeasyPrint vs. native).
+
+Misst pro Engine und Verfahren (IZA, IPK, IAA) die Renderdauer eines
+typischen Snapshots (render_document_to_file, wie im Prozess-Pool) sowie
+den Spitzen-RSS eines Render-Prozesses. Jede Engine läuft in einem
+eigenen, per "spawn" gestarteten Prozess (wie die Pool-Worker), damit
+sich Imports und Caches der Engines nicht gegenseitig beeinflussen.
+
+Spalten:
+- warm-up ms: Worker-Initializer (WeasyPrint: warm_up, native: keiner)
+- ms/PDF: mittlere Renderdauer nach dem Warm-up
+- RSS MB: Spitzen-RSS des Prozesses nach allen Renderings
+
+WeasyPrint benötigt die Systembibliotheken (Pango); fehlen sie, wird die
+Engine als nicht verfügbar ausgewiesen.
+
+Ausführen (aus apps/api):
+    python -m benchmarks.bench_pdf_engines [--iterations 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_pdf_render import SNAPSHOTS  # noqa: E402
+
+
+def _measure(engine: str, iterations: int) -> dict:
+    """Läuft im Kindprozess: Warm-up, Renderings, Spitzen-RSS."""
+    from app.services.pdf_service import PDFService, render_document_to_file
+
+    service = PDFService(engine=engine)
+    started = time.perf_counter()
+    try:
+        if service.worker_initializer is not None:
+            service.worker_initializer()
+    except OSError as exc:
+        # WeasyPrint ohne Pango
+        return {"error": str(exc).split(": ")[0]}
+    warm_up_ms = (time.perf_counter() - started) * 1000
+
+    per_procedure = {}
+    with tempfile.TemporaryDirectory() as directory:
+        target = os.path.join(directory, "out.pdf")
+        for procedure_code, fields in SNAPSHOTS.items():
+            document = service.build_document(
+                case_id=f"bench-{procedure_code.lower()}-0001",
+                version=1,
+                procedure_code=procedure_code,
+                procedure_version="v1",
+                procedure_name=procedure_code,
+                fields_json=fields,
+                request_id=None,
+            )
+            size = render_document_to_file(document, target)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                render_document_to_file(document, target)
+            per_procedure[procedure_code] = (
+                (time.perf_counter() - started) / iterations * 1000,
+                size,
+            )
+
+    # ru_maxrss: Kilobyte unter Linux
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"warm_up_ms": warm_up_ms, "procedures": per_procedure, "rss_mb": rss_mb}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for engine in ("weasyprint", "native"):
+        with context.Pool(1) as pool:
+            results[engine] = pool.apply(_measure, (engine, args.iterations))
+
+    for engine, result in results.items():
+        if "error" in result:
+            print(f"{engine}: nicht verfügbar ({result['error']})")
+            continue
+        print(f"{engine}: warm-up {result['warm_up_ms']:.1f} ms, RSS {result['rss_mb']:.1f} MB")
+    print()
+
+    print(f"{'Verfahren':<10}{'Engine':<12}{'ms/PDF':>9}{'KB':>8}")
+    for procedure_code in SNAPSHOTS:
+        for engine, result in results.items():
+            if "error" in result:
+                continue
+            ms, size = result["procedures"][procedure_code]
+            print(f"{procedure_code:<10}{engine:<12}{ms:>9.2f}{size / 1024:>8.1f}")
+
+    if all("error" not in result for result in results.values()):
+        weasy, native = results["weasyprint"], results["native"]
+        speedups = [
+            weasy["procedures"][code][0] / native["procedures"][code][0] for code in SNAPSHOTS
+        ]
+        print()
+        print(f"native schneller: {min(speedups):.0f}x bis {max(speedups):.0f}x")
+        print(f"RSS: {weasy['rss_mb']:.1f} MB -> {native['rss_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
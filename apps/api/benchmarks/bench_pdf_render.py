@@ -0,0 +1,127 @@
+"""
+Benchmark: PDF-Rendering mit und ohne wiederverwendete WeasyPrint-Ressourcen.
+
+Misst pro Verfahren (IZA, IPK, IAA) die Renderdauer eines typischen
+Snapshots
+- vorher: Stylesheet inline im HTML, Fonts bei jedem Rendering neu
+  eingerichtet (frühere Implementierung)
+- nachher: render_html_to_pdf mit vorab geparstem CSS und gemeinsamer
+  FontConfiguration (nach warm_up)
+
+Benötigt die WeasyPrint-Systembibliotheken (Pango).
+
+Ausführen (aus apps/api):
+    python -m benchmarks.bench_pdf_render [--iterations 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.pdf_service import (  # noqa: E402
+    PDF_STYLESHEET,
+    pdf_service,
+    render_html_to_pdf,
+    warm_up,
+)
+
+
+SNAPSHOTS = {
+    "IZA": {
+        "contents_description": "Bluetooth-Kopfhörer",
+        "value_amount": 89.90,
+        "value_currency": "EUR",
+        "origin_country": "CN",
+        "sender_name": "Shenzhen Audio Ltd",
+        "sender_country": "CN",
+        "recipient_full_name": "Max Mustermann",
+        "recipient_address": "Musterstr. 1",
+        "recipient_city": "Berlin",
+        "recipient_postcode": "10115",
+        "recipient_country": "DE",
+        "commercial_goods": False,
+        "remarks": None,
+    },
+    "IPK": {
+        "goods_description": "Ersatzteile Fahrrad",
+        "quantity": 3,
+        "weight_kg": 2.4,
+        "sender_name": "Bike Parts Inc.",
+        "sender_country": "US",
+        "recipient_name": "Erika Musterfrau",
+        "recipient_country": "DE",
+        "value_amount": 240.00,
+        "value_currency": "USD",
+        "origin_country": "US",
+    },
+    "IAA": {
+        "goods_description": "Handgefertigte Keramik",
+        "quantity": 12,
+        "weight_kg": 8.5,
+        "sender_name": "Töpferei Beispiel GmbH",
+        "sender_country": "DE",
+        "recipient_name": "Ceramics Store Ltd",
+        "recipient_country": "GB",
+        "value_amount": 640.00,
+        "value_currency": "EUR",
+        "export_type": "sale",
+    },
+}
+
+
+def _html(procedure_code: str) -> str:
+    return pdf_service.build_html(
+        case_id=f"bench-{procedure_code.lower()}-0001",
+        version=1,
+        procedure_code=procedure_code,
+        procedure_version="v1",
+        procedure_name=procedure_code,
+        fields_json=SNAPSHOTS[procedure_code],
+        request_id=None,
+    )
+
+
+def _legacy_render(html: str) -> bytes:
+    """Referenz: Stylesheet inline, keine wiederverwendeten Ressourcen."""
+    from weasyprint import HTML
+
+    inline = html.replace("</head>", f"<style>{PDF_STYLESHEET}</style></head>", 1)
+    buffer = BytesIO()
+    HTML(string=inline).write_pdf(buffer)
+    return buffer.getvalue()
+
+
+def _ms_per_render(render, html: str, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        render(html)
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    warm_up()
+    print(f"warm_up: {(time.perf_counter() - started) * 1000:.1f} ms")
+    print()
+
+    print(f"{'Verfahren':<10}{'vorher ms':>11}{'nachher ms':>12}{'Faktor':>9}")
+    for procedure_code in SNAPSHOTS:
+        html = _html(procedure_code)
+        _legacy_render(html)
+        legacy = _ms_per_render(_legacy_render, html, args.iterations)
+        warm = _ms_per_render(render_html_to_pdf, html, args.iterations)
+        print(f"{procedure_code:<10}{legacy:>11.1f}{warm:>12.1f}{legacy / warm:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
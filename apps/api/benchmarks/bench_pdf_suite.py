@@ -0,0 +1,286 @@
+"""
+Benchmark-Suite: PDFService.generate_pdf mit Baseline-Vergleich.
+
+Rendert synthetische Snapshots für IZA, IPK und IAA in drei Größen
+- small: nur wenige Pflichtangaben
+- typical: typischer Snapshot (SNAPSHOTS aus bench_pdf_render)
+- large: lange Freitexte plus 200 Positionsfelder (mehrseitige PDFs)
+
+und misst pro Fall (über --iterations, nach einem Warm-up):
+- wall_ms: Wanduhrzeit eines generate_pdf-Aufrufs (getrimmtes Mittel,
+  nur Anzeige)
+- cpu_ms: CPU-Zeit des Prozesses (time.process_time), Minimum der
+  Iterationen; Scheduler, andere Prozesse und GC-Läufe verlängern einzelne
+  Messungen nur, das Minimum ist daher die stabilste Kennzahl
+- peak_rss_mb: Spitzen-RSS nach allen Renderings
+- size_bytes: Größe des PDFs
+
+Jeder Fall läuft in einem eigenen, per "spawn" gestarteten Prozess, damit
+der Spitzen-RSS nicht von vorherigen Fällen stammt. Alle Fälle werden in
+--rounds Durchgängen nacheinander gemessen; so fallen Lastphasen der
+Maschine nicht auf einen einzelnen Fall, und das Minimum stammt aus der
+ruhigsten Phase.
+
+Baseline:
+- --update-baseline schreibt die Messung nach --baseline (Standard:
+  benchmarks/baselines/pdf_suite_<engine>.json)
+- sonst wird gegen die Baseline verglichen; liegt eine geprüfte Metrik
+  (GATED_METRICS: cpu_ms, peak_rss_mb, size_bytes) mehr als --threshold
+  plus Rauschmaß über dem Baseline-Wert, endet das Skript mit Exit-Code 1
+- das Rauschmaß wächst mit dem Baseline-Wert (NOISE_FLOOR: absolut und
+  relativ); wall_ms wird nicht geprüft, da sie auf geteilten Maschinen
+  vor allem die Last anderer Prozesse misst
+- Zeiten sind maschinenabhängig: Baseline auf derselben Maschine vor der
+  Änderung erzeugen; abweichende Umgebungen werden gemeldet
+
+Ausführen (aus apps/api):
+    python -m benchmarks.bench_pdf_suite [--engine native] [--iterations 30] [--rounds 5]
+    python -m benchmarks.bench_pdf_suite --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.bench_pdf_render import SNAPSHOTS  # noqa: E402
+
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+SIZES = ("small", "typical", "large")
+METRICS = ("wall_ms", "cpu_ms", "peak_rss_mb", "size_bytes")
+GATED_METRICS = ("cpu_ms", "peak_rss_mb", "size_bytes")
+
+# Rauschmaß je Metrik: (absolut, relativ zum Baseline-Wert); es gilt der
+# größere Wert. Kurze Renderings (~1 ms) schwanken um fast 1 ms, lange um
+# rund 10 %
+NOISE_FLOOR = {"cpu_ms": (1.0, 0.1), "peak_rss_mb": (2.0, 0.0), "size_bytes": (512, 0.0)}
+
+# Anteil der schnellsten und langsamsten Messungen, die für wall_ms
+# verworfen werden
+TRIM = 0.2
+
+SMALL_SNAPSHOTS = {
+    "IZA": {
+        "contents_description": "Buch",
+        "value_amount": 12.50,
+        "value_currency": "EUR",
+        "origin_country": "GB",
+    },
+    "IPK": {
+        "goods_description": "Ersatzteil",
+        "value_amount": 20.00,
+        "value_currency": "EUR",
+    },
+    "IAA": {
+        "goods_description": "Keramik",
+        "value_amount": 50.00,
+        "value_currency": "EUR",
+    },
+}
+
+
+def _large(fields: dict) -> dict:
+    """Typischer Snapshot mit langen Freitexten und 200 Positionsfeldern."""
+    large = {
+        key: " ".join([value] * 120) if isinstance(value, str) and len(value) > 3 else value
+        for key, value in fields.items()
+    }
+    large["remarks"] = " ".join(["Bitte Sendung bei Zustellung sorgfältig prüfen."] * 150)
+    for index in range(1, 201):
+        large[f"item_{index:03d}_description"] = f"Position {index}: Ersatzteil Typ {index % 7}"
+    return large
+
+
+def snapshot_fields(procedure_code: str, size: str) -> dict:
+    if size == "small":
+        return SMALL_SNAPSHOTS[procedure_code]
+    if size == "typical":
+        return SNAPSHOTS[procedure_code]
+    return _large(SNAPSHOTS[procedure_code])
+
+
+def _trimmed_mean(samples: list[float]) -> float:
+    ordered = sorted(samples)
+    cut = int(len(ordered) * TRIM)
+    return statistics.fmean(ordered[cut:len(ordered) - cut])
+
+
+def _measure(engine: str, procedure_code: str, size: str, iterations: int) -> dict:
+    """Läuft im Kindprozess: Warm-up, Renderings, Spitzen-RSS."""
+    from app.services.pdf_service import PDFService
+
+    service = PDFService(engine=engine)
+    fields = snapshot_fields(procedure_code, size)
+
+    def render() -> bytes:
+        return service.generate_pdf(
+            case_id=f"bench-{procedure_code.lower()}-{size}",
+            version=1,
+            procedure_code=procedure_code,
+            procedure_version="v1",
+            procedure_name=procedure_code,
+            fields_json=fields,
+            request_id="bench",
+        )
+
+    if service.worker_initializer is not None:
+        service.worker_initializer()
+    pdf = render()
+
+    wall, cpu = [], []
+    for _ in range(iterations):
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        render()
+        wall.append((time.perf_counter() - wall_started) * 1000)
+        cpu.append((time.process_time() - cpu_started) * 1000)
+
+    return {
+        "wall": wall,
+        "cpu": cpu,
+        # ru_maxrss: Kilobyte unter Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "size_bytes": len(pdf),
+    }
+
+
+def run_suite(engine: str, iterations: int, rounds: int) -> dict[str, dict]:
+    """
+    Misst alle Fälle in `rounds` Durchgängen (je Fall ein neuer Prozess) und
+    fasst die Messungen aller Durchgänge zusammen.
+    """
+    context = multiprocessing.get_context("spawn")
+    runs: dict[str, list[dict]] = {}
+    for _ in range(rounds):
+        for procedure_code in SNAPSHOTS:
+            for size in SIZES:
+                with context.Pool(1) as pool:
+                    runs.setdefault(f"{procedure_code}/{size}", []).append(
+                        pool.apply(_measure, (engine, procedure_code, size, iterations))
+                    )
+
+    results = {}
+    for case, case_runs in runs.items():
+        results[case] = {
+            "wall_ms": round(_trimmed_mean([ms for run in case_runs for ms in run["wall"]]), 3),
+            "cpu_ms": round(min(ms for run in case_runs for ms in run["cpu"]), 3),
+            "peak_rss_mb": max(run["peak_rss_mb"] for run in case_runs),
+            "size_bytes": case_runs[-1]["size_bytes"],
+        }
+    return results
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def noise(metric: str, before: float) -> float:
+    absolute, relative = NOISE_FLOOR[metric]
+    return max(absolute, before * relative)
+
+
+def find_regressions(baseline: dict, results: dict, threshold: float) -> list[str]:
+    """Geprüfte Metriken, die mehr als Schwelle plus Rauschmaß über der Baseline liegen."""
+    regressions = []
+    for case, metrics in results.items():
+        reference = baseline["cases"].get(case)
+        if reference is None:
+            continue
+        for metric in GATED_METRICS:
+            before, after = reference[metric], metrics[metric]
+            if after > before * (1 + threshold) + noise(metric, before):
+                regressions.append(f"{case} {metric}: {before} -> {after}")
+    return regressions
+
+
+def _delta(before: float | None, after: float) -> str:
+    if not before:
+        return ""
+    return f"{(after - before) / before * 100:+.0f}%"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--engine", choices=("weasyprint", "native"), default="weasyprint")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    baseline_path = args.baseline or BASELINE_DIR / f"pdf_suite_{args.engine}.json"
+    results = run_suite(args.engine, args.iterations, args.rounds)
+
+    baseline = None
+    if not args.update_baseline and baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+
+    print(f"Engine: {args.engine}, {args.rounds} x {args.iterations} Iterationen")
+    print(
+        f"{'Fall':<14}{'wall ms':>9}{'':>6}{'cpu ms':>9}{'':>6}"
+        f"{'RSS MB':>8}{'':>6}{'KB':>8}{'':>6}"
+    )
+    for case, metrics in results.items():
+        reference = (baseline or {}).get("cases", {}).get(case, {})
+        print(
+            f"{case:<14}"
+            f"{metrics['wall_ms']:>9.1f}{_delta(reference.get('wall_ms'), metrics['wall_ms']):>6}"
+            f"{metrics['cpu_ms']:>9.1f}{_delta(reference.get('cpu_ms'), metrics['cpu_ms']):>6}"
+            f"{metrics['peak_rss_mb']:>8.1f}"
+            f"{_delta(reference.get('peak_rss_mb'), metrics['peak_rss_mb']):>6}"
+            f"{metrics['size_bytes'] / 1024:>8.1f}"
+            f"{_delta(reference.get('size_bytes'), metrics['size_bytes']):>6}"
+        )
+    print()
+
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(
+            json.dumps(
+                {
+                    "engine": args.engine,
+                    "iterations": args.iterations,
+                    "rounds": args.rounds,
+                    "environment": environment(),
+                    "cases": results,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"Baseline geschrieben: {baseline_path}")
+        return
+
+    if baseline is None:
+        print(f"Keine Baseline unter {baseline_path} (--update-baseline)")
+        return
+
+    if baseline.get("environment") != environment():
+        print("Hinweis: Baseline stammt aus einer anderen Umgebung, Zeiten sind nicht vergleichbar")
+    regressions = find_regressions(baseline, results, args.threshold)
+    if regressions:
+        print(f"Regressionen (> {args.threshold:.0%} plus Rauschmaß über Baseline):")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"Keine Regression (Schwelle {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
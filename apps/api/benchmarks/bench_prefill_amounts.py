@@ -0,0 +1,192 @@
+"""
+Benchmark: Betragserkennung der Belegauswertung (Prefill) auf langen Rechnungen.
+
+Vergleicht auf synthetischen mehrseitigen Rechnungen
+- vorher: 13 Einzelmuster über den ganzen Text, danach pro Treffer eines
+  Schlüsselworts (Versand, Gesamt, ...) alle Muster erneut auf dem
+  Kontextfenster (frühere Implementierung)
+- nachher: AmountIndex, zwei kombinierte Muster in einem Durchlauf,
+  Kontextfenster per bisect über die Offsets
+
+und prüft, dass beide dieselben Vorschläge liefern (Beträge, Gesamtbetrag,
+Versandkosten). Weicht ein Ergebnis ab, endet das Skript mit Exit-Code 1.
+
+Ausführen (aus apps/api):
+    python -m benchmarks.bench_prefill_amounts [--iterations 20] [--pages 1 10 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.prefill_extraction import (  # noqa: E402
+    SHIPPING_KEYWORDS,
+    AmountIndex,
+    extract_shipping_cost,
+    extract_total_amount,
+)
+
+
+_LEGACY_PATTERNS = [
+    (r"€\s*(\d{1,6}(?:[.,]\d{2})?)", "EUR", 0.9),
+    (r"(\d{1,6}(?:[.,]\d{2})?)\s*€", "EUR", 0.9),
+    (r"EUR\s*(\d{1,6}(?:[.,]\d{2})?)", "EUR", 0.85),
+    (r"(\d{1,6}(?:[.,]\d{2})?)\s*EUR", "EUR", 0.85),
+    (r"\$\s*(\d{1,6}(?:[.,]\d{2})?)", "USD", 0.9),
+    (r"(\d{1,6}(?:[.,]\d{2})?)\s*\$", "USD", 0.9),
+    (r"USD\s*(\d{1,6}(?:[.,]\d{2})?)", "USD", 0.85),
+    (r"(\d{1,6}(?:[.,]\d{2})?)\s*USD", "USD", 0.85),
+    (r"£\s*(\d{1,6}(?:[.,]\d{2})?)", "GBP", 0.9),
+    (r"(\d{1,6}(?:[.,]\d{2})?)\s*£", "GBP", 0.9),
+    (r"GBP\s*(\d{1,6}(?:[.,]\d{2})?)", "GBP", 0.85),
+    (r"CHF\s*(\d{1,6}(?:[.,]\d{2})?)", "CHF", 0.85),
+    (r"(\d{1,6}(?:[.,]\d{2})?)\s*CHF", "CHF", 0.85),
+]
+
+_LEGACY_TOTAL_KEYWORDS = [
+    r"gesamt",
+    r"total",
+    r"summe",
+    r"endbetrag",
+    r"zu zahlen",
+    r"grand total",
+    r"order total",
+    r"betrag",
+]
+
+
+def _legacy_amounts(text: str) -> list[tuple[float, str, float]]:
+    """Referenz: jedes Einzelmuster über den ganzen Text."""
+    results = []
+    for pattern, currency, confidence in _LEGACY_PATTERNS:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            try:
+                amount = float(match.group(1).replace(",", "."))
+            except ValueError:
+                continue
+            if amount > 0:
+                results.append((amount, currency, confidence))
+    return results
+
+
+def _legacy_shipping(text: str) -> tuple[float, str, float] | None:
+    text_lower = text.lower()
+    for keyword in SHIPPING_KEYWORDS:
+        for match in re.finditer(keyword, text_lower, re.IGNORECASE):
+            start = max(0, match.start() - 50)
+            end = min(len(text), match.end() + 50)
+            context_amounts = _legacy_amounts(text[start:end])
+            if context_amounts:
+                amount, currency, conf = context_amounts[0]
+                return (amount, currency, min(conf + 0.1, 0.95))
+    return None
+
+
+def _legacy_total(text: str, amounts: list) -> tuple[float, str, float] | None:
+    text_lower = text.lower()
+    for keyword in _LEGACY_TOTAL_KEYWORDS:
+        for match in re.finditer(keyword, text_lower, re.IGNORECASE):
+            start = max(0, match.start() - 30)
+            end = min(len(text), match.end() + 80)
+            context_amounts = _legacy_amounts(text[start:end])
+            if context_amounts:
+                context_amounts.sort(key=lambda x: x[0], reverse=True)
+                amount, currency, conf = context_amounts[0]
+                return (amount, currency, min(conf + 0.15, 0.95))
+    if amounts:
+        amount, currency, conf = sorted(amounts, key=lambda x: x[0], reverse=True)[0]
+        return (amount, currency, conf * 0.7)
+    return None
+
+
+def legacy_suggestions(text: str) -> tuple:
+    amounts = _legacy_amounts(text)
+    return amounts, _legacy_total(text, amounts), _legacy_shipping(text)
+
+
+def indexed_suggestions(text: str) -> tuple:
+    index = AmountIndex(text)
+    amounts = index.amounts()
+    return (
+        amounts,
+        extract_total_amount(text, amounts, index),
+        extract_shipping_cost(text, amounts, index),
+    )
+
+
+def invoice_text(pages: int, seed: int = 7) -> str:
+    """
+    Mehrseitige Rechnung: Positionszeilen mit Preisen, Gewichts- und
+    Lieferhinweisen (Schlüsselwörter ohne Betrag in der Nähe), Seitensummen,
+    am Ende Versandkosten und Gesamtbetrag.
+    """
+    rng = random.Random(seed)
+    currencies = [("€ {}", ","), ("{} EUR", ","), ("$ {}", "."), ("{} USD", "."), ("CHF {}", ".")]
+    lines = ["Online Shop GmbH", "Rechnung Nr. 2026-000123", "Bestellung bei: Online Shop GmbH", ""]
+    for page in range(1, pages + 1):
+        page_sum = 0.0
+        for position in range(1, 41):
+            price = rng.randint(100, 99999) / 100
+            page_sum += price
+            template, separator = rng.choice(currencies)
+            amount = f"{price:.2f}".replace(".", separator)
+            lines.append(
+                f"{position:>3}  Artikel {page:03d}-{position:03d} Ersatzteil Typ {rng.randint(1, 9)}"
+                f"    {template.format(amount)}"
+            )
+            if position % 5 == 0:
+                lines.append(
+                    f"     Gesamtgewicht der Position {rng.randint(1, 40) / 10} kg, "
+                    f"Lieferung aus Lager {rng.randint(1, 9)}, Artikelnummer {rng.randint(10**6, 10**7)}"
+                )
+        lines.append(f"Zwischensumme Seite {page}: {page_sum:.2f} EUR".replace(".", ","))
+        lines.append(f"Seite {page} von {pages}")
+        lines.append("")
+    lines.append("Versandkosten: 12,90 €")
+    lines.append("Gesamt zu zahlen: 1.234,56 €")
+    return "\n".join(lines)
+
+
+def _ms_per_call(function, text: str, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function(text)
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    mismatches = []
+    print(f"{'Seiten':>6}{'Zeichen':>10}{'Beträge':>9}{'vorher ms':>11}{'nachher ms':>12}{'Faktor':>8}")
+    for pages in args.pages:
+        text = invoice_text(pages)
+        expected = legacy_suggestions(text)
+        if indexed_suggestions(text) != expected:
+            mismatches.append(pages)
+        legacy = _ms_per_call(legacy_suggestions, text, args.iterations)
+        indexed = _ms_per_call(indexed_suggestions, text, args.iterations)
+        print(
+            f"{pages:>6}{len(text):>10}{len(expected[0]):>9}"
+            f"{legacy:>11.2f}{indexed:>12.2f}{legacy / indexed:>7.1f}x"
+        )
+
+    print()
+    if mismatches:
+        print(f"Abweichende Vorschläge bei {mismatches} Seiten")
+        sys.exit(1)
+    print("Vorschläge identisch (Beträge, Gesamtbetrag, Versandkosten)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark: Durchsatz und Trefferquote der Belegauswertung (process_document).
+
+Wertet das synthetische Rechnungskorpus (invoice_corpus: Deutsch, Englisch,
+Französisch, vier Währungen, 1–50 Seiten) mit process_document aus, wie ein
+Worker von prefill_extractor, und meldet pro Seitenklasse und gesamt:
+- docs/s: ausgewertete Belege pro Sekunde (ein Prozess)
+- p50/p95 ms: Latenz pro Beleg
+- Trefferquote von value_amount, shipping_cost und sender_name gegen die
+  Sollwerte (Betrag auf den Cent; kein Versand = kein Vorschlag; Name
+  exakt, ohne Groß-/Kleinschreibung und Mehrfach-Leerzeichen)
+
+Baseline (benchmarks/baselines/prefill_corpus.json):
+- --update-baseline schreibt die Messung
+- sonst endet das Skript mit Exit-Code 1, wenn eine Trefferquote sinkt
+  (deterministisch, maschinenunabhängig) oder docs/s mehr als --threshold
+  unter der Baseline liegt (nur bei gleicher Umgebung)
+
+So lässt sich Performance-Arbeit an der Regex-Pipeline beurteilen, ohne
+die Qualität der Vorschläge zu verschlechtern.
+
+Ausführen (aus apps/api):
+    python -m benchmarks.bench_prefill_corpus [--documents 120] [--repeat 3]
+    python -m benchmarks.bench_prefill_corpus --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.prefill_extraction import (  # noqa: E402
+    PREFILL_MAX_PAGES,
+    PrefillSuggestions,
+    process_document,
+    warm_up,
+)
+from benchmarks.bench_pdf_suite import environment  # noqa: E402
+from benchmarks.invoice_corpus import Invoice, generate_corpus  # noqa: E402
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "prefill_corpus.json"
+FIELDS = ("value_amount", "shipping_cost", "sender_name")
+BUCKETS = (("1-2", 1, 2), ("3-10", 3, 10), ("11-50", 11, 50))
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def field_hits(invoice: Invoice, result: PrefillSuggestions) -> dict[str, bool]:
+    """Je Feld: stimmt der Vorschlag mit dem Sollwert überein?"""
+    values = {suggestion.field_key: suggestion.value for suggestion in result.suggestions}
+    hits = {}
+    for key in ("value_amount", "shipping_cost"):
+        expected, found = invoice.truth[key], values.get(key)
+        if expected is None:
+            hits[key] = found is None
+        else:
+            hits[key] = found is not None and abs(found - expected) < 0.005
+    found = values.get("sender_name")
+    expected = _normalize(invoice.truth["sender_name"])
+    hits["sender_name"] = found is not None and _normalize(found) == expected
+    return hits
+
+
+def _summary(samples: list[tuple[float, dict[str, bool]]]) -> dict:
+    latencies = sorted(seconds * 1000 for seconds, _ in samples)
+    summary = {
+        "documents": len(samples),
+        "docs_per_s": round(len(samples) / (sum(latencies) / 1000), 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        # Nächster Rang; bei wenigen Belegen der langsamste
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 2),
+    }
+    for key in FIELDS:
+        summary[f"acc_{key}"] = round(sum(hits[key] for _, hits in samples) / len(samples), 3)
+    return summary
+
+
+def run(corpus: list[Invoice], max_pages: int, repeat: int) -> dict[str, dict]:
+    warm_up()
+    process_document(corpus[0].pdf, "pdf", max_pages)
+
+    samples: dict[str, list[tuple[float, dict[str, bool]]]] = {}
+    for _ in range(repeat):
+        for invoice in corpus:
+            started = time.perf_counter()
+            result = process_document(invoice.pdf, "pdf", max_pages)
+            seconds = time.perf_counter() - started
+            bucket = next(name for name, low, high in BUCKETS if low <= invoice.pages <= high)
+            samples.setdefault(bucket, []).append((seconds, field_hits(invoice, result)))
+
+    results = {name: _summary(samples[name]) for name, _, _ in BUCKETS if name in samples}
+    results["all"] = _summary([sample for bucket in samples.values() for sample in bucket])
+    return results
+
+
+def find_regressions(
+    baseline: dict,
+    results: dict,
+    threshold: float,
+    same_environment: bool,
+) -> list[str]:
+    """Gesunkene Trefferquoten; bei gleicher Umgebung auch gesunkener Durchsatz."""
+    regressions = []
+    for bucket, metrics in results.items():
+        reference = baseline["buckets"].get(bucket)
+        if reference is None:
+            continue
+        for key in FIELDS:
+            metric = f"acc_{key}"
+            if metrics[metric] < reference[metric]:
+                regressions.append(f"{bucket} {metric}: {reference[metric]} -> {metrics[metric]}")
+        before, after = reference["docs_per_s"], metrics["docs_per_s"]
+        if same_environment and after < before * (1 - threshold):
+            regressions.append(f"{bucket} docs_per_s: {before} -> {after}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-pages", type=int, default=PREFILL_MAX_PAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.documents, args.seed)
+    results = run(corpus, args.max_pages, args.repeat)
+    config = {"documents": args.documents, "seed": args.seed, "max_pages": args.max_pages}
+
+    baseline = None
+    if not args.update_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    print(
+        f"{len(corpus)} Belege ({sum(invoice.pages for invoice in corpus)} Seiten), "
+        f"max_pages={args.max_pages}, {args.repeat} Durchläufe"
+    )
+    print(
+        f"{'Seiten':<8}{'Belege':>7}{'docs/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'Betrag':>9}{'Versand':>9}{'Händler':>9}"
+    )
+    for bucket, metrics in results.items():
+        print(
+            f"{bucket:<8}{metrics['documents']:>7}{metrics['docs_per_s']:>9.1f}"
+            f"{metrics['p50_ms']:>9.2f}{metrics['p95_ms']:>9.2f}"
+            + "".join(f"{metrics[f'acc_{key}']:>9.1%}" for key in FIELDS)
+        )
+    print()
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(
+            json.dumps(
+                {**config, "environment": environment(), "buckets": results},
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"Baseline geschrieben: {args.baseline}")
+        return
+
+    if baseline is None:
+        print(f"Keine Baseline unter {args.baseline} (--update-baseline)")
+        return
+
+    if any(baseline.get(key) != value for key, value in config.items()):
+        print("Korpus oder max_pages weichen von der Baseline ab, kein Vergleich")
+        return
+    same_environment = baseline.get("environment") == environment()
+    if not same_environment:
+        print("Hinweis: Baseline stammt aus einer anderen Umgebung, docs/s wird nicht verglichen")
+    regressions = find_regressions(baseline, results, args.threshold, same_environment)
+    if regressions:
+        print("Regressionen gegenüber der Baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"Keine Regression (Trefferquoten, docs/s-Schwelle {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
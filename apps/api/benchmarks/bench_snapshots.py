@@ -0,0 +1,125 @@
+"""
+Benchmark: Snapshot-Delta-Ketten (ohne Datenbank).
+
+Misst für lange Versionshistorien
+- Speicherbedarf: Vollkopie je Version vs. Keyframes + Deltas
+- Diff-Latenz: Delta-Kette (diff_chain) vs. beide Versionen vollständig
+  rekonstruieren und vergleichen; "gewählt" zeigt die Strategie von
+  diff_snapshots (use_delta_diff)
+
+Ausführen (aus apps/api):
+    python -m benchmarks.bench_snapshots [--fields 60] [--lengths 50 200 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.domain.snapshot_delta import (  # noqa: E402
+    SnapshotLink,
+    compute_delta,
+    diff_chain,
+    diff_fields,
+    is_keyframe_due,
+    materialize,
+    use_delta_diff,
+)
+
+
+def _history(length: int, field_count: int, seed: int = 42) -> list[dict]:
+    """Versionen mit 1-3 geänderten und gelegentlich entfernten Feldern."""
+    rng = random.Random(seed)
+    fields = {f"field_{i:03d}": f"Wert {i} " * 4 for i in range(field_count)}
+    versions = [dict(fields)]
+    for _ in range(length - 1):
+        for _ in range(rng.randint(1, 3)):
+            fields[f"field_{rng.randrange(field_count):03d}"] = rng.random()
+        if rng.random() < 0.1:
+            fields.pop(rng.choice(sorted(fields)), None)
+        versions.append(dict(fields))
+    return versions
+
+
+def _chain(history: list[dict]) -> tuple[list[SnapshotLink], list[int]]:
+    """Links wie create_snapshot sie schreibt, plus Keyframe-Index je Version."""
+    links: list[SnapshotLink] = []
+    keyframe_index: list[int] = []
+    for idx, fields in enumerate(history):
+        if not links:
+            links.append(SnapshotLink(idx + 1, fields, None))
+            keyframe_index.append(idx)
+            continue
+        delta = compute_delta(history[idx - 1], fields)
+        if is_keyframe_due(idx - keyframe_index[-1]):
+            links.append(SnapshotLink(idx + 1, fields, delta))
+            keyframe_index.append(idx)
+        else:
+            links.append(SnapshotLink(idx + 1, None, delta))
+            keyframe_index.append(keyframe_index[-1])
+    return links, keyframe_index
+
+
+def _size(value: object) -> int:
+    return len(json.dumps(value, sort_keys=True).encode("utf-8"))
+
+
+def _diff_full(links: list[SnapshotLink], keyframes: list[int], a: int, b: int) -> list[dict]:
+    """Beide Versionen ab ihren Keyframes rekonstruieren und vergleichen."""
+    return diff_fields(
+        materialize(links[keyframes[a]: a + 1]),
+        materialize(links[keyframes[b]: b + 1]),
+    )
+
+
+def _diff_chain(links: list[SnapshotLink], keyframes: list[int], a: int, b: int) -> list[dict]:
+    return diff_chain(links[keyframes[a]: a + 1], links[a + 1: b + 1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fields", type=int, default=60)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[50, 200, 1000])
+    args = parser.parse_args()
+
+    print(f"{'Versionen':>10}{'voll KB':>10}{'Kette KB':>10}{'Faktor':>9}")
+    results = []
+    for length in args.lengths:
+        history = _history(length, args.fields)
+        links, keyframes = _chain(history)
+        full = sum(_size(fields) for fields in history)
+        stored = sum(
+            (_size(link.keyframe) if link.keyframe is not None else 0)
+            + (_size(link.delta) if link.delta is not None else 0)
+            for link in links
+        )
+        print(f"{length:>10}{full / 1024:>10.1f}{stored / 1024:>10.1f}{full / stored:>8.1f}x")
+        results.append((length, links, keyframes))
+
+    print()
+    print(f"{'Versionen':>10}  {'Diff':<12}{'voll µs':>10}{'Kette µs':>10}{'Faktor':>9}  gewählt")
+    for length, links, keyframes in results:
+        pairs = {
+            "benachbart": (length - 2, length - 1),
+            "+5": (length - 6, length - 1),
+            "+50": (max(0, length - 51), length - 1),
+        }
+        for label, (a, b) in pairs.items():
+            assert _diff_chain(links, keyframes, a, b) == _diff_full(links, keyframes, a, b)
+            full = min(timeit.repeat(lambda: _diff_full(links, keyframes, a, b), number=200, repeat=5))
+            chain = min(timeit.repeat(lambda: _diff_chain(links, keyframes, a, b), number=200, repeat=5))
+            print(
+                f"{length:>10}  {label:<12}{full / 200 * 1e6:>10.2f}"
+                f"{chain / 200 * 1e6:>10.2f}{full / chain:>8.1f}x"
+                f"  {'Kette' if use_delta_diff(a, b) else 'voll'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: Wizard GET-Pfad (ohne Datenbank).
+
+Misst build_wizard_state + _build_steps_info + Response-Serialisierung
+für alle Verfahren und vergleicht mit der früheren Implementierung
+(lineare Step-Suche, StepInfo-Validierung pro Request).
+
+Ausführen (aus apps/api):
+    python -m benchmarks.bench_wizard [--iterations 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.domain.wizard import build_wizard_state  # noqa: E402
+from app.domain.wizard_steps import PROCEDURE_STEPS_REGISTRY, get_procedure_steps  # noqa: E402
+from app.routes.wizard import (  # noqa: E402
+    StepInfo,
+    WizardResponse,
+    WizardStateResponse,
+    _build_steps_info,
+)
+
+
+def _legacy_steps_info(procedure_code: str, current_step: str, completed_steps: list[str]) -> list[StepInfo]:
+    """Referenz: frühere Implementierung mit linearen Lookups."""
+    steps_config = get_procedure_steps(procedure_code)
+    keys = [step.step_key for step in steps_config.steps]
+    current_idx = keys.index(current_step) if current_step in keys else -1
+    result = []
+    for idx, step_def in enumerate(steps_config.steps):
+        is_completed = step_def.step_key in completed_steps
+        is_current = step_def.step_key == current_step
+        result.append(StepInfo(
+            step_key=step_def.step_key,
+            title=step_def.title,
+            description=step_def.description,
+            required_fields=list(step_def.required_fields),
+            is_completed=is_completed,
+            is_current=is_current,
+            is_accessible=(
+                is_completed
+                or is_current
+                or idx <= current_idx
+                or (idx == current_idx + 1 and current_step in completed_steps)
+            ),
+        ))
+    return result
+
+
+def _scenarios() -> list[tuple[str, str, list[str]]]:
+    scenarios = []
+    for code, config in PROCEDURE_STEPS_REGISTRY.items():
+        keys = list(config.step_keys)
+        for idx, key in enumerate(keys):
+            scenarios.append((code, key, keys[:idx]))
+    return scenarios
+
+
+def _get_path(build_steps, code: str, current: str, completed: list[str]) -> str:
+    state = build_wizard_state("case-1", code, current, completed, False)
+    response = WizardResponse(
+        data=WizardStateResponse(
+            **state._asdict(),
+            steps=build_steps(code, current, completed),
+        )
+    )
+    return response.model_dump_json()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    scenarios = _scenarios()
+
+    # Gleiche Ausgabe wie die Referenz
+    for code, current, completed in scenarios:
+        assert _get_path(_build_steps_info, code, current, completed) == _get_path(
+            _legacy_steps_info, code, current, completed
+        ), (code, current)
+
+    def run(build_steps) -> float:
+        def loop() -> None:
+            for code, current, completed in scenarios:
+                _get_path(build_steps, code, current, completed)
+        n = max(1, args.iterations // len(scenarios))
+        return min(timeit.repeat(loop, number=n, repeat=5)) / (n * len(scenarios))
+
+    def run_steps_only(build_steps) -> float:
+        def loop() -> None:
+            for code, current, completed in scenarios:
+                build_steps(code, current, completed)
+        n = max(1, args.iterations // len(scenarios))
+        return min(timeit.repeat(loop, number=n, repeat=5)) / (n * len(scenarios))
+
+    print(f"{'Messung':<34}{'legacy µs':>12}{'aktuell µs':>12}{'Faktor':>9}")
+    for label, fn in (("_build_steps_info", run_steps_only), ("GET-Pfad inkl. Serialisierung", run)):
+        legacy = fn(_legacy_steps_info) * 1e6
+        current = fn(_build_steps_info) * 1e6
+        print(f"{label:<34}{legacy:>12.2f}{current:>12.2f}{legacy / current:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
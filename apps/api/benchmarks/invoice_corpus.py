@@ -0,0 +1,230 @@
+"""
+Synthetisches Rechnungskorpus für Benchmarks der Belegauswertung (Prefill).
+
+Erzeugt Text-PDFs (native PDF-Engine, keine Systembibliotheken) mit
+bekannten Sollwerten für die Vorschläge value_amount, shipping_cost und
+sender_name:
+- Sprachen: Deutsch, Englisch, Französisch (Schlüsselwörter, Zahlenformat)
+- Währungen: EUR, USD, GBP, CHF, Symbol bzw. Code vor oder nach dem Betrag;
+  die Hälfte der Belege mit Tausendertrennzeichen (1.234,56 / 1,234.56)
+- 1–50 Seiten (überwiegend kurze Belege); Positionen, Gewichts- und
+  Lieferhinweise auf allen Seiten, MwSt., Versand und Gesamtbetrag am Ende
+- Händlername mit Schlüsselwort („Verkäufer:“, „Sold by:“, ...) oder nur
+  als erste Zeile; ein Teil der Belege ohne Versandkosten
+
+Deterministisch bei gleichem Seed. Wird von bench_prefill_corpus genutzt.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+
+from app.services.pdf_native import (
+    MARGIN_X,
+    MARGIN_Y,
+    REGULAR,
+    _Canvas,
+    _encode,
+    _write_pdf,
+)
+
+
+LANGUAGES = ("de", "en", "fr")
+CURRENCIES = ("EUR", "USD", "GBP", "CHF")
+
+FONT_SIZE = 9
+LINE_STEP = FONT_SIZE * 1.5
+LINES_PER_PAGE = 48
+
+MERCHANTS = (
+    "Online Shop GmbH",
+    "Nordlicht Versand GmbH",
+    "Shenzhen Audio Ltd",
+    "Bike Parts Inc",
+    "Maison Dupont SARL",
+    "Alpen Outdoor AG",
+    "Tea & Spice Co",
+    "Keramik Werkstatt KG",
+)
+
+ARTICLES = (
+    "Bluetooth-Kopfhörer", "USB-C Ladekabel", "Ersatzteil Typ", "Teedose",
+    "Wanderjacke", "Keramikschale", "Fahrradkette", "Phone case",
+    "Coffee beans", "Carnet de notes",
+)
+
+LABELS = {
+    "de": {
+        "title": "Rechnung",
+        "address": "Hauptstraße 12, 10115 Berlin",
+        "number": "Rechnungsnummer",
+        "date": "Rechnungsdatum",
+        "merchant": ("Verkäufer: {}", "Bestellung bei: {}", "Rechnung von {}"),
+        "customer": "Kunde",
+        "header": "Pos  Artikel  Menge  Preis",
+        "note": "Gesamtgewicht {} kg, Lieferung aus Lager {}",
+        "page": "Seite {} von {}",
+        "subtotal": "Zwischensumme",
+        "vat": "MwSt. 19 %",
+        "shipping": ("Versandkosten", "Versand"),
+        "total": ("Gesamtbetrag", "Summe", "Zu zahlen"),
+    },
+    "en": {
+        "title": "Invoice",
+        "address": "12 Market Street, London EC1A 1BB",
+        "number": "Invoice number",
+        "date": "Invoice date",
+        "merchant": ("Sold by: {}", "Seller: {}", "Order from {}"),
+        "customer": "Bill to",
+        "header": "No  Item  Qty  Price",
+        "note": "Weight {} kg, ships from warehouse {}",
+        "page": "Page {} of {}",
+        "subtotal": "Subtotal",
+        "vat": "Tax 20 %",
+        "shipping": ("Shipping", "Shipping & handling"),
+        "total": ("Order total", "Grand total", "Total"),
+    },
+    "fr": {
+        "title": "Facture",
+        "address": "8 rue de la Paix, 75002 Paris",
+        "number": "Numéro de facture",
+        "date": "Date de facture",
+        "merchant": ("Vendeur : {}", "Commande chez {}"),
+        "customer": "Client",
+        "header": "N°  Article  Qté  Prix",
+        "note": "Poids {} kg, expédié depuis l'entrepôt {}",
+        "page": "Page {} sur {}",
+        "subtotal": "Sous-total",
+        "vat": "TVA 20 %",
+        "shipping": ("Frais de port", "Frais de livraison"),
+        "total": ("Total TTC", "Montant total"),
+    },
+}
+
+
+@dataclass(frozen=True)
+class Invoice:
+    """Ein Beleg des Korpus mit Sollwerten (shipping_cost None = kein Versand)."""
+
+    name: str
+    language: str
+    currency: str
+    pages: int
+    pdf: bytes
+    truth: dict[str, float | str | None] = field(default_factory=dict)
+
+
+def format_amount(
+    amount: float,
+    language: str,
+    currency: str,
+    rng: random.Random,
+    grouping: bool = True,
+) -> str:
+    """Betrag im Format der Sprache; Symbol/Code je nach Währung vor oder nach der Zahl."""
+    number = f"{amount:,.2f}" if grouping else f"{amount:.2f}"
+    if language == "de":
+        number = number.replace(",", "_").replace(".", ",").replace("_", ".")
+    elif language == "fr":
+        number = number.replace(",", " ").replace(".", ",")
+    if currency == "EUR":
+        return rng.choice([f"{number} €", f"{number} EUR", f"€ {number}"])
+    if currency == "USD":
+        return rng.choice([f"${number}", f"{number} USD"])
+    if currency == "GBP":
+        return rng.choice([f"£{number}", f"GBP {number}"])
+    return rng.choice([f"CHF {number}", f"{number} CHF"])
+
+
+def _page_count(rng: random.Random) -> int:
+    """Überwiegend kurze Belege, einzelne sehr lange."""
+    roll = rng.random()
+    if roll < 0.6:
+        return rng.randint(1, 2)
+    if roll < 0.9:
+        return rng.randint(3, 10)
+    return rng.randint(11, 50)
+
+
+def _lines(rng: random.Random, language: str, currency: str, pages: int) -> tuple[list[str], dict]:
+    labels = LABELS[language]
+    merchant = rng.choice(MERCHANTS)
+    grouping = rng.random() < 0.5
+
+    def money(amount: float) -> str:
+        return format_amount(amount, language, currency, rng, grouping)
+
+    lines: list[str] = []
+    if rng.random() < 0.7:
+        lines.append(rng.choice(labels["merchant"]).format(merchant))
+    else:
+        # Nur der Name als erste Zeile (Briefkopf)
+        lines.append(merchant)
+    lines += [
+        labels["address"],
+        labels["title"],
+        f"{labels['number']}: {rng.randint(10**6, 10**7)}",
+        f"{labels['date']}: 2026-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+        f"{labels['customer']}: Erika Musterfrau",
+        "",
+        labels["header"],
+    ]
+
+    body_lines = max(1, pages * LINES_PER_PAGE - len(lines) - 6)
+    items_total = 0.0
+    position = 0
+    while body_lines > 0:
+        position += 1
+        price = rng.randint(199, 24999) / 100
+        items_total += price
+        lines.append(
+            f"{position:>3}  {rng.choice(ARTICLES)} {rng.randint(1, 99)}  1  "
+            f"{money(price)}"
+        )
+        body_lines -= 1
+        if position % 6 == 0 and body_lines > 0:
+            note = labels["note"].format(rng.randint(1, 40) / 10, rng.randint(1, 9))
+            lines.append("     " + note)
+            body_lines -= 1
+
+    shipping = rng.choice([4.90, 5.99, 12.90, 19.50]) if rng.random() < 0.75 else None
+    vat = round(items_total * 0.19, 2)
+    total = round(items_total + vat + (shipping or 0), 2)
+    lines.append(f"{labels['subtotal']}: {money(items_total)}")
+    lines.append(f"{labels['vat']}: {money(vat)}")
+    if shipping is not None:
+        lines.append(f"{rng.choice(labels['shipping'])}: {money(shipping)}")
+    lines.append(f"{rng.choice(labels['total'])}: {money(total)}")
+    truth = {"value_amount": total, "shipping_cost": shipping, "sender_name": merchant}
+    return lines, truth
+
+
+def _render(lines: list[str], language: str, title: str) -> tuple[bytes, int]:
+    canvas = _Canvas()
+    chunks = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+    footer = LABELS[language]["page"]
+    for page, chunk in enumerate(chunks):
+        if page:
+            canvas.new_page()
+        rows = chunk + ["", footer.format(page + 1, len(chunks))]
+        for row, text in enumerate(rows):
+            if text:
+                top = MARGIN_Y + row * LINE_STEP
+                canvas.text(MARGIN_X, top, [(_encode(text), REGULAR)], FONT_SIZE, "#000000")
+    pdf = _write_pdf(canvas.pages, title=title, created_iso="2026-01-15T00:00:00+00:00")
+    return pdf, len(chunks)
+
+
+def generate_corpus(documents: int = 120, seed: int = 7) -> list[Invoice]:
+    """Erzeugt `documents` Belege (deterministisch je Seed)."""
+    rng = random.Random(seed)
+    corpus = []
+    for number in range(documents):
+        language = LANGUAGES[number % len(LANGUAGES)]
+        currency = rng.choice(CURRENCIES)
+        lines, truth = _lines(rng, language, currency, _page_count(rng))
+        name = f"invoice-{number:03d}-{language}-{currency.lower()}"
+        pdf, pages = _render(lines, language, name)
+        corpus.append(Invoice(name, language, currency, pages, pdf, truth))
+    return corpus
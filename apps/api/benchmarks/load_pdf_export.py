@@ -0,0 +1,186 @@
+"""
+Lasttest: Latenz eines unbeteiligten Endpoints während paralleler PDF-Exporte.
+
+Startet eine minimale App mit POST /pdf und GET /health auf uvicorn
+(localhost, eigener Thread mit eigenem Event Loop, ein Worker wie in
+Produktion) und misst die /health-Latenz,
+während --exports Exporte gleichzeitig laufen:
+- idle: keine Exporte (Referenz)
+- inline: Rendering im Event Loop (frühere Implementierung)
+- pool: Rendering über PDFRenderer (Prozess-Pool, begrenzte Warteschlange)
+
+Exporte über der Kapazität des Pools werden mit 503 abgewiesen und in der
+Spalte "503" gezählt.
+
+Ausführen (aus apps/api):
+    python -m benchmarks.load_pdf_export [--exports 8] [--workers 2] [--queue-size 8]
+    # ohne WeasyPrint-Systembibliotheken: CPU-Last pro Rendering simulieren
+    python -m benchmarks.load_pdf_export --synthetic-ms 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import socket
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Response
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.pdf_renderer import PDFRenderer, RendererBusy  # noqa: E402
+
+
+SAMPLE_FIELDS = {
+    "contents_description": "Bluetooth-Kopfhörer",
+    "value_amount": 89.90,
+    "value_currency": "EUR",
+    "origin_country": "CN",
+    "sender_name": "Shenzhen Audio Ltd",
+    "sender_country": "CN",
+    "recipient_full_name": "Max Mustermann",
+    "recipient_address": "Musterstr. 1",
+    "recipient_city": "Berlin",
+    "recipient_postcode": "10115",
+    "recipient_country": "DE",
+    "commercial_goods": False,
+    "remarks": None,
+}
+
+
+def _burn(ms: int, html: str) -> bytes:
+    """Simuliertes Rendering: hält die CPU ms Millisekunden beschäftigt."""
+    deadline = time.perf_counter() + ms / 1000
+    while time.perf_counter() < deadline:
+        pass
+    return b"%PDF"
+
+
+def _sample_html() -> str:
+    from app.services.pdf_service import pdf_service
+
+    return pdf_service.build_html(
+        case_id="bench-case-0001",
+        version=1,
+        procedure_code="IZA",
+        procedure_version="v1",
+        procedure_name="Internetbestellung – Import Zollanmeldung",
+        fields_json=SAMPLE_FIELDS,
+        request_id="bench",
+    )
+
+
+def _app(mode: str, html: str, render_fn: Callable[[str], bytes], renderer: PDFRenderer) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/pdf")
+    async def export() -> Response:
+        if mode == "inline":
+            return Response(render_fn(html), media_type="application/pdf")
+        try:
+            pdf = await renderer.render(html)
+        except RendererBusy as exc:
+            return Response(status_code=503, headers={"Retry-After": str(exc.retry_after)})
+        return Response(pdf, media_type="application/pdf")
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _measure(app: FastAPI, exports: int, probes: int, interval: float) -> tuple[list[float], Counter]:
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    # Exporte und Health-Checks über getrennte Clients (eigene Verbindungen)
+    limits = httpx.Limits(max_connections=exports + 1)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=None, limits=limits) as exporter, \
+                httpx.AsyncClient(base_url=base_url, timeout=None) as prober:
+            await prober.get("/health")
+            running = [asyncio.create_task(exporter.post("/pdf")) for _ in range(exports)]
+            latencies = []
+            for _ in range(probes):
+                await asyncio.sleep(interval)
+                started = time.perf_counter()
+                await prober.get("/health")
+                latencies.append((time.perf_counter() - started) * 1000)
+            responses = await asyncio.gather(*running)
+    finally:
+        server.should_exit = True
+        thread.join()
+    return latencies, Counter(r.status_code for r in responses)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--exports", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--probes", type=int, default=40)
+    parser.add_argument("--interval-ms", type=float, default=25)
+    parser.add_argument("--synthetic-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    html = _sample_html()
+    if args.synthetic_ms:
+        render_fn: Callable[[str], bytes] = functools.partial(_burn, args.synthetic_ms)
+    else:
+        from app.services.pdf_service import render_html_to_pdf
+
+        render_fn = render_html_to_pdf
+
+    asyncio.run(_run(args, html, render_fn))
+
+
+async def _run(args: argparse.Namespace, html: str, render_fn: Callable[[str], bytes]) -> None:
+    renderer = PDFRenderer(
+        workers=args.workers, queue_size=args.queue_size, render_fn=render_fn
+    )
+    # Worker-Start (spawn + Imports) nicht mitmessen
+    await asyncio.gather(*(renderer.render(html) for _ in range(args.workers)))
+
+    print(f"{'Modus':<8}{'Exporte':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'200':>6}{'503':>6}")
+    try:
+        for mode, exports in (("idle", 0), ("inline", args.exports), ("pool", args.exports)):
+            app = _app(mode, html, render_fn, renderer)
+            latencies, statuses = await _measure(app, exports, args.probes, args.interval_ms / 1000)
+            print(
+                f"{mode:<8}{exports:>9}{statistics.median(latencies):>10.2f}"
+                f"{_percentile(latencies, 0.95):>10.2f}{max(latencies):>10.2f}"
+                f"{statuses[200]:>6}{statuses[503]:>6}"
+            )
+    finally:
+        renderer.shutdown()
+
+
+if __name__ == "__main__":
+    main()
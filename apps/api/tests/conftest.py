@@ -0,0 +1,57 @@
+"""
+Shared helpers for tests that call async code and fake the Prisma client.
+
+Import them explicitly (`from conftest import _run`); pytest puts this
+directory on sys.path.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+
+def _run(coro):
+    """Run on a private loop so the global event loop of other tests stays intact."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+@asynccontextmanager
+async def _tx(client):
+    yield client
+
+
+class FakeCreditPrisma:
+    """Tenant credit balance and ledger; subclasses add the models they need."""
+
+    def __init__(self, balance: int):
+        self.balance = balance
+        self.ledger: list[dict] = []
+        self.tenantcreditbalance = SimpleNamespace(
+            find_unique=self._find_balance, update_many=self._decrement
+        )
+        self.creditledgerentry = SimpleNamespace(create=self._create_entry)
+
+    @staticmethod
+    def _returning(value):
+        async def find(**kwargs):
+            return value
+        return find
+
+    async def _find_balance(self, where):
+        return SimpleNamespace(balance=self.balance)
+
+    async def _decrement(self, where, data):
+        if self.balance < where["balance"]["gte"]:
+            return SimpleNamespace(count=0)
+        self.balance -= data["balance"]["decrement"]
+        return SimpleNamespace(count=1)
+
+    async def _create_entry(self, data):
+        self.ledger.append(data)
+
+    def tx(self):
+        return _tx(self)
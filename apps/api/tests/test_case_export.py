@@ -0,0 +1,152 @@
+"""
+Tests for bulk case export serialization (JSONL/CSV).
+"""
+
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import app.routes.case_export as case_export_routes
+from app.domain.case_export import (
+    CSV_BASE_COLUMNS,
+    csv_header,
+    csv_row,
+    encode_csv_line,
+    encode_jsonl_line,
+    format_csv_value,
+    serialize_case,
+)
+from app.routes.cases import StatusFilter
+from conftest import _run
+
+
+NOW = datetime(2026, 1, 15, 10, 30, tzinfo=timezone.utc)
+
+
+def _case(fields: dict, procedure_code: str | None = "IZA"):
+    return SimpleNamespace(
+        id="case-1",
+        title="Paket aus China",
+        status="PREPARED",
+        procedure=SimpleNamespace(code=procedure_code) if procedure_code else None,
+        procedure_version="v1",
+        created_at=NOW,
+        updated_at=NOW,
+        fields=[SimpleNamespace(key=k, value_json=v) for k, v in fields.items()],
+    )
+
+
+def _snapshot():
+    return SimpleNamespace(
+        version=2,
+        procedure_code="IZA",
+        procedure_version="v1",
+        created_at=NOW,
+    )
+
+
+SNAPSHOT_FIELDS = {"value_amount": 12.5}
+SNAPSHOT_VALIDATION = {"valid": True}
+
+
+class TestSerializeCase:
+    """Tests for the per-case export record."""
+
+    def test_includes_fields_and_snapshot(self):
+        record = serialize_case(
+            _case({"value_amount": 12.5}), _snapshot(), SNAPSHOT_FIELDS, SNAPSHOT_VALIDATION
+        )
+
+        assert record["id"] == "case-1"
+        assert record["procedure_code"] == "IZA"
+        assert record["fields"] == {"value_amount": 12.5}
+        assert record["latest_snapshot"]["version"] == 2
+        assert record["latest_snapshot"]["fields"] == {"value_amount": 12.5}
+        assert record["latest_snapshot"]["validation"] == {"valid": True}
+
+    def test_without_procedure_or_snapshot(self):
+        record = serialize_case(_case({}, procedure_code=None), None)
+
+        assert record["procedure_code"] is None
+        assert record["latest_snapshot"] is None
+
+    def test_jsonl_line_roundtrip(self):
+        record = serialize_case(_case({"remarks": "Größe M"}), None)
+        line = encode_jsonl_line(record)
+
+        assert line.endswith(b"\n")
+        assert json.loads(line) == record
+
+
+class TestCsvExport:
+    """Tests for CSV rows."""
+
+    def test_header_appends_field_keys(self):
+        header = csv_header(["origin_country", "value_amount"])
+        assert header[: len(CSV_BASE_COLUMNS)] == list(CSV_BASE_COLUMNS)
+        assert header[-2:] == ["origin_country", "value_amount"]
+
+    def test_row_matches_header(self):
+        keys = ["commercial_goods", "origin_country", "value_amount"]
+        record = serialize_case(
+            _case({"value_amount": 12.5, "origin_country": "CN", "commercial_goods": False}),
+            _snapshot(),
+            SNAPSHOT_FIELDS,
+            SNAPSHOT_VALIDATION,
+        )
+        row = dict(zip(csv_header(keys), csv_row(record, keys)))
+
+        assert row["snapshot_version"] == "2"
+        assert row["origin_country"] == "CN"
+        assert row["value_amount"] == "12.5"
+        assert row["commercial_goods"] == "false"
+
+    def test_missing_field_is_empty(self):
+        record = serialize_case(_case({}), None)
+        row = csv_row(record, ["value_amount"])
+        assert row[-1] == ""
+        assert row[CSV_BASE_COLUMNS.index("snapshot_version")] == ""
+
+    def test_quoting(self):
+        assert encode_csv_line(["a,b", 'c"d']) == b'"a,b","c""d"\n'
+
+    def test_format_csv_value(self):
+        assert format_csv_value(None) == ""
+        assert format_csv_value("text") == "text"
+        assert format_csv_value({"a": 1}) == '{"a": 1}'
+
+
+class FakeRawPrisma:
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.calls: list[tuple] = []
+
+    async def query_raw(self, sql: str, *params):
+        self.calls.append((sql, params))
+        return self.rows
+
+
+class TestFieldKeys:
+    """The CSV header keys are deduplicated in SQL, not by loading every field."""
+
+    @pytest.fixture
+    def fake_prisma(self, monkeypatch):
+        fake = FakeRawPrisma([{"key": "origin_country"}, {"key": "value_amount"}])
+        monkeypatch.setattr(case_export_routes, "prisma", fake)
+        return fake
+
+    def test_all_cases(self, fake_prisma):
+        keys = _run(case_export_routes._get_field_keys("tenant-1", StatusFilter.ALL))
+
+        assert keys == ["origin_country", "value_amount"]
+        assert fake_prisma.calls == [(case_export_routes._FIELD_KEYS_SQL, ("tenant-1",))]
+
+    def test_status_filter_matches_case_query(self, fake_prisma):
+        _run(case_export_routes._get_field_keys("tenant-1", StatusFilter.ARCHIVED))
+
+        sql, (tenant_id, statuses) = fake_prisma.calls[0]
+        assert sql == case_export_routes._FIELD_KEYS_BY_STATUS_SQL
+        where = case_export_routes._build_where("tenant-1", StatusFilter.ARCHIVED)
+        assert (tenant_id, json.loads(statuses)) == ("tenant-1", where["status"]["in"])
@@ -0,0 +1,334 @@
+"""
+Tests for bulk case import: parsing (CSV/JSONL) and the NDJSON endpoint.
+"""
+
+import io
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from starlette.requests import Request
+
+import app.routes.case_import as case_import_routes
+from app.dependencies.auth import AuthContext
+from app.domain.case_import import (
+    MAX_LINE_LENGTH,
+    CsvRecordReader,
+    ImportAborted,
+    ImportFormat,
+    ImportRowError,
+    LineSplitter,
+    RowParser,
+    coerce_csv_value,
+)
+from app.domain.procedures import procedure_loader
+from app.routes.case_import import import_cases
+from conftest import _run
+
+
+def _split(chunks: list[bytes]) -> list[str]:
+    splitter = LineSplitter()
+    lines: list[str] = []
+    for chunk in chunks:
+        lines.extend(splitter.feed(chunk))
+    lines.extend(splitter.close())
+    return lines
+
+
+# --- LineSplitter Tests ---
+
+
+class TestLineSplitter:
+    """Tests for incremental line splitting."""
+
+    def test_lines_across_chunk_boundaries(self):
+        lines = _split([b"a,b\n1,", b"2\r\n3,4"])
+        assert lines == ["a,b", "1,2", "3,4"]
+
+    def test_multibyte_character_split_across_chunks(self):
+        data = "title\nMünchen\n".encode("utf-8")
+        idx = data.index("ü".encode("utf-8")) + 1
+        lines = _split([data[:idx], data[idx:]])
+        assert lines[:2] == ["title", "München"]
+
+    def test_bom_is_stripped(self):
+        lines = _split(["﻿title\nA\n".encode("utf-8")])
+        assert lines[0] == "title"
+
+    def test_invalid_encoding_raises(self):
+        with pytest.raises(ImportRowError) as exc:
+            _split([b"\xff\xfe\xfa\n"])
+        assert exc.value.code == "INVALID_ENCODING"
+
+
+# --- CsvRecordReader Tests ---
+
+
+def _records(data: bytes) -> list:
+    """Records of the reader; unreadable records as their error code."""
+    reader = CsvRecordReader(io.BytesIO(data))
+    records = []
+    while True:
+        try:
+            records.append(next(reader))
+        except StopIteration:
+            return records
+        except ImportAborted:
+            raise
+        except ImportRowError as exc:
+            records.append(exc.code)
+
+
+class TestCsvRecordReader:
+    """Tests for CSV record reading from the spooled upload."""
+
+    def test_quoted_newline_stays_in_field(self):
+        records = _records(b'title,remarks\r\nA,"line1\r\nline2"\r\nB,x\r\n')
+        assert records == [["title", "remarks"], ["A", "line1\r\nline2"], ["B", "x"]]
+
+    def test_bare_quote_inside_field(self):
+        records = _records(b'title,remarks\nA,12" monitor\nB,24" monitor\nC,x\n')
+        assert records[1:] == [["A", '12" monitor'], ["B", '24" monitor'], ["C", "x"]]
+
+    def test_malformed_record_is_skipped(self):
+        records = _records(b'title,remarks\nA,"x"y\nB,z\n')
+        assert records == [["title", "remarks"], "INVALID_ROW", ["B", "z"]]
+
+    def test_unterminated_quote_at_end(self):
+        records = _records(b'title,remarks\nA,x\nB,"open\nC,y\n')
+        assert records == [["title", "remarks"], ["A", "x"], "INVALID_ROW"]
+
+    def test_bom_and_blank_lines(self):
+        records = _records("\ufefftitle\n\nA\n".encode("utf-8"))
+        assert records == [["title"], [], ["A"]]
+
+    def test_invalid_encoding_aborts(self):
+        with pytest.raises(ImportAborted) as exc:
+            _records(b"title\n\xff\xfe\xfa\n")
+        assert exc.value.code == "INVALID_ENCODING"
+
+    def test_line_too_long_aborts(self):
+        with pytest.raises(ImportAborted) as exc:
+            _records(b"title\n" + b"x" * (MAX_LINE_LENGTH + 1))
+        assert exc.value.code == "LINE_TOO_LONG"
+
+
+# --- RowParser Tests ---
+
+
+class TestRowParserCsv:
+    """Tests for CSV row parsing."""
+
+    def test_header_then_rows(self):
+        parser = RowParser(ImportFormat.CSV)
+        assert parser.parse("title,procedure_code,sender_name,remarks") is None
+
+        row = parser.parse("Paket 1,IZA,AliExpress,")
+        assert row.row_number == 1
+        assert row.title == "Paket 1"
+        assert row.procedure_code == "IZA"
+        assert row.fields == {"sender_name": "AliExpress"}
+        assert row.raw_fields is True
+
+    def test_split_records_and_blank_records(self):
+        parser = RowParser(ImportFormat.CSV)
+        assert parser.parse(["title", "sender_name"]) is None
+        assert parser.parse([]) is None
+
+        row = parser.parse(["A", "Shop"])
+        assert (row.row_number, row.title, row.fields) == (1, "A", {"sender_name": "Shop"})
+
+    def test_skip_row_counts_unreadable_records(self):
+        parser = RowParser(ImportFormat.CSV)
+        with pytest.raises(ImportAborted):
+            parser.skip_row()
+
+        parser.parse(["title"])
+        assert parser.skip_row() == 1
+        assert parser.parse(["B"]).row_number == 2
+
+    def test_column_count_mismatch(self):
+        parser = RowParser(ImportFormat.CSV)
+        parser.parse("title,sender_name")
+        with pytest.raises(ImportRowError) as exc:
+            parser.parse("A,B,C")
+        assert exc.value.code == "INVALID_ROW"
+        assert parser.rows_seen == 1
+
+
+class TestRowParserJsonl:
+    """Tests for JSONL row parsing."""
+
+    def test_valid_object(self):
+        parser = RowParser(ImportFormat.JSONL)
+        row = parser.parse('{"title": "A", "procedure_code": "IZA", "fields": {"value_amount": 12.5}}')
+        assert row.title == "A"
+        assert row.fields == {"value_amount": 12.5}
+        assert row.raw_fields is False
+
+    def test_blank_lines_ignored(self):
+        parser = RowParser(ImportFormat.JSONL)
+        assert parser.parse("   ") is None
+        assert parser.rows_seen == 0
+
+    def test_invalid_json(self):
+        parser = RowParser(ImportFormat.JSONL)
+        with pytest.raises(ImportRowError) as exc:
+            parser.parse("{not json")
+        assert exc.value.code == "INVALID_JSON"
+
+    def test_fields_must_be_object(self):
+        parser = RowParser(ImportFormat.JSONL)
+        with pytest.raises(ImportRowError) as exc:
+            parser.parse('{"fields": [1, 2]}')
+        assert exc.value.code == "INVALID_ROW"
+
+
+# --- Value Coercion Tests ---
+
+
+class TestCoerceCsvValue:
+    """Tests for typing CSV values by field type."""
+
+    def test_number_with_decimal_comma(self):
+        assert coerce_csv_value("value_amount", "12,50", "NUMBER") == 12.5
+
+    def test_integer_number(self):
+        assert coerce_csv_value("quantity", "3", "NUMBER") == 3
+
+    def test_invalid_number(self):
+        with pytest.raises(ImportRowError) as exc:
+            coerce_csv_value("value_amount", "abc", "NUMBER")
+        assert exc.value.code == "INVALID_VALUE"
+
+    def test_boolean_values(self):
+        assert coerce_csv_value("commercial_goods", "ja", "BOOLEAN") is True
+        assert coerce_csv_value("commercial_goods", "0", "BOOLEAN") is False
+
+    def test_country_uppercased(self):
+        assert coerce_csv_value("origin_country", " cn ", "COUNTRY") == "CN"
+
+    def test_unknown_field_stays_string(self):
+        assert coerce_csv_value("recipient_postcode", "01234", None) == "01234"
+
+
+# --- Endpoint Tests ---
+
+
+class FakeCreateMany:
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+
+    async def create_many(self, data):
+        self.rows.extend(data)
+        return len(data)
+
+
+class FakeImportPrisma:
+    """Records what create_many writes inside tx()."""
+
+    def __init__(self):
+        self.cases: list[dict] = []
+        self.fields: list[dict] = []
+        self.progresses: list[dict] = []
+
+    @asynccontextmanager
+    async def tx(self):
+        yield type("Tx", (), {
+            "case": FakeCreateMany(self.cases),
+            "casefield": FakeCreateMany(self.fields),
+            "wizardprogress": FakeCreateMany(self.progresses),
+        })()
+
+
+@pytest.fixture
+def fake_prisma(monkeypatch):
+    fake = FakeImportPrisma()
+    monkeypatch.setattr(case_import_routes, "prisma", fake)
+
+    async def no_procedure(code, version=None):
+        return None
+
+    monkeypatch.setattr(procedure_loader, "get_cached", no_procedure)
+    return fake
+
+
+def _import(body: bytes, content_type: str = "text/csv", chunk_size: int = 7) -> list[dict]:
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    async def receive():
+        if not chunks:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return {"type": "http.request", "body": chunks.pop(0), "more_body": True}
+
+    request = Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/cases/import",
+            "headers": [(b"content-type", content_type.encode())],
+        },
+        receive,
+    )
+    context = AuthContext(
+        user={"id": "user-1"}, tenant={"id": "tenant-1"}, role="OWNER", session_token_hash=None
+    )
+
+    async def scenario():
+        response = await import_cases(request, format=None, procedure_code=None, context=context)
+        return [json.loads(line) async for line in response.body_iterator]
+
+    return _run(scenario())
+
+
+class TestImportEndpoint:
+    """POST /cases/import streams one line per row and always ends with a summary."""
+
+    def test_bare_quote_does_not_swallow_later_rows(self, fake_prisma):
+        lines = _import(b'title,contents_description\nA,12" Monitor\nB,Kabel\nC,Maus\n')
+
+        assert [line.get("status") for line in lines[:-1]] == ["created"] * 3
+        assert lines[-1] == {"summary": {"total": 3, "created": 3, "failed": 0}}
+        assert [f["value_json"].data for f in fake_prisma.fields] == [
+            '12" Monitor', "Kabel", "Maus"
+        ]
+
+    def test_malformed_csv_record_is_a_row_error(self, fake_prisma):
+        lines = _import(b'title,remarks\nA,"x"y\nB,ok\n')
+
+        assert lines[0]["row"] == 1 and lines[0]["error"]["code"] == "INVALID_ROW"
+        assert lines[1]["row"] == 2 and lines[1]["status"] == "created"
+        assert lines[-1] == {"summary": {"total": 2, "created": 1, "failed": 1}}
+
+    def test_jsonl_rows(self, fake_prisma):
+        body = b'{"title": "A", "fields": {"x": 1}}\n{not json\n'
+
+        lines = _import(body, content_type="application/x-ndjson")
+
+        assert [line.get("status") for line in lines[:-1]] == ["error", "created"]
+        assert lines[-1]["summary"] == {"total": 2, "created": 1, "failed": 1}
+
+    def test_invalid_encoding_ends_with_summary(self, fake_prisma):
+        lines = _import(b"title\nA\n\xff\xfe\n")
+
+        assert lines[-1]["summary"]["aborted"]["code"] == "INVALID_ENCODING"
+
+    def test_unexpected_error_ends_with_summary(self, fake_prisma, monkeypatch):
+        calls = []
+
+        async def failing_loader(code, version=None):
+            calls.append(code)
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(procedure_loader, "get_cached", failing_loader)
+
+        lines = _import(b"title,procedure_code\nA,\nB,IZA\nC,\n")
+
+        # Row A was prepared before the failure and is still saved
+        assert lines[0] == {
+            "row": 1, "status": "created", "case_id": fake_prisma.cases[0]["id"],
+            "case_status": "DRAFT", "procedure_code": None, "fields": 0,
+        }
+        assert lines[-1]["summary"]["aborted"]["code"] == "INTERNAL_SERVER_ERROR"
+        assert lines[-1]["summary"]["created"] == 1
+        assert calls == ["IZA"]
@@ -0,0 +1,126 @@
+"""
+Tests for the dashboard metrics aggregation.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.routes.dashboard as dashboard
+from app.dependencies.auth import AuthContext
+from conftest import _run
+
+
+class FakePrisma:
+    """Returns canned rows for the two aggregate queries and records every call."""
+
+    def __init__(self, status_rows: list[dict], day_rows: list[dict] | None = None):
+        self.status_rows = status_rows
+        self.day_rows = day_rows or []
+        self.calls: list[tuple] = []
+
+    async def query_raw(self, sql: str, *params):
+        self.calls.append((sql, params))
+        if sql == dashboard._CASE_STATS_SQL:
+            return self.status_rows
+        if sql == dashboard._DAILY_ACTIVITY_SQL:
+            return self.day_rows
+        raise AssertionError("unexpected query")
+
+
+@pytest.fixture
+def fake_prisma(monkeypatch):
+    def install(status_rows, day_rows=None):
+        fake = FakePrisma(status_rows, day_rows)
+        monkeypatch.setattr(dashboard, "prisma", fake)
+        return fake
+
+    return install
+
+
+def _context(tenant_id: str | None = "tenant-1") -> AuthContext:
+    tenant = {"id": tenant_id} if tenant_id else {}
+    return AuthContext(user={"id": "user-1"}, tenant=tenant, role="OWNER", session_token_hash=None)
+
+
+class TestCaseStats:
+    def test_counts_by_status(self, fake_prisma):
+        fake_prisma([
+            {"status": "DRAFT", "count": 3, "last_activity": "2026-10-18T08:00:00+00:00"},
+            {"status": "IN_PROCESS", "count": 2, "last_activity": "2026-10-17T08:00:00+00:00"},
+            {"status": "ARCHIVED", "count": 1, "last_activity": "2026-10-01T08:00:00+00:00"},
+        ])
+
+        counts, _ = _run(dashboard._get_case_stats("tenant-1"))
+
+        assert counts.model_dump() == {
+            "drafts": 3, "in_process": 2, "submitted": 0, "archived": 1, "total": 6,
+        }
+
+    def test_uncounted_statuses_still_define_last_activity(self, fake_prisma):
+        fake_prisma([
+            {"status": "DRAFT", "count": 1, "last_activity": "2026-10-18T08:00:00+00:00"},
+            {"status": "PREPARED", "count": 4, "last_activity": "2026-10-19T09:30:00.123+00:00"},
+        ])
+
+        counts, last_activity = _run(dashboard._get_case_stats("tenant-1"))
+
+        assert counts.total == 1
+        assert last_activity == datetime(2026, 10, 19, 9, 30, 0, 123000, tzinfo=timezone.utc)
+
+    def test_no_cases(self, fake_prisma):
+        fake = fake_prisma([])
+
+        counts, last_activity = _run(dashboard._get_case_stats("tenant-1"))
+
+        assert counts.total == 0
+        assert last_activity is None
+        assert fake.calls == [(dashboard._CASE_STATS_SQL, ("tenant-1",))]
+
+
+class TestDailyActivity:
+    def test_passes_today_and_window(self, fake_prisma):
+        fake = fake_prisma([], [
+            {"date": "2026-10-18", "cases_created": 0, "cases_submitted": 1},
+            {"date": "2026-10-19", "cases_created": 2, "cases_submitted": 0},
+        ])
+
+        days = _run(dashboard._get_daily_activity("tenant-1", days=2))
+
+        today = datetime.utcnow().date()
+        assert fake.calls == [(dashboard._DAILY_ACTIVITY_SQL, ("tenant-1", today.isoformat(), 2))]
+        assert [day.model_dump() for day in days] == [
+            {"date": "2026-10-18", "cases_created": 0, "cases_submitted": 1},
+            {"date": "2026-10-19", "cases_created": 2, "cases_submitted": 0},
+        ]
+
+
+class TestDashboardMetrics:
+    def test_two_queries_per_view(self, fake_prisma):
+        today = datetime.utcnow().date()
+        day_rows = [
+            {"date": (today - timedelta(days=offset)).isoformat(), "cases_created": 0,
+             "cases_submitted": 0}
+            for offset in range(6, -1, -1)
+        ]
+        fake = fake_prisma(
+            [{"status": "SUBMITTED", "count": 5, "last_activity": "2026-10-19T10:00:00+00:00"}],
+            day_rows,
+        )
+
+        response = _run(dashboard.get_dashboard_metrics(_context()))
+
+        assert len(fake.calls) == 2
+        assert response.data.case_counts.submitted == 5
+        assert response.data.case_counts.total == 5
+        assert len(response.data.activity.days) == 7
+        assert response.data.activity.days[-1].date == today.isoformat()
+
+    def test_no_tenant_skips_queries(self, fake_prisma):
+        fake = fake_prisma([])
+
+        response = _run(dashboard.get_dashboard_metrics(_context(None)))
+
+        assert fake.calls == []
+        assert response.data.case_counts.total == 0
+        assert response.data.activity.days == []
@@ -11,15 +11,19 @@ Also tests negative paths:
 - Credit consumption
 """
 
+import hashlib
+import json
 import os
 import uuid
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, AsyncIterator
 
 import pytest
 from fastapi.testclient import TestClient
 
+from app.domain.procedures import procedure_loader
 from app.main import create_app
 
 
@@ -165,6 +169,11 @@ class FakeProcedureModel:
         return steps
 
 
+@dataclass
+class FakeBatchResult:
+    count: int
+
+
 class FakeCaseModel:
     def __init__(self, proc_model: FakeProcedureModel, field_model: "FakeCaseFieldModel") -> None:
         self._cases: list[dict] = []
@@ -211,6 +220,19 @@ class FakeCaseModel:
                 return FakeModel(self._cases[i])
         raise ValueError("Case not found")
 
+    async def update_many(self, where: dict, data: dict) -> FakeBatchResult:
+        count = 0
+        for c in self._cases:
+            if all(
+                c.get(k) in v["in"] if isinstance(v, dict) else c.get(k) == v
+                for k, v in where.items()
+            ):
+                for k, v in data.items():
+                    c[k] = c.get(k, 0) + v["increment"] if isinstance(v, dict) else v
+                c["updated_at"] = datetime.now(timezone.utc)
+                count += 1
+        return FakeBatchResult(count)
+
 
 class FakeCaseFieldModel:
     def __init__(self) -> None:
@@ -239,9 +261,53 @@ class FakeCaseFieldModel:
         return FakeModel(new_field)
 
 
-class FakeCaseSnapshotModel:
+class FakeSnapshotBlobStore:
+    """Content-addressed blobs, filled via FakePrisma.query_raw."""
+
     def __init__(self) -> None:
+        self._blobs: dict[str, object] = {}
+
+    def put(self, content: object) -> str:
+        digest = hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+        self._blobs.setdefault(digest, content)
+        return digest
+
+    def attach(self, snapshot: dict, include: dict | None) -> dict:
+        result = dict(snapshot)
+        for relation, column in (
+            ("fields_blob", "fields_hash"),
+            ("delta_blob", "delta_hash"),
+            ("validation_blob", "validation_hash"),
+        ):
+            if include and include.get(relation):
+                digest = snapshot[column]
+                result[relation] = FakeModel({"content": self._blobs[digest]}) if digest else None
+        return result
+
+
+def _snapshot_matches(snapshot: dict, where: dict) -> bool:
+    if "OR" in where:
+        return any(_snapshot_matches(snapshot, clause) for clause in where["OR"])
+    for key, condition in where.items():
+        value = snapshot[key]
+        if isinstance(condition, dict):
+            if "gte" in condition and value < condition["gte"]:
+                return False
+            if "lte" in condition and value > condition["lte"]:
+                return False
+            if "lt" in condition and value >= condition["lt"]:
+                return False
+            if "in" in condition and value not in condition["in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCaseSnapshotModel:
+    def __init__(self, blobs: FakeSnapshotBlobStore) -> None:
         self._snapshots: list[dict] = []
+        self._blobs = blobs
 
     async def create(self, data: dict) -> FakeModel:
         snapshot = {
@@ -250,25 +316,34 @@ class FakeCaseSnapshotModel:
             "version": data["version"],
             "procedure_code": data["procedure_code"],
             "procedure_version": data["procedure_version"],
-            "fields_json": data["fields_json"],
-            "validation_json": data["validation_json"],
+            "keyframe_version": data["keyframe_version"],
+            "fields_hash": data["fields_hash"],
+            "delta_hash": data["delta_hash"],
+            "validation_hash": data["validation_hash"],
             "created_at": datetime.now(timezone.utc),
         }
         self._snapshots.append(snapshot)
         return FakeModel(snapshot)
 
-    async def find_first(self, where: dict, order: dict | None = None) -> FakeModel | None:
-        for s in self._snapshots:
-            if s["case_id"] == where.get("case_id") and s["version"] == where.get("version"):
-                return FakeModel(s)
-        return None
-
-    async def find_many(self, where: dict, order: dict | None = None) -> list[FakeModel]:
-        result = [FakeModel(s) for s in self._snapshots if s["case_id"] == where.get("case_id")]
-        if order and order.get("version") == "desc":
-            result.sort(key=lambda x: x.version, reverse=True)
+    def _select(self, where: dict, order: dict | list | None) -> list[dict]:
+        result = [s for s in self._snapshots if _snapshot_matches(s, where)]
+        orders = order if isinstance(order, list) else [order or {}]
+        for clause in reversed(orders):
+            for key, direction in clause.items():
+                result.sort(key=lambda x: x[key], reverse=direction == "desc")
         return result
 
+    async def find_many(
+        self, where: dict, order: dict | list | None = None, include: dict | None = None
+    ) -> list[FakeModel]:
+        return [FakeModel(self._blobs.attach(s, include)) for s in self._select(where, order)]
+
+    async def find_first(
+        self, where: dict, order: dict | list | None = None, include: dict | None = None
+    ) -> FakeModel | None:
+        result = self._select(where, order)
+        return FakeModel(self._blobs.attach(result[0], include)) if result else None
+
 
 class FakeCreditBalanceModel:
     def __init__(self) -> None:
@@ -295,6 +370,14 @@ class FakeCreditBalanceModel:
             return FakeModel(self._balances[tenant_id])
         raise ValueError("Balance not found")
 
+    async def update_many(self, where: dict, data: dict) -> FakeBatchResult:
+        row = self._balances.get(where.get("tenant_id"))
+        minimum = where.get("balance", {}).get("gte", float("-inf"))
+        if row is None or row["balance"] < minimum:
+            return FakeBatchResult(0)
+        row["balance"] -= data["balance"]["decrement"]
+        return FakeBatchResult(1)
+
 
 class FakeLedgerModel:
     def __init__(self) -> None:
@@ -330,10 +413,19 @@ class FakePrisma:
         self.casefield = FakeCaseFieldModel()
         self.procedure = FakeProcedureModel()
         self.case = FakeCaseModel(self.procedure, self.casefield)
-        self.casesnapshot = FakeCaseSnapshotModel()
+        self.snapshotblobs = FakeSnapshotBlobStore()
+        self.casesnapshot = FakeCaseSnapshotModel(self.snapshotblobs)
         self.tenantcreditbalance = FakeCreditBalanceModel()
         self.creditledgerentry = FakeLedgerModel()
 
+    @asynccontextmanager
+    async def tx(self) -> AsyncIterator["FakePrisma"]:
+        yield self
+
+    async def query_raw(self, query: str, payload: str) -> list[dict]:
+        # Only used by snapshot_store.put_blobs
+        return [{"hash": self.snapshotblobs.put(value)} for value in json.loads(payload)]
+
 
 # --- Test Fixtures ---
 
@@ -411,6 +503,7 @@ def e2e_ctx(monkeypatch: pytest.MonkeyPatch) -> E2EContext:
         pass
 
     prisma = FakePrisma()
+    procedure_loader.clear_cache()
     monkeypatch.setattr("app.db.prisma_client.prisma", prisma)
     monkeypatch.setattr("app.db.prisma_client.connect_prisma", noop)
     monkeypatch.setattr("app.db.prisma_client.disconnect_prisma", noop)
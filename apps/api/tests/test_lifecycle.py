@@ -2,16 +2,22 @@
 Tests for Case Lifecycle (Submit, Snapshots, Field Lock).
 """
 
+import hashlib
+import json
 import os
 import uuid
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, AsyncIterator
 
 import pytest
 from fastapi.testclient import TestClient
 
+from app.domain.procedures import procedure_loader
 from app.main import create_app
+from app.services.snapshot_store import create_snapshot
+from app.services.summary_cache import summary_cache
 
 
 # --- Fake Prisma Models ---
@@ -237,6 +243,11 @@ class FakeProcedureField:
             setattr(self, k, v)
 
 
+@dataclass
+class FakeBatchResult:
+    count: int
+
+
 class FakeCaseModel:
     def __init__(self, procedure_model: FakeProcedureModel) -> None:
         self._cases: list[dict] = []
@@ -278,6 +289,19 @@ class FakeCaseModel:
                 return FakeCase(self._cases[i], None, self._procedure_model)
         raise ValueError("Case not found")
 
+    async def update_many(self, where: dict, data: dict) -> FakeBatchResult:
+        count = 0
+        for c in self._cases:
+            if all(
+                c.get(k) in v["in"] if isinstance(v, dict) else c.get(k) == v
+                for k, v in where.items()
+            ):
+                for k, v in data.items():
+                    c[k] = c.get(k, 0) + v["increment"] if isinstance(v, dict) else v
+                c["updated_at"] = datetime.now(timezone.utc)
+                count += 1
+        return FakeBatchResult(count)
+
 
 class FakeCase:
     def __init__(self, data: dict, include: dict | None, procedure_model: FakeProcedureModel) -> None:
@@ -338,9 +362,53 @@ class FakeCaseField:
             setattr(self, k, v)
 
 
-class FakeCaseSnapshotModel:
+class FakeSnapshotBlobStore:
+    """Content-addressed blobs, filled via FakePrisma.query_raw."""
+
     def __init__(self) -> None:
+        self._blobs: dict[str, object] = {}
+
+    def put(self, content: object) -> str:
+        digest = hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+        self._blobs.setdefault(digest, content)
+        return digest
+
+    def attach(self, snapshot: dict, include: dict | None) -> dict:
+        result = dict(snapshot)
+        for relation, column in (
+            ("fields_blob", "fields_hash"),
+            ("delta_blob", "delta_hash"),
+            ("validation_blob", "validation_hash"),
+        ):
+            if include and include.get(relation):
+                digest = snapshot[column]
+                result[relation] = FakeCaseSnapshot({"content": self._blobs[digest]}) if digest else None
+        return result
+
+
+def _snapshot_matches(snapshot: dict, where: dict) -> bool:
+    if "OR" in where:
+        return any(_snapshot_matches(snapshot, clause) for clause in where["OR"])
+    for key, condition in where.items():
+        value = snapshot[key]
+        if isinstance(condition, dict):
+            if "gte" in condition and value < condition["gte"]:
+                return False
+            if "lte" in condition and value > condition["lte"]:
+                return False
+            if "lt" in condition and value >= condition["lt"]:
+                return False
+            if "in" in condition and value not in condition["in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCaseSnapshotModel:
+    def __init__(self, blobs: FakeSnapshotBlobStore) -> None:
         self._snapshots: list[dict] = []
+        self._blobs = blobs
 
     async def create(self, data: dict) -> "FakeCaseSnapshot":
         snapshot = {
@@ -349,24 +417,33 @@ class FakeCaseSnapshotModel:
             "version": data["version"],
             "procedure_code": data["procedure_code"],
             "procedure_version": data["procedure_version"],
-            "fields_json": data["fields_json"],
-            "validation_json": data["validation_json"],
+            "keyframe_version": data["keyframe_version"],
+            "fields_hash": data["fields_hash"],
+            "delta_hash": data["delta_hash"],
+            "validation_hash": data["validation_hash"],
             "created_at": datetime.now(timezone.utc),
         }
         self._snapshots.append(snapshot)
         return FakeCaseSnapshot(snapshot)
 
-    async def find_many(self, where: dict, order: dict | None = None) -> list["FakeCaseSnapshot"]:
-        result = [s for s in self._snapshots if s["case_id"] == where.get("case_id")]
-        if order and order.get("version") == "desc":
-            result.sort(key=lambda x: x["version"], reverse=True)
-        return [FakeCaseSnapshot(s) for s in result]
+    def _select(self, where: dict, order: dict | list | None) -> list[dict]:
+        result = [s for s in self._snapshots if _snapshot_matches(s, where)]
+        orders = order if isinstance(order, list) else [order or {}]
+        for clause in reversed(orders):
+            for key, direction in clause.items():
+                result.sort(key=lambda x: x[key], reverse=direction == "desc")
+        return result
 
-    async def find_first(self, where: dict, order: dict | None = None) -> "FakeCaseSnapshot | None":
-        for s in self._snapshots:
-            if s["case_id"] == where.get("case_id") and s["version"] == where.get("version"):
-                return FakeCaseSnapshot(s)
-        return None
+    async def find_many(
+        self, where: dict, order: dict | list | None = None, include: dict | None = None
+    ) -> list["FakeCaseSnapshot"]:
+        return [FakeCaseSnapshot(self._blobs.attach(s, include)) for s in self._select(where, order)]
+
+    async def find_first(
+        self, where: dict, order: dict | list | None = None, include: dict | None = None
+    ) -> "FakeCaseSnapshot | None":
+        result = self._select(where, order)
+        return FakeCaseSnapshot(self._blobs.attach(result[0], include)) if result else None
 
 
 class FakeCaseSnapshot:
@@ -384,7 +461,16 @@ class FakePrisma:
         self.procedure = FakeProcedureModel()
         self.case = FakeCaseModel(self.procedure)
         self.casefield = FakeCaseFieldModel()
-        self.casesnapshot = FakeCaseSnapshotModel()
+        self.snapshotblobs = FakeSnapshotBlobStore()
+        self.casesnapshot = FakeCaseSnapshotModel(self.snapshotblobs)
+
+    @asynccontextmanager
+    async def tx(self) -> AsyncIterator["FakePrisma"]:
+        yield self
+
+    async def query_raw(self, query: str, payload: str) -> list[dict]:
+        # Only used by snapshot_store.put_blobs
+        return [{"hash": self.snapshotblobs.put(value)} for value in json.loads(payload)]
 
 
 # --- Test Context ---
@@ -449,6 +535,8 @@ def lifecycle_ctx(monkeypatch: pytest.MonkeyPatch) -> LifecycleTestContext:
         return None
 
     fake_prisma = FakePrisma()
+    procedure_loader.clear_cache()
+    summary_cache.clear()
     monkeypatch.setattr("app.db.prisma_client.prisma", fake_prisma)
     monkeypatch.setattr("app.db.prisma_client.connect_prisma", _noop)
     monkeypatch.setattr("app.db.prisma_client.disconnect_prisma", _noop)
@@ -629,3 +717,86 @@ def test_get_snapshot_returns_detail(lifecycle_ctx: LifecycleTestContext) -> Non
     assert "fields_json" in data
     assert "validation_json" in data
 
+
+
+def test_diff_snapshots_between_versions(lifecycle_ctx: LifecycleTestContext) -> None:
+    """GET /cases/{id}/snapshots/{a}/diff/{b} returns changed fields."""
+    import asyncio
+
+    client = lifecycle_ctx.client
+    cookies = {"zollpilot_session": lifecycle_ctx.user_token}
+
+    resp = client.post("/cases", json={"title": "Snapshot Diff"}, cookies=cookies)
+    case_id = resp.json()["data"]["id"]
+    history = [
+        {"tracking_number": "12345", "weight_kg": 10.5},
+        {"tracking_number": "12345", "weight_kg": 11.0, "remarks": "neu"},
+        {"weight_kg": 11.0, "remarks": "neu"},
+    ]
+    for version, fields in enumerate(history, start=1):
+        asyncio.get_event_loop().run_until_complete(
+            create_snapshot(
+                case_id=case_id,
+                version=version,
+                procedure_code="IZA",
+                procedure_version="v1",
+                fields=fields,
+                validation={"valid": True, "errors": []},
+                client=lifecycle_ctx.prisma,
+            )
+        )
+
+    resp = client.get(f"/cases/{case_id}/snapshots/1/diff/3", cookies=cookies)
+    assert resp.status_code == 200
+    changes = {c["key"]: c for c in resp.json()["data"]["changes"]}
+    assert changes["remarks"]["op"] == "added"
+    assert changes["tracking_number"] == {
+        "key": "tracking_number", "op": "removed", "from": "12345", "to": None
+    }
+    assert changes["weight_kg"]["from"] == 10.5
+    assert changes["weight_kg"]["to"] == 11.0
+
+    resp = client.get(f"/cases/{case_id}/snapshots/1/diff/7", cookies=cookies)
+    assert resp.status_code == 404
+    assert resp.json()["error"]["code"] == "SNAPSHOT_NOT_FOUND"
+
+
+def test_submit_logs_stage_timings(lifecycle_ctx: LifecycleTestContext, caplog: pytest.LogCaptureFixture) -> None:
+    """Submit exposes per-stage timings in the request log."""
+    client = lifecycle_ctx.client
+    cookies = {"zollpilot_session": lifecycle_ctx.user_token}
+
+    resp = client.post("/cases", json={"title": "Timings"}, cookies=cookies)
+    case_id = resp.json()["data"]["id"]
+    client.post(f"/cases/{case_id}/procedure", json={"procedure_code": "IZA"}, cookies=cookies)
+    client.put(f"/cases/{case_id}/fields/tracking_number", json={"value": "12345"}, cookies=cookies)
+    client.put(f"/cases/{case_id}/fields/weight_kg", json={"value": 10.5}, cookies=cookies)
+    lifecycle_ctx.prisma.case._cases[0]["fields"] = lifecycle_ctx.prisma.casefield._fields
+
+    with caplog.at_level("INFO", logger="api"):
+        client.post(f"/cases/{case_id}/submit", cookies=cookies)
+
+    records = [r for r in caplog.records if r.getMessage() == f"POST /cases/{case_id}/submit"]
+    assert records
+    assert "load_case" in records[-1].stage_timings
+
+
+def test_summary_reflects_field_update(lifecycle_ctx: LifecycleTestContext) -> None:
+    """Cached summary is invalidated by field writes."""
+    client = lifecycle_ctx.client
+    cookies = {"zollpilot_session": lifecycle_ctx.user_token}
+
+    resp = client.post("/cases", json={"title": "Summary Cache"}, cookies=cookies)
+    case_id = resp.json()["data"]["id"]
+    client.post(f"/cases/{case_id}/procedure", json={"procedure_code": "IZA"}, cookies=cookies)
+    client.put(f"/cases/{case_id}/fields/weight_kg", json={"value": 10.5}, cookies=cookies)
+    lifecycle_ctx.prisma.case._cases[0]["fields"] = lifecycle_ctx.prisma.casefield._fields
+
+    first = client.get(f"/cases/{case_id}/summary", cookies=cookies)
+    assert first.status_code == 200
+
+    client.put(f"/cases/{case_id}/fields/weight_kg", json={"value": 12.0}, cookies=cookies)
+    assert not summary_cache.has_case(case_id)
+
+    second = client.get(f"/cases/{case_id}/summary", cookies=cookies)
+    assert second.status_code == 200
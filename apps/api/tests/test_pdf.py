@@ -2,12 +2,27 @@
 Tests for PDF export functionality.
 """
 
+import asyncio
+import os
+import tracemalloc
+
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch, MagicMock
 from datetime import datetime, timezone
 
-from app.services.pdf_service import pdf_service, PDFService
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+import app.routes.pdf as pdf_routes
+import app.services.pdf_export as pdf_export
+from app.services.pdf_cache import PDFCache
+from app.services.pdf_renderer import RenderFailed, RendererBusy, RenderTimeout
+import app.services.pdf_service as pdf_service_module
+from app.services.pdf_service import pdf_service, PDFService, PDF_TEMPLATE_HASH
+from app.services.summary_cache import summary_cache
 from app.domain.summary import generate_case_summary
+from conftest import FakeCreditPrisma
 
 
 class TestPDFService:
@@ -48,6 +63,14 @@ class TestPDFService:
         # Should have reasonable size
         assert len(pdf_bytes) > 1000
 
+    def test_render_resources_are_reused(self):
+        """Stylesheet and font configuration are created once per process."""
+        first = pdf_service_module._render_resources()
+        pdf_service_module.warm_up()
+
+        assert pdf_service_module._render_resources() is first
+        assert "<style>" not in pdf_service_module.PDF_TEMPLATE
+
     def test_get_filename_format(self):
         """Filename follows expected format."""
         filename = pdf_service.get_filename(
@@ -259,3 +282,222 @@ class TestLedgerEntry:
         assert "case_id" in entry["metadata_json"]
         assert "version" in entry["metadata_json"]
 
+
+class FakeExportPrisma(FakeCreditPrisma):
+    """Minimal models used by export_case_pdf."""
+
+    def __init__(self, balance: int):
+        super().__init__(balance)
+        case = SimpleNamespace(
+            id="case-1", status="SUBMITTED", procedure=SimpleNamespace(name="IZA")
+        )
+        snapshot = SimpleNamespace(
+            id="snapshot-1",
+            version=1,
+            procedure_code="IZA",
+            procedure_version="v1",
+            created_at=datetime(2026, 1, 15, 10, 30, tzinfo=timezone.utc),
+        )
+        self.case = SimpleNamespace(find_first=self._returning(case))
+        self.casesnapshot = SimpleNamespace(find_first=self._returning(snapshot))
+
+
+class StubRenderer:
+    def __init__(self, result=None, error: Exception | None = None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+
+    async def render_to_file(self, document, path) -> int:
+        self.calls += 1
+        if self.error:
+            raise self.error
+        with open(path, "wb") as target:
+            return target.write(self.result)
+
+
+async def _read_body(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+@pytest.fixture
+def export(monkeypatch, tmp_path):
+    """Call export_case_pdf with a fake database, a stub renderer and a fresh PDF cache."""
+    summary_cache.clear()
+    summary_cache.put(
+        ("case-1", 1, "IZA", "v1"),
+        generate_case_summary(
+            procedure_code="IZA", procedure_version="v1", procedure_name="IZA", fields={}
+        ),
+    )
+
+    monkeypatch.setattr(pdf_export, "pdf_cache", PDFCache(tmp_path))
+
+    def call(
+        balance: int,
+        renderer: StubRenderer,
+        hits_consume_credit: bool = True,
+        read_body: bool = True,
+    ):
+        db = FakeExportPrisma(balance)
+        settings = SimpleNamespace(pdf_cache_hits_consume_credit=hits_consume_credit)
+        monkeypatch.setattr(pdf_routes, "prisma", db)
+        monkeypatch.setattr(pdf_export, "pdf_renderer", renderer)
+        monkeypatch.setattr(pdf_routes, "get_settings", lambda: settings)
+        request = SimpleNamespace(state=SimpleNamespace(request_id="req-1"))
+        context = SimpleNamespace(tenant={"id": "tenant-1"}, user={"id": "user-1"})
+        loop = asyncio.new_event_loop()
+        try:
+            response = loop.run_until_complete(
+                pdf_routes.export_case_pdf("case-1", request, context)
+            )
+            # Streamed from the cache file; collect it like a client would
+            if read_body:
+                response.body = loop.run_until_complete(_read_body(response))
+            return db, response
+        except HTTPException as exc:
+            return db, exc
+        finally:
+            loop.close()
+
+    yield call
+    summary_cache.clear()
+
+
+class TestExportCredits:
+    """Credits are consumed only after a successful render."""
+
+    def test_success_consumes_one_credit(self, export):
+        db, response = export(2, StubRenderer(result=b"%PDF-ok"))
+
+        assert response.body == b"%PDF-ok"
+        assert db.balance == 1
+        assert [entry["reason"] for entry in db.ledger] == ["PDF_EXPORT"]
+
+    @pytest.mark.parametrize(
+        ("error", "status_code", "code"),
+        [
+            (RendererBusy(retry_after=3), 503, "PDF_RENDERER_BUSY"),
+            (RenderTimeout(), 504, "PDF_RENDER_TIMEOUT"),
+            (RenderFailed(), 500, "PDF_RENDER_FAILED"),
+        ],
+    )
+    def test_render_errors_cost_nothing(self, export, error, status_code, code):
+        db, exc = export(2, StubRenderer(error=error))
+
+        assert exc.status_code == status_code
+        assert exc.detail["code"] == code
+        assert db.balance == 2
+        assert db.ledger == []
+
+    def test_busy_sets_retry_after(self, export):
+        _, exc = export(2, StubRenderer(error=RendererBusy(retry_after=3)))
+        assert exc.headers == {"Retry-After": "3"}
+
+    def test_no_credit_skips_render(self, export):
+        db, exc = export(0, StubRenderer(error=AssertionError("must not render")))
+
+        assert exc.status_code == 402
+        assert db.ledger == []
+
+
+class TestExportCache:
+    """Repeat downloads are served from the PDF cache."""
+
+    def test_repeat_download_skips_render(self, export):
+        renderer = StubRenderer(result=b"%PDF-ok")
+        _, first = export(2, renderer)
+        db, second = export(2, renderer)
+
+        assert renderer.calls == 1
+        assert first.headers["X-PDF-Cache"] == "miss"
+        assert second.headers["X-PDF-Cache"] == "hit"
+        assert second.body == b"%PDF-ok"
+        assert db.balance == 1
+        assert second.headers["X-Credits-Consumed"] == "1"
+
+    def test_cache_hits_can_be_free(self, export):
+        renderer = StubRenderer(result=b"%PDF-ok")
+        export(2, renderer, hits_consume_credit=False)
+        db, response = export(0, renderer, hits_consume_credit=False)
+
+        assert response.status_code == 200
+        assert response.headers["X-Credits-Consumed"] == "0"
+        assert db.ledger == []
+
+    def test_request_id_is_audited_not_rendered(self, export):
+        db, _ = export(2, StubRenderer(result=b"%PDF-ok"))
+        assert db.ledger[0]["metadata_json"].data["request_id"] == "req-1"
+
+
+class TestStreamedResponse:
+    """PDFs are streamed from the cache file instead of being copied into the response."""
+
+    SIZE = 8 * 1024 * 1024
+
+    def _peak(self, produce) -> int:
+        tracemalloc.start()
+        try:
+            produce()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_content_length_and_body(self, export):
+        _, response = export(2, StubRenderer(result=b"%PDF-ok"))
+        assert response.headers["Content-Length"] == str(len(b"%PDF-ok"))
+        assert response.body == b"%PDF-ok"
+
+    def test_peak_memory_below_buffered_response(self, export):
+        key = ("snapshot-1", PDF_TEMPLATE_HASH)
+        pdf_export.pdf_cache.put(key, os.urandom(self.SIZE))
+
+        def streamed():
+            _, response = export(2, StubRenderer(error=AssertionError("cached")), read_body=False)
+
+            async def drain():
+                return sum([len(chunk) async for chunk in response.body_iterator])
+
+            loop = asyncio.new_event_loop()
+            try:
+                assert loop.run_until_complete(drain()) == self.SIZE
+            finally:
+                loop.close()
+
+        def buffered():
+            # Previous behaviour: full bytes object handed to a Response
+            Response(content=pdf_export.pdf_cache.get(key), media_type="application/pdf")
+
+        streamed_peak = self._peak(streamed)
+        buffered_peak = self._peak(buffered)
+
+        assert buffered_peak >= self.SIZE
+        assert streamed_peak < self.SIZE / 4
+
+
+class TestDeterministicRendering:
+    """Identical snapshots produce identical documents."""
+
+    def _html(self, request_id):
+        return pdf_service.build_html(
+            case_id="case-1",
+            version=1,
+            procedure_code="IZA",
+            procedure_version="v1",
+            procedure_name="IZA",
+            fields_json={"value_amount": 10},
+            request_id=request_id,
+            generated_at=datetime(2026, 1, 15, 10, 30, tzinfo=timezone.utc),
+        )
+
+    def test_html_is_stable(self):
+        assert self._html(None) == self._html(None)
+        assert "15.01.2026 10:30 UTC" in self._html(None)
+        assert "Request-ID" not in self._html(None)
+
+    def test_request_id_only_when_given(self):
+        assert "Request-ID: req-9" in self._html("req-9")
+
+    def test_template_hash_is_short_hex(self):
+        assert len(PDF_TEMPLATE_HASH) == 16
+        int(PDF_TEMPLATE_HASH, 16)
@@ -0,0 +1,272 @@
+"""
+Tests for the streamed batch PDF export.
+"""
+
+import asyncio
+import io
+import json
+import os
+import zipfile
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+import app.services.pdf_export as pdf_export
+from app.domain.summary import generate_case_summary
+from app.routes.pdf import PdfBatchRequest
+from app.services.pdf_batch import (
+    MANIFEST_NAME,
+    BatchItem,
+    PDFBatchExport,
+    ZipStream,
+    load_batch_items,
+)
+from app.services.pdf_cache import PDFCache
+from app.services.pdf_renderer import RenderFailed
+from app.services.summary_cache import summary_cache
+from conftest import FakeCreditPrisma, _run
+
+
+CREATED = datetime(2026, 1, 15, 10, 30, tzinfo=timezone.utc)
+
+
+def _case(case_id: str, status: str = "SUBMITTED"):
+    return SimpleNamespace(id=case_id, status=status, procedure=SimpleNamespace(name="IZA"))
+
+
+def _snapshot(case_id: str):
+    return SimpleNamespace(
+        id=f"snapshot-{case_id}",
+        case_id=case_id,
+        version=1,
+        procedure_code="IZA",
+        procedure_version="v1",
+        created_at=CREATED,
+    )
+
+
+def _item(case_id: str) -> BatchItem:
+    return BatchItem(case_id, case=_case(case_id), snapshot=_snapshot(case_id))
+
+
+class FakeBatchPrisma(FakeCreditPrisma):
+    """Cases, snapshots and the credit models."""
+
+    def __init__(self, balance: int, cases=(), snapshots=()):
+        super().__init__(balance)
+        self.snapshots = list(snapshots)
+        self.raw_queries: list[tuple] = []
+        self.case = SimpleNamespace(find_many=self._returning(list(cases)))
+        self.casesnapshot = SimpleNamespace(find_many=self._find_snapshots)
+
+    async def query_raw(self, sql, *params):
+        """Latest snapshot ids per case, like the DISTINCT ON query."""
+        self.raw_queries.append((sql, params))
+        latest = {}
+        for snapshot in self.snapshots:
+            if snapshot.case_id in json.loads(params[0]):
+                current = latest.get(snapshot.case_id)
+                if current is None or snapshot.version > current.version:
+                    latest[snapshot.case_id] = snapshot
+        return [{"id": snapshot.id} for snapshot in latest.values()]
+
+    async def _find_snapshots(self, where, include=None):
+        return [s for s in self.snapshots if s.id in where["id"]["in"]]
+
+
+class DelayRenderer:
+    """Renders "%PDF <case>" after a per-case delay; tracks concurrency."""
+
+    def __init__(self, delays: dict[str, float] | None = None, fail: set[str] = frozenset()):
+        self.delays = delays or {}
+        self.fail = fail
+        self.running = 0
+        self.max_running = 0
+
+    async def render_to_file(self, document, path) -> int:
+        case_id = document.case_id
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delays.get(case_id, 0))
+            if case_id in self.fail:
+                raise RenderFailed("layout failed")
+            with open(path, "wb") as target:
+                return target.write(f"%PDF {case_id}".encode())
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+def batch(monkeypatch, tmp_path):
+    """Run a batch export with a fake database and renderer; returns (db, chunks)."""
+    summary_cache.clear()
+    for case_id in ["case-a", "case-b", "case-c", "case-d"]:
+        summary_cache.put(
+            (case_id, 1, "IZA", "v1"),
+            generate_case_summary(
+                procedure_code="IZA", procedure_version="v1", procedure_name="IZA", fields={}
+            ),
+        )
+    monkeypatch.setattr(pdf_export, "pdf_cache", PDFCache(tmp_path))
+
+    def call(items, renderer, balance=10, concurrency=2, hits_consume_credit=True):
+        monkeypatch.setattr(pdf_export, "pdf_renderer", renderer)
+        db = FakeBatchPrisma(balance)
+        export = PDFBatchExport(
+            items,
+            tenant_id="tenant-1",
+            user_id="user-1",
+            request_id="req-1",
+            concurrency=concurrency,
+            cache_hits_consume_credit=hits_consume_credit,
+            client=db,
+        )
+
+        async def collect():
+            return [chunk async for chunk in export.stream()]
+
+        return db, _run(collect())
+
+    yield call
+    summary_cache.clear()
+
+
+def _open(chunks) -> zipfile.ZipFile:
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def _manifest(chunks) -> dict:
+    return json.loads(_open(chunks).read(MANIFEST_NAME))
+
+
+class TestZipStream:
+    """Entries are emitted as they are added."""
+
+    def test_entries_stream_before_finish(self):
+        archive = ZipStream()
+        first = archive.add("a.pdf", b"%PDF-a")
+        second = archive.add("b.txt", b"text " * 100, compress=True)
+        tail = archive.finish()
+
+        assert first and second and tail
+        zf = zipfile.ZipFile(io.BytesIO(first + second + tail))
+        assert zf.testzip() is None
+        assert zf.read("a.pdf") == b"%PDF-a"
+        assert zf.getinfo("a.pdf").compress_type == zipfile.ZIP_STORED
+        assert zf.getinfo("b.txt").compress_type == zipfile.ZIP_DEFLATED
+
+    def test_add_file_copies_in_chunks(self):
+        data = os.urandom(200 * 1024)
+        archive = ZipStream()
+        chunks = list(archive.add_file("big.pdf", io.BytesIO(data), len(data)))
+        tail = archive.finish()
+
+        assert len(chunks) > 2
+        assert max(len(chunk) for chunk in chunks) < len(data)
+        zf = zipfile.ZipFile(io.BytesIO(b"".join(chunks) + tail))
+        assert zf.read("big.pdf") == data
+
+
+class TestPDFBatchExport:
+    """Concurrent rendering, manifest and per-case credits."""
+
+    def test_pdfs_and_manifest(self, batch):
+        items = [_item("case-a"), _item("case-b"), BatchItem("missing", error_code="CASE_NOT_FOUND")]
+        db, chunks = batch(items, DelayRenderer())
+
+        zf = _open(chunks)
+        assert zf.read("ZollPilot_IZA_case-a_v1.pdf") == b"%PDF case-a"
+        manifest = _manifest(chunks)
+        assert [e["case_id"] for e in manifest["cases"]] == ["case-a", "case-b", "missing"]
+        assert manifest["exported"] == 2
+        assert manifest["credits_consumed"] == 2
+        assert manifest["cases"][2]["error_code"] == "CASE_NOT_FOUND"
+        assert db.balance == 8
+        assert len(db.ledger) == 2
+
+    def test_streams_in_completion_order(self, batch):
+        items = [_item("case-a"), _item("case-b")]
+        _, chunks = batch(items, DelayRenderer(delays={"case-a": 0.2}))
+
+        names = _open(chunks).namelist()
+        assert names.index("ZollPilot_IZA_case-b_v1.pdf") < names.index("ZollPilot_IZA_case-a_v1.pdf")
+
+    def test_concurrency_is_bounded(self, batch):
+        renderer = DelayRenderer(delays={c: 0.05 for c in ["case-a", "case-b", "case-c", "case-d"]})
+        items = [_item(c) for c in ["case-a", "case-b", "case-c", "case-d"]]
+        _, chunks = batch(items, renderer, concurrency=2)
+
+        assert renderer.max_running == 2
+        assert _manifest(chunks)["exported"] == 4
+
+    def test_render_failure_costs_nothing(self, batch):
+        items = [_item("case-a"), _item("case-b")]
+        db, chunks = batch(items, DelayRenderer(fail={"case-b"}))
+
+        entry = _manifest(chunks)["cases"][1]
+        assert (entry["status"], entry["error_code"]) == ("failed", "PDF_RENDER_FAILED")
+        assert entry["credits_consumed"] == 0
+        assert db.balance == 9
+
+    def test_insufficient_credits_drops_pdf(self, batch):
+        items = [_item("case-a"), _item("case-b")]
+        db, chunks = batch(items, DelayRenderer(delays={"case-b": 0.1}), balance=1)
+
+        manifest = _manifest(chunks)
+        assert manifest["exported"] == 1
+        assert manifest["cases"][1]["error_code"] == "INSUFFICIENT_CREDITS"
+        assert "ZollPilot_IZA_case-b_v1.pdf" not in _open(chunks).namelist()
+        assert db.balance == 0
+
+
+class TestLoadBatchItems:
+    """Cases that cannot be exported are reported, not rendered."""
+
+    def test_marks_unexportable_cases(self):
+        db = FakeBatchPrisma(
+            0,
+            cases=[_case("case-a"), _case("case-b", status="PREPARED"), _case("case-c")],
+            snapshots=[
+                _snapshot("case-a"),
+                SimpleNamespace(id="snapshot-case-a-v2", case_id="case-a", version=2),
+                _snapshot("case-b"),
+            ],
+        )
+        items = _run(
+            load_batch_items(
+                "tenant-1", case_ids=["case-a", "case-b", "case-c", "missing"], client=db
+            )
+        )
+
+        assert [(i.case_id, i.error_code) for i in items] == [
+            ("case-a", None),
+            ("case-b", "CASE_NOT_SUBMITTED"),
+            ("case-c", "NO_SNAPSHOT"),
+            ("missing", "CASE_NOT_FOUND"),
+        ]
+        assert items[0].snapshot.id == "snapshot-case-a-v2"
+        assert len(db.raw_queries) == 1
+
+
+class TestPdfBatchRequest:
+    """Exactly one selection mode."""
+
+    def test_accepts_case_ids_or_range(self):
+        assert PdfBatchRequest(case_ids=["case-a"]).case_ids == ["case-a"]
+        assert PdfBatchRequest(prepared_from=date(2026, 1, 1)).prepared_to is None
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {},
+            {"case_ids": ["case-a"], "prepared_from": "2026-01-01"},
+            {"case_ids": []},
+            {"prepared_from": "2026-02-01", "prepared_to": "2026-01-01"},
+        ],
+    )
+    def test_rejects_invalid_selection(self, payload):
+        with pytest.raises(ValidationError):
+            PdfBatchRequest(**payload)
@@ -0,0 +1,73 @@
+"""
+Tests for the on-disk PDF cache.
+"""
+
+import os
+
+from app.services.pdf_cache import PDFCache
+
+
+def _key(n: int) -> tuple[str, str]:
+    return (f"snapshot-{n}", "abcd1234")
+
+
+class TestPDFCache:
+    """Tests for lookups, LRU eviction and persistence."""
+
+    def test_roundtrip(self, tmp_path):
+        cache = PDFCache(tmp_path, max_bytes=1000)
+        assert cache.get(_key(1)) is None
+
+        cache.put(_key(1), b"%PDF-1")
+
+        assert cache.get(_key(1)) == b"%PDF-1"
+        assert (tmp_path / "snapshot-1-abcd1234.pdf").exists()
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_template_hash_is_part_of_key(self, tmp_path):
+        cache = PDFCache(tmp_path, max_bytes=1000)
+        cache.put(("snapshot-1", "old"), b"%PDF-old")
+
+        assert cache.get(("snapshot-1", "new")) is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = PDFCache(tmp_path, max_bytes=250)
+        for n in range(2):
+            cache.put(_key(n), b"x" * 100)
+        cache.get(_key(0))
+        cache.put(_key(2), b"x" * 100)
+
+        assert cache.get(_key(1)) is None
+        assert cache.get(_key(0)) is not None
+        assert cache.size_bytes == 200
+        assert len(list(tmp_path.glob("*.pdf"))) == 2
+
+    def test_oversized_entry_is_not_stored(self, tmp_path):
+        cache = PDFCache(tmp_path, max_bytes=10)
+        cache.put(_key(1), b"x" * 11)
+
+        assert cache.get(_key(1)) is None
+        assert cache.size_bytes == 0
+
+    def test_index_survives_restart(self, tmp_path):
+        cache = PDFCache(tmp_path, max_bytes=250)
+        cache.put(_key(0), b"x" * 100)
+        cache.put(_key(1), b"x" * 100)
+        # Older access time for snapshot-1: it is evicted first after restart
+        os.utime(tmp_path / "snapshot-1-abcd1234.pdf", (1, 1))
+        (tmp_path / "stale.pdf.123.tmp").write_bytes(b"partial")
+
+        restarted = PDFCache(tmp_path, max_bytes=250)
+        restarted.put(_key(2), b"x" * 100)
+
+        assert restarted.get(_key(0)) == b"x" * 100
+        assert restarted.get(_key(1)) is None
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_missing_file_is_a_miss(self, tmp_path):
+        cache = PDFCache(tmp_path, max_bytes=1000)
+        cache.put(_key(1), b"%PDF")
+        (tmp_path / "snapshot-1-abcd1234.pdf").unlink()
+
+        assert cache.get(_key(1)) is None
+        assert cache.size_bytes == 0
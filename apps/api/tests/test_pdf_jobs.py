@@ -0,0 +1,348 @@
+"""
+Tests for asynchronous PDF export jobs.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from prisma.errors import UniqueViolationError
+
+import app.routes.pdf as pdf_routes
+import app.services.pdf_export as pdf_export
+import app.services.pdf_jobs as pdf_jobs
+from app.domain.summary import generate_case_summary
+from app.services.pdf_cache import PDFCache
+from app.services.pdf_jobs import PDFJobWorker, claim_next_job, enqueue_job, process_job
+from app.services.pdf_renderer import RenderFailed, RendererBusy
+from app.services.pdf_service import PDF_TEMPLATE_HASH
+from app.services.summary_cache import summary_cache
+from conftest import FakeCreditPrisma, _run
+
+
+async def _read_body(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+CASE = SimpleNamespace(id="case-1", status="SUBMITTED", procedure=SimpleNamespace(name="IZA"))
+SNAPSHOT = SimpleNamespace(
+    id="snapshot-1",
+    case_id="case-1",
+    version=1,
+    procedure_code="IZA",
+    procedure_version="v1",
+    created_at=datetime(2026, 1, 15, 10, 30, tzinfo=timezone.utc),
+)
+
+
+def _matches(job, where) -> bool:
+    return all(getattr(job, key) == value for key, value in where.items())
+
+
+class FakeJobPrisma(FakeCreditPrisma):
+    """In-memory PdfExportJob table plus the credit models."""
+
+    def __init__(self, balance: int = 1):
+        super().__init__(balance)
+        self.jobs: dict[str, SimpleNamespace] = {}
+        self.creates = 0
+        self.pdfexportjob = SimpleNamespace(
+            find_unique=self._find_unique,
+            find_first=self._find_first,
+            create=self._create,
+            update=self._update,
+            update_many=self._update_many,
+        )
+        self.case = SimpleNamespace(find_first=self._returning(CASE))
+        self.casesnapshot = SimpleNamespace(find_first=self._returning(SNAPSHOT))
+
+    def _with_relations(self, job, include):
+        if job is None or not include:
+            return job
+        return SimpleNamespace(**vars(job), case=CASE, snapshot=SNAPSHOT)
+
+    async def _find_unique(self, where, include=None):
+        job = next((j for j in self.jobs.values() if _matches(j, where)), None)
+        return self._with_relations(job, include)
+
+    async def _find_first(self, where, include=None):
+        return await self._find_unique(where, include)
+
+    async def _create(self, data):
+        if any(j.snapshot_id == data["snapshot_id"] for j in self.jobs.values()):
+            raise UniqueViolationError({"user_facing_error": {"message": "duplicate"}})
+        self.creates += 1
+        job = SimpleNamespace(
+            id=str(uuid.uuid4()),
+            status="QUEUED",
+            error_code=None,
+            attempts=0,
+            created_at=datetime.now(timezone.utc),
+            started_at=None,
+            finished_at=None,
+            **data,
+        )
+        self.jobs[job.id] = job
+        return job
+
+    async def _update(self, where, data):
+        job = self.jobs[where["id"]]
+        vars(job).update(data)
+        return job
+
+    async def _update_many(self, where, data):
+        matched = [j for j in self.jobs.values() if _matches(j, where)]
+        for job in matched:
+            vars(job).update(data)
+        return SimpleNamespace(count=len(matched))
+
+    async def query_raw(self, sql):
+        queued = sorted(
+            (j for j in self.jobs.values() if j.status == "QUEUED"), key=lambda j: j.created_at
+        )
+        if not queued:
+            return []
+        job = queued[0]
+        job.status = "RUNNING"
+        job.attempts += 1
+        return [{"id": job.id}]
+
+
+class StubRenderer:
+    def __init__(self, result=b"%PDF-job", error: Exception | None = None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+
+    async def render_to_file(self, document, path) -> int:
+        self.calls += 1
+        if self.error:
+            raise self.error
+        with open(path, "wb") as target:
+            return target.write(self.result)
+
+
+@pytest.fixture
+def renderer(monkeypatch, tmp_path):
+    """Stub renderer, fresh PDF cache and a cached summary for the test case."""
+    summary_cache.clear()
+    summary_cache.put(
+        ("case-1", 1, "IZA", "v1"),
+        generate_case_summary(
+            procedure_code="IZA", procedure_version="v1", procedure_name="IZA", fields={}
+        ),
+    )
+    stub = StubRenderer()
+    monkeypatch.setattr(pdf_export, "pdf_cache", PDFCache(tmp_path))
+    monkeypatch.setattr(pdf_export, "pdf_renderer", stub)
+    monkeypatch.setattr(
+        pdf_jobs, "get_settings", lambda: SimpleNamespace(pdf_cache_hits_consume_credit=True)
+    )
+    yield stub
+    summary_cache.clear()
+
+
+def _enqueue(db, existing=None):
+    return _run(
+        enqueue_job(
+            existing,
+            tenant_id="tenant-1",
+            case_id="case-1",
+            snapshot=SNAPSHOT,
+            user_id="user-1",
+            request_id="req-1",
+            client=db,
+        )
+    )
+
+
+def _claim_and_process(db):
+    async def scenario():
+        job_id = await claim_next_job(db)
+        await process_job(job_id, db)
+        return db.jobs[job_id]
+    return _run(scenario())
+
+
+class TestEnqueue:
+    """One job per snapshot."""
+
+    def test_creates_queued_job(self):
+        db = FakeJobPrisma()
+        job = _enqueue(db)
+
+        assert job.status == "QUEUED"
+        assert job.snapshot_id == "snapshot-1"
+        assert job.snapshot_version == 1
+
+    def test_concurrent_enqueue_returns_first_job(self):
+        db = FakeJobPrisma()
+        first = _enqueue(db)
+        second = _enqueue(db)
+
+        assert second.id == first.id
+        assert db.creates == 1
+
+    def test_failed_job_is_requeued(self):
+        db = FakeJobPrisma()
+        job = _enqueue(db)
+        job.status, job.error_code = "FAILED", "PDF_RENDER_FAILED"
+
+        requeued = _enqueue(db, existing=job)
+
+        assert requeued.id == job.id
+        assert requeued.status == "QUEUED"
+        assert requeued.error_code is None
+
+
+class TestProcessJob:
+    """Credits are debited when the job succeeds."""
+
+    def test_success_debits_credit(self, renderer):
+        db = FakeJobPrisma(balance=2)
+        _enqueue(db)
+
+        job = _claim_and_process(db)
+
+        assert job.status == "SUCCEEDED"
+        assert job.finished_at is not None
+        assert db.balance == 1
+        metadata = db.ledger[0]["metadata_json"].data
+        assert metadata["job_id"] == job.id
+        assert metadata["request_id"] == "req-1"
+        assert pdf_export.pdf_cache.get((SNAPSHOT.id, PDF_TEMPLATE_HASH)) == b"%PDF-job"
+
+    def test_render_failure_costs_nothing(self, renderer):
+        renderer.error = RenderFailed("layout failed")
+        db = FakeJobPrisma(balance=2)
+        _enqueue(db)
+
+        job = _claim_and_process(db)
+
+        assert (job.status, job.error_code) == ("FAILED", "PDF_RENDER_FAILED")
+        assert db.balance == 2
+        assert db.ledger == []
+
+    def test_insufficient_credits_fails_job(self, renderer):
+        db = FakeJobPrisma(balance=0)
+        _enqueue(db)
+
+        job = _claim_and_process(db)
+
+        assert (job.status, job.error_code) == ("FAILED", "INSUFFICIENT_CREDITS")
+        assert db.ledger == []
+
+    def test_busy_renderer_requeues(self, renderer):
+        renderer.error = RendererBusy(retry_after=2)
+        db = FakeJobPrisma(balance=2)
+        job = _enqueue(db)
+
+        with pytest.raises(RendererBusy):
+            _claim_and_process(db)
+
+        assert job.status == "QUEUED"
+        assert job.attempts == 1
+        assert db.balance == 2
+
+
+class TestWorker:
+    """The worker pool drains the queue."""
+
+    def test_worker_processes_queued_job(self, renderer):
+        db = FakeJobPrisma(balance=1)
+        job = _enqueue(db)
+        worker = PDFJobWorker(concurrency=2, poll_seconds=0.01, client=db)
+
+        async def scenario():
+            await worker.start()
+            for _ in range(200):
+                if job.status == "SUCCEEDED":
+                    break
+                await asyncio.sleep(0.01)
+            await worker.stop()
+
+        _run(scenario())
+
+        assert job.status == "SUCCEEDED"
+        assert renderer.calls == 1
+        assert db.balance == 0
+
+    def test_recover_requeues_interrupted_jobs(self):
+        db = FakeJobPrisma()
+        job = _enqueue(db)
+        job.status = "RUNNING"
+
+        assert _run(pdf_jobs.recover_jobs(db)) == 1
+        assert job.status == "QUEUED"
+
+
+@pytest.fixture
+def routes(monkeypatch, renderer):
+    """Call the job endpoints with a fake database."""
+    db = FakeJobPrisma(balance=1)
+    monkeypatch.setattr(pdf_routes, "prisma", db)
+    context = SimpleNamespace(tenant={"id": "tenant-1"}, user={"id": "user-1"})
+    request = SimpleNamespace(state=SimpleNamespace(request_id="req-1"))
+
+    def call(endpoint, *args):
+        try:
+            return _run(endpoint("case-1", *args, context=context))
+        except HTTPException as exc:
+            return exc
+
+    return db, request, call
+
+
+class TestJobEndpoints:
+    """POST is idempotent, download requires a finished job."""
+
+    def test_post_is_idempotent(self, routes):
+        db, request, call = routes
+
+        first = call(pdf_routes.create_pdf_job, request)
+        second = call(pdf_routes.create_pdf_job, request)
+
+        assert first.data.id == second.data.id
+        assert first.data.status == "QUEUED"
+        assert db.creates == 1
+
+    def test_post_without_credit_is_rejected(self, routes):
+        db, request, call = routes
+        db.balance = 0
+
+        exc = call(pdf_routes.create_pdf_job, request)
+
+        assert exc.status_code == 402
+        assert db.jobs == {}
+
+    def test_download_requires_succeeded_job(self, routes):
+        db, request, call = routes
+        job_id = call(pdf_routes.create_pdf_job, request).data.id
+
+        exc = call(pdf_routes.download_pdf_job, job_id)
+
+        assert exc.status_code == 409
+        assert exc.detail["code"] == "PDF_JOB_NOT_READY"
+
+    def test_download_after_success_is_free(self, routes):
+        db, request, call = routes
+        job_id = call(pdf_routes.create_pdf_job, request).data.id
+        _claim_and_process(db)
+
+        status = call(pdf_routes.get_pdf_job, job_id)
+        response = call(pdf_routes.download_pdf_job, job_id)
+
+        assert status.data.status == "SUCCEEDED"
+        assert status.data.download_url == f"/cases/case-1/pdf/jobs/{job_id}/download"
+        assert _run(_read_body(response)) == b"%PDF-job"
+        assert response.headers["Content-Length"] == "8"
+        assert db.balance == 0
+        assert len(db.ledger) == 1
+
+    def test_unknown_job_is_not_found(self, routes):
+        _, _, call = routes
+        exc = call(pdf_routes.get_pdf_job, "missing")
+        assert exc.status_code == 404
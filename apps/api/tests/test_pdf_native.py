@@ -0,0 +1,177 @@
+"""
+Tests for the native PDF engine.
+"""
+
+import dataclasses
+import io
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from pypdf import PdfReader
+
+from app.services import pdf_native, pdf_service
+from app.services.pdf_native import NATIVE_TEMPLATE_HASH, render_native_pdf
+from app.services.pdf_service import (
+    PDF_TEMPLATE_HASH,
+    PDFService,
+    render_document_to_file,
+)
+
+
+FIELDS = {
+    "contents_description": "Bluetooth-Kopfhörer",
+    "value_amount": 89.90,
+    "value_currency": "EUR",
+    "origin_country": "CN",
+    "sender_name": "Shenzhen Audio Ltd",
+    "sender_country": "CN",
+    "recipient_full_name": "Jörg Müller",
+    "recipient_address": "Musterstr. 1",
+    "recipient_city": "Berlin",
+    "recipient_postcode": "10115",
+    "recipient_country": "DE",
+    "commercial_goods": False,
+    "remarks": None,
+}
+
+
+def _document(request_id=None, fields=None):
+    return PDFService(engine="native").build_document(
+        case_id="abcd1234-5678",
+        version=2,
+        procedure_code="IZA",
+        procedure_version="v1",
+        procedure_name="Internetbestellung – Import Zollanmeldung",
+        fields_json=FIELDS if fields is None else fields,
+        request_id=request_id,
+        generated_at=datetime(2026, 1, 15, 10, 30, tzinfo=timezone.utc),
+    )
+
+
+def _text(pdf: bytes) -> tuple[int, str]:
+    reader = PdfReader(io.BytesIO(pdf))
+    return len(reader.pages), "\n".join(page.extract_text() for page in reader.pages)
+
+
+class TestNativeRendering:
+    """Same content as the HTML template, drawn directly."""
+
+    def test_contains_template_texts_and_case_data(self):
+        pages, text = _text(render_native_pdf(_document()))
+
+        assert pages >= 1
+        for expected in [
+            "ZollPilot",
+            "Erstellt am: 15.01.2026 10:30 UTC",
+            "Ausfüllhilfe zur Zollanmeldung (keine offizielle Anmeldung)",
+            "abcd1234...",
+            "IZA v1",
+            "Schritt 1:",
+            "Bluetooth-Kopfhörer",
+            "Jörg Müller",
+            "Snapshot Version: 2",
+            f"Seite {pages} von {pages}",
+        ]:
+            assert expected in text
+        assert "Request-ID" not in text
+
+    def test_request_id_only_when_given(self):
+        _, text = _text(render_native_pdf(_document(request_id="req-9")))
+        assert "Request-ID: req-9" in text
+
+    def test_output_is_deterministic(self):
+        assert render_native_pdf(_document()) == render_native_pdf(_document())
+
+    def test_long_sections_continue_on_new_pages(self):
+        items = [
+            SimpleNamespace(label=f"Position {index}", value=f"Wert {index}")
+            for index in range(120)
+        ]
+        document = dataclasses.replace(
+            _document(), sections=(SimpleNamespace(title="Positionen", items=items),)
+        )
+
+        pages, text = _text(render_native_pdf(document))
+
+        assert pages > 2
+        assert "Position 0" in text and "Wert 119" in text
+        assert f"Seite {pages} von {pages}" in text
+
+    def test_long_values_wrap_within_the_page(self):
+        words = ["Ersatzteil"] * 60
+        lines = pdf_native._wrap(
+            [(" ".join(words), pdf_native.REGULAR)], 10, pdf_native.VALUE_WIDTH
+        )
+
+        assert len(lines) > 1
+        assert all(
+            pdf_native._line_width(line, 10) <= pdf_native.VALUE_WIDTH for line in lines
+        )
+
+    def test_unsupported_characters_are_replaced(self):
+        lines = pdf_native._wrap([("Größe ☃", pdf_native.REGULAR)], 10, 100)
+        assert lines == [[("Größe ?".encode("cp1252"), pdf_native.REGULAR)]]
+
+
+class TestEngineSelection:
+    """PDFService picks the engine; the cache key follows it."""
+
+    def test_template_hash_per_engine(self):
+        assert PDFService().template_hash == PDF_TEMPLATE_HASH
+        # Native PDFs may come from the WeasyPrint fallback: both templates count
+        native = PDFService(engine="native").template_hash
+        assert native not in (NATIVE_TEMPLATE_HASH, PDF_TEMPLATE_HASH)
+        assert len(native) == 16
+
+    def test_native_engine_needs_no_worker_initializer(self):
+        assert PDFService(engine="native").worker_initializer is None
+        assert PDFService().worker_initializer is not None
+
+    def test_unknown_engine_is_rejected(self):
+        with pytest.raises(ValueError):
+            PDFService().configure(engine="reportlab")
+
+    def test_render_document_to_file_dispatches_on_engine(self, tmp_path):
+        target = tmp_path / "out.pdf"
+
+        size = render_document_to_file(_document(), str(target))
+
+        assert size == target.stat().st_size
+        assert target.read_bytes() == render_native_pdf(_document())
+
+
+class TestWeasyPrintFallback:
+    """Text outside Windows-1252 must not turn into "?" in the native engine."""
+
+    def test_western_text_stays_native(self):
+        document = _document()
+        assert document.engine == "native"
+        assert pdf_native.can_render_native(document)
+
+    @pytest.mark.parametrize("sender", ["深圳市华强电子有限公司", "Łódź Trade Sp. z o.o."])
+    def test_unsupported_text_falls_back(self, sender):
+        document = _document(fields={**FIELDS, "sender_name": sender})
+
+        assert document.engine == "weasyprint"
+        assert not pdf_native.can_render_native(document)
+
+    def test_unsupported_request_id_falls_back(self):
+        assert _document(request_id="req-✓").engine == "weasyprint"
+
+    def test_fallback_renders_with_weasyprint(self, monkeypatch, tmp_path):
+        rendered = []
+
+        def fake_render_html_to_file(html, path):
+            rendered.append(html)
+            with open(path, "wb") as target:
+                return target.write(b"%PDF-weasyprint")
+
+        monkeypatch.setattr(pdf_service, "render_html_to_file", fake_render_html_to_file)
+        sender = "深圳市华强电子有限公司 Łódź"
+        target = tmp_path / "out.pdf"
+
+        render_document_to_file(_document(fields={**FIELDS, "sender_name": sender}), str(target))
+
+        assert target.read_bytes() == b"%PDF-weasyprint"
+        assert sender in rendered[0]
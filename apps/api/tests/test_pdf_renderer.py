@@ -0,0 +1,138 @@
+"""
+Tests for the process-pool PDF renderer.
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.services.pdf_renderer import (
+    PDFRenderer,
+    RenderFailed,
+    RendererBusy,
+    RenderTimeout,
+)
+from conftest import _run
+
+
+# Render functions run in spawned workers: module-level and cheap to import.
+
+
+def _pid_render(html: str) -> bytes:
+    return f"%PDF {html} {os.getpid()}".encode()
+
+
+def _sleep_render(html: str) -> bytes:
+    time.sleep(float(html))
+    return b"%PDF"
+
+
+def _file_render(html: str, path: str) -> int:
+    with open(path, "wb") as target:
+        return target.write(f"%PDF {html}".encode())
+
+
+def _failing_render(html: str) -> bytes:
+    raise ValueError("layout failed")
+
+
+_warm = False
+
+
+def _mark_warm() -> None:
+    global _warm
+    _warm = True
+
+
+def _warmth_render(html: str) -> bytes:
+    return b"warm" if _warm else b"cold"
+
+
+class TestPDFRenderer:
+    """Tests for queueing, timeouts and failures."""
+
+    def test_renders_in_worker_process(self):
+        renderer = PDFRenderer(workers=1, queue_size=0, render_fn=_pid_render)
+        try:
+            pdf = _run(renderer.render("doc"))
+        finally:
+            renderer.shutdown()
+
+        prefix, html, pid = pdf.decode().split()
+        assert (prefix, html) == ("%PDF", "doc")
+        assert int(pid) != os.getpid()
+        assert renderer.pending == 0
+
+    def test_busy_when_queue_full(self):
+        renderer = PDFRenderer(workers=1, queue_size=1, render_fn=_sleep_render)
+
+        async def scenario():
+            running = [asyncio.create_task(renderer.render("0.5")) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(RendererBusy) as exc_info:
+                await renderer.render("0")
+            await asyncio.gather(*running)
+            return exc_info.value
+
+        try:
+            busy = _run(scenario())
+        finally:
+            renderer.shutdown()
+
+        assert busy.retry_after >= 1
+        assert renderer.pending == 0
+
+    def test_timeout_replaces_pool(self):
+        renderer = PDFRenderer(
+            workers=1, queue_size=0, timeout_seconds=1, render_fn=_sleep_render
+        )
+
+        async def scenario():
+            with pytest.raises(RenderTimeout):
+                await renderer.render("30")
+            return await renderer.render("0")
+
+        started = time.perf_counter()
+        try:
+            assert _run(scenario()) == b"%PDF"
+        finally:
+            renderer.shutdown()
+
+        assert time.perf_counter() - started < 20
+        assert renderer.pending == 0
+
+    def test_render_to_file_writes_in_worker(self, tmp_path):
+        renderer = PDFRenderer(workers=1, queue_size=0, file_render_fn=_file_render)
+        target = tmp_path / "out.pdf"
+        try:
+            size = _run(renderer.render_to_file("doc", target))
+        finally:
+            renderer.shutdown()
+
+        assert target.read_bytes() == b"%PDF doc"
+        assert size == len(b"%PDF doc")
+        assert renderer.pending == 0
+
+    def test_worker_error_raises_render_failed(self):
+        renderer = PDFRenderer(workers=1, queue_size=0, render_fn=_failing_render)
+        try:
+            with pytest.raises(RenderFailed):
+                _run(renderer.render("doc"))
+        finally:
+            renderer.shutdown()
+
+    def test_initializer_runs_in_each_worker(self):
+        renderer = PDFRenderer(
+            workers=2, queue_size=0, render_fn=_warmth_render, initializer=_mark_warm
+        )
+
+        async def scenario():
+            renderer.start()
+            return await asyncio.gather(renderer.render(""), renderer.render(""))
+
+        try:
+            assert _run(scenario()) == [b"warm", b"warm"]
+        finally:
+            renderer.shutdown()
@@ -9,10 +9,18 @@ from dataclasses import dataclass
 from datetime import datetime
 
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
+from starlette.requests import Request
 
 from app.main import create_app
 from app.routes.prefill import (
+    MAX_REQUEST_SIZE,
+    _check_upload_head,
+    _file_too_large,
+    _receive_form,
+    _upload_content,
+    batch_extract,
     extract_amounts,
     extract_items,
     extract_merchant_name,
@@ -20,6 +28,8 @@ from app.routes.prefill import (
     extract_total_amount,
     process_document,
 )
+from app.services.prefill_extraction import AmountIndex
+from conftest import _run
 
 
 # --- Fake Models ---
@@ -267,6 +277,40 @@ class TestExtractItems:
         assert len(items) >= 2
 
 
+class TestAmountIndex:
+    """The one-pass tokenizer must match scanning each slice on its own."""
+
+    INVOICE = (
+        "Artikel 1  €1199.00\nArtikel 2  19,99 EUR\nTyp 3    $ 29.99 USD\n"
+        "Versandkosten: £4.50\nGesamt: CHF 1234567.89\n"
+    )
+
+    def test_amounts_match_extract_amounts_order(self):
+        index = AmountIndex(self.INVOICE)
+        assert index.amounts() == extract_amounts(self.INVOICE)
+        assert [a[1] for a in index.amounts()[:2]] == ["EUR", "EUR"]
+
+    def test_windows_match_slice_scans(self):
+        text = self.INVOICE * 3
+        index = AmountIndex(text)
+        for start in range(0, len(text), 3):
+            for end in range(start, min(len(text), start + 90) + 1, 7):
+                assert index.window(start, end) == extract_amounts(text[start:end])
+
+    def test_window_cutting_an_amount_sees_the_cut_part(self):
+        text = "Preis €1199.00 inkl."
+        index = AmountIndex(text)
+        assert index.window(0, text.index("9.00")) == [(119.0, "EUR", 0.9)]
+        assert index.window(text.index("9.00"), len(text)) == []
+
+    def test_keyword_lookups_accept_shared_index(self):
+        text = "Artikel: €50.00\nGesamt: €55.99\nVersand: 5,99 EUR"
+        index = AmountIndex(text)
+        amounts = index.amounts()
+        assert extract_total_amount(text, amounts, index) == extract_total_amount(text, amounts)
+        assert extract_shipping_cost(text, amounts, index) == extract_shipping_cost(text, amounts)
+
+
 class TestProcessDocument:
     def test_process_empty_pdf(self):
         # Empty content simulates unreadable PDF
@@ -317,6 +361,33 @@ class TestPrefillEndpoints:
         data = response.json()
         assert data["error"]["code"] == "EMPTY_FILE"
 
+    def test_upload_content_not_matching_type(self, auth_client: TestClient):
+        # PNG bytes declared as PDF: rejected from the magic bytes
+        response = auth_client.post(
+            "/prefill/upload",
+            files={"file": ("invoice.pdf", b"\x89PNG\r\n\x1a\n....", "application/pdf")},
+            headers={"X-Contract-Version": "1"},
+        )
+        assert response.status_code == 400
+        data = response.json()
+        assert data["error"]["code"] == "INVALID_FILE_TYPE"
+
+    def test_batch_streams_ndjson_per_file(self, auth_client: TestClient):
+        response = auth_client.post(
+            "/prefill/batch",
+            files=[
+                ("files", ("a.pdf", b"%PDF-1.4 test", "application/pdf")),
+                ("files", ("b.txt", b"hello", "text/plain")),
+            ],
+            headers={"X-Contract-Version": "1"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        by_file = {line["file"]: line for line in lines if "file" in line}
+        assert by_file["b.txt"]["error"]["code"] == "INVALID_FILE_TYPE"
+        assert lines[-1] == {"summary": {"total": 2, "succeeded": 1, "failed": 1}}
+
     def test_upload_pdf_returns_suggestions(self, auth_client: TestClient):
         # Create a simple PDF-like content (not a real PDF, but tests the flow)
         # In real tests, you'd use a real PDF fixture
@@ -375,10 +446,147 @@ class TestFileSize:
             files={"file": ("large.pdf", large_content, "application/pdf")},
             headers={"X-Contract-Version": "1"},
         )
-        assert response.status_code == 400
+        assert response.status_code == 413
         data = response.json()
         assert data["error"]["code"] == "FILE_TOO_LARGE"
 
+    def test_file_too_large_without_content_length(self, auth_client: TestClient):
+        # Chunked body without Content-Length: rejected once the cap is passed
+        def body():
+            yield b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.pdf\"\r\n"
+            yield b"Content-Type: application/pdf\r\n\r\n%PDF-1.4 "
+            for _ in range(11 * 16):
+                yield b"x" * 65536
+
+        response = auth_client.post(
+            "/prefill/upload",
+            content=body(),
+            headers={
+                "X-Contract-Version": "1",
+                "Content-Type": "multipart/form-data; boundary=b",
+            },
+        )
+        assert response.status_code == 413
+        assert response.json()["error"]["code"] == "FILE_TOO_LARGE"
+
+
+def _streamed_request(chunks: list[bytes]) -> tuple[Request, list[bytes]]:
+    """Multipart request whose body arrives in `chunks`; returns the chunks read."""
+    received: list[bytes] = []
+
+    async def receive():
+        if len(received) == len(chunks):
+            return {"type": "http.request", "body": b"", "more_body": False}
+        received.append(chunks[len(received)])
+        return {"type": "http.request", "body": received[-1], "more_body": True}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/prefill/upload",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=b")],
+    }
+    return Request(scope, receive), received
+
+
+def _part(field: str, filename: str, content_type: bytes, content: list[bytes]) -> list[bytes]:
+    disposition = f'form-data; name="{field}"; filename="{filename}"'.encode()
+    return [
+        b"--b\r\nContent-Disposition: " + disposition + b"\r\n",
+        b"Content-Type: " + content_type + b"\r\n\r\n",
+        *content,
+        b"\r\n",
+    ]
+
+
+def _upload_chunks(content_type: bytes, content: list[bytes]) -> list[bytes]:
+    return [*_part("file", "a.pdf", content_type, content), b"--b--\r\n"]
+
+
+def _receive_upload(request: Request):
+    (upload,) = _run(_receive_form(
+        request,
+        "file",
+        max_bytes=MAX_REQUEST_SIZE,
+        max_files=1,
+        too_large=_file_too_large,
+        check_head=_check_upload_head,
+    ))
+    return upload
+
+
+class TestUploadIngestion:
+    def test_mismatching_content_rejected_before_body_is_received(self):
+        body = [b"\x89PNG\r\n\x1a\n" + b"x" * 2048] + [b"x" * 65536] * 100
+        request, received = _streamed_request(_upload_chunks(b"application/pdf", body))
+
+        with pytest.raises(HTTPException) as exc:
+            _receive_upload(request)
+
+        assert exc.value.detail["code"] == "INVALID_FILE_TYPE"
+        assert len(received) == 3
+
+    def test_invalid_type_rejected_from_first_bytes(self):
+        request, received = _streamed_request(
+            _upload_chunks(b"text/plain", [b"hello" * 300] + [b"x" * 65536] * 100)
+        )
+
+        with pytest.raises(HTTPException) as exc:
+            _receive_upload(request)
+
+        assert exc.value.detail["message"].startswith("Ungültiger Dateityp")
+        assert len(received) == 3
+
+    def test_short_file_checked_at_part_end(self):
+        request, _ = _streamed_request(_upload_chunks(b"image/png", [b"\x89PNG"]))
+
+        with pytest.raises(HTTPException) as exc:
+            _receive_upload(request)
+
+        assert exc.value.detail["code"] == "INVALID_FILE_TYPE"
+
+    def test_content_shares_the_parser_buffer(self):
+        content = b"%PDF-1.4 " + b"x" * 200_000
+        request, _ = _streamed_request(
+            _upload_chunks(b"application/pdf", [content[:70_000], content[70_000:]])
+        )
+        upload = _receive_upload(request)
+
+        result = _upload_content(upload)
+
+        assert result == content
+        # Same object as the spooled file's buffer: no second copy
+        assert result is upload.file._file.getvalue()
+        _run(upload.close())
+        assert result == content
+
+
+class TestBatchIngestion:
+    def test_files_stay_open_until_the_stream_ends(self):
+        large = b"\xff\xd8\xff" + b"x" * (2 * 1024 * 1024)
+        request, _ = _streamed_request([
+            *_part("files", "large.jpg", b"image/jpeg", [large]),
+            *_part("files", "small.png", b"image/png", [b"\x89PNG\r\n\x1a\n"]),
+            b"--b--\r\n",
+        ])
+
+        response = _run(batch_extract(request, context=None))
+        files = response.background.args[0]
+
+        # Above PREFILL_BATCH_SPOOL_BYTES the upload is kept on disk
+        assert [file.file._rolled for file in files] == [True, False]
+        assert not any(file.file.closed for file in files)
+
+        async def consume():
+            lines = [json.loads(chunk) async for chunk in response.body_iterator]
+            await response.background()
+            return lines
+
+        lines = _run(consume())
+
+        assert lines[-1] == {"summary": {"total": 2, "succeeded": 2, "failed": 0}}
+        assert all(file.file.closed for file in files)
+
 
 class TestPrivacy:
     def test_no_content_in_response_debug(self, auth_client: TestClient):
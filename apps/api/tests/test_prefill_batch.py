@@ -0,0 +1,196 @@
+"""
+Tests for batch prefill: document collection (ZIP expansion) and NDJSON streaming.
+"""
+
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+
+from app.services.prefill_batch import (
+    PREFILL_BATCH_MAX_FILES,
+    BatchTooLarge,
+    BatchUpload,
+    PrefillBatch,
+    collect_documents,
+)
+from app.services.prefill_extraction import MAX_FILE_SIZE, PrefillSuggestions
+from app.services.prefill_extractor import ExtractionTimeout, ExtractorBusy
+from conftest import _run
+
+
+PDF = b"%PDF-1.4 invoice"
+
+
+def _upload(name: str, content_type: str, content: bytes) -> BatchUpload:
+    return BatchUpload(name, content_type, io.BytesIO(content), len(content))
+
+
+class _TrackedFile(io.BytesIO):
+    """BytesIO that records how many bytes were read."""
+
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def _zip(entries: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in entries.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+class _FakeExtractor:
+    """Extractor double: the PDF body after the header is the delay in seconds."""
+
+    def __init__(self, busy_times: int = 0):
+        self.busy_times = busy_times
+        self.running = 0
+        self.max_running = 0
+
+    async def extract(self, content: bytes, file_type: str) -> PrefillSuggestions:
+        if self.busy_times:
+            self.busy_times -= 1
+            raise ExtractorBusy(0)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            delay = content[len(b"%PDF-"):]
+            if delay == b"timeout":
+                raise ExtractionTimeout("too slow")
+            await asyncio.sleep(float(delay) if delay.replace(b".", b"").isdigit() else 0)
+        finally:
+            self.running -= 1
+        return PrefillSuggestions(
+            suggestions=[],
+            items=[],
+            raw_text_preview=None,
+            extraction_method=file_type,
+            warnings=[],
+        )
+
+
+def _lines(batch: PrefillBatch) -> list[dict]:
+    async def collect():
+        return [json.loads(chunk) async for chunk in batch.stream()]
+
+    return _run(collect())
+
+
+class TestCollectDocuments:
+    """Uploads and ZIP entries become individually numbered documents."""
+
+    def test_zip_entries_are_expanded(self):
+        archive = _zip({
+            "invoices/a.pdf": PDF,
+            "b.JPEG": b"\xff\xd8\xff",
+            "notes.txt": b"x",
+            "__MACOSX/._a.pdf": b"x",
+            "invoices/": b"",
+        })
+
+        documents = collect_documents([
+            _upload("first.pdf", "application/pdf", PDF),
+            _upload("docs.zip", "application/zip", archive),
+        ])
+
+        assert [(d.index, d.name, d.file_type) for d in documents] == [
+            (0, "first.pdf", "pdf"),
+            (1, "docs.zip/invoices/a.pdf", "pdf"),
+            (2, "docs.zip/b.JPEG", "jpg"),
+            (3, "docs.zip/notes.txt", None),
+        ]
+        assert documents[1].read() == PDF
+        assert documents[3].error.code == "INVALID_FILE_TYPE"
+
+    def test_invalid_uploads_become_file_errors(self):
+        documents = collect_documents([
+            _upload("a.txt", "text/plain", b"x"),
+            _upload("big.pdf", "application/pdf", b"%PDF-" + b"x" * MAX_FILE_SIZE),
+            _upload("broken.zip", "application/zip", b"PK not a zip"),
+        ])
+
+        assert [d.error.code for d in documents] == [
+            "INVALID_FILE_TYPE",
+            "FILE_TOO_LARGE",
+            "INVALID_FILE_TYPE",
+        ]
+
+    def test_zip_entry_size_is_checked_while_reading(self):
+        # Highly compressible entry: the archive is small, the entry is not
+        documents = collect_documents([
+            _upload("bomb.zip", "application/zip", _zip({"a.pdf": b"%PDF-" + b"0" * MAX_FILE_SIZE})),
+        ])
+
+        assert documents[0].error.code == "FILE_TOO_LARGE"
+
+    def test_uploads_are_read_when_processed(self):
+        file = _TrackedFile(PDF)
+
+        documents = collect_documents([BatchUpload("a.pdf", "application/pdf", file, len(PDF))])
+
+        assert file.bytes_read == 0
+        assert documents[0].read() == PDF
+        assert file.bytes_read == len(PDF)
+
+    def test_too_many_documents(self):
+        archive = _zip({f"{index}.pdf": PDF for index in range(PREFILL_BATCH_MAX_FILES)})
+
+        with pytest.raises(BatchTooLarge):
+            collect_documents([
+                _upload("one.pdf", "application/pdf", PDF),
+                _upload("docs.zip", "application/zip", archive),
+            ])
+
+
+class TestPrefillBatch:
+    """Results stream per document in completion order, then a summary."""
+
+    def test_results_stream_in_completion_order(self):
+        documents = collect_documents([
+            _upload("slow.pdf", "application/pdf", b"%PDF-0.3"),
+            _upload("fast.pdf", "application/pdf", b"%PDF-0"),
+            _upload("empty.pdf", "application/pdf", b""),
+            _upload("fake.png", "image/png", PDF),
+        ])
+        extractor = _FakeExtractor()
+
+        lines = _lines(PrefillBatch(documents, concurrency=2, extractor=extractor))
+
+        assert [line.get("file") for line in lines[:4]] == [
+            "fast.pdf", "empty.pdf", "fake.png", "slow.pdf"
+        ]
+        assert lines[0]["status"] == "ok" and lines[0]["data"]["extraction_method"] == "pdf"
+        assert lines[1]["error"]["code"] == "EMPTY_FILE"
+        assert lines[2]["error"]["code"] == "INVALID_FILE_TYPE"
+        assert lines[-1] == {"summary": {"total": 4, "succeeded": 2, "failed": 2}}
+
+    def test_concurrency_is_capped_per_request(self):
+        documents = collect_documents([
+            _upload(f"{index}.pdf", "application/pdf", b"%PDF-0.05") for index in range(6)
+        ])
+        extractor = _FakeExtractor()
+
+        lines = _lines(PrefillBatch(documents, concurrency=2, extractor=extractor))
+
+        assert extractor.max_running == 2
+        assert lines[-1]["summary"]["succeeded"] == 6
+
+    def test_busy_pool_is_retried_and_timeouts_reported(self):
+        documents = collect_documents([
+            _upload("a.pdf", "application/pdf", PDF),
+            _upload("b.pdf", "application/pdf", b"%PDF-timeout"),
+        ])
+        extractor = _FakeExtractor(busy_times=2)
+
+        lines = _lines(PrefillBatch(documents, concurrency=1, extractor=extractor))
+
+        assert lines[0]["status"] == "ok"
+        assert lines[1]["error"]["code"] == "PREFILL_TIMEOUT"
@@ -0,0 +1,112 @@
+"""
+Tests for the prefill result cache.
+"""
+
+from app.services.prefill_cache import PrefillCache, cache_key
+from app.services.prefill_extraction import EXTRACTOR_VERSION, PrefillSuggestions
+
+
+def _suggestions(preview: str = "Rechnung") -> PrefillSuggestions:
+    return PrefillSuggestions(
+        suggestions=[],
+        items=[],
+        raw_text_preview=preview,
+        extraction_method="pdf_text",
+        warnings=[],
+    )
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCacheKey:
+    """The key holds a content hash, never the content."""
+
+    def test_key_is_hash_version_and_page_limit(self):
+        digest, version, max_pages = cache_key(b"%PDF-1.4 invoice", 5)
+
+        assert len(digest) == 64 and b"invoice".hex() not in digest
+        assert (version, max_pages) == (EXTRACTOR_VERSION, 5)
+
+    def test_same_content_same_key(self):
+        assert cache_key(b"%PDF-a", 5) == cache_key(bytearray(b"%PDF-a"), 5)
+        assert cache_key(b"%PDF-a", 5) != cache_key(b"%PDF-b", 5)
+        assert cache_key(b"%PDF-a", 5) != cache_key(b"%PDF-a", 1)
+
+
+class TestPrefillCache:
+    """Tests for lookup, TTL, LRU eviction and hit-rate metrics."""
+
+    def test_hit_returns_copy(self):
+        cache = PrefillCache()
+        key = cache_key(b"%PDF-a", 5)
+        cache.put(key, _suggestions())
+
+        first = cache.get(key)
+        first.warnings.append("changed")
+
+        assert cache.get(key).warnings == []
+
+    def test_document_text_is_not_cached(self):
+        cache = PrefillCache()
+        key = cache_key(b"%PDF-a", 5)
+        suggestions = _suggestions("Rechnung Nr. 4711 an Erika Mustermann")
+        cache.put(key, suggestions)
+
+        assert all(
+            "Erika" not in repr(stored) for _, stored in cache._entries.values()
+        )
+        assert cache.get(key).raw_text_preview is None
+        # The caller's result keeps its preview
+        assert suggestions.raw_text_preview.startswith("Rechnung")
+
+    def test_entries_expire_after_ttl(self):
+        clock = _Clock()
+        cache = PrefillCache(ttl_seconds=60, clock=clock)
+        key = cache_key(b"%PDF-a", 5)
+        cache.put(key, _suggestions())
+
+        clock.now = 59
+        assert cache.get(key) is not None
+        clock.now = 60
+        assert cache.get(key) is None
+        assert cache.stats().entries == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = PrefillCache(max_entries=2)
+        keys = [cache_key(bytes([index]), 5) for index in range(3)]
+        cache.put(keys[0], _suggestions())
+        cache.put(keys[1], _suggestions())
+        cache.get(keys[0])
+        cache.put(keys[2], _suggestions())
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[2]) is not None
+
+    def test_stats_report_hit_rate(self):
+        cache = PrefillCache()
+        key = cache_key(b"%PDF-a", 5)
+        assert cache.stats().hit_rate == 0.0
+
+        cache.get(key)
+        cache.put(key, _suggestions())
+        cache.get(key)
+        cache.get(key)
+
+        stats = cache.stats()
+        assert (stats.entries, stats.hits, stats.misses) == (1, 2, 1)
+        assert stats.hit_rate == 0.667
+
+    def test_zero_entries_disables_cache(self):
+        cache = PrefillCache()
+        cache.configure(max_entries=0, ttl_seconds=600)
+        cache.put(cache_key(b"%PDF-a", 5), _suggestions())
+
+        assert not cache.enabled
+        assert cache.stats().entries == 0
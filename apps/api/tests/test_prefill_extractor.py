@@ -0,0 +1,245 @@
+"""
+Tests for the process-pool prefill extractor and the per-document limits.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import dataclasses
+import pytest
+
+from app.services.pdf_native import render_native_pdf
+from app.services.pdf_service import PDFService
+from app.services.prefill_cache import PrefillCache
+from app.services.prefill_extraction import (
+    PrefillSuggestions,
+    extract_text_from_pdf,
+    page_order,
+    process_document,
+)
+from app.services.prefill_extractor import (
+    ExtractionFailed,
+    ExtractionTimeout,
+    ExtractorBusy,
+    PrefillExtractor,
+)
+from conftest import _run
+
+
+# Extract functions run in spawned workers: module-level and cheap to import.
+
+
+def _pid_extract(content: bytes, file_type: str, max_pages: int) -> PrefillSuggestions:
+    return PrefillSuggestions(
+        suggestions=[],
+        items=[],
+        raw_text_preview=f"{content.decode()} {max_pages} {os.getpid()}",
+        extraction_method="test",
+        warnings=[],
+    )
+
+
+def _sleep_extract(content: bytes, file_type: str, max_pages: int) -> PrefillSuggestions:
+    time.sleep(float(content))
+    return _pid_extract(b"slept", file_type, max_pages)
+
+
+def _failing_extract(content: bytes, file_type: str, max_pages: int) -> PrefillSuggestions:
+    raise ValueError("broken pdf")
+
+
+def _multi_page_pdf(rows: list[tuple[str, str]] | None = None) -> bytes:
+    """Invoice-like PDF spanning several pages (native engine, no system libs)."""
+    if rows is None:
+        rows = [(f"Position {index}", f"{index},00 EUR") for index in range(150)]
+    document = PDFService(engine="native").build_document(
+        case_id="prefill-0001",
+        version=1,
+        procedure_code="IZA",
+        procedure_version="v1",
+        procedure_name="IZA",
+        fields_json={"contents_description": "Kopfhörer"},
+        request_id=None,
+        generated_at=datetime(2026, 1, 15, tzinfo=timezone.utc),
+    )
+    items = [SimpleNamespace(label=label, value=value) for label, value in rows]
+    document = dataclasses.replace(
+        document, sections=(SimpleNamespace(title="Rechnung", items=items),)
+    )
+    return render_native_pdf(document)
+
+
+class TestPrefillExtractor:
+    """Tests for queueing, timeouts, failures and metrics."""
+
+    def test_pdf_is_extracted_in_worker_process(self):
+        extractor = PrefillExtractor(
+            workers=1, queue_size=0, max_pages=3, extract_fn=_pid_extract
+        )
+        try:
+            result = _run(extractor.extract(b"doc", "pdf"))
+        finally:
+            extractor.shutdown()
+
+        content, max_pages, pid = result.raw_text_preview.split()
+        assert (content, max_pages) == ("doc", "3")
+        assert int(pid) != os.getpid()
+        assert extractor.stats().completed == 1
+
+    def test_images_skip_the_pool(self):
+        extractor = PrefillExtractor(workers=1, queue_size=0, extract_fn=_failing_extract)
+
+        result = _run(extractor.extract(b"\x89PNG", "png"))
+
+        assert result.extraction_method == "image_unsupported"
+        assert extractor.stats().completed == 0
+
+    def test_busy_when_queue_full(self):
+        extractor = PrefillExtractor(workers=1, queue_size=1, extract_fn=_sleep_extract)
+
+        async def scenario():
+            running = [asyncio.create_task(extractor.extract(b"0.5", "pdf")) for _ in range(2)]
+            await asyncio.sleep(0)
+            assert extractor.stats().pending == 2
+            with pytest.raises(ExtractorBusy) as exc_info:
+                await extractor.extract(b"0", "pdf")
+            await asyncio.gather(*running)
+            return exc_info.value
+
+        try:
+            busy = _run(scenario())
+        finally:
+            extractor.shutdown()
+
+        stats = extractor.stats()
+        assert busy.retry_after >= 1
+        assert (stats.pending, stats.completed, stats.rejected) == (0, 2, 1)
+        assert stats.avg_run_ms > 0 and stats.max_run_ms >= 500
+
+    def test_timeout_stops_the_document(self):
+        extractor = PrefillExtractor(
+            workers=1, queue_size=0, timeout_seconds=1, extract_fn=_sleep_extract
+        )
+
+        async def scenario():
+            with pytest.raises(ExtractionTimeout):
+                await extractor.extract(b"30", "pdf")
+            return await extractor.extract(b"0", "pdf")
+
+        started = time.perf_counter()
+        try:
+            assert _run(scenario()).raw_text_preview.startswith("slept")
+        finally:
+            extractor.shutdown()
+
+        assert time.perf_counter() - started < 20
+        assert extractor.stats().timeouts == 1
+
+    def test_queued_documents_do_not_time_out_behind_a_slow_one(self):
+        # Together 3.5 s, each below the 2 s timeout: waiting does not count
+        extractor = PrefillExtractor(
+            workers=1, queue_size=8, timeout_seconds=2, extract_fn=_sleep_extract
+        )
+
+        async def scenario():
+            await extractor.extract(b"0", "pdf")  # warm up the worker
+            return await asyncio.gather(*(
+                extractor.extract(delay, "pdf") for delay in (b"1.5", b"1.0", b"0.5", b"0.5")
+            ))
+
+        try:
+            results = _run(scenario())
+        finally:
+            extractor.shutdown()
+
+        assert all(result.raw_text_preview.startswith("slept") for result in results)
+        stats = extractor.stats()
+        assert (stats.timeouts, stats.completed) == (0, 5)
+        assert stats.avg_wait_ms > 0
+
+    def test_repeated_upload_is_served_from_cache(self):
+        cache = PrefillCache()
+        extractor = PrefillExtractor(
+            workers=1, queue_size=0, extract_fn=_pid_extract, cache=cache
+        )
+
+        async def scenario():
+            first = await extractor.extract(b"doc", "pdf")
+            second = await extractor.extract(bytearray(b"doc"), "pdf")
+            other = await extractor.extract(b"other", "pdf")
+            return first, second, other
+
+        try:
+            first, second, other = _run(scenario())
+        finally:
+            extractor.shutdown()
+
+        # Cache hits carry no document text
+        assert second == first.model_copy(update={"raw_text_preview": None})
+        assert other != first
+        assert extractor.stats().completed == 2
+        assert (cache.stats().hits, cache.stats().misses) == (1, 2)
+
+    def test_worker_error_raises_extraction_failed(self):
+        extractor = PrefillExtractor(workers=1, queue_size=0, extract_fn=_failing_extract)
+        try:
+            with pytest.raises(ExtractionFailed):
+                _run(extractor.extract(b"doc", "pdf"))
+        finally:
+            extractor.shutdown()
+
+        assert extractor.stats().failed == 1
+
+
+class TestPageLimit:
+    """Only the first max_pages pages of a PDF are read."""
+
+    def test_pages_beyond_the_limit_are_ignored_with_warning(self):
+        pdf = _multi_page_pdf()
+
+        limited = process_document(pdf, "pdf", max_pages=1)
+        full = process_document(pdf, "pdf", max_pages=50)
+
+        assert any("Nur 1 von" in warning for warning in limited.warnings)
+        assert not any("Nur " in warning for warning in full.warnings)
+        assert "Position 149" not in (limited.raw_text_preview or "")
+
+
+class TestPageOrder:
+    """First and last page are read first; reading stops once confident."""
+
+    def test_first_and_last_page_first(self):
+        assert page_order(0, 5) == []
+        assert page_order(1, 5) == [0]
+        assert page_order(6, 5) == [0, 5, 1, 2, 3]
+        assert page_order(6, 2) == [0, 5]
+
+    def test_stops_after_first_and_last_page_when_confident(self):
+        rows = [("Bestellung bei", "Online Shop GmbH")]
+        rows += [(f"Position {index}", "Ersatzteil") for index in range(150)]
+        rows += [("Gesamtbetrag", "99,00 EUR")]
+        pdf = _multi_page_pdf(rows)
+
+        text, page_count, pages_read = extract_text_from_pdf(
+            pdf, max_pages=50, enough=lambda text: "Gesamtbetrag" in text
+        )
+        result = process_document(pdf, "pdf", max_pages=50)
+
+        assert page_count > 2 and pages_read == 2
+        assert "Gesamtbetrag" in text and "Position 75" not in text
+        values = {s.field_key: s.value for s in result.suggestions}
+        assert values["value_amount"] == 99.0
+        assert "sender_name" in values
+        assert any(f"Nur 2 von {page_count}" in warning for warning in result.warnings)
+
+    def test_reads_on_without_confident_total(self):
+        pdf = _multi_page_pdf()
+
+        _, page_count, pages_read = extract_text_from_pdf(
+            pdf, max_pages=50, enough=lambda text: False
+        )
+
+        assert pages_read == page_count
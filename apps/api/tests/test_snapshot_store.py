@@ -0,0 +1,376 @@
+"""
+Tests for content-addressed, delta-chained snapshot storage.
+"""
+
+import hashlib
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.domain.snapshot_delta import (
+    SNAPSHOT_KEYFRAME_INTERVAL,
+    SnapshotLink,
+    apply_delta,
+    compute_delta,
+    diff_chain,
+    diff_fields,
+    materialize,
+)
+from app.services.snapshot_store import (
+    _LATEST_SNAPSHOT_IDS_SQL,
+    create_snapshot,
+    diff_snapshots,
+    latest_snapshots,
+    load_fields,
+    load_snapshot_fields,
+    put_blobs,
+    snapshot_validation,
+)
+from conftest import _run
+
+
+def _matches(row: dict, where: dict) -> bool:
+    if "OR" in where:
+        return any(_matches(row, clause) for clause in where["OR"])
+    for key, condition in where.items():
+        value = row[key]
+        if isinstance(condition, dict):
+            if "gte" in condition and value < condition["gte"]:
+                return False
+            if "lte" in condition and value > condition["lte"]:
+                return False
+            if "lt" in condition and value >= condition["lt"]:
+                return False
+            if "in" in condition and value not in condition["in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeSnapshots:
+    """In-memory casesnapshot model supporting the queries of snapshot_store."""
+
+    def __init__(self, blobs: dict):
+        self.rows: list[dict] = []
+        self.blobs = blobs
+        self.queries = 0
+
+    def _load(self, row: dict, include: dict | None) -> SimpleNamespace:
+        data = dict(row)
+        for relation, column in (
+            ("fields_blob", "fields_hash"),
+            ("delta_blob", "delta_hash"),
+            ("validation_blob", "validation_hash"),
+        ):
+            if include and include.get(relation):
+                digest = row[column]
+                data[relation] = SimpleNamespace(content=self.blobs[digest]) if digest else None
+        return SimpleNamespace(**data)
+
+    def _select(self, where: dict, order) -> list[dict]:
+        rows = [row for row in self.rows if _matches(row, where)]
+        orders = order if isinstance(order, list) else [order or {}]
+        for clause in reversed(orders):
+            for key, direction in clause.items():
+                rows.sort(key=lambda r: r[key], reverse=direction == "desc")
+        return rows
+
+    async def find_first(self, where: dict, order=None, include=None):
+        self.queries += 1
+        rows = self._select(where, order)
+        return self._load(rows[0], include) if rows else None
+
+    async def find_many(self, where: dict, order=None, include=None):
+        self.queries += 1
+        return [self._load(row, include) for row in self._select(where, order)]
+
+    async def create(self, data: dict):
+        row = {"id": str(uuid.uuid4()), **data}
+        self.rows.append(row)
+        return SimpleNamespace(**row)
+
+
+class FakeClient:
+    """Hashes like the DB (sorted keys) and stores snapshots in memory."""
+
+    def __init__(self):
+        self.blobs: dict[str, object] = {}
+        self.raw_queries = 0
+        self.casesnapshot = FakeSnapshots(self.blobs)
+
+    async def query_raw(self, sql: str, payload: str) -> list[dict]:
+        self.raw_queries += 1
+        if sql == _LATEST_SNAPSHOT_IDS_SQL:
+            # Latest snapshot per case, like the DISTINCT ON query
+            latest: dict[str, dict] = {}
+            for row in self.casesnapshot.rows:
+                if row["case_id"] in json.loads(payload):
+                    current = latest.get(row["case_id"])
+                    if current is None or row["version"] > current["version"]:
+                        latest[row["case_id"]] = row
+            return [{"id": row["id"]} for row in latest.values()]
+        rows = []
+        for value in json.loads(payload):
+            digest = hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+            self.blobs.setdefault(digest, value)
+            rows.append({"hash": digest})
+        return rows
+
+
+def _submit(client: FakeClient, version: int, fields: dict, case_id: str = "case-1"):
+    return _run(
+        create_snapshot(
+            case_id=case_id,
+            version=version,
+            procedure_code="IZA",
+            procedure_version="v1",
+            fields=fields,
+            validation={"valid": True},
+            client=client,
+        )
+    )
+
+
+def _history(length: int) -> list[dict]:
+    """Fields per version: one value changes, one key toggles."""
+    versions = []
+    for v in range(1, length + 1):
+        fields = {"value_amount": v * 10, "origin_country": "CN"}
+        if v % 3 == 0:
+            fields["remarks"] = f"v{v}"
+        versions.append(fields)
+    return versions
+
+
+class TestDeltas:
+    """Tests for pure delta helpers."""
+
+    def test_compute_and_apply_roundtrip(self):
+        previous = {"a": 1, "b": 2, "c": 3}
+        current = {"a": 1, "b": 5, "d": 4}
+        delta = compute_delta(previous, current)
+
+        assert delta == {"set": {"b": 5, "d": 4}, "unset": ["c"]}
+        apply_delta(previous, delta)
+        assert previous == current
+
+    def test_none_value_is_not_unset(self):
+        delta = compute_delta({"a": 1}, {"a": None})
+        assert delta == {"set": {"a": None}, "unset": []}
+
+    def test_type_changes_are_deltas(self):
+        previous = {"a": 1, "b": True, "d": 1.0, "e": {"n": 0}, "f": [1], "g": 2}
+        current = {"a": True, "b": 1, "d": 1, "e": {"n": False}, "f": [1.0], "g": 2}
+        delta = compute_delta(previous, current)
+
+        assert delta == {
+            "set": {"a": True, "b": 1, "d": 1, "e": {"n": False}, "f": [1.0]},
+            "unset": [],
+        }
+        apply_delta(previous, delta)
+        assert [type(previous[key]) for key in "abdg"] == [bool, int, int, int]
+        assert previous["e"]["n"] is False
+        assert type(previous["f"][0]) is float
+
+    def test_diffs_report_type_changes(self):
+        old = {"a": 1, "b": True, "c": 1.0}
+        new = {"a": True, "b": 1, "c": 1}
+        expected = [
+            {"key": "a", "op": "changed", "from": 1, "to": True},
+            {"key": "b", "op": "changed", "from": True, "to": 1},
+            {"key": "c", "op": "changed", "from": 1.0, "to": 1},
+        ]
+
+        assert diff_fields(old, new) == expected
+        base = [SnapshotLink(1, old, None)]
+        forward = [SnapshotLink(2, None, compute_delta(old, new))]
+        assert diff_chain(base, forward) == expected
+
+    def test_materialize_requires_keyframe(self):
+        with pytest.raises(ValueError):
+            materialize([SnapshotLink(version=2, keyframe=None, delta={})])
+
+    def test_diff_chain_detects_revert(self):
+        base = [SnapshotLink(1, {"a": 1, "b": 2}, None)]
+        forward = [
+            SnapshotLink(2, None, {"set": {"a": 9}, "unset": ["b"]}),
+            SnapshotLink(3, None, {"set": {"a": 1, "c": 3}, "unset": []}),
+        ]
+        changes = diff_chain(base, forward)
+
+        assert changes == [
+            {"key": "b", "op": "removed", "from": 2, "to": None},
+            {"key": "c", "op": "added", "from": None, "to": 3},
+        ]
+
+
+class TestPutBlobs:
+    """Tests for blob deduplication."""
+
+    def test_identical_payloads_share_hash(self):
+        client = FakeClient()
+        hashes = _run(put_blobs([{"a": 1, "b": 2}, {"b": 2, "a": 1}, {}], client=client))
+
+        assert hashes[0] == hashes[1]
+        assert hashes[2] != hashes[0]
+        assert len(client.blobs) == 2
+        assert client.raw_queries == 1
+
+    def test_empty_input_skips_query(self):
+        client = FakeClient()
+        assert _run(put_blobs([], client=client)) == []
+        assert client.raw_queries == 0
+
+
+class TestDeltaChain:
+    """Tests for keyframes, reconstruction and diffs."""
+
+    def test_first_snapshot_is_keyframe(self):
+        client = FakeClient()
+        snapshot = _submit(client, 1, {"value_amount": 10})
+
+        assert snapshot.keyframe_version == 1
+        assert snapshot.fields_hash is not None
+        assert snapshot.delta_hash is None
+        assert client.blobs[snapshot.validation_hash] == {"valid": True}
+
+    def test_create_is_idempotent_per_version(self):
+        client = FakeClient()
+        first = _submit(client, 1, {"value_amount": 10})
+        again = _submit(client, 1, {"value_amount": 99})
+
+        assert again.id == first.id
+        assert len(client.casesnapshot.rows) == 1
+
+    def test_keyframe_interval(self):
+        client = FakeClient()
+        length = SNAPSHOT_KEYFRAME_INTERVAL * 2 + 1
+        for version, fields in enumerate(_history(length), start=1):
+            _submit(client, version, fields)
+
+        keyframes = [r["version"] for r in client.casesnapshot.rows if r["fields_hash"]]
+        assert keyframes == [1, SNAPSHOT_KEYFRAME_INTERVAL + 1, 2 * SNAPSHOT_KEYFRAME_INTERVAL + 1]
+        assert all(r["delta_hash"] for r in client.casesnapshot.rows[1:])
+
+    def test_reconstructs_every_version(self):
+        client = FakeClient()
+        history = _history(25)
+        for version, fields in enumerate(history, start=1):
+            _submit(client, version, fields)
+
+        snapshots = _run(client.casesnapshot.find_many(where={"case_id": "case-1"}))
+        fields = _run(load_fields(snapshots, client=client))
+
+        for snapshot in snapshots:
+            assert fields[snapshot.id] == history[snapshot.version - 1]
+
+    def test_batch_load_is_single_query(self):
+        client = FakeClient()
+        for case_id in ("case-1", "case-2"):
+            for version, fields in enumerate(_history(5), start=1):
+                _submit(client, version, fields, case_id=case_id)
+
+        latest = _run(
+            client.casesnapshot.find_many(where={"version": 5})
+        )
+        client.casesnapshot.queries = 0
+        fields = _run(load_fields(latest, client=client))
+
+        assert client.casesnapshot.queries == 1
+        assert all(f == _history(5)[4] for f in fields.values())
+
+    def test_loaded_keyframe_needs_no_query(self):
+        client = FakeClient()
+        _submit(client, 1, {"a": 1})
+        snapshot = _run(
+            client.casesnapshot.find_first(
+                where={"case_id": "case-1", "version": 1}, include={"fields_blob": True}
+            )
+        )
+        client.casesnapshot.queries = 0
+
+        assert _run(load_snapshot_fields(snapshot, client=client)) == {"a": 1}
+        assert client.casesnapshot.queries == 0
+
+    def test_diff_across_keyframe(self):
+        client = FakeClient()
+        history = _history(15)
+        for version, fields in enumerate(history, start=1):
+            _submit(client, version, fields)
+
+        changes = _run(diff_snapshots("case-1", 5, 12, client=client))
+
+        assert changes == [
+            {"key": "remarks", "op": "added", "from": None, "to": "v12"},
+            {"key": "value_amount", "op": "changed", "from": 50, "to": 120},
+        ]
+
+    def test_diff_long_span_uses_keyframes(self):
+        client = FakeClient()
+        history = _history(40)
+        for version, fields in enumerate(history, start=1):
+            _submit(client, version, fields)
+
+        client.casesnapshot.queries = 0
+        changes = _run(diff_snapshots("case-1", 2, 39, client=client))
+
+        assert client.casesnapshot.queries == 2
+        assert changes == [
+            {"key": "remarks", "op": "added", "from": None, "to": "v39"},
+            {"key": "value_amount", "op": "changed", "from": 20, "to": 390},
+        ]
+
+    def test_diff_reverse_and_missing(self):
+        client = FakeClient()
+        for version, fields in enumerate(_history(4), start=1):
+            _submit(client, version, fields)
+
+        assert _run(diff_snapshots("case-1", 4, 3, client=client)) == [
+            {"key": "remarks", "op": "added", "from": None, "to": "v3"},
+            {"key": "value_amount", "op": "changed", "from": 40, "to": 30},
+        ]
+        assert _run(diff_snapshots("case-1", 2, 2, client=client)) == []
+        assert _run(diff_snapshots("case-1", 1, 9, client=client)) is None
+        assert _run(diff_snapshots("case-1", 9, 1, client=client)) is None
+
+
+class TestLatestSnapshots:
+    """The latest snapshot per case is selected in SQL, only those are loaded."""
+
+    def test_loads_only_latest_per_case(self):
+        client = FakeClient()
+        for version in (1, 2, 3):
+            _submit(client, version, {"value_amount": version})
+        _submit(client, 1, {"value_amount": 7}, case_id="case-2")
+        _submit(client, 1, {"value_amount": 9}, case_id="case-3")
+        client.casesnapshot.queries = client.raw_queries = 0
+
+        latest = _run(latest_snapshots(
+            ["case-1", "case-2", "missing"], include={"fields_blob": True}, client=client
+        ))
+
+        assert {case_id: s.version for case_id, s in latest.items()} == {
+            "case-1": 3, "case-2": 1,
+        }
+        assert latest["case-2"].fields_blob.content == {"value_amount": 7}
+        assert (client.raw_queries, client.casesnapshot.queries) == (1, 1)
+
+    def test_no_cases_skip_queries(self):
+        client = FakeClient()
+
+        assert _run(latest_snapshots([], client=client)) == {}
+        assert client.raw_queries == 0
+
+
+class TestAccessors:
+    """Tests for payload accessors on loaded snapshots."""
+
+    def test_reads_validation_blob(self):
+        snapshot = SimpleNamespace(validation_blob=SimpleNamespace(content={"valid": False}))
+        assert snapshot_validation(snapshot) == {"valid": False}
+
+    def test_missing_blob_is_empty(self):
+        assert snapshot_validation(SimpleNamespace(validation_blob=None)) == {}
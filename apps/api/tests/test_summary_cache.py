@@ -0,0 +1,121 @@
+"""
+Tests for the shared case summary cache.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import app.routes.lifecycle as lifecycle
+from app.dependencies.auth import AuthContext
+from app.domain.summary import CaseSummary
+from app.services.summary_cache import SummaryCache
+
+
+def _summary(name: str = "IZA") -> CaseSummary:
+    return CaseSummary(
+        procedure_code="IZA",
+        procedure_version="v1",
+        procedure_name=name,
+        sections=[],
+    )
+
+
+class TestSummaryCache:
+    """Tests for keyed lookup, invalidation and LRU eviction."""
+
+    def test_put_with_current_generation(self):
+        cache = SummaryCache()
+        generation = cache.generation("case-1")
+        cache.put(("case-1", 1, "IZA", "v1"), _summary(), generation=generation)
+
+        assert cache.get(("case-1", 1, "IZA", "v1")) is not None
+
+    def test_put_after_invalidation_is_dropped(self):
+        cache = SummaryCache()
+        generation = cache.generation("case-1")
+        # Field edit while the summary is being built from the old fields
+        cache.invalidate("case-1")
+        cache.put(("case-1", 1, "IZA", "v1"), _summary(), generation=generation)
+
+        assert cache.get(("case-1", 1, "IZA", "v1")) is None
+        assert not cache.has_case("case-1")
+
+    def test_other_cases_do_not_change_generation(self):
+        cache = SummaryCache()
+        generation = cache.generation("case-1")
+        cache.invalidate("case-2")
+        cache.put(("case-1", 1, "IZA", "v1"), _summary(), generation=generation)
+
+        assert cache.get(("case-1", 1, "IZA", "v1")) is not None
+
+    def test_forgotten_generations_drop_pending_puts(self):
+        cache = SummaryCache(max_entries=2)
+        cache.invalidate("case-1")
+        generation = cache.generation("case-1")
+        # case-1's counter is evicted; a stale put must not be accepted
+        cache.invalidate("case-2")
+        cache.invalidate("case-3")
+        cache.put(("case-1", 1, "IZA", "v1"), _summary(), generation=generation)
+
+        assert cache.get(("case-1", 1, "IZA", "v1")) is None
+
+    def test_version_is_part_of_key(self):
+        cache = SummaryCache()
+        cache.put(("case-1", 1, "IZA", "v1"), _summary())
+
+        assert cache.get(("case-1", 2, "IZA", "v1")) is None
+        assert cache.has_case("case-1")
+
+    def test_invalidate_drops_all_versions_of_case(self):
+        cache = SummaryCache()
+        cache.put(("case-1", 1, "IZA", "v1"), _summary())
+        cache.put(("case-1", 2, "IZA", "v1"), _summary())
+        cache.put(("case-2", 1, "IZA", "v1"), _summary())
+
+        cache.invalidate("case-1")
+
+        assert not cache.has_case("case-1")
+        assert cache.get(("case-1", 1, "IZA", "v1")) is None
+        assert cache.get(("case-2", 1, "IZA", "v1")) is not None
+
+    def test_lru_eviction(self):
+        cache = SummaryCache(max_entries=2)
+        cache.put(("a", 1, "IZA", "v1"), _summary())
+        cache.put(("b", 1, "IZA", "v1"), _summary())
+        cache.get(("a", 1, "IZA", "v1"))
+        cache.put(("c", 1, "IZA", "v1"), _summary())
+
+        assert cache.get(("b", 1, "IZA", "v1")) is None
+        assert not cache.has_case("b")
+        assert cache.get(("a", 1, "IZA", "v1")) is not None
+
+
+class TestSummaryEndpoint:
+    """GET /cases/{id}/summary must not cache summaries of outdated fields."""
+
+    def test_concurrent_field_edit_is_not_cached(self, monkeypatch):
+        cache = SummaryCache()
+        procedure = SimpleNamespace(code="IZA", version="v1", name="IZA")
+
+        class FakeCaseModel:
+            async def find_first(self, where, include=None):
+                # upsert_field commits and invalidates while the fields are read
+                cache.invalidate("case-1")
+                return SimpleNamespace(
+                    id="case-1", version=1, procedure_id="p1", procedure=procedure, fields=[]
+                )
+
+        monkeypatch.setattr(lifecycle, "summary_cache", cache)
+        monkeypatch.setattr(lifecycle, "prisma", SimpleNamespace(case=FakeCaseModel()))
+        context = AuthContext(
+            user={"id": "user-1"}, tenant={"id": "tenant-1"}, role="OWNER", session_token_hash=None
+        )
+
+        loop = asyncio.new_event_loop()
+        try:
+            response = loop.run_until_complete(lifecycle.get_case_summary("case-1", context))
+        finally:
+            loop.close()
+
+        assert response.data.procedure.code == "IZA"
+        assert not cache.has_case("case-1")
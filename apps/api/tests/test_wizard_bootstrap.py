@@ -0,0 +1,252 @@
+"""
+Tests for GET /cases/{id}/wizard/bootstrap.
+
+The bootstrap payload must match the four endpoints it replaces
+(GET /cases/{id}, /cases/{id}/wizard, /procedures/{code} and
+/knowledge/entries) for the same case.
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import app.domain.procedures as procedures_domain
+import app.routes.cases as cases_routes
+import app.routes.knowledge as knowledge_routes
+import app.routes.wizard as wizard_routes
+from app.dependencies.auth import AuthContext
+from app.domain.procedures import procedure_loader
+from app.routes.cases import get_case
+from app.routes.knowledge import list_knowledge_entries
+from app.routes.procedures import get_procedure
+from app.routes.wizard import get_wizard_bootstrap, get_wizard_state
+from conftest import _run
+
+NOW = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+
+
+class FakeCase(SimpleNamespace):
+    def model_dump(self) -> dict:
+        return {"id": self.id, "tenant_id": self.tenant_id}
+
+
+class FakeCaseModel:
+    def __init__(self, cases: list[FakeCase]):
+        self.cases = cases
+
+    async def find_first(self, where, include=None):
+        for case in self.cases:
+            if case.id == where["id"] and case.tenant_id == where["tenant_id"]:
+                return case
+        return None
+
+
+class FakeWizardProgressModel:
+    def __init__(self, cases: list[FakeCase]):
+        self.cases = cases
+        self.created: list[dict] = []
+
+    async def create(self, data):
+        self.created.append(data)
+        progress = SimpleNamespace(id=f"wp-{data['case_id']}", **data)
+        for case in self.cases:
+            if case.id == data["case_id"]:
+                case.wizard_progress = progress
+        return progress
+
+
+class FakeProcedureModel:
+    def __init__(self, procedures: list[SimpleNamespace]):
+        self.procedures = procedures
+
+    async def find_first(self, where, include=None):
+        for procedure in self.procedures:
+            if procedure.code == where["code"] and procedure.is_active:
+                if "version" not in where or procedure.version == where["version"]:
+                    return procedure
+        return None
+
+
+class FakeKnowledgeEntryModel:
+    def __init__(self, entries: list[SimpleNamespace]):
+        self.entries = entries
+
+    async def find_many(self, where, order=None, include=None):
+        entries = [e for e in self.entries if e.status == where["status"]]
+        applies_to = where.get("applies_to")
+        if isinstance(applies_to, dict):
+            entries = [e for e in entries if e.applies_to in applies_to["in"]]
+        elif applies_to:
+            entries = [e for e in entries if e.applies_to == applies_to]
+        if where.get("related_fields") == {"isEmpty": False}:
+            entries = [e for e in entries if e.related_fields]
+        return sorted(entries, key=lambda e: e.title)
+
+
+class FakePrisma:
+    def __init__(self, cases, procedures, entries):
+        self.case = FakeCaseModel(cases)
+        self.wizardprogress = FakeWizardProgressModel(cases)
+        self.procedure = FakeProcedureModel(procedures)
+        self.knowledgeentry = FakeKnowledgeEntryModel(entries)
+
+
+def _procedure() -> SimpleNamespace:
+    field = SimpleNamespace(
+        field_key="contents_description", field_type="TEXT", required=True,
+        config_json={"maxLength": 200}, order=1,
+    )
+    step = SimpleNamespace(
+        step_key="package", title="Paket", order=1, is_active=True, fields=[field]
+    )
+    return SimpleNamespace(
+        id="proc-iza", code="IZA", name="Internetbestellung", version="v1",
+        is_active=True, steps=[step],
+    )
+
+
+def _case(case_id: str, status: str, tenant_id: str = "tenant-1", progress=None) -> FakeCase:
+    procedure = _procedure()
+    return FakeCase(
+        id=case_id,
+        tenant_id=tenant_id,
+        title="Kopfhörer",
+        status=status,
+        version=2,
+        created_at=NOW,
+        updated_at=NOW,
+        prepared_at=None,
+        completed_at=None,
+        submitted_at=NOW if status == "SUBMITTED" else None,
+        archived_at=None,
+        procedure_id=procedure.id,
+        procedure_version="v1",
+        procedure=procedure,
+        wizard_progress=progress,
+        fields=[
+            SimpleNamespace(key="contents_description", value_json="Kopfhörer", updated_at=NOW),
+            SimpleNamespace(key="value_amount", value_json=59.9, updated_at=NOW),
+        ],
+    )
+
+
+def _progress(case_id: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=f"wp-{case_id}", case_id=case_id, procedure_code="IZA",
+        current_step="sender", completed_steps=["package"], is_completed=False,
+    )
+
+
+def _entry(entry_id: str, title: str, related_fields: list[str], applies_to: str = "IZA"):
+    return SimpleNamespace(
+        id=entry_id, title=title, summary=f"{title} kurz erklärt", applies_to=applies_to,
+        related_fields=related_fields, version=1, status="PUBLISHED",
+        topic=SimpleNamespace(code="zollwert", name="Zollwert"),
+    )
+
+
+def _context(tenant_id: str = "tenant-1") -> AuthContext:
+    return AuthContext(
+        user={"id": "user-1"}, tenant={"id": tenant_id}, role="OWNER", session_token_hash=None
+    )
+
+
+@pytest.fixture
+def fake_prisma(monkeypatch):
+    procedure_loader.clear_cache()
+
+    def install(cases, entries=()):
+        fake = FakePrisma(list(cases), [_procedure()], list(entries))
+        for module in (wizard_routes, cases_routes, knowledge_routes, procedures_domain):
+            monkeypatch.setattr(module, "prisma", fake)
+        return fake
+
+    yield install
+    procedure_loader.clear_cache()
+
+
+class TestBootstrapPayload:
+    def test_matches_individual_endpoints(self, fake_prisma):
+        fake_prisma(
+            [_case("case-1", "IN_PROCESS", progress=_progress("case-1"))],
+            [
+                _entry("e1", "Versandkosten", ["shipping_cost"]),
+                _entry("e2", "Warenwert", ["value_amount"], applies_to="ALL"),
+                _entry("e3", "Allgemeines", []),
+                _entry("e4", "Reiseverkehr", ["value_amount"], applies_to="IPK"),
+            ],
+        )
+        context = _context()
+
+        bootstrap = _run(get_wizard_bootstrap("case-1", context)).data
+
+        assert bootstrap.case == _run(get_case("case-1", context)).data
+        assert bootstrap.wizard == _run(get_wizard_state("case-1", context)).data
+        assert bootstrap.procedure == _run(get_procedure("IZA", context)).data
+        entries = _run(list_knowledge_entries(procedure="IZA", topic=None, field=None))["data"]
+        # Bootstrap only carries field-level hints
+        assert [item.model_dump() for item in bootstrap.knowledge] == [
+            entry for entry in entries if entry["related_fields"]
+        ]
+        assert [item.id for item in bootstrap.knowledge] == ["e1", "e2"]
+
+    def test_creates_missing_progress(self, fake_prisma):
+        fake = fake_prisma([_case("case-1", "IN_PROCESS")])
+
+        bootstrap = _run(get_wizard_bootstrap("case-1", _context())).data
+
+        assert len(fake.wizardprogress.created) == 1
+        assert bootstrap.wizard.current_step == "package"
+        assert bootstrap.wizard.completed_steps == []
+
+    def test_no_knowledge_entries(self, fake_prisma):
+        fake_prisma([_case("case-1", "IN_PROCESS", progress=_progress("case-1"))])
+
+        bootstrap = _run(get_wizard_bootstrap("case-1", _context())).data
+
+        assert bootstrap.knowledge == []
+        assert bootstrap.procedure.code == "IZA"
+
+
+class TestBootstrapAccess:
+    @pytest.mark.parametrize("status", ["SUBMITTED", "ARCHIVED"])
+    def test_read_only_cases_with_progress(self, fake_prisma, status):
+        fake = fake_prisma([_case("case-1", status, progress=_progress("case-1"))])
+
+        bootstrap = _run(get_wizard_bootstrap("case-1", _context())).data
+
+        assert bootstrap.case.status == status
+        assert bootstrap.wizard.current_step == "sender"
+        assert fake.wizardprogress.created == []
+
+    @pytest.mark.parametrize("status", ["SUBMITTED", "ARCHIVED"])
+    def test_read_only_cases_without_progress(self, fake_prisma, status):
+        fake = fake_prisma([_case("case-1", status)])
+
+        with pytest.raises(HTTPException) as exc:
+            _run(get_wizard_bootstrap("case-1", _context()))
+
+        assert exc.value.status_code == 404
+        assert exc.value.detail["code"] == "WIZARD_NOT_FOUND"
+        assert fake.wizardprogress.created == []
+
+    def test_draft_case_forbidden(self, fake_prisma):
+        fake_prisma([_case("case-1", "DRAFT")])
+
+        with pytest.raises(HTTPException) as exc:
+            _run(get_wizard_bootstrap("case-1", _context()))
+
+        assert exc.value.status_code == 403
+        assert exc.value.detail["code"] == "WIZARD_NOT_AVAILABLE"
+
+    def test_other_tenants_case_not_found(self, fake_prisma):
+        other = _case("case-1", "IN_PROCESS", tenant_id="tenant-2", progress=_progress("case-1"))
+        fake_prisma([other])
+
+        with pytest.raises(HTTPException) as exc:
+            _run(get_wizard_bootstrap("case-1", _context("tenant-1")))
+
+        assert exc.value.status_code == 404
+        assert exc.value.detail["code"] == "CASE_NOT_FOUND"
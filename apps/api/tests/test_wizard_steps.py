@@ -0,0 +1,88 @@
+"""
+Tests for compiled wizard step lookups and StepInfo templates.
+"""
+
+from app.domain.wizard_steps import (
+    IZA_STEPS,
+    ProcedureSteps,
+    StepDefinition,
+    get_required_fields_for_step,
+)
+from app.routes.wizard import _build_steps_info, _case_include
+
+
+class TestCompiledSteps:
+    """Tests for O(1) step lookups."""
+
+    def test_index_and_neighbours(self):
+        assert IZA_STEPS.step_keys[0] == "package"
+        assert IZA_STEPS.get_step_index("recipient") == 2
+        assert IZA_STEPS.get_step_index("unknown") == -1
+        assert IZA_STEPS.get_next_step("package") == "sender"
+        assert IZA_STEPS.get_next_step("review") is None
+        assert IZA_STEPS.get_previous_step("sender") == "package"
+        assert IZA_STEPS.get_previous_step("package") is None
+        assert IZA_STEPS.get_previous_step("unknown") is None
+
+    def test_get_step_and_validity(self):
+        assert IZA_STEPS.get_step("value").title == "Wert"
+        assert IZA_STEPS.get_step("unknown") is None
+        assert IZA_STEPS.is_valid_step("review") is True
+        assert IZA_STEPS.is_valid_step("unknown") is False
+
+    def test_empty_procedure(self):
+        empty = ProcedureSteps(procedure_code="X", steps=[])
+        assert empty.first_step == ""
+        assert empty.last_step == ""
+        assert empty.get_next_step("a") is None
+
+    def test_single_step(self):
+        single = ProcedureSteps(
+            procedure_code="X",
+            steps=[StepDefinition("only", "Only", "", [])],
+        )
+        assert single.first_step == single.last_step == "only"
+        assert single.get_next_step("only") is None
+
+
+class TestBuildStepsInfo:
+    """Tests for StepInfo overlay flags."""
+
+    def test_flags_for_current_step(self):
+        steps = _build_steps_info("IZA", "sender", ["package"])
+        by_key = {s.step_key: s for s in steps}
+
+        assert by_key["package"].is_completed is True
+        assert by_key["sender"].is_current is True
+        assert by_key["sender"].is_accessible is True
+        assert by_key["recipient"].is_accessible is False
+
+    def test_next_step_unlocked_when_current_completed(self):
+        steps = _build_steps_info("IZA", "sender", ["package", "sender"])
+        by_key = {s.step_key: s for s in steps}
+
+        assert by_key["recipient"].is_accessible is True
+        assert by_key["value"].is_accessible is False
+
+    def test_unknown_procedure(self):
+        assert _build_steps_info("XXX", "package", []) == []
+
+
+class TestCaseProjection:
+    """Tests for per-endpoint case include projections."""
+
+    def test_default_excludes_fields(self):
+        include = _case_include()
+        assert include == {"procedure": True, "wizard_progress": True}
+
+    def test_required_fields_only(self):
+        include = _case_include(get_required_fields_for_step("value"))
+        keys = include["fields"]["where"]["key"]["in"]
+
+        assert "value_amount" in keys
+        assert "origin_country" in keys  # IPK
+        assert "sender_name" not in keys
+
+    def test_step_without_required_fields(self):
+        assert get_required_fields_for_step("review") == frozenset()
+        assert "fields" not in _case_include(get_required_fields_for_step("review"))
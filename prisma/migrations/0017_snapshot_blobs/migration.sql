@@ -0,0 +1,72 @@
+-- Content-addressed Snapshot Storage
+--
+-- fields_json / validation_json werden aus CaseSnapshot in die Tabelle
+-- SnapshotBlob verschoben. Identische Payloads (Reopen/Resubmit ohne
+-- Änderung, gleiche Validierungsergebnisse) werden nur einmal gespeichert.
+--
+-- hash = SHA-256 über die kanonische JSONB-Textform (Postgres sortiert Keys
+-- und normalisiert Whitespace). Die API berechnet den Hash identisch
+-- (siehe apps/api/app/services/snapshot_store.py).
+
+-- CreateTable SnapshotBlob
+CREATE TABLE "SnapshotBlob" (
+    "hash" TEXT NOT NULL,
+    "content" JSONB NOT NULL,
+    "size_bytes" INTEGER NOT NULL,
+    "created_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "SnapshotBlob_pkey" PRIMARY KEY ("hash")
+);
+
+-- Hash-Spalten an CaseSnapshot
+ALTER TABLE "CaseSnapshot" ADD COLUMN "fields_hash" TEXT;
+ALTER TABLE "CaseSnapshot" ADD COLUMN "validation_hash" TEXT;
+
+UPDATE "CaseSnapshot" SET
+    "fields_hash" = encode(sha256(convert_to("fields_json"::text, 'UTF8')), 'hex'),
+    "validation_hash" = encode(sha256(convert_to("validation_json"::text, 'UTF8')), 'hex');
+
+-- Bestehende Payloads dedupliziert übernehmen
+INSERT INTO "SnapshotBlob" ("hash", "content", "size_bytes")
+SELECT DISTINCT ON ("hash") "hash", "content", octet_length("content"::text)
+FROM (
+    SELECT "fields_hash" AS "hash", "fields_json" AS "content" FROM "CaseSnapshot"
+    UNION ALL
+    SELECT "validation_hash", "validation_json" FROM "CaseSnapshot"
+) AS payloads
+ON CONFLICT ("hash") DO NOTHING;
+
+-- Report: eingesparter Speicher (sichtbar im Migrations-Log)
+DO $$
+DECLARE
+    snapshot_count BIGINT;
+    inline_bytes BIGINT;
+    blob_count BIGINT;
+    blob_bytes BIGINT;
+BEGIN
+    SELECT COUNT(*),
+           COALESCE(SUM(octet_length("fields_json"::text) + octet_length("validation_json"::text)), 0)
+      INTO snapshot_count, inline_bytes
+      FROM "CaseSnapshot";
+    SELECT COUNT(*), COALESCE(SUM("size_bytes"), 0)
+      INTO blob_count, blob_bytes
+      FROM "SnapshotBlob";
+    RAISE NOTICE 'Snapshot dedupe: % snapshots -> % blobs, % bytes -> % bytes (% bytes saved)',
+        snapshot_count, blob_count, inline_bytes, blob_bytes, inline_bytes - blob_bytes;
+END
+$$;
+
+ALTER TABLE "CaseSnapshot" ALTER COLUMN "fields_hash" SET NOT NULL;
+ALTER TABLE "CaseSnapshot" ALTER COLUMN "validation_hash" SET NOT NULL;
+
+ALTER TABLE "CaseSnapshot" DROP COLUMN "fields_json";
+ALTER TABLE "CaseSnapshot" DROP COLUMN "validation_json";
+
+-- Indizes und Foreign Keys
+CREATE INDEX "CaseSnapshot_fields_hash_idx" ON "CaseSnapshot"("fields_hash");
+CREATE INDEX "CaseSnapshot_validation_hash_idx" ON "CaseSnapshot"("validation_hash");
+
+ALTER TABLE "CaseSnapshot" ADD CONSTRAINT "CaseSnapshot_fields_hash_fkey"
+    FOREIGN KEY ("fields_hash") REFERENCES "SnapshotBlob"("hash") ON DELETE RESTRICT ON UPDATE CASCADE;
+ALTER TABLE "CaseSnapshot" ADD CONSTRAINT "CaseSnapshot_validation_hash_fkey"
+    FOREIGN KEY ("validation_hash") REFERENCES "SnapshotBlob"("hash") ON DELETE RESTRICT ON UPDATE CASCADE;
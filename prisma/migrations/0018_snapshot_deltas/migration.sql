@@ -0,0 +1,101 @@
+-- Delta-Ketten für Snapshot-Felddaten
+--
+-- Jeder Snapshot speichert seine Felddaten als Delta zum vorherigen
+-- Snapshot des Falls (delta_hash). Jeder 10. Snapshot eines Falls ist ein
+-- Keyframe und behält zusätzlich die vollständigen Felddaten (fields_hash).
+-- Intervall und Delta-Format entsprechen apps/api/app/domain/snapshot_delta.py:
+--     {"set": {key: wert}, "unset": [key, ...]}   (unset sortiert)
+
+ALTER TABLE "CaseSnapshot" ADD COLUMN "keyframe_version" INTEGER;
+ALTER TABLE "CaseSnapshot" ADD COLUMN "delta_hash" TEXT;
+ALTER TABLE "CaseSnapshot" ALTER COLUMN "fields_hash" DROP NOT NULL;
+
+-- Position in der Kette und Delta zum Vorgänger berechnen
+CREATE TEMP TABLE "_snapshot_chain" AS
+WITH ordered AS (
+    SELECT s."id",
+           s."case_id",
+           s."version",
+           ROW_NUMBER() OVER w AS position,
+           b."content" AS fields,
+           LAG(b."content") OVER w AS previous_fields
+    FROM "CaseSnapshot" s
+    JOIN "SnapshotBlob" b ON b."hash" = s."fields_hash"
+    WINDOW w AS (PARTITION BY s."case_id" ORDER BY s."version")
+), positioned AS (
+    SELECT o.*,
+           FIRST_VALUE(o."version") OVER (
+               PARTITION BY o."case_id", (o.position - 1) / 10
+               ORDER BY o."version"
+           ) AS keyframe_version
+    FROM ordered o
+)
+SELECT p."id",
+       p.keyframe_version,
+       p.keyframe_version = p."version" AS is_keyframe,
+       CASE WHEN p.previous_fields IS NULL THEN NULL ELSE jsonb_build_object(
+           'set', COALESCE((
+               SELECT jsonb_object_agg(cur.key, cur.value)
+               FROM jsonb_each(p.fields) AS cur
+               WHERE p.previous_fields -> cur.key IS DISTINCT FROM cur.value
+           ), '{}'::jsonb),
+           'unset', COALESCE((
+               SELECT jsonb_agg(prev.key ORDER BY prev.key)
+               FROM jsonb_object_keys(p.previous_fields) AS prev(key)
+               WHERE NOT p.fields ? prev.key
+           ), '[]'::jsonb)
+       ) END AS delta
+FROM positioned p;
+
+INSERT INTO "SnapshotBlob" ("hash", "content", "size_bytes")
+SELECT DISTINCT ON (h."hash") h."hash", h.delta, octet_length(h.delta::text)
+FROM (
+    SELECT encode(sha256(convert_to(delta::text, 'UTF8')), 'hex') AS "hash", delta
+    FROM "_snapshot_chain"
+    WHERE delta IS NOT NULL
+) AS h
+ON CONFLICT ("hash") DO NOTHING;
+
+UPDATE "CaseSnapshot" s SET
+    "keyframe_version" = c.keyframe_version,
+    "delta_hash" = CASE WHEN c.delta IS NULL THEN NULL
+                        ELSE encode(sha256(convert_to(c.delta::text, 'UTF8')), 'hex') END,
+    "fields_hash" = CASE WHEN c.is_keyframe THEN s."fields_hash" ELSE NULL END
+FROM "_snapshot_chain" c
+WHERE c."id" = s."id";
+
+DROP TABLE "_snapshot_chain";
+
+ALTER TABLE "CaseSnapshot" ALTER COLUMN "keyframe_version" SET NOT NULL;
+
+-- Nicht mehr referenzierte Voll-Payloads entfernen
+DELETE FROM "SnapshotBlob" b
+WHERE NOT EXISTS (
+    SELECT 1 FROM "CaseSnapshot" s
+    WHERE s."fields_hash" = b."hash"
+       OR s."delta_hash" = b."hash"
+       OR s."validation_hash" = b."hash"
+);
+
+-- Report: gespeicherte Blobs nach Umstellung (sichtbar im Migrations-Log)
+DO $$
+DECLARE
+    keyframe_count BIGINT;
+    delta_count BIGINT;
+    blob_bytes BIGINT;
+BEGIN
+    SELECT COUNT(*) FILTER (WHERE "fields_hash" IS NOT NULL),
+           COUNT(*) FILTER (WHERE "fields_hash" IS NULL)
+      INTO keyframe_count, delta_count
+      FROM "CaseSnapshot";
+    SELECT COALESCE(SUM("size_bytes"), 0) INTO blob_bytes FROM "SnapshotBlob";
+    RAISE NOTICE 'Snapshot deltas: % keyframes, % delta-only snapshots, % blob bytes',
+        keyframe_count, delta_count, blob_bytes;
+END
+$$;
+
+-- Indizes und Foreign Keys
+CREATE INDEX "CaseSnapshot_delta_hash_idx" ON "CaseSnapshot"("delta_hash");
+
+ALTER TABLE "CaseSnapshot" ADD CONSTRAINT "CaseSnapshot_delta_hash_fkey"
+    FOREIGN KEY ("delta_hash") REFERENCES "SnapshotBlob"("hash") ON DELETE RESTRICT ON UPDATE CASCADE;
@@ -0,0 +1,37 @@
+-- Asynchrone PDF-Export-Jobs
+--
+-- Jobs werden von der API in einem lokalen Worker-Pool abgearbeitet
+-- (apps/api/app/services/pdf_jobs.py) und überstehen Neustarts über diese
+-- Tabelle. Ein Job pro Snapshot (snapshot_id UNIQUE), damit wiederholtes
+-- Einreihen idempotent ist.
+
+-- CreateEnum
+CREATE TYPE "PdfExportJobStatus" AS ENUM ('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED');
+
+-- CreateTable
+CREATE TABLE "PdfExportJob" (
+    "id" TEXT NOT NULL,
+    "tenant_id" TEXT NOT NULL,
+    "case_id" TEXT NOT NULL,
+    "snapshot_id" TEXT NOT NULL,
+    "snapshot_version" INTEGER NOT NULL,
+    "requested_by_user_id" TEXT NOT NULL,
+    "status" "PdfExportJobStatus" NOT NULL DEFAULT 'QUEUED',
+    "error_code" TEXT,
+    "attempts" INTEGER NOT NULL DEFAULT 0,
+    "request_id" TEXT,
+    "created_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "started_at" TIMESTAMP(3),
+    "finished_at" TIMESTAMP(3),
+
+    CONSTRAINT "PdfExportJob_pkey" PRIMARY KEY ("id")
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "PdfExportJob_snapshot_id_key" ON "PdfExportJob"("snapshot_id");
+CREATE INDEX "PdfExportJob_status_created_at_idx" ON "PdfExportJob"("status", "created_at");
+CREATE INDEX "PdfExportJob_case_id_idx" ON "PdfExportJob"("case_id");
+
+-- AddForeignKey
+ALTER TABLE "PdfExportJob" ADD CONSTRAINT "PdfExportJob_case_id_fkey" FOREIGN KEY ("case_id") REFERENCES "Case"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+ALTER TABLE "PdfExportJob" ADD CONSTRAINT "PdfExportJob_snapshot_id_fkey" FOREIGN KEY ("snapshot_id") REFERENCES "CaseSnapshot"("id") ON DELETE CASCADE ON UPDATE CASCADE;
@@ -0,0 +1,9 @@
+-- Indizes für die Tagesaktivität des Dashboards
+--
+-- GET /dashboard zählt erstellte und eingereichte Fälle der letzten 7 Tage
+-- in einer Abfrage (apps/api/app/routes/dashboard.py). Mit diesen Indizes
+-- liest sie nur die Fälle im Zeitfenster statt aller Fälle des Mandanten.
+
+-- CreateIndex
+CREATE INDEX "Case_tenant_id_created_at_idx" ON "Case"("tenant_id", "created_at");
+CREATE INDEX "Case_tenant_id_submitted_at_idx" ON "Case"("tenant_id", "submitted_at");
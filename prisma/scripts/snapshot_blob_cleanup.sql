@@ -0,0 +1,34 @@
+-- Snapshot Blob Cleanup
+--
+-- SnapshotBlobs sind content-addressed und werden von Snapshots aller
+-- Mandanten gemeinsam genutzt; beim Löschen eines Falls oder Mandanten
+-- verschwinden nur die CaseSnapshots (ON DELETE CASCADE), die Blobs
+-- bleiben. Dieses Skript entfernt Blobs, auf die kein Snapshot mehr
+-- verweist (gleiche Bedingung wie Migration 0018).
+--
+-- Sicherheit:
+-- - Referenzierte Blobs können nicht gelöscht werden (Foreign Keys)
+-- - Blobs jünger als 1 Tag bleiben erhalten: put_blobs schreibt Blobs vor
+--   dem Snapshot, der sie referenziert (snapshot_store.py)
+-- - Wird ein alter, verwaister Blob genau während des Laufs wiederverwendet,
+--   schlägt das Anlegen dieses Snapshots mit einem Foreign-Key-Fehler fehl
+--   und kann wiederholt werden; Daten gehen nicht verloren
+--
+-- Idempotent, kann regelmäßig laufen (z.B. wöchentlich per Cron).
+--
+-- Ausführen mit: psql -d <database> -f snapshot_blob_cleanup.sql
+-- ODER: docker exec -i zollpilot-postgres psql -U zollpilot -d zollpilot < prisma/scripts/snapshot_blob_cleanup.sql
+
+WITH deleted AS (
+    DELETE FROM "SnapshotBlob" b
+    WHERE b."created_at" < NOW() - INTERVAL '1 day'
+      AND NOT EXISTS (
+        SELECT 1 FROM "CaseSnapshot" s
+        WHERE s."fields_hash" = b."hash"
+           OR s."delta_hash" = b."hash"
+           OR s."validation_hash" = b."hash"
+    )
+    RETURNING b."size_bytes"
+)
+SELECT COUNT(*) AS deleted_blobs, COALESCE(SUM("size_bytes"), 0) AS freed_bytes
+FROM deleted;
@@ -0,0 +1,27 @@
+-- Snapshot Storage Report
+--
+-- Vergleicht die logische Größe aller Snapshot-Payloads (so als wäre jede
+-- Kopie inline gespeichert) mit der tatsächlich gespeicherten Größe der
+-- deduplizierten SnapshotBlobs. Felddaten zählen je Snapshot als Delta
+-- bzw. bei Keyframes zusätzlich als Vollstand (siehe Migration 0018).
+--
+-- Ausführen mit: psql -d <database> -f snapshot_storage_report.sql
+-- ODER: docker exec -i zollpilot-postgres psql -U zollpilot -d zollpilot < prisma/scripts/snapshot_storage_report.sql
+
+WITH refs AS (
+    SELECT "fields_hash" AS "hash" FROM "CaseSnapshot"
+    UNION ALL
+    SELECT "delta_hash" FROM "CaseSnapshot"
+    UNION ALL
+    SELECT "validation_hash" FROM "CaseSnapshot"
+)
+SELECT
+    (SELECT COUNT(*) FROM "CaseSnapshot")                         AS snapshots,
+    (SELECT COUNT(*) FROM "CaseSnapshot" WHERE "fields_hash" IS NOT NULL) AS keyframes,
+    (SELECT COUNT(*) FROM "SnapshotBlob")                         AS blobs,
+    COALESCE(SUM(b."size_bytes"), 0)                              AS logical_bytes,
+    (SELECT COALESCE(SUM("size_bytes"), 0) FROM "SnapshotBlob")   AS stored_bytes,
+    COALESCE(SUM(b."size_bytes"), 0)
+        - (SELECT COALESCE(SUM("size_bytes"), 0) FROM "SnapshotBlob") AS saved_bytes
+FROM refs r
+JOIN "SnapshotBlob" b ON b."hash" = r."hash";